@@ -60,6 +60,7 @@ async def processar_dump_exemplo():
             chunks_added = wikipedia_offline_service._processar_lote_chunks(chunk_batch)
             total_chunks += chunks_added
             total_articles += len(set(chunk['title'] for chunk in chunk_batch))
+        escrita = wikipedia_offline_service.descarregar_escritas()
         processing_time = time.time() - start_time
         return {
             "message": "Dump de exemplo processado com sucesso",
@@ -67,6 +68,7 @@ async def processar_dump_exemplo():
             "total_articles_processed": total_articles,
             "total_chunks_created": total_chunks,
             "processing_time_seconds": round(processing_time, 2),
+            "escrita_qdrant": escrita.get(wikipedia_offline_service.collection_name, {}),
             "artigos_incluidos": ["Inteligência artificial", "Machine learning", "Python"],
             "formato_original": "MediaWiki XML",
             "proximos_passos": [
@@ -151,6 +153,7 @@ async def processar_dump_expandido():
             chunks_added = wikipedia_offline_service._processar_lote_chunks(chunk_batch)
             total_chunks += chunks_added
             total_articles += len(set(chunk['title'] for chunk in chunk_batch))
+        escrita = wikipedia_offline_service.descarregar_escritas()
         processing_time = time.time() - start_time
         return {
             "message": "Dump expandido processado com sucesso!",
@@ -158,6 +161,7 @@ async def processar_dump_expandido():
             "total_articles_processed": total_articles,
             "total_chunks_created": total_chunks,
             "processing_time_seconds": round(processing_time, 2),
+            "escrita_qdrant": escrita.get(wikipedia_offline_service.collection_name, {}),
             "chunks_per_second": round(total_chunks / processing_time, 2) if processing_time > 0 else 0,
             "artigos_incluidos": [
                 "Brasil (geografia, história, cultura)",
@@ -335,3 +339,34 @@ As aplicações de {titulo.lower()} são vastas e incluem diversos setores da so
         }
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro ao simular download: {str(e)}")
+
+@router.get("/dumps/checkpoints")
+async def listar_checkpoints():
+    try:
+        checkpoints = wikipedia_dump_processor.checkpoints.listar()
+        return {
+            "arquivo": str(wikipedia_dump_processor.checkpoints.path),
+            "total": len(checkpoints),
+            "checkpoints": checkpoints
+        }
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro ao listar checkpoints: {str(e)}")
+
+@router.delete("/dumps/checkpoints")
+async def resetar_checkpoints(filename: str = None, colecao: str = None):
+    try:
+        if filename and not colecao:
+            colecao = wikipedia_offline_service.collection_name
+        chave = wikipedia_dump_processor.checkpoints.chave(filename, colecao) if filename else None
+        removidos = wikipedia_dump_processor.checkpoints.resetar(chave)
+        if chave and removidos == 0:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Checkpoint não encontrado: {chave}")
+        return {
+            "message": "Checkpoints resetados" if chave is None else f"Checkpoint '{chave}' resetado",
+            "removidos": removidos,
+            "observacao": "A próxima ingestão desses dumps começará do início"
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro ao resetar checkpoints: {str(e)}")
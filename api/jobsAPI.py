@@ -0,0 +1,84 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from services.jobService import job_manager, ESTADOS_FINAIS
+
+router = APIRouter()
+
+
+@router.get("/jobs")
+async def listar_jobs(estado: Optional[str] = None):
+    """Lista os jobs (mais recentes primeiro), opcionalmente filtrados por estado"""
+    jobs = [job.to_dict() for job in job_manager.listar(estado)]
+    return {"total": len(jobs), "jobs": jobs}
+
+
+@router.get("/jobs/{job_id}")
+async def obter_job(job_id: str):
+    """Estado, progresso, taxa e ETA de um job"""
+    job = job_manager.obter(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job não encontrado: {job_id}")
+    return job.to_dict()
+
+
+@router.delete("/jobs/{job_id}")
+async def cancelar_job(job_id: str):
+    """Cancela um job pendente ou em execução"""
+    job = job_manager.cancelar(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job não encontrado: {job_id}")
+    return job.to_dict()
+
+
+async def _transmitir_jobs(websocket: WebSocket, job_id: Optional[str] = None):
+    """Envia cada atualização de job (ou de um job específico) pelo WebSocket"""
+    await websocket.accept()
+    loop = asyncio.get_running_loop()
+    fila: asyncio.Queue = asyncio.Queue(maxsize=1000)
+
+    def ouvinte(dados):
+        if job_id is None or dados["id"] == job_id:
+            # Chamado nas threads dos jobs: entrega ao event loop
+            loop.call_soon_threadsafe(_enfileirar, fila, dados)
+
+    job_manager.adicionar_ouvinte(ouvinte)
+    try:
+        if job_id is not None:
+            job = job_manager.obter(job_id)
+            if job is None:
+                await websocket.send_json({"erro": f"Job não encontrado: {job_id}"})
+                return
+            await websocket.send_json(job.to_dict())
+            if job.estado in ESTADOS_FINAIS:
+                return
+        while True:
+            dados = await fila.get()
+            await websocket.send_json(dados)
+            if job_id is not None and dados["estado"] in ESTADOS_FINAIS:
+                return
+    except WebSocketDisconnect:
+        pass
+    finally:
+        job_manager.remover_ouvinte(ouvinte)
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+
+def _enfileirar(fila: asyncio.Queue, dados):
+    if fila.full():
+        # Cliente lento: descarta a atualização mais antiga
+        fila.get_nowait()
+    fila.put_nowait(dados)
+
+
+@router.websocket("/ws/jobs")
+async def websocket_jobs(websocket: WebSocket):
+    await _transmitir_jobs(websocket)
+
+
+@router.websocket("/ws/jobs/{job_id}")
+async def websocket_job(websocket: WebSocket, job_id: str):
+    await _transmitir_jobs(websocket, job_id)
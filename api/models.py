@@ -81,6 +81,10 @@ class AdicionarArtigoRequest(BaseModel):
         description="Nome da coleção Qdrant a ser usada para adicionar o artigo",
         example="minha-wiki"
     )
+    incremental: bool = Field(
+        default=False,
+        description="Se verdadeiro, ignora o artigo se o conteúdo não mudou e reprocessa apenas os chunks alterados"
+    )
 
 
 class PerguntarRequest(BaseModel):
@@ -280,6 +284,8 @@ class AdicionarArtigoResponse(BaseModel):
     titulo: str = Field(..., description="Título do artigo adicionado")
     url: str = Field(..., description="URL do artigo na Wikipedia")
     chunks_adicionados: int = Field(..., description="Número de chunks criados a partir do artigo")
+    chunks_reprocessados: Optional[int] = Field(default=None, description="Chunks que passaram pelo modelo de embeddings (modo incremental)")
+    inalterado: Optional[bool] = Field(default=None, description="Se o artigo foi ignorado por não ter mudado (modo incremental)")
 
 
 class StatusResponse(BaseModel):
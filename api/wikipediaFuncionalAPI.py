@@ -19,6 +19,9 @@ logger = logging.getLogger(__name__)
 from services.dbService import listar_bases, buscar_dimensao_embedding, get_connection, get_or_create_user
 from services.wikipediaOfflineService import wikipedia_offline_service
 from services.wikipediaDumpService import wikipedia_dump_processor
+from services.utils.qdrant_factory import redefinir_cliente_qdrant
+from services.jobService import job_manager, ESTADOS_FINAIS
+from services.utils.text_analysis import analisar_consulta, normalizados
 from api.models import (
     StatusResponse,
     BuscarResponse,
@@ -91,6 +94,9 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("👋 Encerrando serviços...")
+    job_manager.encerrar()
+    wikipedia_offline_service.encerrar()
+    redefinir_cliente_qdrant()
 
 # Definição do objeto FastAPI
 app = FastAPI(
@@ -158,12 +164,14 @@ async def criar_colecao(request: Request):
         modelo = data.get("modelo", "bge-large-pt").strip()
         modelo_dim = data.get("dimensoes", 1024)
         modelo_llm = data.get("modelo_llm", "qwen2.5:7b").strip()
-        logger.debug(f"[criar_colecao] Parâmetros extraídos: nome={nome}, modelo={modelo}, dimensoes={modelo_dim}, modelo_llm={modelo_llm}")
+        perfil = data.get("perfil") or None
+        hibrida = data.get("hibrida")
+        logger.debug(f"[criar_colecao] Parâmetros extraídos: nome={nome}, modelo={modelo}, dimensoes={modelo_dim}, modelo_llm={modelo_llm}, perfil={perfil}, hibrida={hibrida}")
         if not nome:
              return {"sucesso": False, "erro": "Nome da coleção não informado."}
         # Usar serviço para criar coleção
         from services import colecaoService
-        resultado = colecaoService.criar_colecao(nome, modelo_dim=modelo_dim)
+        resultado = colecaoService.criar_colecao(nome, modelo_dim=modelo_dim, perfil=perfil, hibrida=hibrida)
         logger.debug(f"[criar_colecao] Resultado do criar_colecao: {resultado}")
         if resultado.get("sucesso"):
             # Inserir no MySQL
@@ -195,7 +203,7 @@ async def criar_colecao(request: Request):
                 logger.error(f"[criar_colecao] Erro ao inserir no MySQL: {db_err}")
                 return {"sucesso": False, "erro": f"Coleção criada no Qdrant, mas falha ao inserir no MySQL: {str(db_err)}"}
             logger.info(f"[criar_colecao] Coleção '{nome}' criada e registrada no MySQL.")
-            return {"sucesso": True, "modelo": modelo, "modelo_llm": modelo_llm, "dimensao": modelo_dim}
+            return {"sucesso": True, "modelo": modelo, "modelo_llm": modelo_llm, "dimensao": modelo_dim, "perfil": resultado.get("perfil")}
         else:
             logger.error(f"[criar_colecao] Falha ao criar coleção no Qdrant: {resultado}")
             return resultado
@@ -206,6 +214,43 @@ async def criar_colecao(request: Request):
 
 
 
+@app.get("/perfis_armazenamento")
+async def perfis_armazenamento(dimensao: int = 1024, vetores: int = 1_000_000):
+    """Perfis de armazenamento disponíveis para novas coleções, com memória estimada"""
+    from services.utils.storage_profiles import PERFIS, listar_perfis, estimar_memoria, obter_perfil
+    
+    perfis = listar_perfis()
+    for nome, perfil in PERFIS.items():
+        perfis[nome]["estimativa"] = estimar_memoria(perfil, vetores, dimensao)
+    return {"padrao": obter_perfil().nome, "dimensao": dimensao, "vetores": vetores, "perfis": perfis}
+
+
+@app.get("/colecoes/{nome}/indices")
+async def indices_colecao(nome: str):
+    """Índices de payload existentes na coleção e os que faltam no esquema"""
+    from services import colecaoService
+
+    resultado = colecaoService.indices_colecao(nome)
+    if not resultado.get("sucesso"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=resultado.get("erro"))
+    return resultado
+
+
+@app.post("/colecoes/{nome}/indices")
+async def aplicar_indices_colecao(nome: str, esperar: bool = False):
+    """Cria os índices de payload que faltam em uma coleção existente (backfill)
+
+    Com esperar=true a resposta só volta depois que o Qdrant indexou os pontos.
+    """
+    from starlette.concurrency import run_in_threadpool
+    from services import colecaoService
+
+    resultado = await run_in_threadpool(colecaoService.aplicar_indices, nome, esperar)
+    if not resultado.get("sucesso") and "indices" not in resultado:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=resultado.get("erro"))
+    return resultado
+
+
 @app.get("/")
 async def raiz():
     """Redireciona para a interface web"""
@@ -333,28 +378,22 @@ async def buscar_artigos(request: BuscarRequest):
         
         # Aplicar validação de termos similar ao sistema RAG, agora usando normalização
         if resultados:
-            import unicodedata
-            def normalizar_texto(texto):
-                texto_nfd = unicodedata.normalize('NFD', texto)
-                texto_sem_acento = ''.join(c for c in texto_nfd if unicodedata.category(c) != 'Mn')
-                return texto_sem_acento.lower()
-
-            stopwords = ['o', 'que', 'é', 'a', 'de', 'da', 'do', 'um', 'uma', 'os', 'as', 'para', 'com', 'por']
-            termos_query = [t.lower().strip('?.,!()') for t in request.query.split() if t.lower() not in stopwords and len(t) > 2]
-            termos_query_normalizados = [normalizar_texto(t) for t in termos_query]
+            # Mesma análise (memoizada) da busca: termos sem stopwords e pontuação, já normalizados
+            analise = analisar_consulta(request.query)
+            termos_query_normalizados = analise.termos_normalizados
+            query_norm = analise.normalizada
 
             if termos_query_normalizados:
                 resultados_filtrados = []
                 for r in resultados:
-                    titulo_norm = normalizar_texto(r.title)
-                    conteudo_norm = normalizar_texto(r.content)
+                    # Título e início do conteúdo normalizados na ingestão
+                    titulo_norm, conteudo_norm = normalizados(r)
 
                     # Verificar se algum termo normalizado da query aparece no título ou conteúdo normalizado
                     tem_termo = any(termo in titulo_norm or termo in conteudo_norm for termo in termos_query_normalizados)
 
                     # Verificação reversa: título normalizado aparece na query normalizada
-                    titulo_palavras = [normalizar_texto(p) for p in r.title.split() if len(p) > 2]
-                    query_norm = normalizar_texto(request.query)
+                    titulo_palavras = [p for p in titulo_norm.split() if len(p) > 2]
                     titulo_na_query = any(palavra in query_norm for palavra in titulo_palavras)
 
                     if tem_termo or titulo_na_query:
@@ -495,6 +534,72 @@ async def perguntar_com_rag(request: PerguntarRequest):
         )
 
 
+def _resumo_incremental() -> dict:
+    """Resumo da última ingestão incremental (chunks reprocessados / artigo inalterado)"""
+    from services.langchainWikipediaService import langchain_wikipedia_service
+    ultima = langchain_wikipedia_service.ultima_ingestao
+    return {
+        "chunks_reprocessados": ultima.get("chunks_reembedados", 0),
+        "inalterado": ultima.get("artigos_inalterados", 0) > 0
+    }
+
+
+def _resposta_job(job, mensagem: str, **extra) -> dict:
+    """Resposta padrão de endpoints que enfileiram um job em segundo plano"""
+    return {
+        "message": mensagem,
+        "job_id": job.id,
+        "tipo": job.tipo,
+        "estado": job.estado,
+        "acompanhar": {
+            "rest": f"/jobs/{job.id}",
+            "websocket": f"/ws/jobs/{job.id}",
+            "cancelar": f"DELETE /jobs/{job.id}"
+        },
+        **extra
+    }
+
+
+def _recusar_job_duplicado(tipo: str, **parametros):
+    """409 com o job_id do job ainda ativo sobre o mesmo recurso (arquivo, coleção)"""
+    ativo = job_manager.em_andamento(tipo, **parametros)
+    if ativo is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": f"Já existe um job {tipo} em andamento para {parametros}",
+                "job_id": ativo.id,
+                "estado": ativo.estado,
+                "acompanhar": f"/jobs/{ativo.id}"
+            }
+        )
+
+
+# Títulos por chamada de ingestão em jobs (um lote da API da Wikipedia)
+LOTE_TITULOS_JOB = 50
+
+
+def _ingerir_titulos_em_job(contexto, titulos: List[str], colecao: Optional[str] = None,
+                            incremental: bool = False, artigos_base: int = 0, chunks_base: int = 0) -> dict:
+    """Ingere títulos em lotes, reportando progresso ao job; retorna chunks por título
+
+    artigos_base/chunks_base somam o que etapas anteriores do mesmo job já processaram.
+    """
+    chunks_por_titulo = {}
+    for i in range(0, len(titulos), LOTE_TITULOS_JOB):
+        if contexto.cancelado:
+            break
+        lote = titulos[i:i + LOTE_TITULOS_JOB]
+        chunks_por_titulo.update(
+            wikipedia_offline_service.adicionar_artigos_com_langchain(lote, colecao, incremental)
+        )
+        contexto.atualizar(
+            artigos=artigos_base + i + len(lote),
+            chunks=chunks_base + sum(chunks_por_titulo.values())
+        )
+    return chunks_por_titulo
+
+
 @app.post("/adicionar", response_model=AdicionarArtigoResponse)
 async def adicionar_artigo(request: AdicionarArtigoRequest):
     """Adiciona artigo da Wikipedia à base local na coleção selecionada"""
@@ -505,7 +610,8 @@ async def adicionar_artigo(request: AdicionarArtigoRequest):
 
         chunks_adicionados = wikipedia_offline_service.adicionar_artigo_wikipedia(
             request.titulo,
-            colecao=colecao
+            colecao=colecao,
+            incremental=request.incremental
         )
         if chunks_adicionados == 0:
             raise HTTPException(    
@@ -519,7 +625,8 @@ async def adicionar_artigo(request: AdicionarArtigoRequest):
             message="Artigo adicionado com sucesso à base offline",
             titulo=request.titulo,
             url=url,
-            chunks_adicionados=chunks_adicionados
+            chunks_adicionados=chunks_adicionados,
+            **(_resumo_incremental() if request.incremental else {})
         )
     except HTTPException:
         raise
@@ -531,52 +638,44 @@ async def adicionar_artigo(request: AdicionarArtigoRequest):
 
 
 
-@app.post("/ingest")
+@app.post("/ingest", status_code=status.HTTP_202_ACCEPTED)
 async def ingerir_artigos_personalizados(request: dict):
-    """Ingere uma lista personalizada de artigos da Wikipedia"""
-    try:
-        total_chunks = 0
-        resultados = []
-        artigos_processados = 0
-        artigos_falharam = 0
+    """Ingere uma lista personalizada de artigos da Wikipedia em um job em segundo plano
 
+    Os artigos são buscados em paralelo na Wikipedia API (limite em
+    WIKIPEDIA_MAX_CONCURRENCY), em lotes de até 50 títulos. A resposta traz o
+    job_id; o progresso e o resultado ficam em GET /jobs/{job_id}.
+    """
+    try:
         artigos = request.get("artigos", [])
-        for titulo in artigos:
-            try:
-                chunks = wikipedia_offline_service.adicionar_artigo_wikipedia(titulo)
-                total_chunks += chunks
-
-                if chunks > 0:
-                    artigos_processados += 1
-                    status = "ok"
-                else:
-                    artigos_falharam += 1
-                    status = "erro"
+        colecao = request.get("colecao")
+        incremental = bool(request.get("incremental", False))
 
+        def executar(contexto):
+            chunks_por_titulo = _ingerir_titulos_em_job(contexto, artigos, colecao, incremental)
+            resultados = []
+            for titulo in artigos:
+                chunks = chunks_por_titulo.get(titulo, 0)
                 resultados.append({
                     "titulo": titulo,
                     "chunks": chunks,
-                    "status": status,
+                    "status": "ok" if chunks > 0 else ("cancelado" if titulo not in chunks_por_titulo else "erro"),
                     "erro": None if chunks > 0 else "Artigo não encontrado ou erro no processamento"
                 })
+            artigos_processados = sum(1 for r in resultados if r["chunks"] > 0)
+            return {
+                "total_artigos": len(artigos),
+                "total_chunks": sum(r["chunks"] for r in resultados),
+                "artigos_processados": artigos_processados,
+                "artigos_falharam": len(artigos) - artigos_processados,
+                "resultados": resultados
+            }
 
-            except Exception as e:
-                artigos_falharam += 1
-                resultados.append({
-                    "titulo": titulo,
-                    "chunks": 0,
-                    "status": "erro",
-                    "erro": str(e)
-                })
-
-        return {
-            "message": "Ingestão personalizada concluída",
-            "total_artigos": len(artigos),
-            "total_chunks": total_chunks,
-            "artigos_processados": artigos_processados,
-            "artigos_falharam": artigos_falharam,
-            "resultados": resultados
-        }
+        job = job_manager.submeter(
+            "ingest", executar, {"artigos": artigos, "colecao": colecao, "incremental": incremental},
+            total_artigos=len(artigos)
+        )
+        return _resposta_job(job, "Ingestão personalizada enfileirada", total_artigos=len(artigos))
 
     except Exception as e:
         raise HTTPException(
@@ -640,7 +739,8 @@ async def ingerir_artigos_com_langchain():
         logger.info("🔗 Iniciando ingestão com LangChain...")
         
         # Usar o novo método LangChain
-        resultados = wikipedia_offline_service.adicionar_artigos_com_langchain(artigos_exemplo)
+        from starlette.concurrency import run_in_threadpool
+        resultados = await run_in_threadpool(wikipedia_offline_service.adicionar_artigos_com_langchain, artigos_exemplo)
         
         total_chunks = sum(resultados.values())
         sucessos = len([r for r in resultados.values() if r > 0])
@@ -668,6 +768,148 @@ async def ingerir_artigos_com_langchain():
         )
 
 
+@app.get("/langchain/embedding-cache")
+async def estatisticas_cache_embeddings():
+    """Contadores de acerto/falha do cache persistente de embeddings e do LRU de consultas"""
+    from services.langchainWikipediaService import langchain_wikipedia_service
+    
+    consultas = langchain_wikipedia_service.cache_consultas.estatisticas()
+    cache = langchain_wikipedia_service._obter_cache_embeddings()
+    if cache is None:
+        return {
+            "habilitado": False, "consultas": consultas,
+            "observacao": "Defina ENABLE_EMBEDDING_CACHE=true e carregue o modelo de embeddings"
+        }
+    return {"habilitado": True, **cache.estatisticas(), "consultas": consultas}
+
+
+@app.delete("/langchain/embedding-cache")
+async def limpar_cache_embeddings():
+    """Remove todas as entradas do cache persistente de embeddings e do LRU de consultas"""
+    from services.langchainWikipediaService import langchain_wikipedia_service
+    
+    langchain_wikipedia_service.cache_consultas.limpar()
+    cache = langchain_wikipedia_service._obter_cache_embeddings()
+    if cache is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cache de embeddings desabilitado")
+    cache.limpar()
+    return {"message": "Cache de embeddings limpo", **cache.estatisticas()}
+
+
+@app.get("/langchain/chunking")
+async def configuracao_chunking(colecao: Optional[str] = None):
+    """Modo de chunking por coleção e truncamento medido na última ingestão"""
+    from services.langchainWikipediaService import langchain_wikipedia_service
+    
+    colecao = colecao or langchain_wikipedia_service.collection_name
+    chunker = langchain_wikipedia_service.obter_chunker(colecao)
+    ultima = langchain_wikipedia_service.ultima_ingestao
+    return {
+        "colecao": colecao,
+        "modo": langchain_wikipedia_service.modo_chunking(colecao),
+        "modo_efetivo": "tokens" if chunker is not None else "caracteres",
+        "tokens_por_chunk": chunker.tokens_por_chunk if chunker else None,
+        "overlap_tokens": chunker.overlap_tokens if chunker else None,
+        "max_seq_length": chunker.max_tokens if chunker else None,
+        "por_colecao": langchain_wikipedia_service.chunking_por_colecao,
+        "ultima_ingestao": {"chunking": ultima.get("chunking"), "truncamento": ultima.get("truncamento")}
+    }
+
+
+@app.put("/langchain/chunking/{colecao}")
+async def definir_chunking(colecao: str, modo: str = "tokens"):
+    """Define o chunking da coleção: "tokens" (tokenizer do modelo) ou "caracteres" """
+    from services.langchainWikipediaService import langchain_wikipedia_service
+    
+    try:
+        langchain_wikipedia_service.definir_chunking(colecao, modo)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await configuracao_chunking(colecao)
+
+
+@app.post("/langchain/chunking/relatorio")
+async def relatorio_chunking(request: dict):
+    """Compara o truncamento de artigos divididos por caracteres e por tokens
+
+    Recebe {"artigos": [títulos]}; os artigos são buscados na Wikipedia API.
+    """
+    try:
+        from starlette.concurrency import run_in_threadpool
+        from services.langchainWikipediaService import langchain_wikipedia_service
+        
+        titulos = request.get("artigos", [])
+        artigos = await run_in_threadpool(wikipedia_offline_service._buscar_artigos_wikipedia, titulos)
+        textos = [artigo["content"] for artigo in artigos.values() if artigo and artigo.get("content")]
+        relatorio = await run_in_threadpool(langchain_wikipedia_service.comparar_chunking, textos)
+        return {"artigos": len(textos), **relatorio}
+        
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro no relatório de chunking: {str(e)}"
+        )
+
+
+@app.get("/langchain/deduplicacao")
+async def estatisticas_deduplicacao(colecao: Optional[str] = None, limite: int = 100):
+    """Índice de quase-duplicatas da coleção e os últimos chunks suprimidos"""
+    from services.langchainWikipediaService import langchain_wikipedia_service
+    
+    colecao = colecao or langchain_wikipedia_service.collection_name
+    deduplicador = langchain_wikipedia_service.obter_deduplicador(colecao)
+    if deduplicador is None:
+        return {"colecao": colecao, "modo": "desligado"}
+    from services.utils.dedup_utils import obter_registro_supressoes
+    
+    suprimidos = list(deduplicador.suprimidos)[-limite:] if limite > 0 else []
+    registro = obter_registro_supressoes(colecao, criar=False)
+    return {
+        "colecao": colecao,
+        **deduplicador.estatisticas(),
+        "chunks_suprimidos_registrados": registro.contar() if registro is not None else 0,
+        "ultima_ingestao": langchain_wikipedia_service.ultima_ingestao.get("deduplicacao"),
+        "suprimidos": suprimidos
+    }
+
+
+@app.delete("/langchain/deduplicacao/{colecao}")
+async def limpar_deduplicacao(colecao: str):
+    """Esvazia o índice de quase-duplicatas da coleção"""
+    from services.langchainWikipediaService import langchain_wikipedia_service
+    
+    langchain_wikipedia_service.limpar_deduplicacao(colecao)
+    return {"message": f"Índice de deduplicação de '{colecao}' limpo"}
+
+
+@app.get("/langchain/content-store")
+async def estatisticas_content_store(colecao: Optional[str] = None):
+    """Tamanho, compressão e acertos do LRU do armazenamento externo de texto da coleção"""
+    from services.langchainWikipediaService import langchain_wikipedia_service
+    from services.utils.content_store import content_store_habilitado, obter_content_store
+
+    colecao = colecao or langchain_wikipedia_service.collection_name
+    store = obter_content_store(colecao, criar=False)
+    if store is None:
+        return {"colecao": colecao, "habilitado": content_store_habilitado(), "registros": 0}
+    return {"habilitado": content_store_habilitado(), **store.estatisticas()}
+
+
+@app.post("/langchain/content-store/{colecao}/compactar")
+async def compactar_content_store(colecao: str):
+    """Reescreve o arquivo de texto da coleção sem os registros substituídos ou removidos"""
+    from starlette.concurrency import run_in_threadpool
+    from services.utils.content_store import obter_content_store
+
+    store = obter_content_store(colecao, criar=False)
+    if store is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Coleção '{colecao}' sem content store")
+    resultado = await run_in_threadpool(store.compactar)
+    return {"colecao": colecao, **resultado}
+
+
 @app.get("/langchain/stats")
 async def estatisticas_langchain():
     """Estatísticas da coleção LangChain"""
@@ -695,9 +937,9 @@ async def estatisticas_langchain():
         )
 
 
-@app.post("/ingest/categorias")
+@app.post("/ingest/categorias", status_code=status.HTTP_202_ACCEPTED)
 async def ingerir_por_categorias():
-    """Ingere artigos por categorias temáticas predefinidas"""
+    """Ingere artigos por categorias temáticas predefinidas (job em segundo plano)"""
     
     categorias = {
         "tecnologia": [
@@ -750,50 +992,50 @@ async def ingerir_por_categorias():
         ]
     }
     
-    try:
+    def executar(contexto):
         resultados_por_categoria = {}
         total_geral = 0
-        
+        processados = 0
+
         for categoria, artigos in categorias.items():
-            total_chunks = 0
-            artigos_processados = 0
-            resultados = []
-            
-            for titulo in artigos:
-                try:
-                    chunks = wikipedia_offline_service.adicionar_artigo_wikipedia(titulo)
-                    total_chunks += chunks
-                    total_geral += chunks
-                    
-                    if chunks > 0:
-                        artigos_processados += 1
-                        
-                    resultados.append({
-                        "titulo": titulo,
-                        "chunks": chunks,
-                        "status": "ok" if chunks > 0 else "erro"
-                    })
-                    
-                except Exception as e:
-                    resultados.append({
-                        "titulo": titulo,
-                        "chunks": 0,
-                        "status": "erro",
-                        "erro": str(e)
-                    })
-            
+            if contexto.cancelado:
+                break
+            contexto.atualizar(etapa=categoria)
+            chunks_por_titulo = _ingerir_titulos_em_job(
+                contexto, artigos, artigos_base=processados, chunks_base=total_geral
+            )
+            processados += len(artigos)
+            total_chunks = sum(chunks_por_titulo.values())
+            total_geral += total_chunks
+
             resultados_por_categoria[categoria] = {
                 "total_artigos": len(artigos),
-                "artigos_processados": artigos_processados,
+                "artigos_processados": sum(1 for c in chunks_por_titulo.values() if c > 0),
                 "total_chunks": total_chunks,
-                "resultados": resultados
+                "resultados": [
+                    {
+                        "titulo": titulo,
+                        "chunks": chunks_por_titulo.get(titulo, 0),
+                        "status": "ok" if chunks_por_titulo.get(titulo, 0) > 0 else "erro"
+                    }
+                    for titulo in artigos
+                ]
             }
-        
+
         return {
-            "message": "Ingestão por categorias concluída",
             "total_chunks_geral": total_geral,
             "categorias": resultados_por_categoria
         }
+
+    try:
+        total_artigos = sum(len(artigos) for artigos in categorias.values())
+        job = job_manager.submeter(
+            "ingest_categorias", executar, {"categorias": list(categorias)}, total_artigos=total_artigos
+        )
+        return _resposta_job(
+            job, "Ingestão por categorias enfileirada",
+            categorias=list(categorias), total_artigos=total_artigos
+        )
         
     except Exception as e:
         raise HTTPException(
@@ -1012,6 +1254,9 @@ async def processar_dump_exemplo():
             total_chunks += chunks_added
             total_articles += len(set(chunk['title'] for chunk in chunk_batch))
         
+        # Esperar os upserts ainda em voo
+        escrita = wikipedia_offline_service.descarregar_escritas()
+        
         end_time = time.time()
         processing_time = end_time - start_time
         
@@ -1021,6 +1266,7 @@ async def processar_dump_exemplo():
             "total_articles_processed": total_articles,
             "total_chunks_created": total_chunks,
             "processing_time_seconds": round(processing_time, 2),
+            "escrita_qdrant": escrita.get(wikipedia_offline_service.collection_name, {}),
             "artigos_incluidos": ["Inteligência artificial", "Machine learning", "Python"],
             "formato_original": "MediaWiki XML",
             "proximos_passos": [
@@ -1156,6 +1402,9 @@ async def processar_dump_expandido():
             total_chunks += chunks_added
             total_articles += len(set(chunk['title'] for chunk in chunk_batch))
         
+        # Esperar os upserts ainda em voo
+        escrita = wikipedia_offline_service.descarregar_escritas()
+        
         end_time = time.time()
         processing_time = end_time - start_time
         
@@ -1165,6 +1414,7 @@ async def processar_dump_expandido():
             "total_articles_processed": total_articles,
             "total_chunks_created": total_chunks,
             "processing_time_seconds": round(processing_time, 2),
+            "escrita_qdrant": escrita.get(wikipedia_offline_service.collection_name, {}),
             "chunks_per_second": round(total_chunks / processing_time, 2) if processing_time > 0 else 0,
             "artigos_incluidos": [
                 "Brasil (geografia, história, cultura)",
@@ -1379,13 +1629,17 @@ As aplicações de {titulo.lower()} são vastas e incluem diversos setores da so
         )
 
 
-@app.post("/dumps/baixar-real")
-async def baixar_dump_real(url: str, background_tasks: BackgroundTasks):
-    """Baixa um dump real da Wikipedia"""
+@app.post("/dumps/baixar-real", status_code=status.HTTP_202_ACCEPTED)
+async def baixar_dump_real(url: str):
+    """Baixa um dump real da Wikipedia em um job (progresso em bytes em GET /jobs/{job_id})
+
+    O download usa DOWNLOAD_SEGMENTS conexões com Range e confere o SHA-1 do
+    dumpstatus.json; chamar de novo com a mesma URL retoma um download interrompido.
+    """
     try:
         import requests
-        from pathlib import Path
-        import time
+        from starlette.concurrency import run_in_threadpool
+        from services.utils.download_utils import DownloadCancelado, DownloadSegmentado, checksums_dumpstatus
         
         # Extrair nome do arquivo da URL
         filename = url.split('/')[-1]
@@ -1400,8 +1654,9 @@ async def baixar_dump_real(url: str, background_tasks: BackgroundTasks):
                 "uso": f"Use POST /dumps/processar-real com filename='{filename}'"
             }
         
-        # Verificar se URL está acessível
-        response = requests.head(url, timeout=30)
+        # Verificar se URL está acessível (chamadas bloqueantes fora do event loop,
+        # para não travar o WebSocket de progresso dos jobs)
+        response = await run_in_threadpool(requests.head, url, timeout=30)
         if response.status_code != 200:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -1411,50 +1666,55 @@ async def baixar_dump_real(url: str, background_tasks: BackgroundTasks):
         file_size_bytes = int(response.headers.get('content-length', 0))
         file_size_mb = round(file_size_bytes / (1024 * 1024), 2)
         
-        # Função para baixar em background
-        def download_file():
+        publicados = await run_in_threadpool(checksums_dumpstatus, url)
+        algoritmo = next((a for a in ("sha1", "md5") if publicados and a in publicados), None)
+        
+        def download_file(contexto):
+            # Segmentos paralelos; falha ou cancelamento mantém o .part para retomar na próxima chamada
+            download = DownloadSegmentado(
+                url, filepath,
+                checksum=(algoritmo, publicados[algoritmo]) if algoritmo else None,
+                progresso=lambda baixados, total: contexto.atualizar(bytes=baixados)
+            )
+            contexto.ao_cancelar(download.cancelar)
             try:
-                start_time = time.time()
-                
-                with requests.get(url, stream=True, timeout=300) as r:
-                    r.raise_for_status()
-                    with open(filepath, 'wb') as f:
-                        downloaded = 0
-                        for chunk in r.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                                downloaded += len(chunk)
-                
-                end_time = time.time()
-                download_time = end_time - start_time
-                
-                # Log de sucesso (seria melhor usar logging real)
-                print(f"Download concluído: {filename} ({file_size_mb} MB) em {download_time:.1f}s")
-                
-            except Exception as e:
-                print(f"Erro no download: {str(e)}")
-                if filepath.exists():
-                    filepath.unlink()  # Remove arquivo parcial
+                resultado = download.executar()
+            except DownloadCancelado:
+                return {"filename": filename, "bytes_baixados": download.baixados, "parcial_mantido": True}
+            
+            logger.info(f"✅ Download concluído: {filename} ({file_size_mb} MB) em {resultado['tempo_s']}s")
+            return {
+                "filename": filename,
+                "size_mb": round(resultado["bytes"] / (1024 * 1024), 2),
+                "tempo_download_s": resultado["tempo_s"],
+                "mb_por_segundo": resultado["mb_por_segundo"],
+                "segmentos": resultado["segmentos"],
+                "retomado_de_bytes": resultado["retomado_de_bytes"],
+                "checksum": resultado["checksum"]
+            }
         
-        # Iniciar download em background
-        background_tasks.add_task(download_file)
+        # Dois downloads do mesmo arquivo dividiriam o .part e o .part.json: o segundo
+        # truncaria o arquivo sob o primeiro (verificado aqui, sem await até o submeter)
+        _recusar_job_duplicado("download_dump", filename=filename)
+        job = job_manager.submeter(
+            "download_dump", download_file, {"url": url, "filename": filename},
+            total_bytes=file_size_bytes or None
+        )
         
-        return {
-            "message": "Download iniciado em background",
-            "tipo": "Dump real da Wikipedia",
-            "url": url,
-            "filename": filename,
-            "size_mb_esperado": file_size_mb,
-            "status": "downloading",
-            "tempo_estimado_min": round(file_size_mb / 10, 1),  # ~10MB/min estimativa
-            "verificar_progresso": "Verifique se arquivo existe em /dumps/disponiveis",
-            "proximos_passos": [
-                "1. Aguardar conclusão do download",
-                f"2. Verificar: GET /dumps/disponiveis",
-                f"3. Processar: POST /dumps/processar-real (filename={filename})"
+        return _resposta_job(
+            job, "Download iniciado em background",
+            url=url,
+            filename=filename,
+            size_mb_esperado=file_size_mb,
+            checksum=algoritmo,
+            proximos_passos=[
+                f"1. Acompanhar: GET /jobs/{job.id}",
+                f"2. Processar: POST /dumps/processar-real (filename={filename})"
             ]
-        }
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1462,13 +1722,30 @@ async def baixar_dump_real(url: str, background_tasks: BackgroundTasks):
         )
 
 
-@app.post("/dumps/processar-real")
-async def processar_dump_real(filename: str, max_artigos: int = 1000, offset: int = 0):
-    """Processa um dump real da Wikipedia (com limite para evitar sobrecarga)"""
+@app.post("/dumps/processar-real", status_code=status.HTTP_202_ACCEPTED)
+async def processar_dump_real(
+    filename: str,
+    max_artigos: int = 1000,
+    offset: int = 0,
+    min_page_id: Optional[int] = None,
+    max_page_id: Optional[int] = None,
+    retomar: bool = True,
+    incremental: bool = False,
+    colecao: Optional[str] = None,
+    clean_workers: Optional[int] = None,
+    upsert_workers: Optional[int] = None,
+    embed_batch_size: Optional[int] = None
+):
+    """Processa um dump real da Wikipedia com o pipeline paralelo em um job em segundo plano
+
+    A resposta traz o job_id; progresso (artigos, chunks, taxa, ETA) e resultado ficam
+    em GET /jobs/{job_id} e no WebSocket /ws/jobs/{job_id}.
+
+    Com retomar=True (padrão), cada chamada continua do checkpoint da chamada anterior;
+    o parâmetro offset só é usado quando não há checkpoint.
+    """
     try:
-        import time
-        
-        start_time = time.time()
+        from services.dumpPipelineService import PipelineConfig
         
         # Verificar se arquivo existe
         filepath = wikipedia_dump_processor.data_dir / filename
@@ -1478,73 +1755,86 @@ async def processar_dump_real(filename: str, max_artigos: int = 1000, offset: in
                 detail=f"Arquivo não encontrado: {filename}"
             )
         
-        # Obter tamanho do arquivo
-        file_size_mb = round(filepath.stat().st_size / (1024 * 1024), 2)
-        
-        # Processar dump com limite
-        wikipedia_dump_processor.offset = offset
-        chunks_generator = wikipedia_dump_processor.process_dump_to_chunks(
-            str(filepath), 
-            max_articles=max_artigos
+        # Dois jobs no mesmo arquivo e coleção partiriam do mesmo checkpoint e
+        # sobrescreveriam o progresso um do outro
+        _recusar_job_duplicado(
+            "processar_dump", filename=filename, colecao=colecao or wikipedia_offline_service.collection_name
         )
         
-        # Processar chunks e adicionar ao Qdrant
-        total_chunks = 0
-        articles_processed = 0
-        
-        print(f"🔄 Iniciando processamento de {filepath}")
-        print(f"📊 Limite de artigos: {max_artigos}")
+        # Obter tamanho do arquivo
+        file_size_mb = round(filepath.stat().st_size / (1024 * 1024), 2)
         
-        try:
-            chunk_count = 0
-            for chunk_data in chunks_generator:
-                chunk_count += 1
-                print(f"🧩 Chunk {chunk_count}: {chunk_data.get('title', 'sem título')[:50]}...")
-                
-                # Adicionar chunk ao Qdrant através do serviço offline
-                try:
-                    success = wikipedia_offline_service.adicionar_chunk_direto(chunk_data)
-                    if success:
-                        total_chunks += 1
-                        if total_chunks % 10 == 0:  # Log a cada 10 chunks
-                            print(f"✅ {total_chunks} chunks processados...")
-                except Exception as e:
-                    print(f"❌ Erro ao adicionar chunk: {e}")
-                    continue
+        # Configuração do pipeline (parâmetros da requisição sobrescrevem variáveis de ambiente)
+        config = PipelineConfig()
+        if clean_workers:
+            config.clean_workers = clean_workers
+        if upsert_workers:
+            config.upsert_workers = upsert_workers
+        if embed_batch_size:
+            config.embed_batch_size = embed_batch_size
+        if incremental:
+            config.incremental = True
+        
+        pipeline = wikipedia_offline_service.criar_pipeline_dump(colecao=colecao, config=config)
+        
+        def executar(contexto):
+            pipeline.progress_callback = lambda stats: contexto.atualizar(
+                artigos=stats["etapas"]["limpeza"]["itens"], chunks=stats["etapas"]["upsert"]["itens"]
+            )
+            contexto.ao_cancelar(pipeline.cancelar)
+            logger.info(f"🔄 Iniciando processamento de {filepath} (limite de artigos: {max_artigos})")
+            resultado = pipeline.executar(str(filepath), max_artigos, offset, min_page_id, max_page_id, retomar)
             
-            print(f"🔍 Total de chunks gerados pelo parser: {chunk_count}")
+            total_chunks = resultado["chunks_inseridos"]
+            processing_time = resultado["tempo_total_s"]
+            chunks_per_second = round(total_chunks / processing_time, 2) if processing_time > 0 and total_chunks > 0 else 0
             
-        except Exception as e:
-            print(f"❌ Erro durante iteração do generator: {e}")
-            import traceback
-            print(f"📋 Stack trace: {traceback.format_exc()}")
-        
-        print(f"🏁 Processamento concluído: {total_chunks} chunks")
-        
-        end_time = time.time()
-        processing_time = end_time - start_time
-        chunks_per_second = round(total_chunks / processing_time, 2) if processing_time > 0 and total_chunks > 0 else 0
+            return {
+                "tipo": "Processamento de dump real da Wikipedia (pipeline paralelo)",
+                "filename": filename,
+                "file_size_mb": file_size_mb,
+                "colecao": pipeline.colecao,
+                "total_chunks_created": total_chunks,
+                "artigos_processados": resultado["artigos_processados"],
+                "max_artigos_processados": max_artigos,
+                "intervalo_page_id": [min_page_id, max_page_id],
+                "multistream": wikipedia_dump_processor.find_multistream_index(str(filepath)) is not None,
+                "processing_time_seconds": processing_time,
+                "chunks_per_second": chunks_per_second,
+                "pipeline": {
+                    "clean_workers": config.clean_workers,
+                    "upsert_workers": config.upsert_workers,
+                    "embed_batch_size": config.embed_batch_size,
+                    "etapas": resultado["etapas"]
+                },
+                "erro": resultado["erro"],
+                "checkpoint": resultado.get("checkpoint"),
+                "incremental": resultado.get("incremental"),
+                "deduplicacao": resultado.get("deduplicacao"),
+                "formato": "MediaWiki XML real (comprimido bz2)",
+                "aviso": "Processamento limitado para evitar sobrecarga do sistema",
+                "proximos_passos": [
+                    "1. Verificar estatísticas: GET /estatisticas",
+                    "2. Testar busca: POST /buscar (query='brasil')",
+                    "3. Fazer perguntas: POST /perguntar",
+                    f"4. Para processar os próximos artigos: POST /dumps/processar-real (filename={filename}) - retoma do checkpoint",
+                    "5. Ver ou resetar checkpoints: GET/DELETE /dumps/checkpoints"
+                ],
+                "observacao": f"Sistema agora tem dados reais da Wikipedia portuguesa! 🎉"
+            }
         
-        return {
-            "message": f"Dump real processado com sucesso! (Limitado a {max_artigos} artigos)",
-            "tipo": "Processamento de dump real da Wikipedia",
-            "filename": filename,
-            "file_size_mb": file_size_mb,
-            "total_chunks_created": total_chunks,
-            "max_artigos_processados": max_artigos,
-            "processing_time_seconds": round(processing_time, 2),
-            "chunks_per_second": chunks_per_second,
-            "formato": "MediaWiki XML real (comprimido bz2)",
-            "aviso": "Processamento limitado para evitar sobrecarga do sistema",
-            "proximos_passos": [
-                "1. Verificar estatísticas: GET /estatisticas",
-                "2. Testar busca: POST /buscar (query='brasil')",
-                "3. Fazer perguntas: POST /perguntar",
-                f"4. Para processar mais artigos: POST /dumps/processar-real (max_artigos > {max_artigos})"
-            ],
-            "observacao": f"Sistema agora tem dados reais da Wikipedia portuguesa! 🎉"
-        }
+        job = job_manager.submeter(
+            "processar_dump", executar,
+            {"filename": filename, "max_artigos": max_artigos, "colecao": pipeline.colecao, "retomar": retomar},
+            total_artigos=max_artigos
+        )
+        return _resposta_job(
+            job, f"Processamento do dump enfileirado (limite de {max_artigos} artigos)",
+            filename=filename, file_size_mb=file_size_mb, colecao=pipeline.colecao
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1554,45 +1844,31 @@ async def processar_dump_real(filename: str, max_artigos: int = 1000, offset: in
 
 @app.get("/dumps/status-download")
 async def status_download():
-    """Verifica status de downloads em andamento"""
+    """Verifica status de downloads em andamento (e dos interrompidos que podem ser retomados)"""
     try:
-        import os
-        from pathlib import Path
+        from services.utils.download_utils import estado_downloads
         
-        # Arquivos esperados e seus tamanhos
-        downloads_esperados = {
-            "ptwiki-20251020-pages-articles.xml.bz2": 2523205242,  # 2.4 GB
-            "ptwiki-20251020-pages-articles1.xml-p1p105695.bz2": 190003828  # 181 MB
+        jobs = {
+            job.parametros.get("filename"): job for job in job_manager.listar()
+            if job.tipo == "download_dump" and job.estado not in ESTADOS_FINAIS
         }
         
         status_downloads = []
+        for download in estado_downloads(wikipedia_dump_processor.data_dir):
+            job = jobs.get(download["filename"])
+            status_downloads.append({
+                **download,
+                "mb_atual": round(download["bytes_baixados"] / (1024 * 1024), 1),
+                "mb_esperado": round(download["bytes_total"] / (1024 * 1024), 1) if download["bytes_total"] else None,
+                "status": f"🔄 {download['porcentagem']}%" if job else "⏸️ Interrompido (pode ser retomado)",
+                "job_id": job.id if job else None
+            })
         
-        for filename, tamanho_esperado in downloads_esperados.items():
-            filepath = wikipedia_dump_processor.data_dir / filename
-            
-            if filepath.exists():
-                tamanho_atual = filepath.stat().st_size
-                porcentagem = round((tamanho_atual / tamanho_esperado) * 100, 1)
-                mb_atual = round(tamanho_atual / (1024 * 1024), 1)
-                mb_esperado = round(tamanho_esperado / (1024 * 1024), 1)
-                
-                # Determinar status
-                if porcentagem >= 99.5:
-                    status = "✅ Completo"
-                elif porcentagem > 0:
-                    status = f"🔄 {porcentagem}% ({mb_atual}/{mb_esperado} MB)"
-                else:
-                    status = "🆕 Iniciando"
-                
-                status_downloads.append({
-                    "filename": filename,
-                    "status": status,
-                    "porcentagem": porcentagem,
-                    "mb_atual": mb_atual,
-                    "mb_esperado": mb_esperado,
-                    "completo": porcentagem >= 99.5,
-                    "ultima_modificacao": filepath.stat().st_mtime
-                })
+        return {
+            "downloads": status_downloads,
+            "total": len(status_downloads),
+            "uso": "POST /dumps/baixar-real com a mesma URL retoma um download interrompido"
+        }
         
     except Exception as e:
         raise HTTPException(
@@ -1601,16 +1877,18 @@ async def status_download():
         )
 
 
-@app.post("/dumps/descomprimir-e-processar")
-async def descomprimir_e_processar(filename: str, max_artigos: int = 100):
-    """Descomprime arquivo BZ2/GZ e processa como XML direto"""
+@app.post("/dumps/descomprimir-e-processar", status_code=status.HTTP_202_ACCEPTED)
+async def descomprimir_e_processar(
+    filename: str,
+    max_artigos: int = 100,
+    min_page_id: Optional[int] = None,
+    max_page_id: Optional[int] = None
+):
+    """Descomprime arquivo BZ2/GZ em streaming e processa (sem gerar XML temporário em disco)
+
+    O processamento roda em um job em segundo plano; acompanhe por GET /jobs/{job_id}.
+    """
     try:
-        import bz2
-        import gzip
-        import time
-        
-        start_time = time.time()
-        
         # Caminho do arquivo comprimido
         compressed_path = wikipedia_dump_processor.data_dir / filename
         if not compressed_path.exists():
@@ -1619,94 +1897,57 @@ async def descomprimir_e_processar(filename: str, max_artigos: int = 100):
                 detail=f"Arquivo não encontrado: {filename}"
             )
         
-        # Nome do arquivo descomprimido
-        if filename.endswith('.bz2'):
-            decompressed_name = filename.replace('.bz2', '.xml')
-        elif filename.endswith('.gz'):
-            decompressed_name = filename.replace('.gz', '.xml') 
-        else:
+        if not (filename.endswith('.bz2') or filename.endswith('.gz')):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Arquivo deve ser .bz2 ou .gz"
             )
-            
-        decompressed_path = wikipedia_dump_processor.data_dir / decompressed_name
         
-        # Verificar se já foi descomprimido
-        if decompressed_path.exists():
-            print(f"✅ Arquivo já descomprimido: {decompressed_name}")
-        else:
-            print(f"🗜️ Descomprimindo {filename}...")
-            decompress_start = time.time()
+        # Dumps multistream com índice são descomprimidos em paralelo, stream a stream;
+        # os demais são descomprimidos em streaming pelo parser sequencial
+        index_path = wikipedia_dump_processor.find_multistream_index(str(compressed_path))
+        modo = "multistream paralelo" if index_path else "streaming sequencial"
+        
+        pipeline = wikipedia_offline_service.criar_pipeline_dump()
+        
+        def executar(contexto):
+            pipeline.progress_callback = lambda stats: contexto.atualizar(
+                artigos=stats["etapas"]["limpeza"]["itens"], chunks=stats["etapas"]["upsert"]["itens"]
+            )
+            contexto.ao_cancelar(pipeline.cancelar)
+            logger.info(f"🗜️ Processando {filename} ({modo})...")
+            start_time = time.time()
+            resultado = pipeline.executar(str(compressed_path), max_artigos, 0, min_page_id, max_page_id)
             
-            # Descomprimir
-            if filename.endswith('.bz2'):
-                with bz2.open(compressed_path, 'rt', encoding='utf-8') as f_in:
-                    with open(decompressed_path, 'w', encoding='utf-8') as f_out:
-                        # Ler em chunks para não sobrecarregar memória
-                        while True:
-                            chunk = f_in.read(1024*1024)  # 1MB chunks
-                            if not chunk:
-                                break
-                            f_out.write(chunk)
-            elif filename.endswith('.gz'):
-                with gzip.open(compressed_path, 'rt', encoding='utf-8') as f_in:
-                    with open(decompressed_path, 'w', encoding='utf-8') as f_out:
-                        while True:
-                            chunk = f_in.read(1024*1024)
-                            if not chunk:
-                                break
-                            f_out.write(chunk)
+            total_chunks = resultado["chunks_inseridos"]
+            total_time = time.time() - start_time
+            chunks_per_second = round(total_chunks / total_time, 2) if total_time > 0 else 0
             
-            decompress_time = time.time() - decompress_start
-            decompressed_size = decompressed_path.stat().st_size / (1024*1024)
-            print(f"✅ Descompressão concluída em {decompress_time:.1f}s - {decompressed_size:.1f} MB")
-        
-        # Agora processar o XML descomprimido
-        print(f"🔄 Processando XML descomprimido...")
-        process_start = time.time()
+            return {
+                "tipo": f"Processamento com descompressão em memória ({modo})",
+                "arquivo_original": filename,
+                "indice_multistream": Path(index_path).name if index_path else None,
+                "max_artigos": max_artigos,
+                "intervalo_page_id": [min_page_id, max_page_id],
+                "total_chunks_created": total_chunks,
+                "artigos_processados": resultado["artigos_processados"],
+                "etapas": resultado["etapas"],
+                "deduplicacao": resultado.get("deduplicacao"),
+                "tempo_total_s": round(total_time, 2),
+                "chunks_per_second": chunks_per_second,
+                "erro": resultado["erro"]
+            }
         
-        chunks_generator = wikipedia_dump_processor.process_dump_to_chunks(
-            str(decompressed_path), 
-            max_articles=max_artigos
+        job = job_manager.submeter(
+            "descomprimir_e_processar", executar,
+            {"filename": filename, "max_artigos": max_artigos, "modo": modo},
+            total_artigos=max_artigos
         )
+        return _resposta_job(job, f"Processamento de {filename} enfileirado ({modo})", arquivo_original=filename)
         
-        total_chunks = 0
-        for chunk_data in chunks_generator:
-            try:
-                success = wikipedia_offline_service.adicionar_chunk_direto(chunk_data)
-                if success:
-                    total_chunks += 1
-                    if total_chunks % 50 == 0:
-                        print(f"✅ {total_chunks} chunks processados...")
-            except Exception as e:
-                print(f"❌ Erro ao adicionar chunk: {e}")
-                continue
-        
-        process_time = time.time() - process_start
-        total_time = time.time() - start_time
-        
-        chunks_per_second = round(total_chunks / process_time, 2) if process_time > 0 else 0
-        
-        return {
-            "message": f"Arquivo descomprimido e processado com sucesso!",
-            "tipo": "Processamento via descompressão intermediária",
-            "arquivo_original": filename,
-            "arquivo_descomprimido": decompressed_name,
-            "max_artigos": max_artigos,
-            "total_chunks_created": total_chunks,
-            "tempo_descompressao_s": round(decompress_time if 'decompress_time' in locals() else 0, 2),
-            "tempo_processamento_s": round(process_time, 2),
-            "tempo_total_s": round(total_time, 2),
-            "chunks_per_second": chunks_per_second,
-            "status": "✅ Sucesso com XML descomprimido",
-            "observacao": "Método alternativo que contorna problemas do parser BZ2"
-        }
-        
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        print(f"❌ ERRO DETALHADO: {str(e)}")
-        print(f"📍 TRACEBACK: {traceback.format_exc()}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro no processo: {str(e)}"
@@ -1730,8 +1971,10 @@ async def manipulador_erro_global(request, exc):
 from .telemetria_ws import router as telemetria_router
 from api.dumpsAPI import router as dumps_router
 from api.dbAPI import router as db_router
+from api.jobsAPI import router as jobs_router
 
 app.include_router(telemetria_router)
+app.include_router(jobs_router)
 app.include_router(db_router)
 app.include_router(dumps_router)
 
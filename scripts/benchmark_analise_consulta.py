@@ -0,0 +1,160 @@
+"""
+Benchmark do custo de análise de texto por consulta
+
+Mede, por consulta, o trabalho de texto feito pelos caminhos de busca e RAG
+(buscar_documentos, as duas etapas de perguntar_com_rag e o filtro de /buscar)
+sobre N resultados:
+
+- antes: listas de stopwords, re.sub e normalização NFD refeitos em cada
+  chamada, e título/conteúdo de cada resultado normalizados na consulta
+  (o /buscar ainda normalizava a query dentro do laço de resultados)
+- agora: analisar_consulta (stopwords em frozenset, padrões compilados,
+  tabela de translate e memoização por consulta) e campos normalizados na
+  ingestão
+
+Nenhum modelo ou Qdrant é usado: só o custo de CPU da análise.
+
+Uso:
+    python scripts/benchmark_analise_consulta.py
+    python scripts/benchmark_analise_consulta.py --resultados 30 --repeticoes 20
+"""
+
+import re
+import sys
+import time
+import random
+import statistics
+import unicodedata
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.utils.text_analysis import (
+    STOPWORDS_PERGUNTA,
+    analisar_consulta,
+    campos_normalizados,
+    normalizados
+)
+
+CONSULTAS = [
+    "Quem foi Dom Pedro II?", "o que é fotossíntese", "Onde fica Cusco?", "capital da França",
+    "Você sabe me falar sobre a Revolução Francesa?", "como funciona o motor a combustão",
+    "história de São Paulo", "qual a população do Japão", "Machu Picchu", "o que são buracos negros?"
+]
+TITULOS = ["São Paulo", "Revolução Francesa", "Fotossíntese", "Japão", "Cusco", "Buraco negro", "Pedro II do Brasil"]
+
+
+def _normalizar_antigo(texto):
+    texto_nfd = unicodedata.normalize('NFD', texto)
+    texto_sem_acento = ''.join(c for c in texto_nfd if unicodedata.category(c) != 'Mn')
+    return texto_sem_acento.lower()
+
+
+def analise_antes(query, resultados):
+    """Trabalho de texto por consulta como era feito em cada caminho"""
+    # buscar_documentos: nomes próprios, query limpa e termos de boosting
+    stopwords_inicio = ['o', 'a', 'os', 'as', 'que', 'quem', 'qual', 'quais', 'onde', 'quando', 'como']
+    nomes = []
+    for i, palavra in enumerate(query.split()):
+        palavra_limpa = re.sub(r'[^\w]', '', palavra)
+        if palavra_limpa and palavra_limpa[0].isupper() and len(palavra_limpa) > 2:
+            if i > 0 or palavra.lower() not in stopwords_inicio:
+                nomes.append(palavra_limpa)
+    stopwords = ['o', 'que', 'é', 'a', 'de', 'da', 'do', 'um', 'uma', 'os', 'as', 'para', 'com', 'por', 'em', 'no', 'na', 'quem', 'foi']
+    palavras_limpas = [re.sub(r'[^\w]', '', p) for p in query.split()]
+    palavras_limpas = [p for p in palavras_limpas if p.lower() not in stopwords and p]
+    stopwords = ['o', 'que', 'é', 'a', 'de', 'da', 'do', 'um', 'uma', 'os', 'as', 'para', 'com', 'por']
+    termos = [re.sub(r'[^\w\s]', '', t.lower()) for t in query.split() if t.lower() not in stopwords]
+    termos = [_normalizar_antigo(t) for t in termos if len(t) > 2]
+    for r in resultados:
+        titulo, conteudo = _normalizar_antigo(r.title), _normalizar_antigo(r.content[:200])
+        any(t in titulo or t in conteudo for t in termos)
+
+    # perguntar_com_rag: termos da pergunta e verificação com word boundaries
+    stopwords = ['o', 'que', 'é', 'a', 'de', 'da', 'do', 'um', 'uma', 'os', 'as', 'para', 'com', 'por', 'onde', 'fica', 'qual', 'sobre', 'sabe', 'vc', 'você', 'me', 'diz', 'fala']
+    termos_pergunta = [re.sub(r'[^\w\s]', '', t.lower()) for t in query.split() if t.lower() not in stopwords]
+    termos_pergunta = [t for t in termos_pergunta if len(t) > 2]
+    for r in resultados:
+        titulo, conteudo = _normalizar_antigo(r.title), _normalizar_antigo(r.content)
+        for termo in termos_pergunta:
+            padrao = r'\b' + re.escape(_normalizar_antigo(termo)) + r'\b'
+            if re.search(padrao, titulo) or re.search(padrao, conteudo):
+                break
+        titulo_palavras = [p for p in titulo.split() if len(p) > 2]
+        pergunta_normalizada = _normalizar_antigo(query)
+        any(p in pergunta_normalizada for p in titulo_palavras)
+
+    # /buscar: filtro de termos, com a query normalizada dentro do laço
+    stopwords = ['o', 'que', 'é', 'a', 'de', 'da', 'do', 'um', 'uma', 'os', 'as', 'para', 'com', 'por']
+    termos_query = [_normalizar_antigo(t.lower().strip('?.,!()')) for t in query.split() if t.lower() not in stopwords and len(t) > 2]
+    for r in resultados:
+        titulo, conteudo = _normalizar_antigo(r.title), _normalizar_antigo(r.content)
+        any(t in titulo or t in conteudo for t in termos_query)
+        titulo_palavras = [_normalizar_antigo(p) for p in r.title.split() if len(p) > 2]
+        query_norm = _normalizar_antigo(query)
+        any(p in query_norm for p in titulo_palavras)
+
+
+def analise_agora(query, resultados):
+    """Mesmo trabalho com o analisador compartilhado e os campos da ingestão"""
+    analise = analisar_consulta(query)
+    for r in resultados:
+        titulo, conteudo = normalizados(r)
+        any(t in titulo or t in conteudo for t in analise.termos_normalizados)
+
+    pergunta = analisar_consulta(query, STOPWORDS_PERGUNTA)
+    for r in resultados:
+        titulo, conteudo = normalizados(r)
+        if pergunta.padrao_termos:
+            pergunta.padrao_termos.search(titulo) or pergunta.padrao_termos.search(conteudo)
+        any(p in pergunta.normalizada for p in titulo.split() if len(p) > 2)
+
+    for r in resultados:
+        titulo, conteudo = normalizados(r)
+        any(t in titulo or t in conteudo for t in analise.termos_normalizados)
+        any(p in analise.normalizada for p in titulo.split() if len(p) > 2)
+
+
+def medir(funcao, consultas, resultados, repeticoes):
+    """Microssegundos por consulta (mediana das repetições)"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for consulta in consultas:
+            funcao(consulta, resultados)
+        tempos.append((time.perf_counter() - inicio) / len(consultas) * 1e6)
+    return statistics.median(tempos)
+
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark do custo de análise de texto por consulta')
+    parser.add_argument('--resultados', type=int, default=10, help='Resultados verificados por consulta (default: 10)')
+    parser.add_argument('--repeticoes', type=int, default=50, help='Repetições da lista de consultas (default: 50)')
+    args = parser.parse_args()
+
+    aleatorio = random.Random(5)
+    resultados = []
+    for _ in range(args.resultados):
+        titulo = aleatorio.choice(TITULOS)
+        conteudo = f"{titulo} é um tema com história, geografia e ciência. " * 6
+        resultados.append(SimpleNamespace(title=titulo, content=conteudo[:200] + "...", **campos_normalizados(titulo, conteudo)))
+
+    # Consultas repetidas (o /perguntar e o front refazem a mesma pergunta)
+    consultas = CONSULTAS * 10
+    antes = medir(analise_antes, consultas, resultados, args.repeticoes)
+    agora = medir(analise_agora, consultas, resultados, args.repeticoes)
+
+    print(f"{len(CONSULTAS)} consultas distintas, {args.resultados} resultados por consulta")
+    print(f"{'forma':<8}{'µs/consulta':>14}")
+    print(f"{'antes':<8}{antes:>14.1f}")
+    print(f"{'agora':<8}{agora:>14.1f}")
+    print(f"⚡ Ganho: {antes / agora:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark das pernas de buscar_documentos em lote vs sequenciais
+
+Popula uma coleção temporária (mesmos textos sintéticos de
+benchmark_payload_indexes, já com o esquema de índices) e, para cada consulta,
+mede as mesmas pernas de buscar_documentos de duas formas:
+
+- sequencial (como antes): get_collection + busca semântica + busca por nomes
+  próprios + uma busca por palavra significativa, cada uma uma ida ao Qdrant
+- em lote (como agora): uma única chamada query_batch_points
+
+Reporta p50/p99 das duas formas.
+
+Uso:
+    python scripts/benchmark_busca_lote.py --pontos 100000
+    python scripts/benchmark_busca_lote.py --host qdrant --palavras 3
+"""
+
+import sys
+import time
+import uuid
+import random
+import statistics
+from pathlib import Path
+
+import numpy as np
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from qdrant_client.http import models
+from services.utils.qdrant_factory import criar_cliente_qdrant
+from services.utils.payload_indexes import criar_indices
+from scripts.benchmark_payload_indexes import esperar_indexacao, popular
+
+
+def pernas(vetor: list, nome: str, palavras: list, limite: int) -> list:
+    """QueryRequests equivalentes às pernas de buscar_documentos"""
+    requisicoes = [models.QueryRequest(query=vetor, limit=limite * 3, with_payload=True)]
+    requisicoes.append(models.QueryRequest(
+        query=vetor, limit=limite * 2, score_threshold=0.0, with_payload=True,
+        filter=models.Filter(must=[models.FieldCondition(key="content", match=models.MatchText(text=nome))])
+    ))
+    for palavra in palavras:
+        requisicoes.append(models.QueryRequest(
+            query=vetor, limit=limite * 2, score_threshold=0.0, with_payload=True,
+            filter=models.Filter(should=[
+                models.FieldCondition(key="content", match=models.MatchText(text=palavra)),
+                models.FieldCondition(key="title", match=models.MatchText(text=palavra))
+            ])
+        ))
+    return requisicoes
+
+
+def medir(client, colecao: str, consultas: list) -> dict:
+    """Latências (ms) por consulta: pernas sequenciais e em lote"""
+    tempos = {"sequencial": [], "lote": []}
+    for requisicoes in consultas:
+        inicio = time.perf_counter()
+        client.get_collection(colecao)
+        for r in requisicoes:
+            client.query_points(
+                collection_name=colecao, query=r.query, query_filter=r.filter, limit=r.limit,
+                score_threshold=r.score_threshold, with_payload=True
+            )
+        tempos["sequencial"].append((time.perf_counter() - inicio) * 1000)
+
+        inicio = time.perf_counter()
+        client.query_batch_points(collection_name=colecao, requests=requisicoes)
+        tempos["lote"].append((time.perf_counter() - inicio) * 1000)
+    return {forma: (statistics.median(t), float(np.percentile(t, 99))) for forma, t in tempos.items()}
+
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark das pernas de buscar_documentos em lote vs sequenciais')
+    parser.add_argument('--host', default=None, help='Host do Qdrant (default: QDRANT_HOST)')
+    parser.add_argument('--pontos', type=int, default=100000, help='Pontos na coleção (default: 100000)')
+    parser.add_argument('--dimensao', type=int, default=384, help='Dimensão dos vetores (default: 384)')
+    parser.add_argument('--consultas', type=int, default=200, help='Consultas medidas (default: 200)')
+    parser.add_argument('--palavras', type=int, default=2, help='Palavras significativas por consulta, 0-3 (default: 2)')
+    parser.add_argument('--limite', type=int, default=10, help='limit de buscar_documentos (default: 10)')
+    parser.add_argument('--lote', type=int, default=1000, help='Pontos por upload (default: 1000)')
+    args = parser.parse_args()
+
+    client = criar_cliente_qdrant(**({"host": args.host} if args.host else {}))
+    try:
+        client.get_collections()
+    except Exception as e:
+        print(f"❌ Qdrant indisponível: {e}")
+        return
+
+    aleatorio = random.Random(3)
+    gerador = np.random.default_rng(2)
+    vocabulario = [f"termo{i}" for i in range(50000)]
+    consultas = [
+        pernas(gerador.normal(size=args.dimensao).tolist(), aleatorio.choice(vocabulario[:500]),
+               [aleatorio.choice(vocabulario) for _ in range(args.palavras)], args.limite)
+        for _ in range(args.consultas)
+    ]
+
+    colecao = f"benchmark_lote_{uuid.uuid4().hex[:6]}"
+    client.create_collection(
+        collection_name=colecao,
+        vectors_config=models.VectorParams(size=args.dimensao, distance=models.Distance.COSINE)
+    )
+    try:
+        print(f"🧪 Populando '{colecao}' com {args.pontos} pontos...")
+        popular(client, colecao, args.pontos, args.dimensao, vocabulario, args.lote)
+        criar_indices(client, colecao, esperar=True)
+        esperar_indexacao(client, colecao)
+        medir(client, colecao, consultas[:10])  # aquecimento
+        resultado = medir(client, colecao, consultas)
+    finally:
+        client.delete_collection(colecao)
+        client.close()
+
+    print(f"{len(consultas[0])} buscas por consulta (+ get_collection no sequencial)")
+    print(f"{'forma':<12}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for forma, (p50, p99) in resultado.items():
+        print(f"{forma:<12}{p50:>10.2f}{p99:>10.2f}")
+    print(f"⚡ Ganho p50: {resultado['sequencial'][0] / resultado['lote'][0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark do armazenamento externo do texto dos chunks (content store)
+
+Divide um trecho do dump em chunks e compara o payload enviado ao Qdrant com o
+texto no payload (comportamento original) e com o texto no content store. Mede
+a taxa de compressão do arquivo local e o custo de leitura na busca: textos
+completos, só os 200 primeiros caracteres (o que buscar_documentos usa) e
+leituras repetidas servidas pelo LRU.
+
+Uso:
+    python scripts/benchmark_content_store.py --dump data/ptwiki-latest-pages-articles.xml.bz2 --max-artigos 5000
+    python scripts/benchmark_content_store.py --candidatos 30    # dump sintético
+"""
+
+import sys
+import json
+import time
+import random
+import logging
+import tempfile
+import statistics
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.wikipediaDumpService import WikipediaDumpProcessor
+from services.utils.content_store import ContentStore, CAMPOS_EXTERNOS
+from services.utils.wikipedia_utils import QdrantHelper
+from scripts.benchmark_dedup import criar_dump_sintetico
+
+
+def payload_original(chunk: dict) -> dict:
+    """Payload como gravado pela ingestão LangChain (texto + doc_metadata)"""
+    return {
+        "title": chunk["title"],
+        "content": chunk["content"],
+        "url": chunk["url"],
+        "chunk_index": chunk.get("chunk_index", 0),
+        "total_chunks": chunk.get("total_chunks", 1),
+        "doc_metadata": {"title": chunk["title"], "url": chunk["url"]},
+        "timestamp": "2024-01-01 00:00:00",
+        "content_hash": chunk.get("content_hash", ""),
+        "article_hash": chunk.get("article_hash", "")
+    }
+
+
+def medir(funcao, repeticoes: int) -> list:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark do content store de chunks')
+    parser.add_argument('--dump', help='Dump XML/bz2/gz real')
+    parser.add_argument('--max-artigos', type=int, default=2000, help='Artigos do trecho do dump (default: 2000)')
+    parser.add_argument('--candidatos', type=int, default=30, help='Chunks lidos por busca (default: 30)')
+    parser.add_argument('--buscas', type=int, default=300, help='Buscas simuladas (default: 300)')
+    parser.add_argument('--nivel', type=int, default=3, help='Nível de compressão (default: 3)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = args.dump or str(criar_dump_sintetico(Path(tmp) / "dump.xml", args.max_artigos))
+        processor = WikipediaDumpProcessor(data_dir=tmp)
+        print(f"📂 Dump: {dump}")
+
+        chunks = []
+        artigos = 0
+        for artigo in processor.parse_xml_dump(dump):
+            novos = processor.article_to_chunks(artigo)
+            if not novos:
+                continue
+            chunks.extend(novos)
+            artigos += 1
+            if args.max_artigos and artigos >= args.max_artigos:
+                break
+
+        ids = [QdrantHelper.gerar_id_deterministico("benchmark", c["title"], c.get("chunk_index", 0)) for c in chunks]
+        payloads = [payload_original(c) for c in chunks]
+        antes = sum(len(json.dumps(p, ensure_ascii=False).encode("utf-8")) for p in payloads)
+        for payload in payloads:
+            for campo in CAMPOS_EXTERNOS:
+                payload.pop(campo, None)
+            payload["conteudo_externo"] = True
+        depois = sum(len(json.dumps(p, ensure_ascii=False).encode("utf-8")) for p in payloads)
+
+        store = ContentStore(Path(tmp) / "store", "benchmark", nivel=args.nivel)
+        inicio = time.perf_counter()
+        store.guardar({pid: c["content"] for pid, c in zip(ids, chunks)})
+        tempo_escrita = time.perf_counter() - inicio
+        stats = store.estatisticas()
+
+        print(f"📄 {artigos} artigos, {len(chunks)} chunks")
+        print(f"📦 Payload no Qdrant: {antes / 1e6:.2f} MB -> {depois / 1e6:.2f} MB ({100 * (1 - depois / antes):.1f}% menor)")
+        print(f"🗜️ Content store ({stats['codec']} nível {args.nivel}): {stats['bytes_originais'] / 1e6:.2f} MB de texto -> "
+              f"{stats['bytes_comprimidos'] / 1e6:.2f} MB ({stats['taxa_compressao']}x), escrita em {tempo_escrita:.2f}s")
+
+        aleatorio = random.Random(1)
+        buscas = [aleatorio.sample(ids, min(args.candidatos, len(ids))) for _ in range(args.buscas)]
+        iterador = iter(buscas)
+        store.max_cache = 0
+        completos = medir(lambda: store.obter(next(iterador)), len(buscas))
+        iterador = iter(buscas)
+        trechos = medir(lambda: store.obter(next(iterador), max_chars=201), len(buscas))
+        store.max_cache = len(ids)
+        store.obter(ids)
+        iterador = iter(buscas)
+        lru = medir(lambda: store.obter(next(iterador)), len(buscas))
+        store.fechar()
+
+    print(f"⏱️ Leitura de {args.candidatos} chunks por busca (p50 / p99 em ms):")
+    for nome, tempos in (("texto completo", completos), ("200 caracteres", trechos), ("LRU quente", lru)):
+        p99 = sorted(tempos)[int(0.99 * (len(tempos) - 1))]
+        print(f"   {nome:<16}{statistics.median(tempos):>8.3f}{p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark da deduplicação aproximada de chunks (MinHash + LSH)
+
+Divide um trecho do dump em chunks, passa cada um pelo DeduplicadorLSH e reporta
+quantos chunks seriam suprimidos, o tamanho estimado do índice (vetores float32 +
+texto no payload) com e sem deduplicação, o custo da deduplicação e o tempo de
+embedding economizado (medido com o modelo, se sentence-transformers estiver
+instalado; senão estimado pela proporção de chunks suprimidos).
+
+Uso:
+    python scripts/benchmark_dedup.py --dump data/ptwiki-latest-pages-articles.xml.bz2 --max-artigos 5000
+    python scripts/benchmark_dedup.py --limiar 0.8     # dump sintético com navboxes repetidas
+"""
+
+import sys
+import time
+import random
+import logging
+import tempfile
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.wikipediaDumpService import WikipediaDumpProcessor
+from services.utils.dedup_utils import DeduplicadorLSH
+
+NAVBOXES = [
+    "Ver também\n\nLista de municípios de {uf}\nLista de rios de {uf}\nMesorregiões de {uf}\n"
+    "Microrregiões de {uf}\nRegião {regiao} do Brasil\n\nLigações externas\n\nPortal de {uf}\nPortal do Brasil",
+    "Referências\n\nInstituto Brasileiro de Geografia e Estatística (IBGE). Censo demográfico. "
+    "Consultado em 1 de janeiro de 2024. Arquivado do original em 2 de janeiro de 2024.\n\n"
+    "Ligações externas\n\nSítio oficial da prefeitura\nDados do IBGE sobre o município",
+]
+
+
+def criar_dump_sintetico(caminho: Path, artigos: int, semente: int = 42) -> Path:
+    """Dump com verbetes de municípios: texto próprio + navboxes e referências compartilhadas"""
+    aleatorio = random.Random(semente)
+    ufs = [("Pernambuco", "Nordeste"), ("Bahia", "Nordeste"), ("Goiás", "Centro-Oeste"), ("Paraná", "Sul")]
+    vocabulario = [f"termo{i}" for i in range(20000)]
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write('<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/">\n<siteinfo></siteinfo>\n')
+        for page_id in range(1, artigos + 1):
+            uf, regiao = aleatorio.choice(ufs)
+            proprio = "\n\n".join(
+                " ".join(aleatorio.choice(vocabulario) for _ in range(aleatorio.randint(60, 140))) + "."
+                for _ in range(aleatorio.randint(2, 6))
+            )
+            comum = "\n\n".join(n.format(uf=uf, regiao=regiao) for n in NAVBOXES)
+            f.write(
+                f"<page><title>Município {page_id}</title><ns>0</ns><id>{page_id}</id>"
+                f"<revision><id>{page_id * 7}</id><timestamp>2024-01-01T00:00:00Z</timestamp>"
+                f"<text>{proprio}\n\n{comum}</text></revision></page>\n"
+            )
+        f.write("</mediawiki>\n")
+    return caminho
+
+
+def carregar_modelo(nome: str):
+    """SentenceTransformer para medir o embedding, ou None se não instalado"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    return SentenceTransformer(nome)
+
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark da deduplicação de chunks')
+    parser.add_argument('--dump', help='Dump XML/bz2/gz real')
+    parser.add_argument('--max-artigos', type=int, default=2000, help='Artigos do trecho do dump (default: 2000)')
+    parser.add_argument('--limiar', type=float, default=0.9, help='Similaridade mínima para suprimir (default: 0.9)')
+    parser.add_argument('--num-perm', type=int, default=64, help='Permutações MinHash (default: 64)')
+    parser.add_argument('--dimensao', type=int, default=384, help='Dimensão dos vetores para estimar o índice (default: 384)')
+    parser.add_argument('--modelo', default='all-MiniLM-L6-v2', help='Modelo para medir o embedding (se instalado)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = args.dump or str(criar_dump_sintetico(Path(tmp) / "dump.xml", args.max_artigos))
+        processor = WikipediaDumpProcessor(data_dir=tmp)
+        print(f"📂 Dump: {dump}")
+
+        chunks = []
+        artigos = 0
+        for artigo in processor.parse_xml_dump(dump):
+            novos = processor.article_to_chunks(artigo)
+            if not novos:
+                continue
+            chunks.extend(novos)
+            artigos += 1
+            if args.max_artigos and artigos >= args.max_artigos:
+                break
+
+    deduplicador = DeduplicadorLSH(limiar=args.limiar, num_perm=args.num_perm, modo="pular")
+    inicio = time.perf_counter()
+    mantidos = [
+        c for c in chunks
+        if deduplicador.verificar(f"{c['title']}#{c['chunk_index']}", c["content"], rotulo=c["title"]) is None
+    ]
+    tempo_dedup = time.perf_counter() - inicio
+
+    def tamanho_indice(lista):
+        return sum(args.dimensao * 4 + len(c["content"].encode("utf-8")) for c in lista)
+
+    antes, depois = tamanho_indice(chunks), tamanho_indice(mantidos)
+    estatisticas = deduplicador.estatisticas()
+    print(f"🧬 LSH: {estatisticas['bandas']} bandas x {estatisticas['linhas_por_banda']} linhas, limiar {args.limiar}")
+    print(f"📄 Chunks: {len(chunks)} | suprimidos: {len(chunks) - len(mantidos)} ({estatisticas['percentual_suprimido']}%)")
+    print(f"💾 Índice estimado: {antes / 1e6:.1f} MB -> {depois / 1e6:.1f} MB ({100 * (1 - depois / antes) if antes else 0:.1f}% menor)")
+    print(f"⚙️ Deduplicação: {tempo_dedup:.2f}s ({len(chunks) / tempo_dedup if tempo_dedup else 0:,.0f} chunks/s), "
+          f"assinaturas em memória: {estatisticas['memoria_assinaturas_bytes'] / 1e6:.1f} MB")
+
+    modelo = carregar_modelo(args.modelo)
+    if modelo is None:
+        print("⚠️ sentence-transformers não instalado: economia de embedding estimada pela proporção de chunks")
+        print(f"🚀 Embedding economizado: ~{estatisticas['percentual_suprimido']}% do tempo de encode")
+        return
+    inicio = time.perf_counter()
+    modelo.encode([c["content"] for c in chunks], batch_size=64)
+    tempo_todos = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    modelo.encode([c["content"] for c in mantidos], batch_size=64)
+    tempo_mantidos = time.perf_counter() - inicio
+    print(f"🧮 Embedding: {tempo_todos:.2f}s -> {tempo_mantidos:.2f}s + {tempo_dedup:.2f}s de deduplicação")
+    print(f"🚀 Embedding economizado: {tempo_todos - tempo_mantidos - tempo_dedup:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
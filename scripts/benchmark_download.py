@@ -0,0 +1,102 @@
+"""
+Benchmark do download segmentado de dumps
+
+Compara o download com 1 conexão (o comportamento antigo) com N segmentos
+paralelos via HTTP Range, incluindo o cálculo do SHA-1 em streaming. Sem --url,
+sobe um servidor local que limita a banda por conexão (como os espelhos da
+Wikimedia fazem), para o ganho aparecer sem depender da rede.
+
+Uso:
+    python scripts/benchmark_download.py --mb 64 --limite-mb-s 8
+    python scripts/benchmark_download.py --url https://dumps.wikimedia.org/ptwiki/latest/ptwiki-latest-pages-articles1.xml-p1p105695.bz2
+"""
+
+import os
+import sys
+import time
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.utils.download_utils import DownloadSegmentado
+
+
+def servidor_local(conteudo: bytes, limite_bytes_s: float) -> ThreadingHTTPServer:
+    """Servidor com suporte a Range e banda limitada por conexão"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            inicio, fim = 0, len(conteudo) - 1
+            intervalo = self.headers.get("Range")
+            if intervalo:
+                a, b = intervalo.split("=")[1].split("-")
+                inicio, fim = int(a), int(b) if b else fim
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {inicio}-{fim}/{len(conteudo)}")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", str(fim - inicio + 1))
+            self.end_headers()
+            bloco = 256 * 1024
+            for pos in range(inicio, fim + 1, bloco):
+                parte = conteudo[pos:min(pos + bloco, fim + 1)]
+                self.wfile.write(parte)
+                time.sleep(len(parte) / limite_bytes_s)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark do download segmentado de dumps')
+    parser.add_argument('--url', default=None, help='URL real a baixar (default: servidor local)')
+    parser.add_argument('--mb', type=int, default=64, help='Tamanho do arquivo local em MB (default: 64)')
+    parser.add_argument('--limite-mb-s', type=float, default=8.0,
+                        help='Banda por conexão do servidor local em MB/s (default: 8)')
+    parser.add_argument('--segmentos', type=int, default=4, help='Conexões paralelas (default: 4)')
+    args = parser.parse_args()
+
+    httpd = None
+    url, checksum = args.url, None
+    if url is None:
+        conteudo = os.urandom(args.mb * 1024 * 1024)
+        checksum = ("sha1", hashlib.sha1(conteudo).hexdigest())
+        httpd = servidor_local(conteudo, args.limite_mb_s * 1024 * 1024)
+        url = f"http://127.0.0.1:{httpd.server_port}/dump.xml.bz2"
+        print(f"🧪 Servidor local: {args.mb} MB a {args.limite_mb_s} MB/s por conexão")
+
+    try:
+        with tempfile.TemporaryDirectory() as diretorio:
+            resultados = {}
+            for segmentos in (1, args.segmentos):
+                destino = Path(diretorio) / f"dump_{segmentos}.bin"
+                inicio = time.perf_counter()
+                resultado = DownloadSegmentado(url, destino, segmentos=segmentos, checksum=checksum).executar()
+                resultados[segmentos] = (time.perf_counter() - inicio, resultado)
+                destino.unlink()
+    finally:
+        if httpd:
+            httpd.shutdown()
+            httpd.server_close()
+
+    base = resultados[1][0]
+    print(f"{'segmentos':<11}{'tempo (s)':>10}{'MB/s':>8}{'speedup':>9}  checksum")
+    for segmentos, (tempo, resultado) in resultados.items():
+        verificado = resultado["checksum"]["verificado"] if resultado["checksum"] else "-"
+        print(f"{resultado['segmentos']:<11}{tempo:>10.2f}{resultado['mb_por_segundo']:>8.1f}{base / tempo:>8.2f}x  {verificado}")
+
+
+if __name__ == "__main__":
+    main()
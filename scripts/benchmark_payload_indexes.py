@@ -0,0 +1,137 @@
+"""
+Benchmark dos índices de payload nas buscas por palavra-chave
+
+Cria uma coleção temporária sem índices de payload, com textos sintéticos, e
+mede as pernas de palavra-chave de buscar_documentos: a busca por nomes
+próprios (MatchText em content com AND) e a busca por palavra (MatchText em
+content OU title). Depois aplica o esquema de utils.payload_indexes na coleção
+já populada (o mesmo backfill de POST /colecoes/{nome}/indices) e repete as
+consultas. Reporta p50/p99 antes e depois.
+
+Requer um Qdrant rodando: o modo local do qdrant-client ignora índices de payload.
+
+Uso:
+    python scripts/benchmark_payload_indexes.py --pontos 100000
+    python scripts/benchmark_payload_indexes.py --host qdrant --consultas 300
+"""
+
+import sys
+import time
+import uuid
+import random
+import statistics
+from pathlib import Path
+
+import numpy as np
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from qdrant_client.http import models
+from services.utils.qdrant_factory import criar_cliente_qdrant
+from services.utils.payload_indexes import criar_indices
+
+
+def popular(client, colecao: str, pontos: int, dimensao: int, vocabulario: list, lote: int):
+    """Pontos com vetores aleatórios e payload no formato da ingestão"""
+    gerador = np.random.default_rng(1)
+    aleatorio = random.Random(1)
+    for inicio in range(0, pontos, lote):
+        quantidade = min(lote, pontos - inicio)
+        vetores = gerador.normal(size=(quantidade, dimensao)).astype(np.float32)
+        payloads = []
+        for i in range(inicio, inicio + quantidade):
+            payloads.append({
+                "title": f"{aleatorio.choice(vocabulario).capitalize()} {aleatorio.choice(vocabulario).capitalize()}",
+                "content": " ".join(aleatorio.choice(vocabulario) for _ in range(150)),
+                "url": f"https://pt.wikipedia.org/wiki/Artigo_{i // 5}",
+                "chunk_index": i % 5,
+                "article_id": i // 5,
+                "source": "wikipedia_dump"
+            })
+        client.upload_collection(collection_name=colecao, vectors=vetores, payload=payloads, wait=True)
+
+
+def esperar_indexacao(client, colecao: str, timeout: float = 900.0):
+    """Espera o otimizador terminar (status green)"""
+    limite = time.time() + timeout
+    while time.time() < limite:
+        if str(client.get_collection(colecao).status).lower().endswith("green"):
+            return
+        time.sleep(1.0)
+
+
+def medir(client, colecao: str, consultas: list, dimensao: int) -> dict:
+    """Latências (ms) das duas pernas de palavra-chave de buscar_documentos"""
+    gerador = np.random.default_rng(2)
+    pernas = {"nomes_proprios": [], "palavra": []}
+    for palavra, nome in consultas:
+        vetor = gerador.normal(size=dimensao).tolist()
+        filtros = {
+            "nomes_proprios": models.Filter(must=[models.FieldCondition(key="content", match=models.MatchText(text=nome))]),
+            "palavra": models.Filter(should=[
+                models.FieldCondition(key="content", match=models.MatchText(text=palavra)),
+                models.FieldCondition(key="title", match=models.MatchText(text=palavra))
+            ])
+        }
+        for perna, filtro in filtros.items():
+            inicio = time.perf_counter()
+            client.query_points(collection_name=colecao, query=vetor, query_filter=filtro, limit=20, score_threshold=0.0)
+            pernas[perna].append((time.perf_counter() - inicio) * 1000)
+    return {
+        perna: (statistics.median(tempos), float(np.percentile(tempos, 99)))
+        for perna, tempos in pernas.items()
+    }
+
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark dos índices de payload nas buscas por palavra-chave')
+    parser.add_argument('--host', default=None, help='Host do Qdrant (default: QDRANT_HOST)')
+    parser.add_argument('--pontos', type=int, default=100000, help='Pontos na coleção (default: 100000)')
+    parser.add_argument('--dimensao', type=int, default=384, help='Dimensão dos vetores (default: 384)')
+    parser.add_argument('--consultas', type=int, default=200, help='Consultas por medição (default: 200)')
+    parser.add_argument('--lote', type=int, default=1000, help='Pontos por upload (default: 1000)')
+    args = parser.parse_args()
+
+    client = criar_cliente_qdrant(**({"host": args.host} if args.host else {}))
+    try:
+        client.get_collections()
+    except Exception as e:
+        print(f"❌ Qdrant indisponível: {e}")
+        return
+
+    aleatorio = random.Random(3)
+    vocabulario = [f"termo{i}" for i in range(50000)]
+    # Palavras raras e comuns, como nomes próprios e termos de perguntas reais
+    consultas = [(aleatorio.choice(vocabulario), aleatorio.choice(vocabulario[:500])) for _ in range(args.consultas)]
+
+    colecao = f"benchmark_indices_{uuid.uuid4().hex[:6]}"
+    client.create_collection(
+        collection_name=colecao,
+        vectors_config=models.VectorParams(size=args.dimensao, distance=models.Distance.COSINE)
+    )
+    try:
+        print(f"🧪 Populando '{colecao}' com {args.pontos} pontos (sem índices de payload)...")
+        popular(client, colecao, args.pontos, args.dimensao, vocabulario, args.lote)
+        esperar_indexacao(client, colecao)
+        antes = medir(client, colecao, consultas, args.dimensao)
+
+        inicio = time.perf_counter()
+        criar_indices(client, colecao, esperar=True)
+        esperar_indexacao(client, colecao)
+        print(f"📇 Índices aplicados aos pontos existentes em {time.perf_counter() - inicio:.1f}s")
+        depois = medir(client, colecao, consultas, args.dimensao)
+    finally:
+        client.delete_collection(colecao)
+        client.close()
+
+    print(f"{'perna':<16}{'p50 antes':>11}{'p50 depois':>12}{'p99 antes':>11}{'p99 depois':>12}  (ms)")
+    for perna in antes:
+        print(f"{perna:<16}{antes[perna][0]:>11.2f}{depois[perna][0]:>12.2f}{antes[perna][1]:>11.2f}{depois[perna][1]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
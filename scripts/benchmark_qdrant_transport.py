@@ -0,0 +1,117 @@
+"""
+Benchmark de transporte do Qdrant: REST x gRPC
+
+Para cada dimensão (384 e 1024 por padrão) cria uma coleção temporária, faz upsert
+de N pontos em lotes e executa buscas, uma vez com REST e outra com gRPC
+(prefer_grpc). Reporta pontos/s no upsert e latência/consultas por segundo na busca.
+Requer um Qdrant rodando (docker-compose expõe 6333 e 6334).
+
+Uso:
+    python scripts/benchmark_qdrant_transport.py
+    python scripts/benchmark_qdrant_transport.py --host qdrant --pontos 20000 --dimensoes 384 768 1024
+"""
+
+import sys
+import time
+import uuid
+import random
+import statistics
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from qdrant_client import models
+from services.utils.qdrant_factory import criar_cliente_qdrant
+
+
+def vetores_aleatorios(quantidade: int, dimensao: int, semente: int):
+    aleatorio = random.Random(semente)
+    return [[aleatorio.uniform(-1, 1) for _ in range(dimensao)] for _ in range(quantidade)]
+
+
+def medir_upsert(client, colecao: str, vetores, lote: int) -> float:
+    """Pontos por segundo no upsert com wait=True (tempo até a confirmação)"""
+    inicio = time.perf_counter()
+    for i in range(0, len(vetores), lote):
+        client.upsert(
+            collection_name=colecao,
+            points=[
+                models.PointStruct(id=i + j, vector=v, payload={"chunk_index": j})
+                for j, v in enumerate(vetores[i:i + lote])
+            ],
+            wait=True
+        )
+    return len(vetores) / (time.perf_counter() - inicio)
+
+
+def medir_busca(client, colecao: str, consultas, limite: int):
+    """Latências (ms) de busca por consulta"""
+    latencias = []
+    for vetor in consultas:
+        inicio = time.perf_counter()
+        client.query_points(collection_name=colecao, query=vetor, limit=limite, with_payload=True)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return latencias
+
+
+def executar(host: str, prefer_grpc: bool, dimensao: int, args) -> dict:
+    client = criar_cliente_qdrant(host=host, prefer_grpc=prefer_grpc)
+    colecao = f"benchmark_transporte_{uuid.uuid4().hex[:8]}"
+    client.create_collection(
+        collection_name=colecao,
+        vectors_config=models.VectorParams(size=dimensao, distance=models.Distance.COSINE)
+    )
+    try:
+        vetores = vetores_aleatorios(args.pontos, dimensao, semente=dimensao)
+        consultas = vetores_aleatorios(args.consultas, dimensao, semente=dimensao + 1)
+        pontos_s = medir_upsert(client, colecao, vetores, args.lote)
+        medir_busca(client, colecao, consultas[:10], args.limite)  # aquecimento
+        latencias = medir_busca(client, colecao, consultas, args.limite)
+    finally:
+        client.delete_collection(colecao)
+        client.close()
+    return {
+        "pontos_s": pontos_s,
+        "p50": statistics.median(latencias),
+        "p95": statistics.quantiles(latencias, n=20)[-1],
+        "qps": 1000 / statistics.mean(latencias)
+    }
+
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark REST x gRPC do Qdrant')
+    parser.add_argument('--host', default=None, help='Host do Qdrant (default: QDRANT_HOST)')
+    parser.add_argument('--dimensoes', type=int, nargs='+', default=[384, 1024], help='Dimensões dos vetores')
+    parser.add_argument('--pontos', type=int, default=10000, help='Pontos inseridos por coleção (default: 10000)')
+    parser.add_argument('--lote', type=int, default=256, help='Pontos por upsert (default: 256)')
+    parser.add_argument('--consultas', type=int, default=500, help='Buscas medidas (default: 500)')
+    parser.add_argument('--limite', type=int, default=10, help='Resultados por busca (default: 10)')
+    args = parser.parse_args()
+
+    for dimensao in args.dimensoes:
+        print(f"\n📐 Dimensão {dimensao} ({args.pontos} pontos, lotes de {args.lote})")
+        resultados = {}
+        for nome, prefer_grpc in (("REST", False), ("gRPC", True)):
+            try:
+                r = executar(args.host, prefer_grpc, dimensao, args)
+            except Exception as e:
+                print(f"❌ {nome}: {e}")
+                continue
+            resultados[nome] = r
+            print(
+                f"⚙️ {nome}: upsert {r['pontos_s']:,.0f} pontos/s | "
+                f"busca p50 {r['p50']:.2f}ms, p95 {r['p95']:.2f}ms, {r['qps']:,.0f} consultas/s"
+            )
+        if len(resultados) == 2:
+            print(
+                f"🚀 gRPC/REST: upsert {resultados['gRPC']['pontos_s'] / resultados['REST']['pontos_s']:.2f}x, "
+                f"busca {resultados['gRPC']['qps'] / resultados['REST']['qps']:.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
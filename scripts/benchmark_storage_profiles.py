@@ -0,0 +1,131 @@
+"""
+Benchmark dos perfis de armazenamento do Qdrant
+
+Para cada perfil (padrao, int8, binario, pq, float16, disco) cria uma coleção
+temporária com os mesmos vetores, espera a indexação e executa as mesmas
+consultas com os parâmetros de busca do perfil (oversampling + rescoring nos
+quantizados). Reporta memória estimada (RAM/disco de vetores + HNSW), latência
+p50/p99 e recall@10 contra a busca exata feita com numpy.
+
+Os vetores são agrupados em torno de centros aleatórios (como embeddings reais,
+que não são uniformes). Requer um Qdrant rodando: o modo local do qdrant-client
+faz busca exata e ignora quantização.
+
+Uso:
+    python scripts/benchmark_storage_profiles.py --pontos 50000 --dimensao 1024
+    python scripts/benchmark_storage_profiles.py --host qdrant --perfis padrao int8 binario
+"""
+
+import sys
+import time
+import uuid
+import statistics
+from pathlib import Path
+
+import numpy as np
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.utils.qdrant_factory import criar_cliente_qdrant
+from services.utils.storage_profiles import (
+    PERFIS, configuracao_colecao, parametros_busca, estimar_memoria
+)
+
+
+def vetores_agrupados(quantidade: int, dimensao: int, grupos: int, semente: int) -> np.ndarray:
+    """Vetores normalizados ao redor de `grupos` centros"""
+    gerador = np.random.default_rng(semente)
+    centros = gerador.normal(size=(grupos, dimensao))
+    vetores = centros[gerador.integers(0, grupos, quantidade)] + 0.6 * gerador.normal(size=(quantidade, dimensao))
+    return (vetores / np.linalg.norm(vetores, axis=1, keepdims=True)).astype(np.float32)
+
+
+def vizinhos_exatos(base: np.ndarray, consultas: np.ndarray, k: int) -> np.ndarray:
+    """Top-k por similaridade de cosseno (vetores já normalizados)"""
+    return np.argsort(-(consultas @ base.T), axis=1)[:, :k]
+
+
+def esperar_indexacao(client, colecao: str, timeout: float = 600.0):
+    """Espera o otimizador terminar (status green: HNSW e quantização construídos)"""
+    limite = time.time() + timeout
+    while time.time() < limite:
+        if str(client.get_collection(colecao).status).lower().endswith("green"):
+            return
+        time.sleep(1.0)
+
+
+def executar(client, nome: str, base: np.ndarray, consultas: np.ndarray, exatos: np.ndarray, args) -> dict:
+    perfil = PERFIS[nome]
+    colecao = f"benchmark_perfil_{nome}_{uuid.uuid4().hex[:6]}"
+    client.create_collection(collection_name=colecao, **configuracao_colecao(perfil, base.shape[1]))
+    try:
+        for i in range(0, len(base), args.lote):
+            client.upload_collection(
+                collection_name=colecao, vectors=base[i:i + args.lote],
+                ids=list(range(i, min(i + args.lote, len(base)))), wait=True
+            )
+        esperar_indexacao(client, colecao)
+        params = parametros_busca(perfil, hnsw_ef=args.ef)
+        for vetor in consultas[:10]:  # aquecimento
+            client.query_points(collection_name=colecao, query=vetor.tolist(), limit=args.k, search_params=params)
+        latencias, acertos = [], 0
+        for vetor, esperado in zip(consultas, exatos):
+            inicio = time.perf_counter()
+            resposta = client.query_points(collection_name=colecao, query=vetor.tolist(), limit=args.k, search_params=params)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            acertos += len({p.id for p in resposta.points} & set(esperado.tolist()))
+    finally:
+        client.delete_collection(colecao)
+    memoria = estimar_memoria(perfil, len(base), base.shape[1])
+    return {
+        "ram_mb": memoria["ram_bytes"] / 2 ** 20,
+        "disco_mb": memoria["disco_bytes"] / 2 ** 20,
+        "p50": statistics.median(latencias),
+        "p99": float(np.percentile(latencias, 99)),
+        "recall": acertos / (len(consultas) * args.k)
+    }
+
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark dos perfis de armazenamento do Qdrant')
+    parser.add_argument('--host', default=None, help='Host do Qdrant (default: QDRANT_HOST)')
+    parser.add_argument('--pontos', type=int, default=20000, help='Vetores na coleção (default: 20000)')
+    parser.add_argument('--dimensao', type=int, default=1024, help='Dimensão dos vetores (default: 1024)')
+    parser.add_argument('--consultas', type=int, default=200, help='Consultas medidas (default: 200)')
+    parser.add_argument('--k', type=int, default=10, help='Vizinhos por consulta / recall@k (default: 10)')
+    parser.add_argument('--ef', type=int, default=None, help='hnsw_ef na busca (default: QDRANT_HNSW_EF ou servidor)')
+    parser.add_argument('--lote', type=int, default=1000, help='Pontos por upload (default: 1000)')
+    parser.add_argument('--perfis', nargs='+', default=list(PERFIS), choices=list(PERFIS), help='Perfis a medir')
+    args = parser.parse_args()
+
+    client = criar_cliente_qdrant(**({"host": args.host} if args.host else {}))
+    try:
+        client.get_collections()
+    except Exception as e:
+        print(f"❌ Qdrant indisponível: {e}")
+        return
+
+    print(f"🧪 Gerando {args.pontos} vetores de {args.dimensao} dimensões e {args.consultas} consultas")
+    base = vetores_agrupados(args.pontos, args.dimensao, grupos=max(10, args.pontos // 500), semente=1)
+    # Consultas: pontos da base com ruído (o vizinho mais próximo não é trivialmente o próprio ponto)
+    gerador = np.random.default_rng(2)
+    consultas = base[gerador.choice(len(base), args.consultas, replace=False)]
+    consultas = consultas + gerador.normal(scale=0.5 / np.sqrt(args.dimensao), size=consultas.shape).astype(np.float32)
+    consultas /= np.linalg.norm(consultas, axis=1, keepdims=True)
+    exatos = vizinhos_exatos(base, consultas, args.k)
+
+    print(f"{'perfil':<10}{'RAM (MB)':>10}{'disco (MB)':>12}{'p50 (ms)':>10}{'p99 (ms)':>10}{'recall@' + str(args.k):>11}")
+    try:
+        for nome in args.perfis:
+            r = executar(client, nome, base, consultas, exatos, args)
+            print(f"{nome:<10}{r['ram_mb']:>10.1f}{r['disco_mb']:>12.1f}{r['p50']:>10.2f}{r['p99']:>10.2f}{r['recall']:>11.3f}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
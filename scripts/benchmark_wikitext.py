@@ -0,0 +1,125 @@
+"""
+Benchmark da limpeza de wikitext
+
+Compara a cadeia de regex antiga de clean_wikitext com o limpador de varredura
+única (services/utils/wikitext_utils.py): tempo, tamanho do texto resultante e
+chunks com marcação residual ("lixo" que seria embedado).
+
+Uso:
+    python scripts/benchmark_wikitext.py --dump data/ptwiki-latest-pages-articles-multistream.xml.bz2 --artigos 500
+    python scripts/benchmark_wikitext.py            # páginas sintéticas
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.utils.wikitext_utils import limpar_wikitext
+from services.wikipediaDumpService import WikipediaDumpProcessor
+
+_RESIDUOS = re.compile(r"\{\{|\}\}|\[\[|\]\]|\{\||\|\}|^\s*\|", re.M)
+
+
+def limpar_wikitext_regex(wikitext: str) -> str:
+    """Implementação anterior de clean_wikitext (sete substituições em sequência)"""
+    text = re.sub(r'\{\{[^}]*\}\}', '', wikitext)
+    text = re.sub(r'\[\[([^|\]]*\|)?([^\]]*)\]\]', r'\2', text)
+    text = re.sub(r'<ref[^>]*>.*?</ref>', '', text, flags=re.DOTALL)
+    text = re.sub(r'<ref[^>]*/?>', '', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'\[\[Categoria:.*?\]\]', '', text)
+    text = re.sub(r'\n+', '\n', text)
+    text = re.sub(r' +', ' ', text)
+    return text.strip()
+
+
+def pagina_sintetica(n: int) -> str:
+    """Página com infobox aninhada, tabela, referências, links, arquivos e categorias"""
+    secoes = []
+    for s in range(8):
+        paragrafos = []
+        for p in range(4):
+            paragrafos.append(
+                f"O '''tema {n}''' foi estudado em [[Lisboa|Lisboa]] e no [[Brasil]] durante o "
+                f"[[Século XX|século XX]].<ref name=\"r{s}{p}\">{{{{citar web |url=http://x.org/{p} "
+                f"|título=Fonte {p} |data={{{{data|2020|1|{p + 1}}}}}}}}}</ref> Segundo ''estudos'' "
+                f"recentes,<ref>{{{{Citar livro|autor=Autor|título=Livro}}}}</ref> o tema tem "
+                f"[http://exemplo.org ligações externas] e&nbsp;notas.{{{{Carece de fontes|data=maio de 2020}}}}"
+            )
+        secoes.append(f"== Seção {s} ==\n" + "\n\n".join(paragrafos))
+    infobox = (
+        "{{Info/Assunto\n| nome = Tema {n}\n| imagem = [[Ficheiro:Tema.jpg|200px]]\n"
+        "| legenda = {{nowrap|Legenda {{small|pequena}}}}\n| local = {{bandeira|BRA}} [[Brasil]]\n"
+        "| coordenadas = {{coord|10|S|50|W|display=inline}}\n}}\n"
+    ).replace("{n}", str(n))
+    tabela = "{| class=\"wikitable\"\n|-\n! Ano !! Valor\n|-\n| 2020 || {{formatnum:1000}}\n|-\n| 2021 || 2000\n|}\n"
+    return (
+        infobox + "\n".join(secoes[:4]) + "\n\n" + tabela + "\n".join(secoes[4:])
+        + "\n\n[[Ficheiro:Mapa.png|thumb|Mapa com [[Portugal]]]]\n"
+        + "{{Portal3|Ciência}}\n[[Categoria:Temas]]\n[[Categoria:Exemplos]]\n"
+    )
+
+
+def carregar_paginas(dump: str, artigos: int) -> List[str]:
+    """Lê o wikitext bruto de artigos reais de um dump"""
+    processor = WikipediaDumpProcessor(data_dir=str(Path(dump).parent))
+    paginas = []
+    for artigo in processor.iter_articles(dump):
+        paginas.append(artigo.content)
+        if len(paginas) >= artigos:
+            break
+    return paginas
+
+
+def medir(limpar: Callable[[str], str], paginas: List[str], repeticoes: int):
+    """Melhor tempo entre as repetições e as saídas da última execução"""
+    melhor = float("inf")
+    saidas = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        saidas = [limpar(p) for p in paginas]
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, saidas
+
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark da limpeza de wikitext')
+    parser.add_argument('--dump', help='Dump XML/bz2 para usar páginas reais')
+    parser.add_argument('--artigos', type=int, default=200, help='Número de páginas (default: 200)')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Repetições por implementação (default: 5)')
+    args = parser.parse_args()
+
+    if args.dump:
+        paginas = carregar_paginas(args.dump, args.artigos)
+        print(f"📂 {len(paginas)} páginas reais de {args.dump}")
+    else:
+        paginas = [pagina_sintetica(i) for i in range(args.artigos)]
+        print(f"🧪 {len(paginas)} páginas sintéticas")
+    total_mb = sum(len(p) for p in paginas) / 1e6
+    print(f"📏 {total_mb:.1f} MB de wikitext\n")
+
+    chunker = WikipediaDumpProcessor(data_dir="./data")._split_into_chunks
+    resultados = {}
+    for nome, limpar in (("regex (antigo)", limpar_wikitext_regex), ("varredura única", limpar_wikitext)):
+        tempo, saidas = medir(limpar, paginas, args.repeticoes)
+        chunks = [c for s in saidas for c in chunker(s)]
+        sujos = sum(1 for c in chunks if _RESIDUOS.search(c))
+        resultados[nome] = tempo
+        print(f"⚙️ {nome}")
+        print(f"   ⏱️ {tempo * 1000:.1f} ms ({total_mb / tempo:.1f} MB/s)")
+        print(f"   📄 {sum(len(s) for s in saidas) / 1e6:.2f} MB de texto, {len(chunks)} chunks")
+        print(f"   🗑️ {sujos} chunks com marcação residual ({sujos / max(len(chunks), 1):.1%})\n")
+
+    print(f"🚀 Speedup: {resultados['regex (antigo)'] / resultados['varredura única']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,18 @@
 """
 Script para reprocessar TODOS os artigos existentes no Qdrant
 com a nova Parse API que retorna conteúdo completo da Wikipedia
+
+Por padrão o reprocessamento é incremental: artigos cujo conteúdo não mudou são
+ignorados e só os chunks alterados são reprocessados. Use --completo para forçar
+o reprocessamento de tudo.
 """
+import sys
 import requests
 import time
 from collections import defaultdict
 
+INCREMENTAL = "--completo" not in sys.argv
+
 def listar_artigos_unicos():
     """Lista todos os títulos únicos no Qdrant"""
     try:
@@ -48,31 +55,37 @@ def listar_artigos_unicos():
         return [], {}
 
 def reprocessar_artigo(titulo):
-    """Reprocessa um artigo específico"""
+    """Reprocessa um artigo específico (retorna sucesso, chunks e se estava inalterado)"""
     try:
         print(f"   📝 {titulo}...", end=" ", flush=True)
         
         response = requests.post(
             'http://localhost:9000/adicionar',
-            json={'titulo': titulo},
+            json={'titulo': titulo, 'incremental': INCREMENTAL},
             timeout=300
         )
         
         if response.status_code == 200:
             data = response.json()
             chunks = data.get('chunks_adicionados', 0)
-            print(f"✅ {chunks} chunks")
-            return True, chunks
+            if data.get('inalterado'):
+                print(f"⏭️ inalterado ({chunks} chunks)")
+                return True, chunks, True
+            if INCREMENTAL:
+                print(f"✅ {chunks} chunks ({data.get('chunks_reprocessados', chunks)} reprocessados)")
+            else:
+                print(f"✅ {chunks} chunks")
+            return True, chunks, False
         else:
             print(f"❌ Erro {response.status_code}")
-            return False, 0
+            return False, 0, False
             
     except requests.exceptions.Timeout:
         print(f"⏰ Timeout")
-        return False, 0
+        return False, 0, False
     except Exception as e:
         print(f"❌ {str(e)[:50]}")
-        return False, 0
+        return False, 0, False
 
 def main():
     print("=" * 80)
@@ -100,7 +113,8 @@ def main():
     print(f"\n⚠️  {artigos_resumo} artigos com ≤3 chunks (provavelmente só resumo)")
     print(f"📊 {len(titulos) - artigos_resumo} artigos com >3 chunks (conteúdo completo)")
     
-    print(f"\n🔄 Isso irá reprocessar TODOS os {len(titulos)} artigos.")
+    modo = "incremental (apenas artigos alterados)" if INCREMENTAL else "completo"
+    print(f"\n🔄 Isso irá reprocessar TODOS os {len(titulos)} artigos - modo {modo}.")
     print("   ⏱️  Tempo estimado: ~{:.0f} minutos".format(len(titulos) * 2 / 60))
     
     # Reprocessar
@@ -112,18 +126,22 @@ def main():
     falhas = 0
     total_chunks_novos = 0
     melhorias = 0
+    inalterados = 0
     tempo_inicio = time.time()
     
     for i, titulo in enumerate(titulos, 1):
         print(f"[{i}/{len(titulos)}]", end=" ")
         
         chunks_antes = chunks_antigos[titulo]
-        sucesso, chunks = reprocessar_artigo(titulo)
+        sucesso, chunks, inalterado = reprocessar_artigo(titulo)
         
         if sucesso:
             sucessos += 1
-            total_chunks_novos += chunks
-            if chunks > chunks_antes * 2:  # Melhorou significativamente
+            if inalterado:
+                inalterados += 1
+            else:
+                total_chunks_novos += chunks
+            if not inalterado and chunks > chunks_antes * 2:  # Melhorou significativamente
                 melhorias += 1
                 print(f"      📈 {chunks_antes} → {chunks} chunks (+{chunks - chunks_antes})")
         else:
@@ -141,6 +159,7 @@ def main():
     print("=" * 80)
     print(f"✅ Sucessos: {sucessos}/{len(titulos)}")
     print(f"❌ Falhas: {falhas}")
+    print(f"⏭️  Inalterados (ignorados): {inalterados}")
     print(f"📈 Melhorias significativas: {melhorias} artigos")
     print(f"📦 Total de novos chunks: {total_chunks_novos}")
     print(f"⏱️  Tempo total: {tempo_total:.1f}s ({tempo_total/60:.1f} min)")
@@ -1,19 +1,16 @@
 from typing import Optional, Dict, Any
-from qdrant_client import QdrantClient
-from qdrant_client.http import models
 
-# Configuração do Qdrant (ajuste conforme necessário)
-QDRANT_HOST = "qdrant"
-QDRANT_PORT = 6333
-
-# Inicializa o cliente Qdrant
-qdrant_client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+# Cliente Qdrant compartilhado (criado no primeiro uso, configurado por QDRANT_* no ambiente)
+from .utils.qdrant_factory import obter_cliente_qdrant
+from .utils.storage_profiles import obter_perfil, configuracao_colecao
+from .utils.payload_indexes import ESQUEMA_INDICES, criar_indices, indices_existentes, indices_faltando
+from .utils.sparse_utils import colecao_hibrida
 
 def listar_colecoes() -> Dict[str, Any]:
     """Retorna lista de coleções existentes no Qdrant, destacando wikipedia_langchain se presente"""
     colecoes = []
     langchain_encontrada = False
-    result = qdrant_client.get_collections()
+    result = obter_cliente_qdrant().get_collections()
     if hasattr(result, "collections"):
         colecoes = [c.name for c in result.collections]
         langchain_encontrada = "wikipedia_langchain" in colecoes
@@ -22,38 +19,68 @@ def listar_colecoes() -> Dict[str, Any]:
         "wikipedia_langchain": langchain_encontrada
     }
 
-def criar_colecao(nome: str, modelo_dim: int = 1024, distancia: str = "COSINE") -> Dict[str, Any]:
-    """Cria uma coleção no Qdrant com nome, dimensão e distância"""
+def criar_colecao(nome: str, modelo_dim: int = 1024, distancia: str = "COSINE",
+                  perfil: Optional[str] = None, hibrida: Optional[bool] = None) -> Dict[str, Any]:
+    """Cria uma coleção no Qdrant com nome, dimensão, distância e perfil de armazenamento
+
+    `hibrida` (padrão: HYBRID_SEARCH_ENABLED) adiciona o vetor esparso BM25 da busca híbrida.
+    """
     try:
+        perfil_armazenamento = obter_perfil(perfil)
         # Verifica se já existe
-        result = qdrant_client.get_collections()
+        result = obter_cliente_qdrant().get_collections()
         collection_names = [col.name for col in result.collections]
         if nome in collection_names:
             return {"sucesso": False, "erro": "Coleção já existe."}
         # Cria coleção
-        qdrant_client.create_collection(
+        obter_cliente_qdrant().create_collection(
             collection_name=nome,
-            vectors_config=models.VectorParams(
-                size=modelo_dim,
-                distance=getattr(models.Distance, distancia)
-            )
+            **configuracao_colecao(perfil_armazenamento, modelo_dim, distancia, hibrida=hibrida)
         )
-        return {"sucesso": True, "nome": nome, "dimensao": modelo_dim, "distancia": distancia}
+        indices = criar_indices(obter_cliente_qdrant(), nome)
+        return {
+            "sucesso": True, "nome": nome, "dimensao": modelo_dim, "distancia": distancia,
+            "perfil": perfil_armazenamento.nome, "indices": indices,
+            "hibrida": colecao_hibrida(obter_cliente_qdrant(), nome)
+        }
     except Exception as e:
         return {"sucesso": False, "erro": str(e)}
 
 def remover_colecao(nome: str) -> Dict[str, Any]:
     """Remove uma coleção do Qdrant"""
     try:
-        qdrant_client.delete_collection(collection_name=nome)
+        obter_cliente_qdrant().delete_collection(collection_name=nome)
+        from .langchainWikipediaService import langchain_wikipedia_service
+        langchain_wikipedia_service.esquecer_colecao(nome)
         return {"sucesso": True, "colecao_removida": nome}
     except Exception as e:
         return {"sucesso": False, "erro": str(e)}
 
+def indices_colecao(nome: str) -> Dict[str, Any]:
+    """Índices de payload da coleção comparados ao esquema esperado"""
+    try:
+        info = obter_cliente_qdrant().get_collection(collection_name=nome)
+        return {
+            "sucesso": True, "colecao": nome, "esquema": ESQUEMA_INDICES,
+            "existentes": indices_existentes(info), "faltando": indices_faltando(info)
+        }
+    except Exception as e:
+        return {"sucesso": False, "erro": str(e)}
+
+def aplicar_indices(nome: str, esperar: bool = False) -> Dict[str, Any]:
+    """Cria os índices de payload que faltam em uma coleção existente"""
+    try:
+        obter_cliente_qdrant().get_collection(collection_name=nome)
+    except Exception as e:
+        return {"sucesso": False, "erro": str(e)}
+    indices = criar_indices(obter_cliente_qdrant(), nome, esperar=esperar)
+    erros = {campo: situacao for campo, situacao in indices.items() if situacao.startswith("erro")}
+    return {"sucesso": not erros, "colecao": nome, "indices": indices}
+
 def obter_dimensao_colecao(nome: str) -> Optional[int]:
     """Obtém a dimensão dos vetores de uma coleção"""
     try:
-        info = qdrant_client.get_collection(collection_name=nome)
+        info = obter_cliente_qdrant().get_collection(collection_name=nome)
         if hasattr(info, "config") and hasattr(info.config, "params"):
             return getattr(info.config.params, "size", None)
         return None
@@ -0,0 +1,655 @@
+"""
+Dump Pipeline Service - Ingestão paralela de dumps da Wikipedia
+
+Pipeline em estágios com filas limitadas entre eles:
+
+    leitor XML (thread) -> limpeza/chunking (pool de processos)
+        -> embedder em lotes (thread) -> upserts no Qdrant (threads paralelas)
+
+As filas limitadas garantem backpressure: se o Qdrant ou o modelo de embeddings
+ficarem lentos, o leitor para de consumir o dump em vez de acumular memória.
+
+Com um CheckpointStore, o último artigo cujos chunks foram todos confirmados no
+Qdrant (em ordem contígua de lotes) é persistido, e a próxima execução retoma a
+partir dele em vez de reler o início do dump.
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .wikipediaDumpService import WikipediaArticle, WikipediaDumpProcessor
+from .utils.embedding_utils import EmbeddingBatcher
+from .utils.checkpoint_utils import CheckpointStore
+from .utils.wikipedia_utils import QdrantHelper
+from .utils.dedup_utils import gravar_duplicatas, obter_registro_supressoes, restaurar_suprimidos
+from .utils.content_store import remover_conteudo
+from .utils.qdrant_writer import preparar_pontos
+
+try:
+    from qdrant_client.models import PointStruct, PointIdsList
+except ImportError:
+    class PointStruct:
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    class PointIdsList:
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+logger = logging.getLogger(__name__)
+
+# Marcador de fim de fluxo entre estágios
+_FIM = object()
+
+# Processador usado dentro de cada processo do pool (criado no initializer)
+_processador_worker: Optional[WikipediaDumpProcessor] = None
+
+
+def _inicializar_worker(data_dir: str, min_content_length: int, chunker: Optional[Any] = None):
+    """Cria o processador de dumps uma vez por processo do pool"""
+    global _processador_worker
+    _processador_worker = WikipediaDumpProcessor(data_dir=data_dir)
+    _processador_worker.min_content_length = min_content_length
+    _processador_worker.chunker = chunker
+
+
+def _limpar_e_dividir(article: WikipediaArticle) -> List[Dict]:
+    """Executado no pool: limpa o wikitext e divide o artigo em chunks"""
+    return _processador_worker.article_to_chunks(article)
+
+
+@dataclass
+class PipelineConfig:
+    """Configuração do pipeline (valores padrão vêm de variáveis de ambiente)"""
+    clean_workers: int = field(default_factory=lambda: int(os.getenv("DUMP_CLEAN_WORKERS", str(max(1, (os.cpu_count() or 2) - 1)))))
+    upsert_workers: int = field(default_factory=lambda: int(os.getenv("DUMP_UPSERT_WORKERS", "2")))
+    embed_batch_size: int = field(default_factory=lambda: int(os.getenv("DUMP_EMBED_BATCH_SIZE", "256")))
+    upsert_batch_size: int = field(default_factory=lambda: int(os.getenv("DUMP_UPSERT_BATCH_SIZE", "256")))
+    queue_size: int = field(default_factory=lambda: int(os.getenv("DUMP_QUEUE_SIZE", "64")))
+    incremental: bool = field(default_factory=lambda: os.getenv("DUMP_INCREMENTAL", "false").lower() == "true")
+    usar_processos: bool = True
+
+
+class EstatisticasEtapa:
+    """Contadores de vazão de um estágio do pipeline (thread-safe)"""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.itens = 0
+        self.erros = 0
+        self.tempo_ocupado = 0.0
+        self.inicio: Optional[float] = None
+        self.fim: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def registrar(self, itens: int, tempo: float):
+        with self._lock:
+            if self.inicio is None:
+                self.inicio = time.time() - tempo
+            self.itens += itens
+            self.tempo_ocupado += tempo
+
+    def registrar_erro(self):
+        with self._lock:
+            self.erros += 1
+
+    def finalizar(self):
+        with self._lock:
+            self.fim = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            decorrido = ((self.fim or time.time()) - self.inicio) if self.inicio else 0.0
+            return {
+                "itens": self.itens,
+                "erros": self.erros,
+                "tempo_ocupado_s": round(self.tempo_ocupado, 2),
+                "itens_por_segundo": round(self.itens / decorrido, 2) if decorrido > 0 else 0.0
+            }
+
+
+class DumpIngestionPipeline:
+    """Pipeline multi-estágio para ingestão de dumps XML no Qdrant"""
+
+    def __init__(
+        self,
+        processor: WikipediaDumpProcessor,
+        embedding_model: Any,
+        qdrant_client: Any,
+        colecao: str,
+        config: Optional[PipelineConfig] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        embedding_cache: Optional[Any] = None,
+        chunker: Optional[Any] = None,
+        deduplicador: Optional[Any] = None
+    ):
+        self.processor = processor
+        self.embedding_model = embedding_model
+        self.qdrant_client = qdrant_client
+        self.colecao = colecao
+        self.config = config or PipelineConfig()
+        self.progress_callback = progress_callback
+        self.embedding_cache = embedding_cache
+        # TokenChunker do modelo (enviado aos workers de limpeza); None = chunks por parágrafos
+        self.chunker = chunker if chunker is not None else getattr(processor, "chunker", None)
+        # DeduplicadorLSH da coleção: quase-duplicatas não passam pelo modelo nem são gravadas
+        self.deduplicador = deduplicador
+
+        self.etapas = {
+            "leitura": EstatisticasEtapa("leitura"),
+            "limpeza": EstatisticasEtapa("limpeza"),
+            "embedding": EstatisticasEtapa("embedding"),
+            "upsert": EstatisticasEtapa("upsert")
+        }
+        self._fila_artigos: "queue.Queue" = queue.Queue(maxsize=self.config.queue_size)
+        self._fila_chunks: "queue.Queue" = queue.Queue(maxsize=self.config.queue_size)
+        self._fila_upsert: "queue.Queue" = queue.Queue(maxsize=max(2, self.config.upsert_workers * 2))
+        self._cancelado = threading.Event()
+        self._erro: Optional[BaseException] = None
+        self._leitura_esgotada = False
+
+        # Checkpoint: lotes de upsert são numerados; só avançamos sobre o prefixo contíguo confirmado
+        self.checkpoint_store = checkpoint_store
+        self._checkpoint_chave: Optional[str] = None
+        self._checkpoint_base: Dict[str, Any] = {}
+        self._checkpoint_lock = threading.Lock()
+        self._lotes_confirmados: Dict[int, Any] = {}
+        self._proximo_lote = 0
+        self._contador_lotes = 0
+        self._artigos_concluidos = 0
+        self._ultimo_marcador: Optional[Dict[str, Any]] = None
+        self._chunks_confirmados = 0
+
+        # Modo incremental: chunks que não precisaram de embedding
+        self._chunks_inalterados = 0
+        self._chunks_reaproveitados = 0
+        self._chunks_suprimidos = 0
+        self._chunks_restaurados = 0
+
+    # ------------------------------------------------------------------
+    # Controle
+    # ------------------------------------------------------------------
+    def cancelar(self):
+        """Solicita a parada do pipeline (os estágios drenam e encerram)"""
+        self._cancelado.set()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores por estágio e profundidade atual das filas"""
+        return {
+            "etapas": {nome: etapa.to_dict() for nome, etapa in self.etapas.items()},
+            "filas": {
+                "artigos": self._fila_artigos.qsize(),
+                "chunks": self._fila_chunks.qsize(),
+                "upsert": self._fila_upsert.qsize()
+            },
+            "cancelado": self._cancelado.is_set()
+        }
+
+    def _put(self, fila: "queue.Queue", item: Any) -> bool:
+        """put bloqueante que respeita cancelamento; retorna False se cancelado"""
+        while not self._cancelado.is_set():
+            try:
+                fila.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _sinalizar_fim(self, fila: "queue.Queue"):
+        """Envia o marcador de fim; se cancelado, descarta itens para não travar"""
+        while True:
+            try:
+                fila.put(_FIM, timeout=0.5)
+                return
+            except queue.Full:
+                if self._cancelado.is_set():
+                    try:
+                        descartado = fila.get_nowait()
+                        if descartado is _FIM:
+                            # Outro marcador de fim: mantém na fila (cada consumidor precisa do seu)
+                            fila.put_nowait(descartado)
+                    except (queue.Empty, queue.Full):
+                        pass
+
+    def _confirmar_lote(self, numero: int, marcador: Optional[Dict[str, Any]], chunks: int):
+        """Registra um lote gravado e persiste o checkpoint do maior prefixo contíguo confirmado"""
+        with self._checkpoint_lock:
+            self._lotes_confirmados[numero] = (marcador, chunks)
+            avancou = False
+            while self._proximo_lote in self._lotes_confirmados:
+                marcador_lote, chunks_lote = self._lotes_confirmados.pop(self._proximo_lote)
+                self._proximo_lote += 1
+                self._chunks_confirmados += chunks_lote
+                if marcador_lote:
+                    self._ultimo_marcador = marcador_lote
+                avancou = True
+            if avancou:
+                self._salvar_checkpoint()
+
+    def _salvar_checkpoint(self, concluido: bool = False):
+        """Grava o checkpoint acumulado (chamado com _checkpoint_lock adquirido ou no fim da execução)"""
+        if not self.checkpoint_store or not self._checkpoint_chave:
+            return
+        base = self._checkpoint_base
+        marcador = self._ultimo_marcador or {}
+        try:
+            self.checkpoint_store.salvar(
+                self._checkpoint_chave,
+                dump_file=base.get("dump_file"),
+                colecao=self.colecao,
+                stream_offset=marcador.get("stream_offset", base.get("stream_offset")),
+                last_page_id=marcador.get("page_id", base.get("last_page_id")),
+                artigos_processados=base.get("artigos_processados", 0) + (marcador.get("artigos") or 0),
+                chunks_inseridos=base.get("chunks_inseridos", 0) + self._chunks_confirmados,
+                concluido=concluido
+            )
+        except OSError as e:
+            logger.warning(f"⚠️ Não foi possível gravar checkpoint: {e}")
+
+    def _falhar(self, etapa: str, erro: BaseException):
+        logger.error(f"❌ Pipeline falhou na etapa '{etapa}': {erro}")
+        if self._erro is None:
+            self._erro = erro
+        self._cancelado.set()
+
+    def _notificar(self):
+        if self.progress_callback:
+            try:
+                self.progress_callback(self.estatisticas())
+            except Exception as e:
+                logger.debug(f"Erro no callback de progresso: {e}")
+
+    # ------------------------------------------------------------------
+    # Estágios
+    # ------------------------------------------------------------------
+    def _etapa_leitura(self, filepath: str, max_artigos: Optional[int], offset: int,
+                       min_page_id: Optional[int] = None, max_page_id: Optional[int] = None,
+                       start_offset: Optional[int] = None):
+        """Lê o XML e coloca artigos válidos na fila (streams multistream são lidos em paralelo)"""
+        etapa = self.etapas["leitura"]
+        try:
+            lidos = 0
+            enviados = 0
+            t0 = time.time()
+            artigos = self.processor.iter_articles(
+                filepath, min_page_id=min_page_id, max_page_id=max_page_id, start_offset=start_offset
+            )
+            for article in artigos:
+                if self._cancelado.is_set():
+                    break
+                lidos += 1
+                if offset and lidos <= offset:
+                    continue
+                if max_artigos and enviados >= max_artigos:
+                    break
+                etapa.registrar(1, time.time() - t0)
+                if not self._put(self._fila_artigos, article):
+                    break
+                enviados += 1
+                t0 = time.time()
+            else:
+                self._leitura_esgotada = not self._cancelado.is_set()
+        except Exception as e:
+            self._falhar("leitura", e)
+        finally:
+            etapa.finalizar()
+            self._sinalizar_fim(self._fila_artigos)
+
+    def _etapa_limpeza(self):
+        """Distribui artigos para o pool de processos, mantendo um número limitado em voo"""
+        etapa = self.etapas["limpeza"]
+        max_em_voo = max(2, self.config.clean_workers * 2)
+        if self.config.usar_processos:
+            executor = ProcessPoolExecutor(
+                max_workers=self.config.clean_workers,
+                initializer=_inicializar_worker,
+                initargs=(str(self.processor.data_dir), self.processor.min_content_length, self.chunker)
+            )
+        else:
+            _inicializar_worker(str(self.processor.data_dir), self.processor.min_content_length, self.chunker)
+            executor = ThreadPoolExecutor(max_workers=self.config.clean_workers)
+
+        em_voo: deque = deque()
+
+        def _coletar(future_info) -> bool:
+            future, t_envio, article = future_info
+            try:
+                chunks = future.result()
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao limpar artigo: {e}")
+                etapa.registrar_erro()
+                return True
+            etapa.registrar(1, time.time() - t_envio)
+            for chunk in chunks:
+                chunk['_stream_offset'] = article.stream_offset
+                if not self._put(self._fila_chunks, chunk):
+                    return False
+            return True
+
+        try:
+            while True:
+                item = self._fila_artigos.get()
+                if item is _FIM or self._cancelado.is_set():
+                    break
+                em_voo.append((executor.submit(_limpar_e_dividir, item), time.time(), item))
+                # Backpressure: aguarda o mais antigo antes de aceitar novos artigos
+                while len(em_voo) >= max_em_voo:
+                    if not _coletar(em_voo.popleft()):
+                        break
+            while em_voo and not self._cancelado.is_set():
+                if not _coletar(em_voo.popleft()):
+                    break
+        except Exception as e:
+            self._falhar("limpeza", e)
+        finally:
+            for future, _, _ in em_voo:
+                future.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+            etapa.finalizar()
+            self._sinalizar_fim(self._fila_chunks)
+
+    def _etapa_embedding(self):
+        """Agrupa chunks, gera embeddings em lote e envia lotes de pontos para upsert"""
+        etapa = self.etapas["embedding"]
+        batcher = EmbeddingBatcher(self.embedding_model, cache=self.embedding_cache)
+        buffer: List[Dict] = []
+        fim = False
+
+        def _flush():
+            if not buffer:
+                return True
+            t0 = time.time()
+            suprimidos = set()
+            vetores = self._vetores_lote(buffer, batcher, suprimidos)
+            # None = chunk inalterado no modo incremental ou quase-duplicata (não é gravado)
+            pontos = [
+                self._criar_ponto(chunk, vetor) if vetor is not None else None
+                for chunk, vetor in zip(buffer, vetores)
+            ]
+            etapa.registrar(len(buffer), time.time() - t0)
+            for i in range(0, len(pontos), self.config.upsert_batch_size):
+                fim_lote = i + self.config.upsert_batch_size
+                marcador = self._marcador_lote(buffer[i:fim_lote])
+                remover = [self._id_ponto(buffer[k]) for k in range(i, min(fim_lote, len(buffer))) if k in suprimidos]
+                lote = (self._contador_lotes, [p for p in pontos[i:fim_lote] if p is not None], marcador, remover)
+                self._contador_lotes += 1
+                if not self._put(self._fila_upsert, lote):
+                    buffer.clear()
+                    return False
+            buffer.clear()
+            self._notificar()
+            return True
+
+        try:
+            while not fim and not self._cancelado.is_set():
+                try:
+                    item = self._fila_chunks.get(timeout=1.0)
+                except queue.Empty:
+                    # Sem chunks novos: não segura um lote parcial indefinidamente
+                    if not _flush():
+                        break
+                    continue
+                if item is _FIM:
+                    fim = True
+                else:
+                    buffer.append(item)
+                if fim or len(buffer) >= self.config.embed_batch_size:
+                    if not _flush():
+                        break
+        except Exception as e:
+            self._falhar("embedding", e)
+        finally:
+            etapa.finalizar()
+            for _ in range(self.config.upsert_workers):
+                self._sinalizar_fim(self._fila_upsert)
+
+    def _etapa_upsert(self):
+        """Envia lotes de pontos ao Qdrant (várias threads em paralelo)"""
+        etapa = self.etapas["upsert"]
+        while True:
+            item = self._fila_upsert.get()
+            if item is _FIM:
+                break
+            if self._cancelado.is_set():
+                continue
+            numero, pontos, marcador, remover = item
+            t0 = time.time()
+            try:
+                if remover:
+                    # Versões anteriores de chunks agora suprimidos como quase-duplicatas
+                    self.qdrant_client.delete(collection_name=self.colecao, points_selector=PointIdsList(points=remover))
+                    remover_conteudo(self.colecao, remover)
+                if pontos:
+                    preparar_pontos(self.qdrant_client, self.colecao, pontos)
+                    self.qdrant_client.upsert(collection_name=self.colecao, points=pontos)
+                    # Reimportação: remove chunks antigos além da nova contagem de cada artigo
+                    removidos = []
+                    QdrantHelper.remover_chunks_excedentes(
+                        self.qdrant_client, self.colecao,
+                        {p.payload["title"]: p.payload["total_chunks"] for p in pontos},
+                        ao_remover=removidos.extend
+                    )
+                    self._restaurar_suprimidos([str(p.id) for p in pontos], removidos, remover)
+                etapa.registrar(len(pontos), time.time() - t0)
+                self._confirmar_lote(numero, marcador, len(pontos))
+            except Exception as e:
+                etapa.registrar_erro()
+                self._falhar("upsert", e)
+
+    def _restaurar_suprimidos(self, gravados: List[str], removidos: List[str], suprimidos: List[str]):
+        """Chunks suprimidos como cópia de um original regravado ou removido voltam à coleção se não forem mais duplicatas"""
+        registro = obter_registro_supressoes(self.colecao, criar=False)
+        if registro is None:
+            return
+        registro.esquecer(gravados)
+        if self.deduplicador is not None and removidos:
+            self.deduplicador.remover(removidos)
+        batcher = EmbeddingBatcher(self.embedding_model, cache=self.embedding_cache)
+        restaurados = restaurar_suprimidos(
+            self.qdrant_client, self.colecao, gravados + removidos + suprimidos,
+            codificar=batcher.encode, deduplicador=self.deduplicador, exceto=suprimidos
+        )
+        if restaurados:
+            with self._checkpoint_lock:
+                self._chunks_restaurados += restaurados
+
+    def _id_ponto(self, chunk: Dict) -> str:
+        return QdrantHelper.gerar_id_deterministico(self.colecao, chunk['title'], chunk.get('chunk_index', 0))
+
+    def _suprimir_duplicados(self, chunks: List[Dict], ids: List[str], indices: List[int], suprimidos: set):
+        """Marca em `suprimidos` os índices de chunks quase duplicados de chunks já indexados"""
+        if self.deduplicador is None:
+            return
+        antes = len(suprimidos)
+        registros = {}
+        for k in indices:
+            chunk = chunks[k]
+            duplicata = self.deduplicador.verificar(
+                ids[k], chunk["content"], rotulo=f"{chunk['title']}#{chunk.get('chunk_index', 0)}",
+                origem={"title": chunk['title'], "url": chunk['url'], "chunk_index": chunk.get('chunk_index', 0)}
+            )
+            if duplicata is not None:
+                suprimidos.add(k)
+                registros[ids[k]] = (duplicata[0], self._payload_chunk(chunk))
+        # Persistidos para que o chunk volte à coleção se o original mudar ou sumir
+        if registros:
+            obter_registro_supressoes(self.colecao).registrar(registros)
+        self._chunks_suprimidos += len(suprimidos) - antes
+
+    def _vetores_lote(self, chunks: List[Dict], batcher: EmbeddingBatcher,
+                      suprimidos: Optional[set] = None) -> List[Optional[List[float]]]:
+        """Vetores do lote; no modo incremental só chunks novos/alterados passam pelo modelo
+
+        Quase-duplicatas (índices adicionados a `suprimidos`) ficam sem vetor.
+        """
+        suprimidos = suprimidos if suprimidos is not None else set()
+        ids = [self._id_ponto(c) for c in chunks]
+        if not self.config.incremental:
+            self._suprimir_duplicados(chunks, ids, list(range(len(chunks))), suprimidos)
+            restantes = [k for k in range(len(chunks)) if k not in suprimidos]
+            vetores: List[Optional[List[float]]] = [None] * len(chunks)
+            for k, vetor in zip(restantes, batcher.encode([chunks[k]["content"] for k in restantes])):
+                vetores[k] = vetor
+            return vetores
+
+        existentes = QdrantHelper.obter_pontos_existentes(self.qdrant_client, self.colecao, ids)
+        situacoes = QdrantHelper.classificar_chunks(
+            existentes, ids, [c.get('content_hash') for c in chunks], [c.get('article_hash') for c in chunks]
+        )
+        self._suprimir_duplicados(
+            chunks, ids, [k for k, situacao in enumerate(situacoes) if situacao != "inalterado"], suprimidos
+        )
+        situacoes = ["suprimido" if k in suprimidos else situacao for k, situacao in enumerate(situacoes)]
+
+        # Vetores só são buscados para os chunks reaproveitados
+        ids_reaproveitar = [pid for pid, situacao in zip(ids, situacoes) if situacao == "reaproveitar"]
+        com_vetor = QdrantHelper.obter_pontos_existentes(self.qdrant_client, self.colecao, ids_reaproveitar, com_vetores=True)
+
+        vetores: List[Optional[List[float]]] = [None] * len(chunks)
+        novos = []
+        for k, (pid, situacao) in enumerate(zip(ids, situacoes)):
+            if situacao == "suprimido":
+                continue
+            elif situacao == "inalterado":
+                self._chunks_inalterados += 1
+            elif situacao == "reaproveitar" and getattr(com_vetor.get(pid), "vector", None) is not None:
+                vetores[k] = com_vetor[pid].vector
+                self._chunks_reaproveitados += 1
+            else:
+                novos.append(k)
+
+        for k, vetor in zip(novos, batcher.encode([chunks[k]["content"] for k in novos])):
+            vetores[k] = vetor
+        return vetores
+
+    def _marcador_lote(self, chunks: List[Dict]) -> Optional[Dict[str, Any]]:
+        """Último artigo concluído dentro do lote (cujo chunk final está no lote), se houver"""
+        marcador = None
+        for chunk in chunks:
+            if chunk.get('chunk_index', 0) >= chunk.get('total_chunks', 1) - 1:
+                self._artigos_concluidos += 1
+                marcador = {
+                    "page_id": chunk.get('article_id'),
+                    "stream_offset": chunk.get('_stream_offset'),
+                    "artigos": self._artigos_concluidos
+                }
+        return marcador
+
+    def _criar_ponto(self, chunk: Dict, vetor: List[float]) -> PointStruct:
+        """Monta o ponto do Qdrant para um chunk do dump"""
+        return PointStruct(id=self._id_ponto(chunk), vector=vetor, payload=self._payload_chunk(chunk))
+
+    def _payload_chunk(self, chunk: Dict) -> Dict[str, Any]:
+        return {
+            "title": chunk['title'],
+            "content": chunk['content'],
+            "url": chunk['url'],
+            "chunk_index": chunk.get('chunk_index', 0),
+            "total_chunks": chunk.get('total_chunks', 1),
+            "article_id": chunk.get('article_id', 0),
+            "timestamp": chunk.get('timestamp', ''),
+            "source": chunk.get('source', 'wikipedia_dump'),
+            "content_hash": chunk.get('content_hash', ''),
+            "article_hash": chunk.get('article_hash', '')
+        }
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+    def executar(self, filepath: str, max_artigos: Optional[int] = None, offset: int = 0,
+                 min_page_id: Optional[int] = None, max_page_id: Optional[int] = None,
+                 retomar: bool = True) -> Dict[str, Any]:
+        """Executa o pipeline completo e retorna as estatísticas por estágio
+
+        Com checkpoint_store e retomar=True, a leitura continua a partir do último artigo
+        confirmado (o offset legado é ignorado nesse caso).
+        """
+        inicio = time.time()
+        start_offset = None
+        checkpoint = None
+        if self.checkpoint_store:
+            self._checkpoint_chave = CheckpointStore.chave(filepath, self.colecao)
+            checkpoint = self.checkpoint_store.obter(self._checkpoint_chave) if retomar else None
+            self._checkpoint_base = dict(checkpoint or {}, dump_file=str(filepath))
+            if checkpoint and checkpoint.get("concluido"):
+                logger.info(f"✅ Dump já ingerido segundo o checkpoint '{self._checkpoint_chave}'")
+                resultado = self.estatisticas()
+                resultado.update({
+                    "tempo_total_s": 0.0, "artigos_processados": 0, "chunks_inseridos": 0,
+                    "erro": None, "checkpoint": checkpoint
+                })
+                return resultado
+            if checkpoint and checkpoint.get("last_page_id") is not None:
+                min_page_id = max(min_page_id or 0, checkpoint["last_page_id"] + 1)
+                start_offset = checkpoint.get("stream_offset")
+                offset = 0
+                logger.info(
+                    f"⏩ Retomando '{self._checkpoint_chave}' após page id {checkpoint['last_page_id']} "
+                    f"(stream offset {start_offset})"
+                )
+            elif not retomar:
+                self.checkpoint_store.resetar(self._checkpoint_chave)
+
+        logger.info(
+            f"🚀 Pipeline de dump: {filepath} -> '{self.colecao}' "
+            f"(limpeza={self.config.clean_workers}, upsert={self.config.upsert_workers}, "
+            f"lote_embedding={self.config.embed_batch_size})"
+        )
+
+        threads = [
+            threading.Thread(target=self._etapa_leitura, args=(filepath, max_artigos, offset, min_page_id, max_page_id, start_offset), name="dump-leitor", daemon=True),
+            threading.Thread(target=self._etapa_limpeza, name="dump-limpeza", daemon=True),
+            threading.Thread(target=self._etapa_embedding, name="dump-embedding", daemon=True)
+        ]
+        threads += [
+            threading.Thread(target=self._etapa_upsert, name=f"dump-upsert-{i}", daemon=True)
+            for i in range(self.config.upsert_workers)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        resultado = self.estatisticas()
+        resultado["tempo_total_s"] = round(time.time() - inicio, 2)
+        resultado["artigos_processados"] = self.etapas["limpeza"].itens
+        resultado["chunks_inseridos"] = self.etapas["upsert"].itens
+        resultado["erro"] = str(self._erro) if self._erro else None
+        if self.config.incremental:
+            resultado["incremental"] = {
+                "chunks_inalterados": self._chunks_inalterados,
+                "chunks_reaproveitados": self._chunks_reaproveitados,
+                "chunks_reembedados": (self.etapas["embedding"].itens - self._chunks_inalterados
+                                       - self._chunks_reaproveitados - self._chunks_suprimidos)
+            }
+        if self.deduplicador is not None:
+            try:
+                mesclados = gravar_duplicatas(self.qdrant_client, self.colecao, self.deduplicador.retirar_mesclas())
+            except Exception as e:
+                logger.warning(f"⚠️ Não foi possível gravar as duplicatas mescladas: {e}")
+                mesclados = 0
+            resultado["deduplicacao"] = {
+                "modo": self.deduplicador.modo,
+                "chunks_suprimidos": self._chunks_suprimidos,
+                "chunks_mesclados": mesclados,
+                "chunks_restaurados": self._chunks_restaurados
+            }
+        if self.checkpoint_store:
+            with self._checkpoint_lock:
+                self._salvar_checkpoint(concluido=self._leitura_esgotada and self._erro is None)
+            resultado["checkpoint"] = self.checkpoint_store.obter(self._checkpoint_chave)
+        self._notificar()
+
+        logger.info(
+            f"🏁 Pipeline concluído: {resultado['artigos_processados']} artigos, "
+            f"{resultado['chunks_inseridos']} chunks em {resultado['tempo_total_s']}s"
+        )
+        return resultado
@@ -0,0 +1,326 @@
+"""
+Serviço de jobs em segundo plano
+
+Tarefas longas (ingestão de dumps, download, ingestão de listas de artigos) rodam
+em um pool de threads com limite de concorrência, fora da requisição HTTP. Cada job
+tem um ID, estado persistido em JSON (escrita atômica), cancelamento cooperativo e
+progresso (artigos, chunks, bytes, taxa e ETA) consultável por REST ou WebSocket.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+FALHOU = "falhou"
+CANCELADO = "cancelado"
+INTERROMPIDO = "interrompido"
+
+ESTADOS_FINAIS = frozenset({CONCLUIDO, FALHOU, CANCELADO, INTERROMPIDO})
+
+
+class JobCancelado(Exception):
+    """Levantada por JobContext.verificar_cancelamento() quando o job foi cancelado"""
+
+
+@dataclass
+class Job:
+    """Estado de um job (o que é persistido e exposto pela API)"""
+    id: str
+    tipo: str
+    parametros: Dict[str, Any] = field(default_factory=dict)
+    estado: str = PENDENTE
+    criado_em: float = field(default_factory=time.time)
+    iniciado_em: Optional[float] = None
+    finalizado_em: Optional[float] = None
+    progresso: Dict[str, Any] = field(default_factory=lambda: {
+        "artigos": 0, "chunks": 0, "bytes": 0,
+        "total_artigos": None, "total_bytes": None, "etapa": None
+    })
+    resultado: Optional[Dict[str, Any]] = None
+    erro: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        dados = asdict(self)
+        dados.update(self._taxa_e_eta())
+        return dados
+
+    def _taxa_e_eta(self) -> Dict[str, Any]:
+        """Taxa (por segundo) e ETA pela métrica com total conhecido: bytes, depois artigos"""
+        if not self.iniciado_em:
+            return {"taxa": None, "eta_s": None}
+        decorrido = (self.finalizado_em or time.time()) - self.iniciado_em
+        progresso = self.progresso
+        if progresso.get("total_bytes"):
+            unidade, feito, total = "bytes", progresso.get("bytes", 0), progresso["total_bytes"]
+        else:
+            unidade, feito, total = "artigos", progresso.get("artigos", 0), progresso.get("total_artigos")
+        taxa = feito / decorrido if decorrido > 0 else 0.0
+        eta = None
+        if self.estado == EXECUTANDO and total and taxa > 0:
+            eta = round(max(total - feito, 0) / taxa, 1)
+        return {
+            "taxa": {"unidade": f"{unidade}/s", "valor": round(taxa, 2)},
+            "eta_s": eta,
+            "decorrido_s": round(decorrido, 1)
+        }
+
+
+class JobContext:
+    """Interface do job em execução com o gerenciador: progresso e cancelamento"""
+
+    def __init__(self, manager: "JobManager", job: Job):
+        self._manager = manager
+        self.job = job
+        self._cancelado = threading.Event()
+        self._ao_cancelar: List[Callable[[], None]] = []
+
+    @property
+    def cancelado(self) -> bool:
+        return self._cancelado.is_set()
+
+    def atualizar(self, **progresso):
+        """Atualiza contadores de progresso (artigos, chunks, bytes, totais, etapa)"""
+        self._manager._atualizar_progresso(self.job, progresso)
+
+    def ao_cancelar(self, callback: Callable[[], None]):
+        """Registra uma função chamada quando o job for cancelado (p.ex. pipeline.cancelar)"""
+        self._ao_cancelar.append(callback)
+        if self.cancelado:
+            callback()
+
+    def verificar_cancelamento(self):
+        """Interrompe o job (JobCancelado) se o cancelamento foi solicitado"""
+        if self.cancelado:
+            raise JobCancelado()
+
+    def _cancelar(self):
+        self._cancelado.set()
+        for callback in self._ao_cancelar:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao cancelar job {self.job.id}: {e}")
+
+
+class JobManager:
+    """Executa jobs em segundo plano com limite de concorrência e estado persistido"""
+
+    def __init__(self, path: Any = None, max_concorrentes: Optional[int] = None, historico: int = 200):
+        self.path = Path(path or os.getenv("JOBS_STATE_FILE", "./data/jobs.json"))
+        self.max_concorrentes = max(1, int(max_concorrentes or os.getenv("JOBS_MAX_CONCURRENT", "2")))
+        self.historico = historico
+        self._jobs: Dict[str, Job] = {}
+        self._contextos: Dict[str, JobContext] = {}
+        self._ouvintes: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._carregado = False
+        self._ultima_gravacao = 0.0
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+    def submeter(self, tipo: str, funcao: Callable[[JobContext], Optional[Dict[str, Any]]],
+                 parametros: Optional[Dict[str, Any]] = None, **progresso) -> Job:
+        """Enfileira funcao(contexto) e retorna o job imediatamente
+
+        O retorno da função vira job.resultado; um resultado com a chave "erro"
+        preenchida (p.ex. do pipeline de dumps) marca o job como falho. Totais
+        conhecidos de antemão (total_artigos, total_bytes) podem ser passados como
+        palavras-chave.
+        """
+        self._garantir_carregado()
+        job = Job(id=uuid.uuid4().hex[:12], tipo=tipo, parametros=dict(parametros or {}))
+        job.progresso.update(progresso)
+        contexto = JobContext(self, job)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._contextos[job.id] = contexto
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concorrentes, thread_name_prefix="job")
+            self._podar_historico()
+            self._persistir(forcar=True)
+        logger.info(f"📋 Job {job.id} ({tipo}) enfileirado")
+        self._publicar(job)
+        self._executor.submit(self._executar, contexto, funcao)
+        return job
+
+    def obter(self, job_id: str) -> Optional[Job]:
+        self._garantir_carregado()
+        return self._jobs.get(job_id)
+
+    def listar(self, estado: Optional[str] = None) -> List[Job]:
+        """Jobs do mais recente para o mais antigo, opcionalmente filtrados por estado"""
+        self._garantir_carregado()
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: j.criado_em, reverse=True)
+        return [j for j in jobs if estado is None or j.estado == estado]
+
+    def em_andamento(self, tipo: str, **parametros) -> Optional[Job]:
+        """Job não finalizado do tipo com esses parâmetros (p.ex. o mesmo arquivo e coleção)"""
+        with self._lock:
+            for job in self.listar():
+                if job.tipo == tipo and job.estado not in ESTADOS_FINAIS and all(
+                    job.parametros.get(chave) == valor for chave, valor in parametros.items()
+                ):
+                    return job
+        return None
+
+    def cancelar(self, job_id: str) -> Optional[Job]:
+        """Solicita o cancelamento; jobs pendentes nem chegam a executar"""
+        job = self.obter(job_id)
+        if job is None or job.estado in ESTADOS_FINAIS:
+            return job
+        with self._lock:
+            contexto = self._contextos.get(job_id)
+            if contexto is not None:
+                contexto._cancelar()
+            if job.estado == PENDENTE:
+                self._finalizar(job, CANCELADO)
+        logger.info(f"🛑 Cancelamento solicitado para o job {job_id}")
+        return job
+
+    def adicionar_ouvinte(self, ouvinte: Callable[[Dict[str, Any]], None]):
+        """Registra uma função chamada (na thread do job) a cada mudança de um job"""
+        with self._lock:
+            self._ouvintes.append(ouvinte)
+
+    def remover_ouvinte(self, ouvinte: Callable[[Dict[str, Any]], None]):
+        with self._lock:
+            if ouvinte in self._ouvintes:
+                self._ouvintes.remove(ouvinte)
+
+    def encerrar(self, cancelar: bool = True):
+        """Cancela os jobs ativos (opcional) e espera o pool terminar"""
+        if cancelar:
+            for job in self.listar():
+                if job.estado not in ESTADOS_FINAIS:
+                    self.cancelar(job.id)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            self._persistir(forcar=True)
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+    def _executar(self, contexto: JobContext, funcao: Callable[[JobContext], Optional[Dict[str, Any]]]):
+        job = contexto.job
+        with self._lock:
+            if contexto.cancelado or job.estado != PENDENTE:
+                self._contextos.pop(job.id, None)
+                return
+            job.estado = EXECUTANDO
+            job.iniciado_em = time.time()
+            self._persistir(forcar=True)
+        self._publicar(job)
+        logger.info(f"▶️ Job {job.id} ({job.tipo}) iniciado")
+        try:
+            resultado = funcao(contexto)
+            job.resultado = resultado
+            erro = resultado.get("erro") if isinstance(resultado, dict) else None
+            if contexto.cancelado:
+                self._finalizar(job, CANCELADO)
+            elif erro:
+                self._finalizar(job, FALHOU, erro=str(erro))
+            else:
+                self._finalizar(job, CONCLUIDO)
+        except JobCancelado:
+            self._finalizar(job, CANCELADO)
+        except Exception as e:
+            logger.error(f"❌ Job {job.id} ({job.tipo}) falhou: {e}")
+            self._finalizar(job, FALHOU, erro=str(e))
+        finally:
+            self._contextos.pop(job.id, None)
+
+    def _finalizar(self, job: Job, estado: str, erro: Optional[str] = None):
+        with self._lock:
+            if job.estado in ESTADOS_FINAIS:
+                return
+            job.estado = estado
+            job.erro = erro
+            job.finalizado_em = time.time()
+            self._persistir(forcar=True)
+        logger.info(f"🏁 Job {job.id} ({job.tipo}) {estado}")
+        self._publicar(job)
+
+    def _atualizar_progresso(self, job: Job, progresso: Dict[str, Any]):
+        with self._lock:
+            job.progresso.update(progresso)
+            self._persistir()
+        self._publicar(job)
+
+    def _publicar(self, job: Job):
+        dados = job.to_dict()
+        for ouvinte in list(self._ouvintes):
+            try:
+                ouvinte(dados)
+            except Exception as e:
+                logger.debug(f"Erro em ouvinte de jobs: {e}")
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+    def _garantir_carregado(self):
+        """Carrega o estado salvo no primeiro uso; jobs ativos de uma execução anterior ficam interrompidos"""
+        if self._carregado:
+            return
+        with self._lock:
+            if self._carregado:
+                return
+            self._carregado = True
+            if not self.path.exists():
+                return
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"⚠️ Estado de jobs ilegível em {self.path}, ignorando: {e}")
+                return
+            campos = set(Job.__dataclass_fields__)
+            for item in dados:
+                job = Job(**{k: v for k, v in item.items() if k in campos})
+                if job.estado not in ESTADOS_FINAIS:
+                    job.estado = INTERROMPIDO
+                    job.erro = "Processo reiniciado durante a execução"
+                    job.finalizado_em = job.finalizado_em or time.time()
+                self._jobs[job.id] = job
+
+    def _podar_historico(self):
+        finalizados = sorted(
+            (j for j in self._jobs.values() if j.estado in ESTADOS_FINAIS), key=lambda j: j.criado_em
+        )
+        for job in finalizados[:max(0, len(self._jobs) - self.historico)]:
+            del self._jobs[job.id]
+
+    def _persistir(self, forcar: bool = False):
+        """Grava o estado (chamado com _lock); progresso é gravado no máximo 1x por segundo"""
+        agora = time.time()
+        if not forcar and agora - self._ultima_gravacao < 1.0:
+            return
+        self._ultima_gravacao = agora
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump([asdict(j) for j in self._jobs.values()], f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Não foi possível gravar o estado dos jobs: {e}")
+
+
+# Instância global
+job_manager = JobManager()
@@ -14,11 +14,25 @@ import os
 import os
 import time
 import logging
-import uuid
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from pathlib import Path
 
+from .utils.embedding_utils import EmbeddingBatcher, obter_dimensao_modelo
+from .utils.embedding_cache import CacheConsultas, criar_cache_embeddings
+from .utils.wikipedia_utils import QdrantHelper, TextProcessor
+from .utils.qdrant_writer import QdrantBatchWriter
+from .utils.qdrant_factory import obter_cliente_qdrant
+from .utils.chunking_utils import TokenChunker, obter_tokenizer, relatorio_truncamento
+from .utils.dedup_utils import (
+    DeduplicadorLSH, gravar_duplicatas, obter_registro_supressoes, remover_registro_supressoes, restaurar_suprimidos
+)
+from .utils.storage_profiles import PerfilArmazenamento, obter_perfil, configuracao_colecao, parametros_busca, perfil_da_colecao
+from .utils.content_store import conteudo_externalizado, preencher_conteudo, remover_content_store, remover_conteudo
+from .utils.payload_indexes import criar_indices
+from .utils.text_analysis import analisar_consulta, normalizados
+from .utils.sparse_utils import colecao_hibrida, consulta_hibrida, esquecer_colecao_hibrida
+
 # Try to import LangChain - fallback gracefully if not available
 try:
     from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -80,10 +94,15 @@ except ImportError:
             self.model_name = model_name
             logger.warning(f"⚠️ SentenceTransformer simulado: {model_name}")
         
-        def encode(self, text):
-            # Return dummy vector
+        def encode(self, text, **kwargs):
+            # Return dummy vector (um por texto quando recebe uma lista)
+            if isinstance(text, (list, tuple)):
+                return [[0.1] * 384 for _ in text]
             return [0.1] * 384
 
+        def get_sentence_embedding_dimension(self):
+            return 384
+
 try:
     from qdrant_client import QdrantClient
     from qdrant_client.http import models
@@ -129,6 +148,9 @@ class SearchResult:
     url: str
     score: float
     metadata: Dict[str, Any]
+    # Título e início do conteúdo sem acentos e em minúsculas (gravados na ingestão)
+    title_norm: Optional[str] = None
+    content_norm: Optional[str] = None
 
 
 class QdrantRetriever(BaseRetriever):
@@ -137,12 +159,17 @@ class QdrantRetriever(BaseRetriever):
     qdrant_client: Any
     collection_name: str
     embedding_model: Any
+    search_params: Any = None
+    codificar_consulta: Any = None
     
-    def __init__(self, qdrant_client: QdrantClient, collection_name: str, embedding_model: SentenceTransformer):
+    def __init__(self, qdrant_client: QdrantClient, collection_name: str, embedding_model: SentenceTransformer,
+                 search_params: Any = None, codificar_consulta: Any = None):
         super().__init__(
             qdrant_client=qdrant_client,
             collection_name=collection_name,
-            embedding_model=embedding_model
+            embedding_model=embedding_model,
+            search_params=search_params,
+            codificar_consulta=codificar_consulta
         )
     
     def _get_relevant_documents(
@@ -150,16 +177,22 @@ class QdrantRetriever(BaseRetriever):
     ) -> List[Document]:
         """Busca documentos relevantes no Qdrant"""
         try:
-            # Gerar embedding da query
-            query_vector = self.embedding_model.encode(query).tolist()
+            # Gerar embedding da query (LRU de consultas do serviço, se fornecido)
+            if self.codificar_consulta is not None:
+                query_vector = self.codificar_consulta(query)
+            else:
+                query_vector = self.embedding_model.encode(query).tolist()
             
             # Buscar no Qdrant
             search_result = self.qdrant_client.search(
                 collection_name=self.collection_name,
                 query_vector=query_vector,
                 limit=kwargs.get('limit', 10),
-                score_threshold=kwargs.get('score_threshold', 0.7)
+                score_threshold=kwargs.get('score_threshold', 0.7),
+                search_params=self.search_params
             )
+            # Coleções com o texto no content store: lido só para os documentos retornados
+            preencher_conteudo(self.collection_name, search_result)
             
             # Converter para documentos LangChain
             documents = []
@@ -193,6 +226,11 @@ class LangChainWikipediaService:
     def __init__(self):
         self.qdrant_client = None
         self.embedding_model = None
+        self.embedding_model_name = None
+        self.embedding_batcher = None
+        self.embedding_cache = None
+        # Vetores das consultas de busca (QUERY_EMBEDDING_CACHE_SIZE=0 desativa)
+        self.cache_consultas = CacheConsultas()
         self.text_splitter = None
         self.retriever = None
         self.collection_name = "wikipedia_langchain"
@@ -202,6 +240,20 @@ class LangChainWikipediaService:
         self.chunk_size = 1000
         self.chunk_overlap = 200
         self.embedding_dimension = 384
+        self.ultima_ingestao: Dict[str, Any] = {}
+
+        # Chunking por coleção: "tokens" (janelas do tokenizer do modelo) ou "caracteres"
+        self.chunking_padrao = os.getenv("CHUNKING_MODE", "tokens")
+        self.chunking_por_colecao: Dict[str, str] = dict(
+            item.split(":", 1) for item in os.getenv("CHUNKING_POR_COLECAO", "").split(",") if ":" in item
+        )
+        self._token_chunker: Optional[TokenChunker] = None
+
+        # Índice LSH de quase-duplicatas por coleção (opcional: DEDUP_MODE=pular ou mesclar)
+        self.deduplicadores: Dict[str, DeduplicadorLSH] = {}
+
+        # Perfil de armazenamento de cada coleção (deduzido da configuração no Qdrant)
+        self._perfis_colecoes: Dict[str, PerfilArmazenamento] = {}
         
         # Status de disponibilidade
         self.langchain_available = LANGCHAIN_AVAILABLE
@@ -252,11 +304,7 @@ class LangChainWikipediaService:
             logger.warning("⚠️ Qdrant não disponível - pulando conexão")
             return
             
-        host = os.getenv("QDRANT_HOST", "localhost")
-        port = int(os.getenv("QDRANT_PORT", 6333))
-        
-        logger.info(f"🔗 Conectando ao Qdrant em {host}:{port}")
-        self.qdrant_client = QdrantClient(host=host, port=port)
+        self.qdrant_client = obter_cliente_qdrant()
         
         # Testar conexão
         try:
@@ -277,10 +325,14 @@ class LangChainWikipediaService:
         
         try:
             self.embedding_model = SentenceTransformer(model_name)
+            self.embedding_model_name = model_name
+            self.embedding_batcher = None
+            self._obter_embedding_batcher()
             logger.info("✅ Modelo de embeddings carregado")
         except Exception as e:
             logger.error(f"❌ Erro ao carregar modelo: {e}")
             self.embedding_model = None
+            self.embedding_batcher = None
     
     def _configurar_text_splitter(self):
         """Configura o TextSplitter"""
@@ -301,40 +353,28 @@ class LangChainWikipediaService:
             )
             logger.info("✅ TextSplitter fallback configurado")
     
-    def criar_colecao_custom(self, collection_name: str, embedding_dimension: Optional[int] = None):
-        """Cria coleção Qdrant customizada para multiusuário"""
+    def criar_colecao_custom(self, collection_name: str, embedding_dimension: Optional[int] = None,
+                             perfil: Optional[str] = None):
+        """Cria coleção Qdrant customizada para multiusuário
+
+        `perfil` escolhe o armazenamento (quantização, disco, HNSW; ver
+        utils.storage_profiles); sem ele vale QDRANT_STORAGE_PROFILE.
+        """
         if embedding_dimension is None:
             embedding_dimension = self.embedding_dimension
+        perfil_armazenamento = obter_perfil(perfil)
         try:
             collections = self.qdrant_client.get_collections()
             collection_names = [col.name for col in collections.collections]
             if collection_name not in collection_names:
-                logger.info(f"📦 Criando coleção '{collection_name}'")
+                logger.info(f"📦 Criando coleção '{collection_name}' (perfil '{perfil_armazenamento.nome}')")
                 self.qdrant_client.create_collection(
                     collection_name=collection_name,
-                    vectors_config=VectorParams(
-                        size=embedding_dimension,
-                        distance=Distance.COSINE
-                    )
+                    **configuracao_colecao(perfil_armazenamento, embedding_dimension)
                 )
-                # Criar índice de texto no campo page_content para busca textual
-                logger.info("📇 Criando índice de texto para busca textual...")
-                try:
-                    from qdrant_client.models import TextIndexParams, TokenizerType
-                    self.qdrant_client.create_payload_index(
-                        collection_name=collection_name,
-                        field_name="page_content",
-                        field_schema=TextIndexParams(
-                            type="text",
-                            tokenizer=TokenizerType.WORD,
-                            min_token_len=2,
-                            max_token_len=20,
-                            lowercase=True
-                        )
-                    )
-                    logger.info("✅ Índice de texto criado com sucesso")
-                except Exception as idx_error:
-                    logger.warning(f"⚠️ Erro ao criar índice de texto: {idx_error}")
+                self._perfis_colecoes[collection_name] = perfil_armazenamento
+                # Índices de payload usados pelos filtros da busca (texto em content/title etc.)
+                criar_indices(self.qdrant_client, collection_name)
                 logger.info(f"✅ Coleção '{collection_name}' criada")
             else:
                 logger.info(f"📦 Coleção '{collection_name}' já existe")
@@ -349,13 +389,24 @@ class LangChainWikipediaService:
         self.retriever = QdrantRetriever(
             qdrant_client=self.qdrant_client,
             collection_name=self.collection_name,
-            embedding_model=self.embedding_model
+            embedding_model=self.embedding_model,
+            search_params=self._parametros_busca(self.collection_name),
+            codificar_consulta=self.codificar_consulta
         )
         
         logger.info("✅ Retriever configurado")
     
-    def ingerir_documentos(self, documentos: List[WikipediaDocument], colecao: str) -> int:
-        """Ingere documentos usando pipeline LangChain completo"""
+    def ingerir_documentos(self, documentos: List[WikipediaDocument], colecao: str, incremental: bool = False,
+                           contagem: Optional[Dict[str, int]] = None) -> int:
+        """Ingere documentos usando pipeline LangChain completo
+
+        Com incremental=True, artigos cujo hash de conteúdo não mudou são ignorados e só
+        os chunks alterados passam pelo modelo de embeddings (os demais reaproveitam o
+        vetor já armazenado). Retorna o número de chunks dos documentos na coleção.
+
+        contagem, se informado, recebe os chunks de cada artigo desta chamada; com jobs
+        concorrentes, ultima_ingestao pode já ser de outra ingestão quando for lido.
+        """
         if not self._initialized:
             raise Exception("Serviço não inicializado")
 
@@ -378,18 +429,19 @@ class LangChainWikipediaService:
             col_info = None
             qdrant_dim = None
 
-        # Detectar dimensão do embedding
-        test_vec = self.embedding_model.encode("teste")
-        if hasattr(test_vec, 'tolist'):
-            emb_dim = len(test_vec.tolist())
-        else:
-            emb_dim = len(test_vec)
+        if self.embedding_model is None:
+            logger.error("❌ Modelo de embeddings não disponível")
+            raise RuntimeError("Embedding model não inicializado. Instale sentence-transformers.")
+
+        # Detectar dimensão do embedding (sem codificar texto de teste quando o modelo informa)
+        emb_dim = self._obter_dimensao_embedding()
         logger.info(f"🔎 Dimensão do embedding: {emb_dim}")
 
         # Se coleção existe e dimensão está errada, remove e recria
         if qdrant_dim is not None and emb_dim != qdrant_dim:
             logger.warning(f"⚠️ Dimensão incompatível: coleção espera {qdrant_dim}, embedding gera {emb_dim}. Removendo e recriando coleção '{colecao}'...")
             self.qdrant_client.delete_collection(collection_name=colecao)
+            self.esquecer_colecao(colecao)
             self.criar_colecao_custom(colecao, emb_dim)
             qdrant_dim = emb_dim
 
@@ -399,68 +451,194 @@ class LangChainWikipediaService:
             self.criar_colecao_custom(colecao, emb_dim)
             qdrant_dim = emb_dim
 
+        deduplicador = self.obter_deduplicador(colecao)
+        ids_indexados: List[str] = []
         try:
-            total_chunks = 0
-            points_batch = []
+            # Etapa 1: dividir todos os documentos em chunks
+            chunks_pendentes = []
+            artigos_inalterados = 0
+            chunks_inalterados = 0
+            contagem_por_artigo = {}
+            hashes_artigos = {doc.title: TextProcessor.calcular_hash_conteudo(doc.content) for doc in documentos}
+            if incremental:
+                # O primeiro chunk guarda o hash do artigo: artigos iguais nem são divididos
+                cabecas = QdrantHelper.obter_pontos_existentes(
+                    self.qdrant_client, colecao,
+                    [QdrantHelper.gerar_id_deterministico(colecao, titulo, 0) for titulo in hashes_artigos]
+                )
+                titulos_inalterados = set()
+                for titulo, article_hash in hashes_artigos.items():
+                    cabeca = cabecas.get(QdrantHelper.gerar_id_deterministico(colecao, titulo, 0))
+                    payload = getattr(cabeca, "payload", None) or {}
+                    if payload.get("article_hash") == article_hash:
+                        titulos_inalterados.add(titulo)
+                        contagem_por_artigo[titulo] = int(payload.get("total_chunks", 1))
+                        chunks_inalterados += contagem_por_artigo[titulo]
+                        logger.info(f"⏭️ '{titulo}' inalterado, ignorando")
+                artigos_inalterados = len(titulos_inalterados)
+                documentos = [doc for doc in documentos if doc.title not in titulos_inalterados]
 
-            for doc in documentos:
+            chunker = self.obter_chunker(colecao)
+            if chunker is not None:
+                # Todos os artigos tokenizados em uma chamada; cada chunk cabe no max_seq_length
+                textos_por_doc = chunker.dividir_lote([doc.content for doc in documentos])
+            for k_doc, doc in enumerate(documentos):
                 # Criar documento LangChain
-                langchain_doc = Document(
-                    page_content=doc.content,
-                    metadata={
-                        'title': doc.title,
-                        'url': doc.url,
-                        **doc.metadata
-                    }
-                )
+                metadata = {
+                    'title': doc.title,
+                    'url': doc.url,
+                    **doc.metadata
+                }
 
-                # Dividir em chunks com LangChain TextSplitter
-                chunks = self.text_splitter.split_documents([langchain_doc])
+                if chunker is not None:
+                    chunks = [Document(page_content=texto, metadata=dict(metadata)) for texto in textos_por_doc[k_doc]]
+                else:
+                    # Dividir em chunks com LangChain TextSplitter
+                    chunks = self.text_splitter.split_documents([Document(page_content=doc.content, metadata=metadata)])
 
                 logger.info(f"📄 '{doc.title}': {len(chunks)} chunks criados")
 
-                # Processar cada chunk
+                article_hash = hashes_artigos[doc.title]
+                contagem_por_artigo[doc.title] = len(chunks)
                 for i, chunk in enumerate(chunks):
-                    # Gerar embedding
-                    if self.embedding_model is None:
-                        logger.error("❌ Modelo de embeddings não disponível")
-                        raise RuntimeError("Embedding model não inicializado. Instale sentence-transformers.")
+                    chunks_pendentes.append((chunk, i, len(chunks), article_hash))
 
-                    embedding_result = self.embedding_model.encode(chunk.page_content)
+            # Modo incremental: compara hashes com os pontos já existentes
+            ids = [QdrantHelper.gerar_id_deterministico(colecao, c.metadata['title'], i) for c, i, _, _ in chunks_pendentes]
+            content_hashes = [TextProcessor.calcular_hash_conteudo(c.page_content) for c, _, _, _ in chunks_pendentes]
+            if incremental:
+                existentes = QdrantHelper.obter_pontos_existentes(self.qdrant_client, colecao, ids, com_vetores=True)
+                situacoes = QdrantHelper.classificar_chunks(
+                    existentes, ids, content_hashes, [h for _, _, _, h in chunks_pendentes]
+                )
+                # Sem vetor armazenado não há o que reaproveitar
+                situacoes = [
+                    "novo" if situacao == "reaproveitar" and getattr(existentes[pid], "vector", None) is None else situacao
+                    for situacao, pid in zip(situacoes, ids)
+                ]
+            else:
+                existentes = {}
+                situacoes = ["novo"] * len(chunks_pendentes)
 
-                    # Converter para lista se necessário
-                    if hasattr(embedding_result, 'tolist'):
-                        embedding = embedding_result.tolist()
-                    else:
-                        embedding = list(embedding_result)
+            def payload_chunk(k: int) -> Dict[str, Any]:
+                chunk, i, total_doc, article_hash = chunks_pendentes[k]
+                return {
+                    'title': chunk.metadata['title'],
+                    'content': chunk.page_content,
+                    'url': chunk.metadata['url'],
+                    'chunk_index': i,
+                    'total_chunks': total_doc,
+                    'doc_metadata': chunk.metadata,
+                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'content_hash': content_hashes[k],
+                    'article_hash': article_hash
+                }
 
-                    # Criar ponto para Qdrant
-                    point_id = str(uuid.uuid4())
-                    point = PointStruct(
-                        id=point_id,
-                        vector=embedding,
-                        payload={
-                            'title': chunk.metadata['title'],
-                            'content': chunk.page_content,
-                            'url': chunk.metadata['url'],
-                            'chunk_index': i,
-                            'total_chunks': len(chunks),
-                            'doc_metadata': chunk.metadata,
-                            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                        }
+            # Quase-duplicatas de chunks já indexados (navboxes, listas, esboços) não são embedadas
+            suprimidos = []
+            # id suprimido -> (original, payload), persistidos para restaurar o chunk se o original mudar
+            registros_supressao = {}
+            if deduplicador is not None:
+                for k, (chunk, i, _, _) in enumerate(chunks_pendentes):
+                    if situacoes[k] == "inalterado":
+                        continue
+                    titulo = chunk.metadata['title']
+                    duplicata = deduplicador.verificar(
+                        ids[k], chunk.page_content, rotulo=f"{titulo}#{i}",
+                        origem={"title": titulo, "url": chunk.metadata['url'], "chunk_index": i}
                     )
+                    if duplicata is None:
+                        ids_indexados.append(ids[k])
+                    else:
+                        situacoes[k] = "duplicado"
+                        registros_supressao[ids[k]] = (duplicata[0], payload_chunk(k))
+                        suprimidos.append({
+                            "id": ids[k], "title": titulo, "chunk_index": i,
+                            "duplicado_de": duplicata[0], "similaridade": round(duplicata[1], 3)
+                        })
 
-                    points_batch.append(point)
+            # Etapa 2: gerar embeddings apenas dos chunks novos/alterados, em lotes ordenados por comprimento
+            batcher = self._obter_embedding_batcher()
+            indices_novos = [k for k, situacao in enumerate(situacoes) if situacao == "novo"]
+            vetores_novos = batcher.encode([chunks_pendentes[k][0].page_content for k in indices_novos])
+            embeddings = {k: vetor for k, vetor in zip(indices_novos, vetores_novos)}
+            self.ultima_ingestao = dict(batcher.ultima_execucao)
+            self.ultima_ingestao["chunking"] = "tokens" if chunker is not None else "caracteres"
+            truncamento = self.relatorio_truncamento([chunks_pendentes[k][0].page_content for k in indices_novos])
+            if truncamento:
+                self.ultima_ingestao["truncamento"] = truncamento
+
+            # Etapa 3: montar pontos e enviá-los ao Qdrant por um escritor com vários upserts em voo
+            # IDs determinísticos: reingerir um artigo sobrescreve seus chunks em vez de duplicá-los
+            total_chunks = 0
+            gravados = 0
+            chunks_por_artigo = {}
+            titulos_alterados = set()
+            ids_gravados = []
+            # Sair do bloco envia o lote final e espera os upserts pendentes
+            with self._criar_escritor(colecao) as escritor:
+                for k, (chunk, i, total_doc, article_hash) in enumerate(chunks_pendentes):
+                    if situacoes[k] == "inalterado":
+                        total_chunks += 1
+                        continue
+                    titulos_alterados.add(chunk.metadata['title'])
+                    chunks_por_artigo[chunk.metadata['title']] = total_doc
+                    if situacoes[k] == "duplicado":
+                        continue
                     total_chunks += 1
+                    embedding = embeddings[k] if situacoes[k] == "novo" else existentes[ids[k]].vector
+
+                    # Criar ponto para Qdrant
+                    point = PointStruct(id=ids[k], vector=embedding, payload=payload_chunk(k))
+
+                    escritor.adicionar([point])
+                    ids_gravados.append(ids[k])
+                    gravados += 1
 
-                # Processar em lotes de 100
-                if len(points_batch) >= 100:
-                    self._inserir_lote(points_batch, colecao)
-                    points_batch = []
+            # Remover chunks antigos além da nova contagem (artigo encolheu)
+            removidos = []
+            QdrantHelper.remover_chunks_excedentes(self.qdrant_client, colecao, chunks_por_artigo, ao_remover=removidos.extend)
+            if deduplicador is not None and removidos:
+                deduplicador.remover(removidos)
+            if suprimidos:
+                # Versões anteriores dos chunks agora suprimidos não podem continuar na coleção
+                self.qdrant_client.delete(
+                    collection_name=colecao,
+                    points_selector=models.PointIdsList(points=[s["id"] for s in suprimidos])
+                )
+                remover_conteudo(colecao, [s["id"] for s in suprimidos])
+            registro = obter_registro_supressoes(colecao, criar=bool(registros_supressao))
+            restaurados = 0
+            if registro is not None:
+                registro.esquecer(ids_gravados)
+                registro.registrar(registros_supressao)
+                # Chunks suprimidos como cópia de um original regravado, suprimido ou removido
+                # são verificados de novo e, se não forem mais duplicatas, voltam à coleção
+                restaurados = restaurar_suprimidos(
+                    self.qdrant_client, colecao, ids_gravados + list(registros_supressao) + removidos,
+                    codificar=batcher.encode, deduplicador=deduplicador, exceto=registros_supressao
+                )
+            mesclados = gravar_duplicatas(self.qdrant_client, colecao, deduplicador.retirar_mesclas()) if deduplicador else 0
 
-            # Processar lote final
-            if points_batch:
-                self._inserir_lote(points_batch, colecao)
+            artigos_inalterados += len({c.metadata['title'] for c, _, _, _ in chunks_pendentes} - titulos_alterados)
+            if contagem is not None:
+                contagem.update(contagem_por_artigo)
+            total_chunks += chunks_inalterados
+            self.ultima_ingestao.update({
+                "chunks_reembedados": len(indices_novos),
+                "chunks_reaproveitados": gravados - len(indices_novos),
+                "artigos_inalterados": artigos_inalterados,
+                "chunks_por_artigo": contagem_por_artigo,
+                "escrita_qdrant": escritor.estatisticas()
+            })
+            if deduplicador is not None:
+                self.ultima_ingestao["deduplicacao"] = {
+                    "modo": deduplicador.modo,
+                    "chunks_suprimidos": len(suprimidos),
+                    "chunks_mesclados": mesclados,
+                    "chunks_restaurados": restaurados,
+                    "suprimidos": suprimidos
+                }
 
             end_time = time.time()
             processing_time = end_time - start_time
@@ -468,34 +646,154 @@ class LangChainWikipediaService:
             logger.info(f"✅ Ingestão concluída:")
             logger.info(f"   📄 Documentos: {len(documentos)}")
             logger.info(f"   🔢 Chunks: {total_chunks}")
+            if incremental:
+                logger.info(
+                    f"   ♻️ Incremental: {len(indices_novos)} chunks reprocessados, "
+                    f"{gravados - len(indices_novos)} reaproveitados, {artigos_inalterados} artigos inalterados"
+                )
+            if suprimidos:
+                logger.info(f"   🧬 Deduplicação: {len(suprimidos)} chunks quase duplicados suprimidos ({deduplicador.modo})")
             logger.info(f"   ⏱️ Tempo: {processing_time:.2f}s")
-            logger.info(f"   🚀 Velocidade: {total_chunks/processing_time:.2f} chunks/s")
+            logger.info(f"   🧮 Embeddings: {self.ultima_ingestao.get('chunks_por_segundo', 0)} chunks/s em {self.ultima_ingestao.get('lotes', 0)} lotes")
+            logger.info(f"   🚀 Velocidade: {total_chunks/processing_time if processing_time > 0 else 0:.2f} chunks/s")
 
             return total_chunks
 
         except Exception as e:
             logger.error(f"❌ Erro na ingestão: {e}")
+            if deduplicador is not None:
+                # Chunks que não chegaram à coleção não podem suprimir os próximos
+                deduplicador.remover(ids_indexados)
             raise
-    
-    def _inserir_lote(self, points: List[PointStruct], colecao: str):
-        """Insere lote de pontos no Qdrant"""
+
+    def modo_chunking(self, colecao: str) -> str:
+        """Modo de chunking configurado para a coleção"""
+        return self.chunking_por_colecao.get(colecao, self.chunking_padrao)
+
+    def definir_chunking(self, colecao: str, modo: str):
+        """Define o modo de chunking ("tokens" ou "caracteres") de uma coleção"""
+        if modo not in ("tokens", "caracteres"):
+            raise ValueError(f"Modo de chunking inválido: {modo}")
+        self.chunking_por_colecao[colecao] = modo
+        logger.info(f"📄 Chunking de '{colecao}': {modo}")
+
+    def obter_chunker(self, colecao: Optional[str] = None) -> Optional[TokenChunker]:
+        """TokenChunker do modelo atual se a coleção usa chunking por tokens
+
+        Retorna None (TextSplitter por caracteres) quando o modelo não expõe
+        tokenizer e max_seq_length, como o modelo simulado.
+        """
+        if self.modo_chunking(colecao or self.collection_name) != "tokens" or self.embedding_model is None:
+            return None
+        chunker = self._token_chunker
+        if chunker is None or chunker.tokenizer is not obter_tokenizer(self.embedding_model):
+            chunker = self._token_chunker = TokenChunker.do_modelo(self.embedding_model)
+            if chunker is not None:
+                logger.info(
+                    f"📄 Chunking por tokens: {chunker.tokens_por_chunk} tokens por chunk, "
+                    f"overlap {chunker.overlap_tokens} (max_seq_length {chunker.max_tokens})"
+                )
+        return chunker
+
+    def relatorio_truncamento(self, textos: List[str]) -> Optional[Dict[str, Any]]:
+        """Tokens dos chunks além do max_seq_length do modelo (None sem tokenizer)"""
+        chunker = TokenChunker.do_modelo(self.embedding_model) if self.embedding_model is not None else None
+        if chunker is None:
+            return None
         try:
-            # Verificar se collection existe, criar se necessário
+            return relatorio_truncamento(chunker.tokenizer, textos, chunker.max_tokens)
+        except Exception as e:
+            logger.debug(f"Relatório de truncamento indisponível: {e}")
+            return None
+
+    def comparar_chunking(self, textos: List[str]) -> Dict[str, Any]:
+        """Truncamento dos mesmos textos divididos por caracteres (antes) e por tokens (depois)"""
+        chunker = TokenChunker.do_modelo(self.embedding_model) if self.embedding_model is not None else None
+        if chunker is None:
+            raise RuntimeError("Modelo de embedding sem tokenizer: chunking por tokens indisponível")
+        if self.text_splitter is None:
+            self._configurar_text_splitter()
+        por_caracteres = [
+            c.page_content for texto in textos
+            for c in self.text_splitter.split_documents([Document(page_content=texto, metadata={})])
+        ]
+        por_tokens = [c for chunks in chunker.dividir_lote(textos) for c in chunks]
+        return {
+            "caracteres": relatorio_truncamento(chunker.tokenizer, por_caracteres, chunker.max_tokens),
+            "tokens": relatorio_truncamento(chunker.tokenizer, por_tokens, chunker.max_tokens)
+        }
+
+    def obter_deduplicador(self, colecao: Optional[str] = None) -> Optional[DeduplicadorLSH]:
+        """Índice de quase-duplicatas da coleção (criado no primeiro uso); None se desligado"""
+        colecao = colecao or self.collection_name
+        deduplicador = self.deduplicadores.get(colecao)
+        if deduplicador is None:
+            deduplicador = self.deduplicadores.setdefault(colecao, DeduplicadorLSH())
+        return deduplicador if deduplicador.ativo else None
+
+    def limpar_deduplicacao(self, colecao: str):
+        """Esvazia o índice de quase-duplicatas da coleção (p.ex. após apagá-la)"""
+        deduplicador = self.deduplicadores.pop(colecao, None)
+        if deduplicador is not None:
+            deduplicador.limpar()
+            logger.info(f"🧬 Índice de deduplicação de '{colecao}' limpo")
+
+    def esquecer_colecao(self, colecao: str):
+        """Descarta o estado mantido para uma coleção removida do Qdrant"""
+        self.limpar_deduplicacao(colecao)
+        self._perfis_colecoes.pop(colecao, None)
+        remover_content_store(colecao)
+        remover_registro_supressoes(colecao)
+        esquecer_colecao_hibrida(colecao)
+
+    def _parametros_busca(self, colecao: str, info: Any = None) -> Optional[Any]:
+        """SearchParams do perfil da coleção (oversampling + rescoring se quantizada)"""
+        perfil = self._perfis_colecoes.get(colecao)
+        if perfil is None:
             try:
-                self.qdrant_client.get_collection(colecao)
+                info = info if info is not None else self.qdrant_client.get_collection(colecao)
             except Exception:
-                logger.warning(f"⚠️ Collection '{colecao}' não existe, criando...")
-                self._criar_colecao()
-            
-            self.qdrant_client.upsert(
-                collection_name=colecao,
-                points=points
-            )
-            logger.debug(f"📦 Lote de {len(points)} pontos inserido")
-            
-        except Exception as e:
-            logger.error(f"❌ Erro ao inserir lote: {e}")
-            raise
+                return None
+            perfil = self._perfis_colecoes[colecao] = perfil_da_colecao(info)
+        return parametros_busca(perfil)
+
+    def _obter_embedding_batcher(self) -> EmbeddingBatcher:
+        """Retorna o EmbeddingBatcher do modelo atual (recriado se o modelo mudou)"""
+        if self.embedding_batcher is None or self.embedding_batcher.model is not self.embedding_model:
+            self.embedding_batcher = EmbeddingBatcher(self.embedding_model, cache=self._obter_cache_embeddings())
+        return self.embedding_batcher
+
+    def _obter_cache_embeddings(self):
+        """Cache em disco do modelo atual (compartilhado entre processos); None se desabilitado"""
+        if not self.embedding_model_name or self.embedding_model is None:
+            return None
+        cache = self.embedding_cache
+        if cache is None or cache.modelo != self.embedding_model_name:
+            cache = criar_cache_embeddings(self.embedding_model_name, self._obter_dimensao_embedding())
+            self.embedding_cache = cache
+        return cache
+
+    def codificar_consulta(self, consulta: str) -> List[float]:
+        """Embedding de uma consulta de busca; repetidas saem do LRU sem passar pelo modelo"""
+        return self.cache_consultas.obter_ou_calcular(
+            self.embedding_model_name or "", consulta, lambda texto: self.embedding_model.encode(texto).tolist()
+        )
+
+    def _obter_dimensao_embedding(self) -> int:
+        """Dimensão do modelo de embedding atual"""
+        return obter_dimensao_modelo(self.embedding_model)
+    
+    def _criar_escritor(self, colecao: str) -> QdrantBatchWriter:
+        """Verifica a collection uma única vez e retorna o escritor de pontos da ingestão"""
+        try:
+            self.qdrant_client.get_collection(colecao)
+        except Exception:
+            logger.warning(f"⚠️ Collection '{colecao}' não existe, criando...")
+            self._criar_colecao()
+        # wait=True: depois da escrita a ingestão lê de volta o que gravou (originais das
+        # mesclas, suprimidos a restaurar, chunks excedentes); com wait=False os upserts
+        # podem estar só no WAL e essas leituras veriam a coleção antiga
+        return QdrantBatchWriter(self.qdrant_client, colecao, wait=True)
     
     def buscar_documentos(self, query: str, limit: int = 10, score_threshold: float = 0.5, colecao: str = None) -> List[SearchResult]:
         """Busca documentos usando LangChain retriever"""
@@ -522,174 +820,108 @@ class LangChainWikipediaService:
         try:
             logger.info(f"🔍 Buscando: '{query}' (limit={limit}, threshold={score_threshold})")
             
-            # Verificar se a coleção tem dados
-            try:
-                col_info = self.qdrant_client.get_collection(self.collection_name)
-                logger.info(f"📊 Coleção '{self.collection_name}': {col_info.points_count} pontos")
-                if col_info.points_count == 0:
-                    logger.error(f"❌ Coleção '{self.collection_name}' está VAZIA!")
-                    return []
-            except Exception as e:
-                logger.error(f"❌ Erro ao acessar coleção: {e}")
-                return []
-                # Log dos termos buscados
-                palavra_norm = normalizar_texto(palavra)
-                logger.info(f"🔍 [Busca textual] Termo original: '{palavra}' | Termo normalizado: '{palavra_norm}'")
-
-            # Detectar nomes próprios (palavras com maiúsculas)
-            import re
-            palavras = query.split()
-            nomes_proprios = []
-            
-            # Lista de stopwords que podem aparecer no início
-            stopwords_inicio = ['o', 'a', 'os', 'as', 'que', 'quem', 'qual', 'quais', 'onde', 'quando', 'como']
-            
-            for i, palavra in enumerate(palavras):
-                palavra_limpa = re.sub(r'[^\w]', '', palavra)
-                
-                # Se for a primeira palavra, só detectar como nome próprio se não for stopword comum
-                if i == 0:
-                    # Primeira palavra com maiúscula que NÃO é stopword = provavelmente nome próprio
-                    if palavra_limpa and palavra_limpa[0].isupper() and len(palavra_limpa) > 2:
-                        if palavra.lower() not in stopwords_inicio:
-                            nomes_proprios.append(palavra_limpa)
-                else:
-                    # Palavras subsequentes com maiúscula = nome próprio
-                    if palavra_limpa and palavra_limpa[0].isupper() and len(palavra_limpa) > 2:
-                        nomes_proprios.append(palavra_limpa)
+            # Análise da query (memoizada): nomes próprios (palavras com maiúsculas), palavras
+            # sem stopwords e pontuação para o embedding e termos normalizados para o boosting
+            analise = analisar_consulta(query)
+            nomes_proprios = list(analise.nomes_proprios)
             
             if nomes_proprios:
                 logger.info(f"🏷️  Nomes próprios detectados: {nomes_proprios}")
             
-            # Limpar query removendo stopwords e pontuação para melhorar embedding
-            stopwords = ['o', 'que', 'é', 'a', 'de', 'da', 'do', 'um', 'uma', 'os', 'as', 'para', 'com', 'por', 'em', 'no', 'na', 'quem', 'foi']
-            palavras_limpas = []
-            for palavra in query.split():
-                palavra_sem_pont = re.sub(r'[^\w]', '', palavra)  # Remove pontuação
-                if palavra_sem_pont.lower() not in stopwords and len(palavra_sem_pont) > 0:
-                    palavras_limpas.append(palavra_sem_pont)
+            # Sem stopwords nem pontuação; a query original se ficou vazia
+            palavras_limpas = list(analise.palavras)
+            query_limpa = analise.texto_limpo
             
-            query_limpa = ' '.join(palavras_limpas)
+            logger.info(f"🧹 Query limpa para embedding: '{query_limpa}'")
             
-            # Se a query ficou vazia após remover stopwords, usar original
-            if not query_limpa.strip():
-                query_limpa = query
+            # Gerar embedding da query LIMPA (/perguntar busca duas vezes a mesma pergunta)
+            query_vector = self.codificar_consulta(query_limpa)
+            # Coleções quantizadas: oversampling + rescoring pelos vetores originais
+            # (perfil em cache: a coleção só é consultada na primeira busca)
+            search_params = self._parametros_busca(self.collection_name)
             
-            logger.info(f"🧹 Query limpa para embedding: '{query_limpa}'")
+            from qdrant_client.models import Filter, FieldCondition, MatchText, QueryRequest
             
-            # Gerar embedding da query LIMPA
-            query_vector = self.embedding_model.encode(query_limpa).tolist()
+            def perna(filtro=None, limite=limit * 2, threshold=0.0):
+                return QueryRequest(
+                    query=query_vector, filter=filtro, limit=limite,
+                    score_threshold=threshold, params=search_params, with_payload=True
+                )
             
-            # BUSCA 1: Busca semântica normal
-            search_result = self.qdrant_client.search(
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                limit=limit * 3,  # Buscar 3x mais para ter margem após boosting
-                score_threshold=score_threshold
-            )
+            hibrida = colecao_hibrida(self.qdrant_client, self.collection_name)
+            if hibrida:
+                # Coleção híbrida: perna densa (com o threshold) e BM25 fundidas por RRF no
+                # Qdrant, no lugar das buscas por MatchText e seus boosts
+                logger.info("🔀 Busca híbrida densa + BM25 com fusão RRF")
+                requisicoes = [consulta_hibrida(
+                    query_vector, query, limite=limit * 3, score_threshold=score_threshold, search_params=search_params
+                )]
+                nomes_proprios, palavras_textuais = [], []
+            else:
+                # BUSCA 1: Busca semântica normal, 3x mais para ter margem após boosting.
+                # Sem threshold no Qdrant: o corte é aplicado abaixo e, se nada passar, o
+                # melhor score já está em mãos (antes exigia uma segunda busca de diagnóstico)
+                requisicoes = [perna(limite=limit * 3, threshold=None)]
+            
+                # Texto no content store: "content" não está no payload e MatchText nele não
+                # acha nada; a busca textual fica só no título (o BM25 da híbrida cobre o texto)
+                texto_externo = conteudo_externalizado(self.collection_name)
+                campos_textuais = ["title"] if texto_externo else ["content", "title"]
+                if texto_externo and nomes_proprios:
+                    logger.info(f"🗜️ Texto no content store: sem busca por nomes próprios no conteúdo {nomes_proprios}")
+                    nomes_proprios = []
+            
+                # BUSCA 2: Nomes próprios com AND (aceitar qualquer score se tem o nome)
+                if nomes_proprios:
+                    logger.info(f"🔍 Busca híbrida com AND para nomes próprios: {nomes_proprios}")
+                    requisicoes.append(perna(Filter(must=[
+                        FieldCondition(key="content", match=MatchText(text=nome)) for nome in nomes_proprios
+                    ])))
+            
+                # BUSCA 3: Para queries com até 3 palavras significativas (ex: "o que é cusco?"
+                # -> "cusco"), busca textual por palavra no content e title (só title com content store)
+                palavras_textuais = [p for p in palavras_limpas if len(p) > 2] if len(palavras_limpas) <= 3 else []
+                if palavras_textuais:
+                    logger.info(f"🔍 Query com {len(palavras_limpas)} palavras: '{query_limpa}' - fazendo busca textual")
+                for palavra in palavras_textuais:
+                    requisicoes.append(perna(Filter(should=[
+                        FieldCondition(key=campo, match=MatchText(text=palavra)) for campo in campos_textuais
+                    ])))
+            
+            # Todas as pernas em uma única ida ao Qdrant
+            respostas = [r.points for r in self.qdrant_client.query_batch_points(
+                collection_name=self.collection_name, requests=requisicoes
+            )]
+            semantica = respostas.pop(0)
+            # Na híbrida o threshold já foi aplicado à perna densa e o score é o do RRF
+            search_result = semantica if hibrida else [hit for hit in semantica if hit.score >= score_threshold]
             
-            logger.info(f"📡 Busca semântica retornou {len(search_result)} chunks")
+            logger.info(f"📡 Busca semântica retornou {len(search_result)} chunks ({len(requisicoes)} buscas em lote)")
             
-            # DEBUG: Mostrar alguns resultados da busca semântica
             if len(search_result) == 0:
                 logger.warning(f"⚠️ BUSCA SEMÂNTICA RETORNOU 0 RESULTADOS!")
                 logger.warning(f"   Query: '{query}'")
                 logger.warning(f"   Query limpa: '{query_limpa}'")
                 logger.warning(f"   Collection: {self.collection_name}")
                 logger.warning(f"   Score threshold: {score_threshold}")
-                
-                # Tentar buscar SEM threshold para ver se há algum resultado
-                try:
-                    test_result = self.qdrant_client.search(
-                        collection_name=self.collection_name,
-                        query_vector=query_vector,
-                        limit=5,
-                        score_threshold=0.0
-                    )
-                    logger.warning(f"   Com threshold=0.0: {len(test_result)} resultados")
-                    if test_result:
-                        logger.warning(f"   Melhor score: {test_result[0].score:.4f}")
-                except:
-                    pass
+                logger.warning(f"   Com threshold=0.0: {len([h for h in semantica[:5] if h.score >= 0.0])} resultados")
+                if semantica:
+                    logger.warning(f"   Melhor score: {semantica[0].score:.4f}")
             
-            # BUSCA 2: Busca textual adicional
             search_result_keywords = []
-            
-            # Se houver nomes próprios detectados, buscar por eles
             if nomes_proprios:
-                try:
-                    from qdrant_client.models import Filter, FieldCondition, MatchText
-                    
-                    # Buscar documentos que contenham os nomes próprios no conteúdo
-                    filter_conditions = []
-                    for nome in nomes_proprios:
-                        filter_conditions.append(
-                            FieldCondition(
-                                key="content",
-                                match=MatchText(text=nome)
-                            )
-                        )
-                    
-                    # Usar AND (must) para nomes próprios
-                    filter_obj = Filter(must=filter_conditions)
-                    logger.info(f"🔍 Busca híbrida com AND para nomes próprios: {nomes_proprios}")
-                    
-                    search_result_keywords = self.qdrant_client.search(
-                        collection_name=self.collection_name,
-                        query_vector=query_vector,
-                        query_filter=filter_obj,
-                        limit=limit * 2,
-                        score_threshold=0.0  # Aceitar qualquer score se tem o nome
-                    )
-                    
-                    logger.info(f"🔍 Busca por nomes próprios ({nomes_proprios}) retornou {len(search_result_keywords)} chunks")
-                    
-                except Exception as e:
-                    logger.warning(f"⚠️ Erro na busca por palavras-chave: {e}")
-            
-            # BUSCA 3: Para queries sem nomes próprios detectados e com 1-2 palavras significativas
-            # (ex: "o que é cusco?" -> palavra significativa: "cusco")
-            # fazer busca textual case-insensitive
-            # MODIFICADO: sempre fazer busca textual para queries curtas, independente de maiúsculas
-            if len(palavras_limpas) <= 3:  # Aumentado de 2 para 3 para capturar mais casos
-                try:
-                    from qdrant_client.models import Filter, FieldCondition, MatchText
-                    
-                    # Buscar pela query limpa (sem stopwords/pontuação)
-                    logger.info(f"🔍 Query com {len(palavras_limpas)} palavras: '{query_limpa}' - fazendo busca textual")
-                    
-                    for palavra in palavras_limpas:
-                        if len(palavra) > 2:  # Ignorar palavras muito curtas
-                            try:
-                                # Buscar no content e title
-                                filter_obj = Filter(
-                                    should=[
-                                        FieldCondition(key="content", match=MatchText(text=palavra)),
-                                        FieldCondition(key="title", match=MatchText(text=palavra))
-                                    ]
-                                )
-                                
-                                keywords_result = self.qdrant_client.search(
-                                    collection_name=self.collection_name,
-                                    query_vector=query_vector,
-                                    query_filter=filter_obj,
-                                    limit=limit * 2,
-                                    score_threshold=0.0
-                                )
-                                
-                                logger.info(f"🔍 Busca textual por '{palavra}' retornou {len(keywords_result)} chunks")
-                                
-                                # Adicionar aos resultados com boost
-                                for hit in keywords_result:
-                                    if hit.id not in [r.id for r in search_result_keywords]:
-                                        hit.score = hit.score * 2.0  # Boost para match textual
-                                        search_result_keywords.append(hit)
-                                        
-                            except Exception as e:
-                                logger.warning(f"⚠️ Erro na busca textual por '{palavra}': {e}")
-                                
-                except Exception as e:
-                    logger.warning(f"⚠️ Erro na busca textual geral: {e}")
+                search_result_keywords = respostas.pop(0)
+                logger.info(f"🔍 Busca por nomes próprios ({nomes_proprios}) retornou {len(search_result_keywords)} chunks")
+            
+            ids_keywords = {hit.id for hit in search_result_keywords}
+            for palavra, keywords_result in zip(palavras_textuais, respostas):
+                logger.info(f"🔍 Busca textual por '{palavra}' retornou {len(keywords_result)} chunks")
+                # Adicionar aos resultados com boost para match textual
+                for hit in keywords_result:
+                    if hit.id not in ids_keywords:
+                        hit.score = hit.score * 2.0
+                        search_result_keywords.append(hit)
+                        ids_keywords.add(hit.id)
             
             # Combinar resultados (sem duplicatas por ID)
             combined_ids = set()
@@ -712,25 +944,17 @@ class LangChainWikipediaService:
             
             # Usar combined_results em vez de search_result
             search_result = combined_results
+
+            # Texto no content store: o boosting e o trecho da resposta usam só os
+            # primeiros 200 caracteres, então só eles são descomprimidos (+1 para o "...")
+            preencher_conteudo(self.collection_name, search_result, max_chars=201)
             
             logger.info(f"📡 Top 15 resultados combinados:")
             for i, hit in enumerate(sorted(search_result, key=lambda x: x.score, reverse=True)[:15], 1):
                 logger.info(f"   {i:2d}. {hit.payload.get('title', 'N/A'):30s} score={hit.score:.4f}")
             
-            # Extrair termos da query para boosting
-            import re
-            import unicodedata
-            
-            def normalizar_texto(texto):
-                """Remove acentos e normaliza texto para comparação"""
-                texto_nfd = unicodedata.normalize('NFD', texto)
-                texto_sem_acento = ''.join(c for c in texto_nfd if unicodedata.category(c) != 'Mn')
-                return texto_sem_acento.lower()
-            
-            stopwords = ['o', 'que', 'é', 'a', 'de', 'da', 'do', 'um', 'uma', 'os', 'as', 'para', 'com', 'por']
-            termos_query = [re.sub(r'[^\w\s]', '', t.lower()) for t in query.split() if t.lower() not in stopwords]
-            termos_query = [t for t in termos_query if len(t) > 2]
-            termos_query_normalizados = [normalizar_texto(t) for t in termos_query]
+            # Termos da query para boosting (já normalizados na análise)
+            termos_query_normalizados = analise.termos_normalizados
             
             # Converter para SearchResult e aplicar boosting
             results = []
@@ -743,16 +967,19 @@ class LangChainWikipediaService:
                     metadata={
                         'chunk_index': hit.payload.get('chunk_index', 0),
                         'total_chunks': hit.payload.get('total_chunks', 1)
-                    }
+                    },
+                    title_norm=hit.payload.get('title_norm'),
+                    content_norm=hit.payload.get('content_norm')
                 )
                 
                 # Aplicar boosting de 3x para matches exatos no título
-                titulo_normalizado = normalizar_texto(result.title)
-                conteudo_normalizado = normalizar_texto(result.content[:200])  # Primeiros 200 chars
+                # (título e primeiros 200 chars normalizados na ingestão). Na híbrida não:
+                # o match lexical já entrou no RRF pela perna BM25 e seria contado duas vezes
+                titulo_normalizado, conteudo_normalizado = normalizados(result)
                 
                 # Verificar se algum termo normalizado aparece no título ou conteúdo normalizado
                 tem_match = False
-                if termos_query_normalizados:
+                if termos_query_normalizados and not hibrida:
                     for termo_norm in termos_query_normalizados:
                         if termo_norm in titulo_normalizado or termo_norm in conteudo_normalizado:
                             tem_match = True
@@ -810,7 +1037,9 @@ class LangChainWikipediaService:
                 "vector_size": collection_info.config.params.vectors.size,
                 "distance_metric": collection_info.config.params.vectors.distance.value,
                 "status": collection_info.status.value,
-                "optimizer_status": collection_info.optimizer_status.value if collection_info.optimizer_status else "unknown"
+                "optimizer_status": collection_info.optimizer_status.value if collection_info.optimizer_status else "unknown",
+                "embedding_cache": self.embedding_cache.estatisticas() if self.embedding_cache else None,
+                "cache_consultas": self.cache_consultas.estatisticas()
             }
             
         except Exception as e:
@@ -0,0 +1,83 @@
+"""
+Utilitários de checkpoint
+
+Persistência do progresso de ingestão de dumps em um arquivo JSON. Cada checkpoint
+registra o dump, a coleção, o offset do stream comprimido e o último page id
+confirmado no Qdrant, permitindo retomar a ingestão sem reprocessar o início do dump.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """Armazena checkpoints de ingestão em JSON com escrita atômica"""
+
+    def __init__(self, path: Any):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chave(dump_file: str, colecao: str) -> str:
+        """Chave do checkpoint: nome do dump + coleção de destino"""
+        return f"{Path(dump_file).name}::{colecao}"
+
+    def _ler(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Checkpoints ilegíveis em {self.path}, ignorando: {e}")
+            return {}
+
+    def _gravar(self, dados: Dict[str, Dict[str, Any]]):
+        # Grava em arquivo temporário e substitui: um crash nunca deixa JSON pela metade
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def obter(self, chave: str) -> Optional[Dict[str, Any]]:
+        """Retorna o checkpoint de uma chave (ou None)"""
+        with self._lock:
+            return self._ler().get(chave)
+
+    def listar(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna todos os checkpoints"""
+        with self._lock:
+            return self._ler()
+
+    def salvar(self, chave: str, **campos) -> Dict[str, Any]:
+        """Atualiza (merge) o checkpoint de uma chave"""
+        with self._lock:
+            dados = self._ler()
+            checkpoint = dados.get(chave, {})
+            checkpoint.update(campos)
+            checkpoint["atualizado_em"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            dados[chave] = checkpoint
+            self._gravar(dados)
+            return checkpoint
+
+    def resetar(self, chave: Optional[str] = None) -> int:
+        """Remove um checkpoint (ou todos, se chave for None); retorna quantos foram removidos"""
+        with self._lock:
+            dados = self._ler()
+            if chave is None:
+                removidos = len(dados)
+                dados = {}
+            else:
+                removidos = 1 if dados.pop(chave, None) is not None else 0
+            self._gravar(dados)
+            return removidos
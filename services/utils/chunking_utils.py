@@ -0,0 +1,150 @@
+"""
+Utilitários de chunking por tokens
+
+Divide textos em chunks medidos em tokens do próprio modelo de embedding, de modo
+que cada chunk caiba no max_seq_length do modelo (tudo além disso é truncado e
+nunca chega ao vetor). O texto é tokenizado uma única vez com offsets; as janelas
+de tokens têm sobreposição configurável e terminam, sempre que possível, em um fim
+de parágrafo ou de frase. O texto de cada chunk é a fatia original do artigo.
+"""
+
+import os
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fronteiras preferidas para terminar um chunk, da mais forte para a mais fraca
+_FRONTEIRAS = ("\n\n", "\n", ". ", "! ", "? ", "; ")
+
+
+def obter_tokenizer(model: Any) -> Optional[Any]:
+    """Tokenizer rápido (com offsets) do modelo de embedding, ou None"""
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None or not callable(tokenizer):
+        return None
+    if getattr(tokenizer, "is_fast", True) is False:
+        # Tokenizers lentos não retornam offset_mapping
+        return None
+    return tokenizer
+
+
+def obter_max_tokens(model: Any) -> Optional[int]:
+    """max_seq_length do modelo (sentence-transformers), ou None"""
+    max_len = getattr(model, "max_seq_length", None)
+    if not isinstance(max_len, int) or max_len <= 0:
+        get_max = getattr(model, "get_max_seq_length", None)
+        max_len = get_max() if callable(get_max) else None
+    return int(max_len) if isinstance(max_len, int) and max_len > 0 else None
+
+
+def _tokens_especiais(tokenizer: Any) -> int:
+    contar = getattr(tokenizer, "num_special_tokens_to_add", None)
+    try:
+        return int(contar()) if callable(contar) else 2
+    except Exception:
+        return 2
+
+
+class TokenChunker:
+    """Divide textos em janelas de tokens do modelo com sobreposição"""
+
+    def __init__(self, tokenizer: Any, max_tokens: int, overlap_tokens: Optional[int] = None):
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        # Espaço para [CLS]/[SEP] (ou equivalentes) adicionados pelo modelo
+        self.tokens_por_chunk = max(8, max_tokens - _tokens_especiais(tokenizer))
+        overlap = overlap_tokens if overlap_tokens is not None else int(os.getenv("CHUNK_OVERLAP_TOKENS", "16"))
+        self.overlap_tokens = max(0, min(overlap, self.tokens_por_chunk // 2))
+
+    @classmethod
+    def do_modelo(cls, model: Any, max_tokens: Optional[int] = None,
+                  overlap_tokens: Optional[int] = None) -> Optional["TokenChunker"]:
+        """Chunker alinhado ao modelo; None se o modelo não expõe tokenizer e max_seq_length"""
+        tokenizer = obter_tokenizer(model)
+        limite = obter_max_tokens(model)
+        if tokenizer is None or limite is None:
+            return None
+        configurado = max_tokens or int(os.getenv("CHUNK_MAX_TOKENS", "0"))
+        return cls(tokenizer, min(configurado, limite) if configurado else limite, overlap_tokens)
+
+    def _offsets(self, textos: Sequence[str]) -> List[List[Tuple[int, int]]]:
+        codificado = self.tokenizer(
+            list(textos), add_special_tokens=False, truncation=False, return_offsets_mapping=True
+        )
+        return [[(int(a), int(b)) for a, b in offsets] for offsets in codificado["offset_mapping"]]
+
+    def dividir(self, texto: str) -> List[str]:
+        """Divide um texto em chunks que cabem no max_seq_length do modelo"""
+        return self.dividir_lote([texto])[0]
+
+    def dividir_lote(self, textos: Sequence[str]) -> List[List[str]]:
+        """Divide vários textos tokenizando todos em uma única chamada"""
+        textos = list(textos)
+        if not textos:
+            return []
+        return [self._janelas(texto, offsets) for texto, offsets in zip(textos, self._offsets(textos))]
+
+    def _janelas(self, texto: str, offsets: List[Tuple[int, int]]) -> List[str]:
+        # Tokens vazios (p.ex. espaços) não delimitam nada
+        offsets = [o for o in offsets if o[1] > o[0]]
+        if not offsets:
+            return [texto.strip()] if texto.strip() else []
+
+        chunks: List[str] = []
+        total = len(offsets)
+        inicio = 0
+        while inicio < total:
+            fim = min(inicio + self.tokens_por_chunk, total)
+            if fim < total:
+                fim = self._ajustar_fim(texto, offsets, inicio, fim)
+            chunk = texto[offsets[inicio][0]:offsets[fim - 1][1]].strip()
+            if chunk:
+                chunks.append(chunk)
+            if fim >= total:
+                break
+            # Próxima janela recua overlap tokens, mas sempre avança
+            inicio = self._inicio_de_palavra(texto, offsets, max(fim - self.overlap_tokens, inicio + 1), fim)
+        return chunks
+
+    @staticmethod
+    def _inicio_de_palavra(texto: str, offsets: List[Tuple[int, int]], k: int, limite: int) -> int:
+        """Avança k até um token que começa uma palavra (um pedaço de palavra retokenizado
+        sozinho vira mais tokens e o chunk passaria do limite)"""
+        while k < limite:
+            posicao = offsets[k][0]
+            if posicao == 0 or not texto[posicao - 1].isalnum():
+                return k
+            k += 1
+        return limite
+
+    def _ajustar_fim(self, texto: str, offsets: List[Tuple[int, int]], inicio: int, fim: int) -> int:
+        """Recua o fim da janela até uma fronteira de parágrafo/frase no último terço"""
+        minimo = inicio + max(1, (fim - inicio) * 2 // 3)
+        for fronteira in _FRONTEIRAS:
+            # Quebras de linha vêm depois do token; a pontuação é o último caractere dele
+            recuo = 0 if fronteira[0] == "\n" else 1
+            for k in range(fim - 1, minimo - 1, -1):
+                if texto.startswith(fronteira, offsets[k][1] - recuo):
+                    return k + 1
+        return fim
+
+
+def relatorio_truncamento(tokenizer: Any, textos: Sequence[str], max_tokens: int) -> Dict[str, Any]:
+    """Quantos tokens dos chunks passam do max_seq_length (e são descartados pelo modelo)"""
+    textos = list(textos)
+    if not textos:
+        return {"chunks": 0, "chunks_truncados": 0, "tokens": 0, "tokens_truncados": 0, "percentual_truncado": 0.0}
+    codificado = tokenizer(textos, add_special_tokens=True, truncation=False)
+    contagens = [len(ids) for ids in codificado["input_ids"]]
+    excedentes = [max(0, c - max_tokens) for c in contagens]
+    total = sum(contagens)
+    return {
+        "chunks": len(textos),
+        "max_tokens": max_tokens,
+        "chunks_truncados": sum(1 for e in excedentes if e),
+        "tokens": total,
+        "tokens_truncados": sum(excedentes),
+        "percentual_truncado": round(100.0 * sum(excedentes) / total, 1) if total else 0.0,
+        "tokens_por_chunk": round(total / len(textos), 1)
+    }
@@ -0,0 +1,446 @@
+"""
+Armazenamento externo e comprimido do texto dos chunks
+
+Com CONTENT_STORE_ENABLED=true, o texto dos chunks sai do payload do Qdrant (que
+o mantém em memória) e vai para um arquivo local por coleção: registros
+comprimidos com zstd (zlib se zstandard não estiver instalado), gravados só no
+fim do arquivo e lidos por mmap. O índice (id do ponto -> offset, tamanho, hash)
+fica em SQLite ao lado do arquivo, e um LRU em memória guarda os textos mais
+lidos. O payload fica com título, url e os campos pequenos usados em filtros,
+mais "conteudo_externo": True; o texto só é lido para os chunks que chegam à
+resposta ou ao prompt, e a busca pode pedir apenas o início de cada um.
+
+Como no cache de embeddings, escritas e leituras usam um lock de arquivo (fcntl)
+para que workers do uvicorn e scripts CLI compartilhem o mesmo armazenamento.
+Regravar um chunk deixa o registro anterior sem uso no arquivo; compactar()
+reescreve apenas os registros vivos.
+"""
+
+import io
+import os
+import re
+import mmap
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Windows: apenas proteção entre threads do mesmo processo
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Limite de parâmetros por consulta SQLite
+_LOTE_SQL = 500
+
+# Primeiro byte de cada registro: codec usado na compressão
+_ZSTD = b"z"
+_ZLIB = b"l"
+
+# Campos que deixam o payload quando o texto vai para o armazenamento externo
+# (doc_metadata repete título e url do próprio payload)
+CAMPOS_EXTERNOS = ("content", "doc_metadata")
+
+
+def content_store_habilitado() -> bool:
+    return os.getenv("CONTENT_STORE_ENABLED", "false").lower() == "true"
+
+
+class ContentStore:
+    """Textos de chunks de uma coleção: arquivo comprimido + mmap, índice SQLite e LRU"""
+
+    def __init__(
+        self,
+        diretorio: Any,
+        colecao: str,
+        nivel: Optional[int] = None,
+        max_cache: Optional[int] = None
+    ):
+        self.colecao = colecao
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        nome = re.sub(r"[^A-Za-z0-9_.-]+", "_", colecao).strip("_") or "colecao"
+        self.dados_path = self.diretorio / f"{nome}.dat"
+        self.indice_path = self.diretorio / f"{nome}.sqlite"
+        self.lock_path = self.diretorio / f"{nome}.lock"
+
+        self.nivel = int(nivel or os.getenv("CONTENT_STORE_LEVEL", "3"))
+        self.codec = _ZSTD if ZSTD_AVAILABLE else _ZLIB
+        if ZSTD_AVAILABLE:
+            self._compressor = zstandard.ZstdCompressor(level=self.nivel)
+            self._descompressor = zstandard.ZstdDecompressor()
+        else:
+            logger.warning("⚠️ zstandard não instalado: content store comprimindo com zlib (pip install zstandard)")
+
+        self.max_cache = int(max_cache if max_cache is not None else os.getenv("CONTENT_STORE_CACHE_SIZE", "10000"))
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # id -> (hash, texto)
+        self.acertos = 0
+        self.falhas = 0
+
+        self._lock = threading.RLock()
+        self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._mapa: Optional[mmap.mmap] = None
+        self._arquivo = None
+        self._geracao = -1
+
+        self._conn = sqlite3.connect(str(self.indice_path), timeout=30, check_same_thread=False)
+        with self._trava(exclusiva=True):
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS registros ("
+                "id TEXT PRIMARY KEY, inicio INTEGER NOT NULL, tamanho INTEGER NOT NULL, "
+                "tamanho_original INTEGER NOT NULL, hash TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (nome TEXT PRIMARY KEY, valor INTEGER NOT NULL)")
+            # A geração muda a cada compactação: quem tem o arquivo antigo mapeado o reabre
+            self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('geracao', 0)")
+            self._conn.commit()
+            self.dados_path.touch(exist_ok=True)
+
+        logger.info(
+            f"🗜️ Content store de '{colecao}': {self.dados_path.name} "
+            f"({'zstd' if self.codec == _ZSTD else 'zlib'} nível {self.nivel}, LRU {self.max_cache})"
+        )
+
+    # ------------------------------------------------------------------
+    # Infraestrutura
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _trava(self, exclusiva: bool):
+        """Lock entre threads (RLock) e entre processos (flock compartilhado/exclusivo)"""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _meta(self, nome: str) -> int:
+        return int(self._conn.execute("SELECT valor FROM meta WHERE nome = ?", (nome,)).fetchone()[0])
+
+    @staticmethod
+    def hash_texto(texto: str) -> str:
+        return hashlib.sha1(texto.encode("utf-8")).hexdigest()[:20]
+
+    def _registros(self, ids: Sequence[str]) -> Dict[str, tuple]:
+        """{id: (inicio, tamanho, tamanho_original, hash)} dos ids presentes no índice"""
+        registros: Dict[str, tuple] = {}
+        for i in range(0, len(ids), _LOTE_SQL):
+            parte = ids[i:i + _LOTE_SQL]
+            marcadores = ",".join("?" * len(parte))
+            for linha in self._conn.execute(
+                f"SELECT id, inicio, tamanho, tamanho_original, hash FROM registros WHERE id IN ({marcadores})", parte
+            ):
+                registros[linha[0]] = linha[1:]
+        return registros
+
+    def _mapear(self, ate: int) -> Optional[mmap.mmap]:
+        """mmap do arquivo de dados cobrindo até o byte `ate` (remapeia se cresceu ou foi compactado)"""
+        geracao = self._meta("geracao")
+        if self._mapa is not None and geracao == self._geracao and len(self._mapa) >= ate:
+            return self._mapa
+        self._desmapear()
+        if self.dados_path.stat().st_size == 0:
+            return None
+        self._arquivo = open(self.dados_path, "rb")
+        self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._geracao = geracao
+        return self._mapa
+
+    def _desmapear(self):
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def _comprimir(self, texto: str) -> bytes:
+        dados = texto.encode("utf-8")
+        if self.codec == _ZSTD:
+            return _ZSTD + self._compressor.compress(dados)
+        return _ZLIB + zlib.compress(dados, min(self.nivel, 9))
+
+    def _descomprimir(self, registro: bytes, max_bytes: Optional[int] = None) -> bytes:
+        """Descomprime o registro; com max_bytes, para depois de produzir esse tanto"""
+        codec, corpo = registro[:1], registro[1:]
+        if codec == _ZLIB:
+            return zlib.decompressobj().decompress(corpo, max_bytes or 0)
+        if codec == _ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("Registro comprimido com zstd, mas o pacote zstandard não está instalado")
+            if max_bytes is None:
+                return self._descompressor.decompress(corpo)
+            with self._descompressor.stream_reader(io.BytesIO(corpo)) as leitor:
+                partes, faltam = [], max_bytes
+                while faltam > 0:
+                    parte = leitor.read(faltam)
+                    if not parte:
+                        break
+                    partes.append(parte)
+                    faltam -= len(parte)
+                return b"".join(partes)
+        raise ValueError(f"Codec desconhecido no content store: {codec!r}")
+
+    def _lembrar(self, chave: str, valor: tuple):
+        if self.max_cache <= 0:
+            return
+        self._cache[chave] = valor
+        self._cache.move_to_end(chave)
+        while len(self._cache) > self.max_cache:
+            self._cache.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+    def guardar(self, textos: Dict[Any, str]) -> int:
+        """Grava {id do ponto: texto}; textos iguais aos já gravados não são reescritos
+
+        Retorna quantos registros foram escritos no arquivo.
+        """
+        novos = {str(chave): texto for chave, texto in textos.items() if texto is not None}
+        if not novos:
+            return 0
+        hashes = {chave: self.hash_texto(texto) for chave, texto in novos.items()}
+
+        with self._trava(exclusiva=True):
+            existentes = self._registros(list(novos))
+            pendentes = [chave for chave in novos if existentes.get(chave, (None,) * 4)[3] != hashes[chave]]
+            if not pendentes:
+                return 0
+            linhas = []
+            # Dados primeiro, índice depois: um id nunca aponta para um registro incompleto
+            with open(self.dados_path, "ab") as f:
+                inicio = f.seek(0, os.SEEK_END)
+                for chave in pendentes:
+                    registro = self._comprimir(novos[chave])
+                    f.write(registro)
+                    linhas.append((chave, inicio, len(registro), len(novos[chave].encode("utf-8")), hashes[chave]))
+                    inicio += len(registro)
+            self._conn.executemany("INSERT OR REPLACE INTO registros VALUES (?, ?, ?, ?, ?)", linhas)
+            self._conn.commit()
+            for chave in pendentes:
+                self._cache.pop(chave, None)
+        return len(pendentes)
+
+    def obter(self, ids: Iterable[Any], max_chars: Optional[int] = None) -> Dict[str, str]:
+        """{id: texto} dos ids presentes (ids ausentes ficam de fora)
+
+        Com max_chars, devolve só o início de cada texto, descomprimindo apenas o
+        necessário para produzi-lo.
+        """
+        chaves = list(dict.fromkeys(str(i) for i in ids))
+        if not chaves:
+            return {}
+        resultado: Dict[str, str] = {}
+        with self._trava(exclusiva=False):
+            registros = self._registros(chaves)
+            if not registros:
+                return {}
+            mapa = self._mapear(max(inicio + tamanho for inicio, tamanho, _, _ in registros.values()))
+            for chave, (inicio, tamanho, tamanho_original, hash_texto) in registros.items():
+                em_cache = self._cache.get(chave)
+                if em_cache is not None and em_cache[0] == hash_texto:
+                    self._cache.move_to_end(chave)
+                    self.acertos += 1
+                    texto = em_cache[1]
+                    resultado[chave] = texto if max_chars is None else texto[:max_chars]
+                    continue
+                self.falhas += 1
+                registro = mapa[inicio:inicio + tamanho]
+                # Um caractere UTF-8 tem no máximo 4 bytes
+                parcial = max_chars is not None and max_chars * 4 < tamanho_original
+                dados = self._descomprimir(registro, max_chars * 4 if parcial else None)
+                if parcial:
+                    resultado[chave] = dados.decode("utf-8", errors="ignore")[:max_chars]
+                else:
+                    texto = dados.decode("utf-8")
+                    self._lembrar(chave, (hash_texto, texto))
+                    resultado[chave] = texto if max_chars is None else texto[:max_chars]
+        return resultado
+
+    def remover(self, ids: Iterable[Any]) -> int:
+        """Remove ids do índice (o espaço no arquivo é recuperado por compactar())"""
+        chaves = [str(i) for i in ids]
+        if not chaves:
+            return 0
+        removidos = 0
+        with self._trava(exclusiva=True):
+            for i in range(0, len(chaves), _LOTE_SQL):
+                parte = chaves[i:i + _LOTE_SQL]
+                removidos += self._conn.execute(
+                    f"DELETE FROM registros WHERE id IN ({','.join('?' * len(parte))})", parte
+                ).rowcount
+            self._conn.commit()
+            for chave in chaves:
+                self._cache.pop(chave, None)
+        return removidos
+
+    def compactar(self) -> Dict[str, int]:
+        """Reescreve o arquivo só com os registros vivos; retorna os bytes antes e depois"""
+        with self._trava(exclusiva=True):
+            antes = self.dados_path.stat().st_size
+            temporario = self.dados_path.with_suffix(".compactando")
+            linhas = self._conn.execute("SELECT id, inicio, tamanho FROM registros ORDER BY inicio").fetchall()
+            novos_inicios = []
+            with open(self.dados_path, "rb") as origem, open(temporario, "wb") as destino:
+                posicao = 0
+                for chave, inicio, tamanho in linhas:
+                    origem.seek(inicio)
+                    destino.write(origem.read(tamanho))
+                    novos_inicios.append((posicao, chave))
+                    posicao += tamanho
+            self._desmapear()
+            os.replace(temporario, self.dados_path)
+            self._conn.executemany("UPDATE registros SET inicio = ? WHERE id = ?", novos_inicios)
+            self._conn.execute("UPDATE meta SET valor = valor + 1 WHERE nome = 'geracao'")
+            self._conn.commit()
+            depois = self.dados_path.stat().st_size
+        logger.info(f"🗜️ Content store de '{self.colecao}' compactado: {antes} -> {depois} bytes")
+        return {"bytes_antes": antes, "bytes_depois": depois}
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Registros, taxa de compressão, espaço recuperável e acertos do LRU deste processo"""
+        with self._trava(exclusiva=False):
+            registros, comprimidos, originais = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0), COALESCE(SUM(tamanho_original), 0) FROM registros"
+            ).fetchone()
+            arquivo = self.dados_path.stat().st_size
+        consultas = self.acertos + self.falhas
+        return {
+            "colecao": self.colecao,
+            "arquivo": str(self.dados_path),
+            "codec": "zstd" if self.codec == _ZSTD else "zlib",
+            "registros": registros,
+            "bytes_originais": originais,
+            "bytes_comprimidos": comprimidos,
+            "taxa_compressao": round(originais / comprimidos, 2) if comprimidos else 0.0,
+            "bytes_arquivo": arquivo,
+            "bytes_recuperaveis": arquivo - comprimidos,
+            "cache_entradas": len(self._cache),
+            "cache_capacidade": self.max_cache,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0
+        }
+
+    def limpar(self):
+        """Remove todos os textos e esvazia o arquivo de dados"""
+        with self._trava(exclusiva=True):
+            self._desmapear()
+            self._conn.execute("DELETE FROM registros")
+            self._conn.execute("UPDATE meta SET valor = valor + 1 WHERE nome = 'geracao'")
+            self._conn.commit()
+            with open(self.dados_path, "wb"):
+                pass
+            self._cache.clear()
+        self.acertos = 0
+        self.falhas = 0
+
+    def fechar(self):
+        """Libera o mmap, a conexão SQLite e o descritor do lock"""
+        with self._lock:
+            self._desmapear()
+            self._conn.close()
+            os.close(self._lock_fd)
+
+
+_stores: Dict[str, ContentStore] = {}
+_stores_lock = threading.Lock()
+
+
+def obter_content_store(colecao: str, criar: bool = True) -> Optional[ContentStore]:
+    """ContentStore da coleção em CONTENT_STORE_DIR (um por processo)
+
+    Com criar=False retorna None se a coleção nunca teve textos externalizados.
+    """
+    with _stores_lock:
+        store = _stores.get(colecao)
+        if store is None:
+            diretorio = os.getenv("CONTENT_STORE_DIR", "./data/content_store")
+            nome = re.sub(r"[^A-Za-z0-9_.-]+", "_", colecao).strip("_") or "colecao"
+            if not criar and not (Path(diretorio) / f"{nome}.sqlite").exists():
+                return None
+            store = _stores[colecao] = ContentStore(diretorio, colecao)
+        return store
+
+
+def conteudo_externalizado(colecao: str) -> bool:
+    """Se os chunks da coleção podem estar sem "content" no payload (filtros de texto não os acham)"""
+    return content_store_habilitado() or obter_content_store(colecao, criar=False) is not None
+
+
+def remover_content_store(colecao: str):
+    """Apaga os textos externalizados de uma coleção removida do Qdrant"""
+    store = obter_content_store(colecao, criar=False)
+    if store is None:
+        return
+    store.limpar()
+    logger.info(f"🗑️ Content store de '{colecao}' esvaziado")
+
+
+def remover_conteudo(colecao: str, ids: Iterable[Any]) -> int:
+    """Apaga do content store o texto de pontos removidos do Qdrant (compactar() recupera o espaço)"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    store = obter_content_store(colecao, criar=False)
+    return store.remover(ids) if store is not None else 0
+
+
+def externalizar_payloads(colecao: str, pontos: Sequence[Any]) -> int:
+    """Move o texto dos pontos para o content store antes do upsert (se habilitado)
+
+    Os payloads perdem "content"/"doc_metadata" e ganham "conteudo_externo": True.
+    Se o armazenamento falhar, os pontos seguem com o texto no payload.
+    """
+    if not content_store_habilitado() or not pontos:
+        return 0
+    textos = {p.id: p.payload["content"] for p in pontos if p.payload and "content" in p.payload}
+    if not textos:
+        return 0
+    try:
+        obter_content_store(colecao).guardar(textos)
+    except Exception as e:
+        logger.warning(f"⚠️ Content store indisponível, texto mantido no payload: {e}")
+        return 0
+    for ponto in pontos:
+        if ponto.payload and "content" in ponto.payload:
+            for campo in CAMPOS_EXTERNOS:
+                ponto.payload.pop(campo, None)
+            ponto.payload["conteudo_externo"] = True
+    return len(textos)
+
+
+def preencher_conteudo(colecao: str, pontos: Sequence[Any], max_chars: Optional[int] = None) -> int:
+    """Coloca em payload["content"] o texto dos pontos externalizados (só o início com max_chars)"""
+    pendentes = [
+        p for p in pontos
+        if p.payload and p.payload.get("conteudo_externo") and "content" not in p.payload
+    ]
+    if not pendentes:
+        return 0
+    store = obter_content_store(colecao, criar=False)
+    textos = store.obter([p.id for p in pendentes], max_chars=max_chars) if store is not None else {}
+    if len(textos) < len(pendentes):
+        logger.warning(f"⚠️ {len(pendentes) - len(textos)} chunks de '{colecao}' sem texto no content store")
+    for ponto in pendentes:
+        ponto.payload["content"] = textos.get(str(ponto.id), "")
+    return len(textos)
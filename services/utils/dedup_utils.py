@@ -0,0 +1,429 @@
+"""
+Utilitários de deduplicação aproximada de chunks (MinHash + LSH)
+
+Artigos da Wikipedia repetem muito texto: navboxes, listas "Ver também", esboços
+de referências e introduções quase idênticas de páginas parecidas. Cada chunk
+recebe uma assinatura MinHash das suas shingles (sequências de palavras); um
+índice LSH por bandas encontra, sem comparar com todos os chunks, os candidatos
+cuja similaridade de Jaccard estimada passa do limiar. O chunk repetido é
+suprimido antes do embedding (ou mesclado ao original, que guarda a origem da
+duplicata no payload).
+
+O índice é mantido em memória, por coleção, e alimentado em fluxo durante a
+ingestão: o primeiro chunk visto de cada grupo de quase-duplicatas é o que fica.
+
+Os chunks suprimidos ficam registrados em disco (RegistroSupressoes, SQLite em
+DEDUP_DIR), com o original de que são cópia e o payload completo. Quando o
+original é regravado ou removido, restaurar_suprimidos verifica cada um de novo
+e devolve à coleção os que deixaram de ser duplicatas, mesmo depois de reiniciar
+o processo. O registro também responde o total_chunks de um chunk suprimido,
+que remover_chunks_excedentes consulta quando o ponto não está no Qdrant.
+"""
+
+import os
+import re
+import json
+import zlib
+import sqlite3
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from qdrant_client.http import models
+except ImportError:
+    models = None
+
+from .qdrant_writer import preparar_pontos
+
+logger = logging.getLogger(__name__)
+
+MODOS_DEDUP = ("desligado", "pular", "mesclar")
+
+# Maior primo abaixo de 2^32: as assinaturas cabem em uint32
+_PRIMO = np.uint64(4294967291)
+_PALAVRA = re.compile(r"\w+")
+# Limite de origens guardadas no payload de um chunk mesclado
+MAX_DUPLICATAS_PAYLOAD = 50
+# Limite de parâmetros por consulta SQLite
+_LOTE_SQL = 500
+
+
+def _parametros_lsh(limiar: float, num_perm: int) -> Tuple[int, int]:
+    """Bandas e linhas por banda cuja curva 1-(1-s^r)^b melhor separa o limiar
+
+    Falsos negativos (duplicatas não encontradas) pesam bem mais que falsos
+    positivos, que custam só uma comparação das assinaturas completas.
+    """
+    s = np.linspace(0.0, 1.0, 101)
+    abaixo, acima = s < limiar, s >= limiar
+    melhor, melhor_erro = (1, num_perm), float("inf")
+    for linhas in range(1, num_perm + 1):
+        bandas = num_perm // linhas
+        p = 1.0 - (1.0 - s ** linhas) ** bandas
+        erro = 0.05 * p[abaixo].mean() * limiar + 0.95 * (1.0 - p[acima]).mean() * (1.0 - limiar)
+        if erro < melhor_erro:
+            melhor, melhor_erro = (bandas, linhas), erro
+    return melhor
+
+
+class MinHasher:
+    """Assinaturas MinHash de textos a partir de shingles de palavras"""
+
+    def __init__(self, num_perm: int = 64, shingle: int = 5, semente: int = 1):
+        self.num_perm = num_perm
+        self.shingle = shingle
+        gerador = np.random.RandomState(semente)
+        # a < 2^31 e x < 2^32: a*x + b não estoura 64 bits
+        self._a = gerador.randint(1, 2 ** 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = gerador.randint(0, 2 ** 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def shingles(self, texto: str) -> List[str]:
+        """Sequências de `shingle` palavras (minúsculas) do texto"""
+        palavras = _PALAVRA.findall(texto.lower())
+        if len(palavras) <= self.shingle:
+            return [" ".join(palavras)] if palavras else []
+        return [" ".join(palavras[i:i + self.shingle]) for i in range(len(palavras) - self.shingle + 1)]
+
+    def assinatura(self, texto: str) -> np.ndarray:
+        """Vetor uint32 de num_perm mínimos das permutações dos hashes das shingles"""
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in set(self.shingles(texto))), dtype=np.uint64
+        )
+        if hashes.size == 0:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        hashes %= _PRIMO
+        permutados = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIMO
+        return permutados.min(axis=1).astype(np.uint32)
+
+    @staticmethod
+    def similaridade(a: np.ndarray, b: np.ndarray) -> float:
+        """Similaridade de Jaccard estimada por duas assinaturas"""
+        return float(np.mean(a == b))
+
+
+class DeduplicadorLSH:
+    """Índice LSH em fluxo: detecta chunks quase duplicados de chunks já indexados
+
+    Cada chunk é identificado por uma chave estável (o ID do ponto no Qdrant);
+    reingerir o mesmo chunk substitui a entrada dele em vez de se considerar
+    duplicata de si mesmo.
+    """
+
+    def __init__(self, limiar: Optional[float] = None, num_perm: Optional[int] = None,
+                 shingle: Optional[int] = None, modo: Optional[str] = None, max_registros: int = 1000):
+        self.limiar = float(limiar if limiar is not None else os.getenv("DEDUP_THRESHOLD", "0.9"))
+        self.modo = modo or os.getenv("DEDUP_MODE", "desligado")
+        if self.modo not in MODOS_DEDUP:
+            raise ValueError(f"Modo de deduplicação inválido: {self.modo}")
+        self.hasher = MinHasher(
+            num_perm=int(num_perm or os.getenv("DEDUP_NUM_PERM", "64")),
+            shingle=int(shingle or os.getenv("DEDUP_SHINGLE", "5"))
+        )
+        self.bandas, self.linhas = _parametros_lsh(self.limiar, self.hasher.num_perm)
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bandas)]
+        self._assinaturas: Dict[str, np.ndarray] = {}
+        self._rotulos: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        self.verificados = 0
+        self.total_suprimidos = 0
+        # Últimas supressões (para inspeção pela API)
+        self.suprimidos: "deque[Dict[str, Any]]" = deque(maxlen=max_registros)
+        # Modo mesclar: origens das duplicatas por chave do chunk mantido, ainda não gravadas
+        self._mesclas: Dict[str, List[Dict[str, Any]]] = {}
+
+    @property
+    def ativo(self) -> bool:
+        return self.modo != "desligado"
+
+    def _chaves_bandas(self, assinatura: np.ndarray) -> List[bytes]:
+        r = self.linhas
+        return [assinatura[i * r:(i + 1) * r].tobytes() for i in range(self.bandas)]
+
+    def _remover(self, chave: str):
+        assinatura = self._assinaturas.pop(chave, None)
+        self._rotulos.pop(chave, None)
+        if assinatura is None:
+            return
+        for bucket, chave_banda in zip(self._buckets, self._chaves_bandas(assinatura)):
+            membros = bucket.get(chave_banda)
+            if membros and chave in membros:
+                membros.remove(chave)
+                if not membros:
+                    del bucket[chave_banda]
+
+    def verificar(self, chave: str, texto: str, rotulo: Optional[str] = None,
+                  origem: Optional[Dict[str, Any]] = None) -> Optional[Tuple[str, float]]:
+        """Indexa o chunk ou, se for quase duplicata de outro, retorna (chave_original, similaridade)
+
+        Duplicatas não entram no índice; no modo mesclar, `origem` (título, url,
+        chunk_index...) é acumulada para o chunk original.
+        """
+        assinatura = self.hasher.assinatura(texto)
+        chaves_bandas = self._chaves_bandas(assinatura)
+        with self._lock:
+            self.verificados += 1
+            candidatos = set()
+            for bucket, chave_banda in zip(self._buckets, chaves_bandas):
+                candidatos.update(bucket.get(chave_banda, ()))
+            candidatos.discard(chave)
+
+            melhor, melhor_sim = None, 0.0
+            for candidato in candidatos:
+                sim = MinHasher.similaridade(assinatura, self._assinaturas[candidato])
+                if sim > melhor_sim:
+                    melhor, melhor_sim = candidato, sim
+
+            if melhor is not None and melhor_sim >= self.limiar:
+                # Antes duplicata de outro: a versão antiga deste chunk sai do índice
+                self._remover(chave)
+                self.total_suprimidos += 1
+                self.suprimidos.append({
+                    "id": chave,
+                    "rotulo": rotulo,
+                    "duplicado_de": melhor,
+                    "rotulo_original": self._rotulos.get(melhor),
+                    "similaridade": round(melhor_sim, 3)
+                })
+                if self.modo == "mesclar" and origem is not None:
+                    self._mesclas.setdefault(melhor, []).append(dict(origem, similaridade=round(melhor_sim, 3)))
+                return melhor, melhor_sim
+
+            self._remover(chave)
+            self._assinaturas[chave] = assinatura
+            if rotulo:
+                self._rotulos[chave] = rotulo
+            for bucket, chave_banda in zip(self._buckets, chaves_bandas):
+                bucket.setdefault(chave_banda, []).append(chave)
+            return None
+
+    def remover(self, chaves: Sequence[str]):
+        """Tira chunks do índice (p.ex. quando a ingestão que os indexou falhou)"""
+        with self._lock:
+            for chave in chaves:
+                self._remover(chave)
+
+    def limpar(self):
+        """Esvazia o índice e os registros"""
+        with self._lock:
+            self._buckets = [{} for _ in range(self.bandas)]
+            self._assinaturas.clear()
+            self._rotulos.clear()
+            self._mesclas.clear()
+            self.suprimidos.clear()
+            self.verificados = 0
+            self.total_suprimidos = 0
+
+    def retirar_mesclas(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Origens acumuladas no modo mesclar desde a última chamada"""
+        with self._lock:
+            mesclas, self._mesclas = self._mesclas, {}
+        return mesclas
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "modo": self.modo,
+                "limiar": self.limiar,
+                "num_perm": self.hasher.num_perm,
+                "shingle": self.hasher.shingle,
+                "bandas": self.bandas,
+                "linhas_por_banda": self.linhas,
+                "chunks_indexados": len(self._assinaturas),
+                "chunks_verificados": self.verificados,
+                "chunks_suprimidos": self.total_suprimidos,
+                "percentual_suprimido": round(100.0 * self.total_suprimidos / self.verificados, 1) if self.verificados else 0.0,
+                "memoria_assinaturas_bytes": len(self._assinaturas) * self.hasher.num_perm * 4
+            }
+
+
+def gravar_duplicatas(client: Any, colecao: str, mesclas: Dict[str, List[Dict[str, Any]]]) -> int:
+    """Modo mesclar: anexa as origens das duplicatas ao payload "duplicatas" dos chunks mantidos"""
+    if not mesclas:
+        return 0
+    existentes = {
+        str(p.id): p for p in client.retrieve(
+            collection_name=colecao, ids=list(mesclas), with_payload=["duplicatas"], with_vectors=False
+        )
+    }
+    gravados = 0
+    for chave, origens in mesclas.items():
+        ponto = existentes.get(str(chave))
+        if ponto is None:
+            continue
+        anteriores = (ponto.payload or {}).get("duplicatas") or []
+        client.set_payload(
+            collection_name=colecao,
+            payload={"duplicatas": (anteriores + origens)[-MAX_DUPLICATAS_PAYLOAD:]},
+            points=[chave]
+        )
+        gravados += 1
+    return gravados
+
+
+class RegistroSupressoes:
+    """Chunks suprimidos de uma coleção: id -> (id do original, payload), em SQLite
+
+    O payload (com o texto) é guardado comprimido para que o chunk possa ser
+    embedado e gravado de novo se o original mudar ou sumir.
+    """
+
+    def __init__(self, caminho: Any):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.caminho), timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS suprimidos ("
+                "id TEXT PRIMARY KEY, original TEXT NOT NULL, total_chunks INTEGER NOT NULL, payload BLOB NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS suprimidos_original ON suprimidos (original)")
+            self._conn.commit()
+
+    def _consultar(self, sql: str, valores: Sequence[str]) -> List[tuple]:
+        linhas = []
+        for i in range(0, len(valores), _LOTE_SQL):
+            parte = list(valores[i:i + _LOTE_SQL])
+            linhas.extend(self._conn.execute(sql.format(",".join("?" * len(parte))), parte).fetchall())
+        return linhas
+
+    def registrar(self, suprimidos: Dict[str, Tuple[str, Dict[str, Any]]]):
+        """Grava (ou atualiza o original de) chunks suprimidos"""
+        if not suprimidos:
+            return
+        linhas = [
+            (str(chave), str(original), int(payload.get("total_chunks", 1)),
+             zlib.compress(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")))
+            for chave, (original, payload) in suprimidos.items()
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO suprimidos VALUES (?, ?, ?, ?)", linhas)
+            self._conn.commit()
+
+    def esquecer(self, chaves: Iterable[Any]) -> int:
+        """Tira chunks do registro (gravados na coleção ou além do fim do artigo)"""
+        chaves = [str(c) for c in chaves]
+        if not chaves:
+            return 0
+        removidos = 0
+        with self._lock:
+            for i in range(0, len(chaves), _LOTE_SQL):
+                parte = chaves[i:i + _LOTE_SQL]
+                removidos += self._conn.execute(
+                    f"DELETE FROM suprimidos WHERE id IN ({','.join('?' * len(parte))})", parte
+                ).rowcount
+            self._conn.commit()
+        return removidos
+
+    def dependentes(self, originais: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """Payloads dos chunks suprimidos como duplicatas de `originais`"""
+        originais = list({str(o) for o in originais})
+        with self._lock:
+            linhas = self._consultar("SELECT id, payload FROM suprimidos WHERE original IN ({})", originais)
+        return {chave: json.loads(zlib.decompress(payload)) for chave, payload in linhas}
+
+    def totais(self, chaves: Iterable[Any]) -> Dict[str, int]:
+        """total_chunks registrado de cada chunk suprimido entre `chaves`"""
+        with self._lock:
+            return dict(self._consultar("SELECT id, total_chunks FROM suprimidos WHERE id IN ({})", [str(c) for c in chaves]))
+
+    def contar(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM suprimidos").fetchone()[0]
+
+    def limpar(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM suprimidos")
+            self._conn.commit()
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
+
+
+_registros: Dict[str, RegistroSupressoes] = {}
+_registros_lock = threading.Lock()
+
+
+def obter_registro_supressoes(colecao: str, criar: bool = True) -> Optional[RegistroSupressoes]:
+    """RegistroSupressoes da coleção em DEDUP_DIR (um por processo)
+
+    Com criar=False retorna None se a coleção nunca teve chunks suprimidos.
+    """
+    with _registros_lock:
+        registro = _registros.get(colecao)
+        if registro is None:
+            nome = re.sub(r"[^A-Za-z0-9_.-]+", "_", colecao).strip("_") or "colecao"
+            caminho = Path(os.getenv("DEDUP_DIR", "./data/dedup")) / f"{nome}.sqlite"
+            if not criar and not caminho.exists():
+                return None
+            registro = _registros[colecao] = RegistroSupressoes(caminho)
+        return registro
+
+
+def remover_registro_supressoes(colecao: str):
+    """Esquece os chunks suprimidos de uma coleção removida do Qdrant"""
+    registro = obter_registro_supressoes(colecao, criar=False)
+    if registro is not None:
+        registro.limpar()
+
+
+def restaurar_suprimidos(client: Any, colecao: str, originais: Iterable[Any],
+                         codificar: Callable[[List[str]], Sequence[Any]],
+                         deduplicador: Optional[DeduplicadorLSH] = None, exceto: Iterable[Any] = ()) -> int:
+    """Devolve à coleção os chunks suprimidos cujo original foi regravado ou removido
+
+    Com o deduplicador ativo, cada chunk é verificado de novo: se ainda for quase
+    duplicata (do original atual ou de outro chunk), continua suprimido com o
+    novo original. Os demais são embedados por `codificar` e gravados.
+    `exceto` são chunks recém-suprimidos, já verificados nesta ingestão.
+    Retorna quantos chunks voltaram à coleção.
+    """
+    registro = obter_registro_supressoes(colecao, criar=False)
+    if registro is None:
+        return 0
+    exceto = {str(chave) for chave in exceto}
+    dependentes = {chave: payload for chave, payload in registro.dependentes(originais).items() if chave not in exceto}
+    if not dependentes:
+        return 0
+    # Chunk regravado na coleção por outro caminho de ingestão: não está mais suprimido
+    existentes = {str(p.id) for p in client.retrieve(
+        collection_name=colecao, ids=list(dependentes), with_payload=False, with_vectors=False
+    )}
+    if existentes:
+        registro.esquecer(existentes)
+        dependentes = {chave: payload for chave, payload in dependentes.items() if chave not in existentes}
+
+    ainda_suprimidos = {}
+    restaurar = []
+    for chave, payload in dependentes.items():
+        duplicata = None
+        if deduplicador is not None and deduplicador.ativo:
+            duplicata = deduplicador.verificar(
+                chave, payload.get("content", ""), rotulo=f"{payload.get('title')}#{payload.get('chunk_index', 0)}"
+            )
+        if duplicata is not None:
+            ainda_suprimidos[chave] = (duplicata[0], payload)
+        else:
+            restaurar.append((chave, payload))
+    registro.registrar(ainda_suprimidos)
+    if not restaurar:
+        return 0
+
+    vetores = codificar([payload.get("content", "") for _, payload in restaurar])
+    pontos = [
+        models.PointStruct(id=chave, vector=list(map(float, vetor)), payload=payload)
+        for (chave, payload), vetor in zip(restaurar, vetores)
+    ]
+    preparar_pontos(client, colecao, pontos)
+    client.upsert(collection_name=colecao, points=pontos)
+    registro.esquecer([chave for chave, _ in restaurar])
+    logger.info(f"🧬 {len(pontos)} chunks antes suprimidos como duplicatas restaurados em '{colecao}'")
+    return len(pontos)
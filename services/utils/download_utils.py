@@ -0,0 +1,367 @@
+"""
+Download de dumps em segmentos paralelos, retomável e com checksum em streaming
+
+O arquivo é dividido em segmentos baixados ao mesmo tempo por requisições HTTP
+Range, cada uma escrevendo na sua região de `<destino>.part`. O progresso de cada
+segmento é salvo em `<destino>.part.json`: uma falha ou um cancelamento deixa o
+arquivo parcial e o estado no disco, e a próxima chamada continua de onde parou.
+Servidores sem suporte a Range caem para uma única conexão.
+
+O SHA-1/MD5 publicado no dumpstatus.json é calculado durante o download: uma
+thread lê o prefixo contíguo já gravado (ainda no cache de páginas) enquanto os
+segmentos seguintes chegam. Com o hash conferido, o .part vira o arquivo final.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "WikipediaOfflineRAG/2.0 (Educational project; Python/requests) Contact: github.com/ekotuja-AI"
+
+
+class DownloadCancelado(Exception):
+    """Download interrompido a pedido; o arquivo parcial é mantido para retomar"""
+
+
+class ErroChecksum(ValueError):
+    """O arquivo baixado não confere com o hash publicado"""
+
+
+def checksums_dumpstatus(url: str, session: Optional[requests.Session] = None,
+                         timeout: float = 30) -> Optional[Dict[str, Any]]:
+    """{"sha1", "md5", "size"} do arquivo segundo o dumpstatus.json do mesmo diretório
+
+    Retorna None se o dumpstatus.json não existir ou não listar o arquivo.
+    """
+    base, nome = url.rsplit("/", 1)
+    try:
+        resposta = (session or requests).get(f"{base}/dumpstatus.json", timeout=timeout, headers={"User-Agent": USER_AGENT})
+        resposta.raise_for_status()
+        jobs = resposta.json().get("jobs", {})
+    except Exception as e:
+        logger.warning(f"⚠️ dumpstatus.json indisponível para {nome}: {e}")
+        return None
+    for job in jobs.values():
+        info = (job.get("files") or {}).get(nome)
+        if info:
+            return {chave: info[chave] for chave in ("sha1", "md5", "size") if chave in info}
+    return None
+
+
+class DownloadSegmentado:
+    """Baixa uma URL para `destino` com segmentos Range paralelos, retomada e checksum"""
+
+    def __init__(
+        self,
+        url: str,
+        destino: Any,
+        segmentos: Optional[int] = None,
+        buffer_bytes: Optional[int] = None,
+        checksum: Optional[Tuple[str, str]] = None,
+        progresso: Optional[Callable[[int, Optional[int]], None]] = None,
+        session: Optional[requests.Session] = None,
+        timeout: float = 60,
+        tentativas: int = 5
+    ):
+        self.url = url
+        self.destino = Path(destino)
+        self.parcial = self.destino.with_name(self.destino.name + ".part")
+        self.estado_path = self.destino.with_name(self.destino.name + ".part.json")
+        self.num_segmentos = max(1, int(segmentos or os.getenv("DOWNLOAD_SEGMENTS", "4")))
+        self.buffer_bytes = int(buffer_bytes or os.getenv("DOWNLOAD_BUFFER_BYTES", str(4 * 1024 * 1024)))
+        # ("sha1" | "md5", hex esperado); None = sem verificação
+        self.checksum = checksum
+        self.progresso = progresso
+        self.session = session or requests.Session()
+        self.session.headers.setdefault("User-Agent", USER_AGENT)
+        self.timeout = timeout
+        self.tentativas = tentativas
+
+        self.total: Optional[int] = None
+        self.segmentos: List[Dict[str, int]] = []  # [{"inicio", "fim" (exclusivo), "baixado"}]
+        self.retomado_de = 0
+        self._aceita_range = False
+        self._lock = threading.Lock()
+        self._lock_estado = threading.Lock()
+        self._novos_dados = threading.Condition(self._lock)
+        self._cancelado = threading.Event()
+        self._concluido = threading.Event()
+        self._ultimo_salvo = 0.0
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+    def cancelar(self):
+        self._cancelado.set()
+        with self._novos_dados:
+            self._novos_dados.notify_all()
+
+    @property
+    def baixados(self) -> int:
+        return sum(s["baixado"] for s in self.segmentos)
+
+    def executar(self) -> Dict[str, Any]:
+        """Baixa (ou retoma) o arquivo; retorna tamanho, tempo, vazão e hash conferido"""
+        inicio = time.time()
+        self.total, aceita_range = self._sondar()
+        # Range sem tamanho conhecido não permite dividir o arquivo
+        self._aceita_range = aceita_range and bool(self.total)
+        self._preparar(self._aceita_range)
+        self.retomado_de = self.baixados
+        if self.retomado_de:
+            logger.info(f"⏯️ Retomando {self.destino.name} de {self.retomado_de / 2 ** 20:.1f} MB")
+        logger.info(
+            f"📥 Baixando {self.destino.name} ({(self.total or 0) / 2 ** 20:.1f} MB) "
+            f"em {len(self.segmentos)} segmento(s)"
+        )
+
+        hasher_thread = None
+        resultado_hash: Dict[str, str] = {}
+        if self.checksum:
+            hasher_thread = threading.Thread(
+                target=self._calcular_hash, args=(resultado_hash,), name="download-hash", daemon=True
+            )
+            hasher_thread.start()
+
+        pool = ThreadPoolExecutor(max_workers=len(self.segmentos), thread_name_prefix="download")
+        try:
+            futuros = [pool.submit(self._baixar_segmento, s) for s in self.segmentos]
+            feitos, _ = wait(futuros, return_when=FIRST_EXCEPTION)
+            erros = [f.exception() for f in feitos if f.exception() is not None]
+            if erros:
+                # Um segmento desistiu: os demais param e o estado fica salvo para retomar
+                self.cancelar()
+        finally:
+            pool.shutdown(wait=True)
+            self._concluido.set()
+            with self._novos_dados:
+                self._novos_dados.notify_all()
+        if self._cancelado.is_set():
+            self._salvar_estado(forcar=True)
+            if hasher_thread is not None:
+                hasher_thread.join()
+            falhas = [e for e in erros if not isinstance(e, DownloadCancelado)]
+            if falhas:
+                raise falhas[0]
+            raise DownloadCancelado(f"Download de {self.destino.name} cancelado em {self.baixados} bytes")
+
+        if hasher_thread is not None:
+            hasher_thread.join()
+            algoritmo, esperado = self.checksum
+            if resultado_hash.get(algoritmo) != esperado.lower():
+                # Conteúdo corrompido: a retomada não pode reaproveitá-lo
+                self.parcial.unlink(missing_ok=True)
+                self.estado_path.unlink(missing_ok=True)
+                raise ErroChecksum(
+                    f"{algoritmo} de {self.destino.name} não confere: {resultado_hash.get(algoritmo)} != {esperado}"
+                )
+
+        os.replace(self.parcial, self.destino)
+        self.estado_path.unlink(missing_ok=True)
+        decorrido = time.time() - inicio
+        tamanho = self.destino.stat().st_size
+        logger.info(f"✅ Download concluído: {self.destino.name} ({tamanho / 2 ** 20:.1f} MB em {decorrido:.1f}s)")
+        return {
+            "arquivo": str(self.destino),
+            "bytes": tamanho,
+            "segmentos": len(self.segmentos),
+            "retomado_de_bytes": self.retomado_de,
+            "tempo_s": round(decorrido, 2),
+            "mb_por_segundo": round((tamanho - self.retomado_de) / 2 ** 20 / decorrido, 2) if decorrido > 0 else 0.0,
+            "checksum": {self.checksum[0]: self.checksum[1].lower(), "verificado": True} if self.checksum else None
+        }
+
+    # ------------------------------------------------------------------
+    # Preparação
+    # ------------------------------------------------------------------
+    def _sondar(self) -> Tuple[Optional[int], bool]:
+        """Tamanho do arquivo e suporte a Range (GET bytes=0-0, pois nem todo servidor aceita HEAD)"""
+        with self.session.get(self.url, headers={"Range": "bytes=0-0"}, stream=True, timeout=self.timeout) as resposta:
+            resposta.raise_for_status()
+            if resposta.status_code == 206:
+                intervalo = resposta.headers.get("Content-Range", "")
+                total = intervalo.rsplit("/", 1)[-1]
+                return (int(total) if total.isdigit() else None), True
+            tamanho = resposta.headers.get("Content-Length")
+            return (int(tamanho) if tamanho and tamanho.isdigit() else None), False
+
+    def _preparar(self, aceita_range: bool):
+        """Carrega o estado de um download anterior compatível ou divide o arquivo em segmentos"""
+        estado = None
+        if self.estado_path.exists() and self.parcial.exists():
+            try:
+                estado = json.loads(self.estado_path.read_text(encoding="utf-8"))
+            except Exception:
+                estado = None
+        if (estado and aceita_range and estado.get("url") == self.url and estado.get("total") == self.total
+                and self.parcial.stat().st_size == self.total):
+            self.segmentos = estado["segmentos"]
+            return
+
+        if not aceita_range:
+            # Sem Range: uma única conexão, sempre do início
+            self.segmentos = [{"inicio": 0, "fim": self.total or -1, "baixado": 0}]
+            with open(self.parcial, "wb"):
+                pass
+        else:
+            tamanho = -(-self.total // self.num_segmentos)
+            self.segmentos = [
+                {"inicio": i, "fim": min(i + tamanho, self.total), "baixado": 0}
+                for i in range(0, self.total, tamanho)
+            ]
+            with open(self.parcial, "wb") as f:
+                f.truncate(self.total)
+        self._salvar_estado(forcar=True)
+
+    def _salvar_estado(self, forcar: bool = False):
+        """Grava o progresso dos segmentos (no máximo uma vez por segundo, salvo forcar)"""
+        with self._lock_estado:
+            agora = time.time()
+            if not forcar and agora - self._ultimo_salvo < 1.0:
+                return
+            self._ultimo_salvo = agora
+            with self._lock:
+                estado = {"url": self.url, "total": self.total, "segmentos": [dict(s) for s in self.segmentos]}
+            temporario = self.estado_path.with_suffix(".tmp")
+            temporario.write_text(json.dumps(estado), encoding="utf-8")
+            os.replace(temporario, self.estado_path)
+
+    # ------------------------------------------------------------------
+    # Download
+    # ------------------------------------------------------------------
+    def _baixar_segmento(self, segmento: Dict[str, int]):
+        """Baixa um segmento, repetindo com backoff a partir do último byte gravado
+
+        Sem suporte a Range não há como continuar do meio: a falha encerra o
+        download e a próxima chamada recomeça do início.
+        """
+        tentativa = 0
+        while True:
+            posicao = segmento["inicio"] + segmento["baixado"]
+            if segmento["fim"] >= 0 and posicao >= segmento["fim"]:
+                return
+            if self._cancelado.is_set():
+                raise DownloadCancelado()
+            headers = {"Range": f"bytes={posicao}-{segmento['fim'] - 1}"} if self._aceita_range else {}
+            try:
+                with self.session.get(self.url, headers=headers, stream=True, timeout=self.timeout) as resposta:
+                    resposta.raise_for_status()
+                    if "Range" in headers and resposta.status_code != 206:
+                        raise IOError(f"Servidor ignorou o Range ({resposta.status_code})")
+                    with open(self.parcial, "r+b") as f:
+                        f.seek(posicao)
+                        for bloco in resposta.iter_content(chunk_size=self.buffer_bytes):
+                            if self._cancelado.is_set():
+                                raise DownloadCancelado()
+                            if not bloco:
+                                continue
+                            f.write(bloco)
+                            # Flush antes de publicar o progresso: o hash lê o que já está no arquivo
+                            f.flush()
+                            with self._novos_dados:
+                                segmento["baixado"] += len(bloco)
+                                self._novos_dados.notify_all()
+                            self._notificar()
+                posicao = segmento["inicio"] + segmento["baixado"]
+                if segmento["fim"] >= 0 and posicao < segmento["fim"]:
+                    # Corpo terminou antes do tamanho conhecido (conexão cortada ou resposta
+                    # vazia): conta como tentativa; sem Range, o .part truncado não vira o arquivo
+                    raise IOError(f"Resposta terminou em {posicao} de {segmento['fim']} bytes")
+                if not self._aceita_range:
+                    return
+            except DownloadCancelado:
+                raise
+            except Exception as e:
+                tentativa += 1
+                if tentativa >= self.tentativas or not self._aceita_range:
+                    raise
+                espera = min(2 ** tentativa, 30)
+                logger.warning(f"⚠️ Segmento {segmento['inicio']} falhou ({e}); nova tentativa em {espera}s")
+                self._cancelado.wait(espera)
+
+    def _notificar(self):
+        self._salvar_estado()
+        if self.progresso:
+            try:
+                self.progresso(self.baixados, self.total)
+            except Exception as e:
+                logger.debug(f"Callback de progresso falhou: {e}")
+
+    def _prefixo_contiguo(self) -> int:
+        """Bytes do início do arquivo já gravados sem lacunas"""
+        fim = 0
+        for segmento in self.segmentos:
+            fim = segmento["inicio"] + segmento["baixado"]
+            if segmento["fim"] < 0 or fim < segmento["fim"]:
+                break
+        return fim
+
+    def _calcular_hash(self, resultado: Dict[str, str]):
+        """Acompanha o prefixo contíguo gravado e o passa pelo hash"""
+        algoritmo = self.checksum[0]
+        hasher = hashlib.new(algoritmo)
+        lido = 0
+        with open(self.parcial, "rb") as f:
+            while True:
+                with self._novos_dados:
+                    while True:
+                        limite = self._prefixo_contiguo()
+                        concluido = self._concluido.is_set()
+                        if limite > lido or concluido or self._cancelado.is_set():
+                            break
+                        self._novos_dados.wait(timeout=1.0)
+                if self._cancelado.is_set():
+                    return
+                f.seek(lido)
+                while lido < limite:
+                    bloco = f.read(min(self.buffer_bytes, limite - lido))
+                    if not bloco:
+                        break
+                    hasher.update(bloco)
+                    lido += len(bloco)
+                if concluido:
+                    break
+        resultado[algoritmo] = hasher.hexdigest()
+
+
+def baixar_arquivo(url: str, destino: Any, verificar_checksum: bool = True, **kwargs) -> Dict[str, Any]:
+    """Baixa `url` para `destino` (retomando se houver .part); hash do dumpstatus.json se publicado"""
+    if verificar_checksum and "checksum" not in kwargs:
+        publicados = checksums_dumpstatus(url)
+        if publicados:
+            algoritmo = "sha1" if "sha1" in publicados else "md5" if "md5" in publicados else None
+            if algoritmo:
+                kwargs["checksum"] = (algoritmo, publicados[algoritmo])
+    return DownloadSegmentado(url, destino, **kwargs).executar()
+
+
+def estado_downloads(diretorio: Any) -> List[Dict[str, Any]]:
+    """Downloads incompletos em `diretorio`, com o progresso real gravado no .part.json"""
+    downloads = []
+    for estado_path in sorted(Path(diretorio).glob("*.part.json")):
+        try:
+            estado = json.loads(estado_path.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        baixados = sum(s["baixado"] for s in estado.get("segmentos", []))
+        total = estado.get("total")
+        downloads.append({
+            "filename": estado_path.name[:-len(".part.json")],
+            "url": estado.get("url"),
+            "bytes_baixados": baixados,
+            "bytes_total": total,
+            "porcentagem": round(100 * baixados / total, 1) if total else None,
+            "segmentos": len(estado.get("segmentos", [])),
+            "ultima_modificacao": estado_path.stat().st_mtime
+        })
+    return downloads
@@ -0,0 +1,319 @@
+"""
+Cache persistente de embeddings
+
+Os vetores ficam em um arquivo memory-mapped com slots de tamanho fixo e o índice
+(chave -> slot, último acesso) em SQLite no mesmo diretório. A chave é o hash de
+(nome do modelo, texto normalizado), então reingestões, parágrafos repetidos e
+coleções diferentes com o mesmo modelo reaproveitam o mesmo vetor.
+
+Quando o cache enche, as entradas menos usadas recentemente são removidas e seus
+slots reaproveitados. Leituras e escritas são protegidas por um lock de arquivo
+(fcntl), permitindo compartilhar o cache entre workers do uvicorn e scripts CLI.
+
+CacheConsultas é um LRU em memória para os vetores das consultas de busca: é
+consultado a cada requisição, então evita o SQLite e o lock de arquivo.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Windows: apenas proteção entre threads do mesmo processo
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Limite de parâmetros por consulta SQLite
+_LOTE_SQL = 500
+
+
+class EmbeddingCache:
+    """Cache de embeddings em disco (mmap + índice SQLite) com despejo LRU"""
+
+    def __init__(
+        self,
+        cache_dir: Any,
+        modelo: str,
+        dimensao: int,
+        dtype: Optional[str] = None,
+        max_entradas: Optional[int] = None
+    ):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy é necessário para o cache de embeddings")
+
+        self.modelo = modelo
+        self.dimensao = int(dimensao)
+        self.dtype = np.dtype(dtype or os.getenv("EMBEDDING_CACHE_DTYPE", "float32"))
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"dtype não suportado no cache: {self.dtype}")
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        nome = re.sub(r"[^A-Za-z0-9_.-]+", "_", modelo).strip("_") or "modelo"
+        base = f"{nome}-{self.dimensao}d-{self.dtype.name}"
+        self.vetores_path = self.cache_dir / f"{base}.vec"
+        self.indice_path = self.cache_dir / f"{base}.sqlite"
+        self.lock_path = self.cache_dir / f"{base}.lock"
+
+        self.acertos = 0
+        self.falhas = 0
+        self._lock = threading.RLock()
+        self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        self._conn = sqlite3.connect(str(self.indice_path), timeout=30, check_same_thread=False)
+        with self._trava(exclusiva=True):
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entradas ("
+                "chave TEXT PRIMARY KEY, slot INTEGER NOT NULL UNIQUE, ultimo_acesso REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_acesso ON entradas(ultimo_acesso)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (nome TEXT PRIMARY KEY, valor INTEGER NOT NULL)")
+            # A capacidade é fixada por quem cria o cache; os demais processos a respeitam
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta VALUES ('capacidade', ?)",
+                (int(max_entradas or os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000")),)
+            )
+            for nome_meta in ("proximo_slot", "acertos", "falhas", "despejos"):
+                self._conn.execute("INSERT OR IGNORE INTO meta VALUES (?, 0)", (nome_meta,))
+            self._conn.commit()
+            self.max_entradas = self._meta("capacidade")
+
+            tamanho = self.max_entradas * self.dimensao * self.dtype.itemsize
+            if not self.vetores_path.exists() or self.vetores_path.stat().st_size < tamanho:
+                with open(self.vetores_path, "ab") as f:
+                    f.truncate(tamanho)
+        self._vetores = np.memmap(self.vetores_path, dtype=self.dtype, mode="r+", shape=(self.max_entradas, self.dimensao))
+
+        logger.info(f"🗃️ Cache de embeddings: {self.vetores_path.name} ({self.max_entradas} entradas, {self.dtype.name})")
+
+    # ------------------------------------------------------------------
+    # Infraestrutura
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _trava(self, exclusiva: bool):
+        """Lock entre threads (RLock) e entre processos (flock compartilhado/exclusivo)"""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _meta(self, nome: str) -> int:
+        return int(self._conn.execute("SELECT valor FROM meta WHERE nome = ?", (nome,)).fetchone()[0])
+
+    def chave(self, texto: str) -> str:
+        """Chave de cache: hash de (modelo, texto com espaços normalizados)"""
+        normalizado = " ".join(texto.split())
+        return hashlib.sha1(f"{self.modelo}\x1f{normalizado}".encode("utf-8")).hexdigest()
+
+    def _slots(self, chaves: Sequence[str]) -> Dict[str, int]:
+        slots: Dict[str, int] = {}
+        for i in range(0, len(chaves), _LOTE_SQL):
+            parte = chaves[i:i + _LOTE_SQL]
+            marcadores = ",".join("?" * len(parte))
+            for chave, slot in self._conn.execute(
+                f"SELECT chave, slot FROM entradas WHERE chave IN ({marcadores})", parte
+            ):
+                slots[chave] = slot
+        return slots
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+    def obter(self, textos: Sequence[str]) -> List[Optional[List[float]]]:
+        """Vetores em cache para cada texto (None quando ausente)"""
+        if not textos:
+            return []
+        chaves = [self.chave(t) for t in textos]
+        with self._trava(exclusiva=False):
+            slots = self._slots(list(dict.fromkeys(chaves)))
+            resultado = [
+                self._vetores[slots[c]].astype(np.float32).tolist() if c in slots else None
+                for c in chaves
+            ]
+
+        acertos = sum(1 for v in resultado if v is not None)
+        falhas = len(resultado) - acertos
+        with self._trava(exclusiva=True):
+            agora = time.time()
+            self._conn.executemany(
+                "UPDATE entradas SET ultimo_acesso = ? WHERE chave = ?",
+                [(agora, c) for c in slots]
+            )
+            self._conn.execute("UPDATE meta SET valor = valor + ? WHERE nome = 'acertos'", (acertos,))
+            self._conn.execute("UPDATE meta SET valor = valor + ? WHERE nome = 'falhas'", (falhas,))
+            self._conn.commit()
+        self.acertos += acertos
+        self.falhas += falhas
+        return resultado
+
+    def guardar(self, textos: Sequence[str], vetores: Sequence[Sequence[float]]):
+        """Armazena vetores, despejando as entradas menos usadas se o cache estiver cheio"""
+        novos: Dict[str, Sequence[float]] = {}
+        for texto, vetor in zip(textos, vetores):
+            if len(vetor) != self.dimensao:
+                raise ValueError(f"Vetor com dimensão {len(vetor)}, cache espera {self.dimensao}")
+            novos[self.chave(texto)] = vetor
+        if not novos:
+            return
+
+        with self._trava(exclusiva=True):
+            # Outro processo pode ter gravado as mesmas chaves nesse meio tempo
+            for chave in self._slots(list(novos)):
+                novos.pop(chave)
+            if not novos:
+                return
+            novos_itens = list(novos.items())[:self.max_entradas]
+
+            proximo = self._meta("proximo_slot")
+            livres = list(range(proximo, min(proximo + len(novos_itens), self.max_entradas)))
+            faltam = len(novos_itens) - len(livres)
+            if faltam > 0:
+                despejados = self._conn.execute(
+                    "SELECT chave, slot FROM entradas ORDER BY ultimo_acesso LIMIT ?", (faltam,)
+                ).fetchall()
+                self._conn.executemany("DELETE FROM entradas WHERE chave = ?", [(c,) for c, _ in despejados])
+                self._conn.execute("UPDATE meta SET valor = valor + ? WHERE nome = 'despejos'", (len(despejados),))
+                livres += [slot for _, slot in despejados]
+
+            # Vetores primeiro, índice depois: uma chave nunca aponta para um slot incompleto
+            for (_, vetor), slot in zip(novos_itens, livres):
+                self._vetores[slot] = np.asarray(vetor, dtype=self.dtype)
+            self._vetores.flush()
+
+            agora = time.time()
+            self._conn.executemany(
+                "INSERT INTO entradas (chave, slot, ultimo_acesso) VALUES (?, ?, ?)",
+                [(chave, slot, agora) for (chave, _), slot in zip(novos_itens, livres)]
+            )
+            self._conn.execute(
+                "UPDATE meta SET valor = ? WHERE nome = 'proximo_slot'",
+                (max(proximo, min(proximo + len(novos_itens), self.max_entradas)),)
+            )
+            self._conn.commit()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores deste processo e acumulados entre todos os processos"""
+        with self._trava(exclusiva=False):
+            entradas = self._conn.execute("SELECT COUNT(*) FROM entradas").fetchone()[0]
+            acertos_total, falhas_total, despejos = (self._meta(n) for n in ("acertos", "falhas", "despejos"))
+        consultas = self.acertos + self.falhas
+        return {
+            "modelo": self.modelo,
+            "arquivo": str(self.vetores_path),
+            "dtype": self.dtype.name,
+            "entradas": entradas,
+            "capacidade": self.max_entradas,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0,
+            "acertos_total": acertos_total,
+            "falhas_total": falhas_total,
+            "despejos_total": despejos
+        }
+
+    def limpar(self):
+        """Remove todas as entradas (o arquivo de vetores é mantido e reaproveitado)"""
+        with self._trava(exclusiva=True):
+            self._conn.execute("DELETE FROM entradas")
+            self._conn.execute("UPDATE meta SET valor = 0 WHERE nome IN ('proximo_slot', 'acertos', 'falhas', 'despejos')")
+            self._conn.commit()
+        self.acertos = 0
+        self.falhas = 0
+
+    def fechar(self):
+        """Libera o mmap, a conexão SQLite e o descritor do lock"""
+        with self._lock:
+            self._vetores.flush()
+            self._conn.close()
+            os.close(self._lock_fd)
+
+
+def criar_cache_embeddings(modelo: str, dimensao: int) -> Optional[EmbeddingCache]:
+    """Cria o cache conforme ENABLE_EMBEDDING_CACHE/CACHE_DIR (None se desabilitado ou indisponível)"""
+    if os.getenv("ENABLE_EMBEDDING_CACHE", "true").lower() != "true":
+        return None
+    try:
+        return EmbeddingCache(os.getenv("CACHE_DIR", "./cache"), modelo, dimensao)
+    except Exception as e:
+        logger.warning(f"⚠️ Cache de embeddings desabilitado: {e}")
+        return None
+
+
+class CacheConsultas:
+    """LRU em memória dos embeddings de consultas, por (modelo, consulta normalizada)"""
+
+    def __init__(self, max_entradas: Optional[int] = None):
+        self.max_entradas = max(0, int(
+            max_entradas if max_entradas is not None else os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024")
+        ))
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self._entradas: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chave(modelo: str, consulta: str) -> tuple:
+        """NFC e espaços normalizados; maiúsculas mantidas (o modelo distingue caixa)"""
+        return modelo, " ".join(unicodedata.normalize("NFC", consulta).split())
+
+    def obter_ou_calcular(self, modelo: str, consulta: str, calcular) -> List[float]:
+        """Vetor em cache ou `calcular(consulta)` (guardado para as próximas chamadas)"""
+        if self.max_entradas == 0:
+            return list(calcular(consulta))
+        chave = self.chave(modelo, consulta)
+        with self._lock:
+            vetor = self._entradas.get(chave)
+            if vetor is not None:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return list(vetor)
+            self.falhas += 1
+        # Codificação fora do lock: consultas diferentes não esperam umas pelas outras
+        vetor = tuple(calcular(consulta))
+        with self._lock:
+            self._entradas[chave] = vetor
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.despejos += 1
+        return list(vetor)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        consultas = self.acertos + self.falhas
+        return {
+            "entradas": len(self._entradas),
+            "capacidade": self.max_entradas,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0,
+            "despejos": self.despejos
+        }
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.acertos = self.falhas = self.despejos = 0
@@ -0,0 +1,163 @@
+"""
+Utilitários de embedding
+
+Geração de embeddings em lote com agrupamento por comprimento (length bucketing):
+os textos são ordenados pelo número de tokens e agrupados em lotes limitados por um
+orçamento de tokens, reduzindo o padding e o número de chamadas ao modelo. Com um
+EmbeddingCache, textos já vistos não passam pelo modelo.
+"""
+
+import os
+import time
+import logging
+from typing import List, Dict, Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Gera embeddings em lotes ordenados por comprimento e limitados por orçamento de tokens"""
+
+    def __init__(self, model: Any, token_budget: Optional[int] = None, max_batch_size: Optional[int] = None,
+                 cache: Optional[Any] = None):
+        self.model = model
+        self.cache = cache
+        self.token_budget = token_budget or int(os.getenv("EMBEDDING_TOKEN_BUDGET", "8192"))
+        self.max_batch_size = max_batch_size or int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "128"))
+        self.ultima_execucao: Dict[str, Any] = {}
+
+    def _max_seq_length(self) -> Optional[int]:
+        """Comprimento máximo de sequência do modelo (tokens além disso são truncados)"""
+        max_len = getattr(self.model, "max_seq_length", None)
+        return int(max_len) if isinstance(max_len, int) and max_len > 0 else None
+
+    def contar_tokens(self, textos: Sequence[str]) -> List[int]:
+        """Conta tokens de cada texto usando o tokenizer do modelo (ou palavras como aproximação)"""
+        tokenizer = getattr(self.model, "tokenizer", None)
+        contagens = None
+        if tokenizer is not None and textos:
+            try:
+                encoded = tokenizer(list(textos), add_special_tokens=True, truncation=False)
+                contagens = [len(ids) for ids in encoded["input_ids"]]
+            except Exception as e:
+                logger.debug(f"Tokenizer indisponível para contagem, usando aproximação: {e}")
+        if contagens is None:
+            contagens = [len(texto.split()) + 2 for texto in textos]
+
+        # O modelo trunca em max_seq_length, então esse é o custo real de cada texto
+        max_len = self._max_seq_length()
+        if max_len:
+            contagens = [min(c, max_len) for c in contagens]
+        return contagens
+
+    def montar_lotes(self, contagens: Sequence[int]) -> List[List[int]]:
+        """Agrupa índices (ordenados por comprimento) em lotes que respeitam o orçamento de tokens"""
+        ordem = sorted(range(len(contagens)), key=lambda i: contagens[i])
+        lotes: List[List[int]] = []
+        lote_atual: List[int] = []
+        maior_no_lote = 0
+
+        for idx in ordem:
+            tokens = max(contagens[idx], 1)
+            maior = max(maior_no_lote, tokens)
+            # Custo do lote = nº de textos x maior texto (todos são preenchidos até o maior)
+            excede_orcamento = lote_atual and maior * (len(lote_atual) + 1) > self.token_budget
+            excede_tamanho = len(lote_atual) >= self.max_batch_size
+            if excede_orcamento or excede_tamanho:
+                lotes.append(lote_atual)
+                lote_atual = []
+                maior = tokens
+            lote_atual.append(idx)
+            maior_no_lote = maior
+
+        if lote_atual:
+            lotes.append(lote_atual)
+        return lotes
+
+    def _encode_lote(self, textos: List[str]) -> List[List[float]]:
+        """Codifica um lote de textos e normaliza a saída para lista de listas"""
+        try:
+            resultado = self.model.encode(textos, batch_size=len(textos), show_progress_bar=False)
+        except TypeError:
+            # Modelos simplificados (fallback) não aceitam argumentos extras
+            resultado = self.model.encode(textos)
+
+        if hasattr(resultado, "tolist"):
+            resultado = resultado.tolist()
+        vetores = [v.tolist() if hasattr(v, "tolist") else list(v) for v in resultado]
+        if len(vetores) != len(textos):
+            raise RuntimeError(f"Modelo retornou {len(vetores)} vetores para {len(textos)} textos")
+        return vetores
+
+    def encode(self, textos: Sequence[str]) -> List[List[float]]:
+        """Gera embeddings para todos os textos, preservando a ordem de entrada"""
+        inicio = time.time()
+        textos = list(textos)
+        if not textos:
+            self.ultima_execucao = {"chunks": 0, "lotes": 0, "tokens": 0, "tempo_s": 0.0, "chunks_por_segundo": 0.0}
+            return []
+
+        # Textos repetidos são codificados uma vez; os já em cache nem isso
+        unicos = list(dict.fromkeys(textos))
+        em_cache = self._consultar_cache(unicos)
+        pendentes = [t for t in unicos if em_cache.get(t) is None]
+
+        contagens = self.contar_tokens(pendentes)
+        lotes = self.montar_lotes(contagens)
+
+        calculados: Dict[str, List[float]] = {}
+        for lote in lotes:
+            textos_lote = [pendentes[i] for i in lote]
+            for texto, vetor in zip(textos_lote, self._encode_lote(textos_lote)):
+                calculados[texto] = vetor
+        self._guardar_cache(calculados)
+
+        vetores = [em_cache.get(t) or calculados[t] for t in textos]
+
+        tempo = time.time() - inicio
+        self.ultima_execucao = {
+            "chunks": len(textos),
+            "lotes": len(lotes),
+            "tokens": sum(contagens),
+            "cache_hits": len(unicos) - len(pendentes),
+            "tempo_s": round(tempo, 3),
+            "chunks_por_segundo": round(len(textos) / tempo, 2) if tempo > 0 else 0.0
+        }
+        logger.info(
+            f"🧮 Embeddings: {len(textos)} chunks em {len(lotes)} lotes "
+            f"({self.ultima_execucao['chunks_por_segundo']} chunks/s)"
+        )
+        return vetores
+
+    def _consultar_cache(self, textos: List[str]) -> Dict[str, List[float]]:
+        if self.cache is None or not textos:
+            return {}
+        try:
+            return {t: v for t, v in zip(textos, self.cache.obter(textos)) if v is not None}
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao consultar cache de embeddings: {e}")
+            return {}
+
+    def _guardar_cache(self, calculados: Dict[str, List[float]]):
+        if self.cache is None or not calculados:
+            return
+        try:
+            self.cache.guardar(list(calculados), list(calculados.values()))
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao gravar cache de embeddings: {e}")
+
+
+def obter_dimensao_modelo(model: Any) -> int:
+    """Obtém a dimensão do embedding sem precisar codificar um texto de teste quando possível"""
+    get_dim = getattr(model, "get_sentence_embedding_dimension", None)
+    if callable(get_dim):
+        try:
+            dim = get_dim()
+            if dim:
+                return int(dim)
+        except Exception:
+            pass
+    vetor = model.encode("teste")
+    if hasattr(vetor, "tolist"):
+        vetor = vetor.tolist()
+    return len(vetor)
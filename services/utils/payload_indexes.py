@@ -0,0 +1,101 @@
+"""
+Índices de payload das coleções Qdrant
+
+Sem índice, cada filtro (MatchText da busca por palavras, MatchValue, Range)
+verifica o payload ponto a ponto. ESQUEMA_INDICES declara os índices que toda
+coleção deve ter; eles são criados junto com a coleção e podem ser aplicados a
+coleções antigas (o Qdrant indexa os pontos já gravados).
+
+O Qdrant mantém um índice por campo: "title" recebe o índice de texto, que é o
+usado pela busca (MatchText), e filtros exatos por título continuam funcionando,
+apenas sem índice próprio.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from qdrant_client.http import models
+    QDRANT_AVAILABLE = True
+except ImportError:
+    models = None
+    QDRANT_AVAILABLE = False
+
+
+# campo -> tipo do índice ("texto", "keyword" ou "inteiro")
+ESQUEMA_INDICES: Dict[str, str] = {
+    "content": "texto",
+    "title": "texto",
+    "url": "keyword",
+    "source": "keyword",
+    "article_id": "inteiro",
+    "chunk_index": "inteiro",
+}
+
+# Tipo do índice -> data_type informado pelo Qdrant em payload_schema
+_DATA_TYPES = {"texto": "text", "keyword": "keyword", "inteiro": "integer"}
+
+
+def schema_indice(tipo: str) -> Any:
+    """field_schema de create_payload_index para o tipo declarado"""
+    if tipo == "texto":
+        return models.TextIndexParams(
+            type="text",
+            tokenizer=models.TokenizerType.WORD,
+            min_token_len=2,
+            max_token_len=20,
+            lowercase=True
+        )
+    if tipo == "keyword":
+        return models.PayloadSchemaType.KEYWORD
+    if tipo == "inteiro":
+        return models.PayloadSchemaType.INTEGER
+    raise ValueError(f"Tipo de índice desconhecido: {tipo}")
+
+
+def indices_existentes(info: Any) -> Dict[str, str]:
+    """{campo: data_type} dos índices de uma coleção (retorno de get_collection)"""
+    schema = getattr(info, "payload_schema", None) or {}
+    existentes = {}
+    for campo, indice in schema.items():
+        data_type = getattr(indice, "data_type", None)
+        existentes[campo] = str(getattr(data_type, "value", data_type) or "").lower()
+    return existentes
+
+
+def indices_faltando(info: Any, esquema: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Campos do esquema sem índice (ou com índice de outro tipo) na coleção"""
+    esquema = esquema or ESQUEMA_INDICES
+    existentes = indices_existentes(info)
+    return {campo: tipo for campo, tipo in esquema.items() if existentes.get(campo) != _DATA_TYPES[tipo]}
+
+
+def criar_indices(client: Any, colecao: str, campos: Optional[Iterable[str]] = None,
+                  esperar: bool = False) -> Dict[str, str]:
+    """Cria os índices do esquema que faltam na coleção
+
+    Retorna {campo: "criado" | "existente" | "erro: ..."}. Com esperar=True só
+    retorna depois que o Qdrant indexou os pontos existentes.
+    """
+    esquema = {campo: ESQUEMA_INDICES[campo] for campo in (campos or ESQUEMA_INDICES)}
+    try:
+        faltando = indices_faltando(client.get_collection(colecao), esquema)
+    except Exception as e:
+        logger.warning(f"⚠️ Não foi possível ler os índices de '{colecao}': {e}")
+        faltando = esquema
+    resultado = {campo: "existente" for campo in esquema if campo not in faltando}
+    for campo, tipo in faltando.items():
+        try:
+            client.create_payload_index(
+                collection_name=colecao, field_name=campo, field_schema=schema_indice(tipo), wait=esperar
+            )
+            resultado[campo] = "criado"
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao criar índice '{campo}' ({tipo}) em '{colecao}': {e}")
+            resultado[campo] = f"erro: {e}"
+    criados = [campo for campo, situacao in resultado.items() if situacao == "criado"]
+    if criados:
+        logger.info(f"📇 Índices de payload criados em '{colecao}': {', '.join(criados)}")
+    return resultado
@@ -0,0 +1,80 @@
+"""
+Fábrica do cliente Qdrant
+
+Um único QdrantClient compartilhado por todos os serviços, criado no primeiro uso
+a partir das variáveis de ambiente. Com QDRANT_PREFER_GRPC=true as operações vão
+pela porta gRPC (vetores em protobuf binário em vez de floats em JSON); o REST
+continua disponível para o que o gRPC não cobre.
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+try:
+    from qdrant_client import QdrantClient
+    QDRANT_AVAILABLE = True
+except ImportError:
+    QdrantClient = None
+    QDRANT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_cliente: Optional["QdrantClient"] = None
+_lock = threading.Lock()
+
+
+def _env_bool(nome: str, padrao: str = "false") -> bool:
+    return os.getenv(nome, padrao).strip().lower() in ("1", "true", "yes", "sim")
+
+
+def configuracao_qdrant(**sobrescritas) -> Dict[str, Any]:
+    """Parâmetros de conexão lidos do ambiente (sobrescritas têm prioridade)
+
+    QDRANT_HOST, QDRANT_PORT, QDRANT_GRPC_PORT, QDRANT_PREFER_GRPC,
+    QDRANT_TIMEOUT (segundos), QDRANT_HTTPS e QDRANT_API_KEY.
+    """
+    config = {
+        "host": os.getenv("QDRANT_HOST", "localhost"),
+        "port": int(os.getenv("QDRANT_PORT", "6333")),
+        "grpc_port": int(os.getenv("QDRANT_GRPC_PORT", "6334")),
+        "prefer_grpc": _env_bool("QDRANT_PREFER_GRPC"),
+        "timeout": int(os.getenv("QDRANT_TIMEOUT", "30")),
+        "https": _env_bool("QDRANT_HTTPS"),
+        "api_key": os.getenv("QDRANT_API_KEY") or None,
+    }
+    config.update({k: v for k, v in sobrescritas.items() if v is not None})
+    return config
+
+
+def criar_cliente_qdrant(**sobrescritas) -> "QdrantClient":
+    """Cria um cliente novo (não compartilhado), p.ex. para benchmarks e scripts"""
+    if not QDRANT_AVAILABLE:
+        raise RuntimeError("qdrant-client não está instalado")
+    config = configuracao_qdrant(**sobrescritas)
+    transporte = f"gRPC :{config['grpc_port']}" if config["prefer_grpc"] else f"REST :{config['port']}"
+    logger.info(f"🔗 Cliente Qdrant em {config['host']} ({transporte}, timeout {config['timeout']}s)")
+    return QdrantClient(**config)
+
+
+def obter_cliente_qdrant() -> "QdrantClient":
+    """Cliente compartilhado, criado no primeiro uso"""
+    global _cliente
+    if _cliente is None:
+        with _lock:
+            if _cliente is None:
+                _cliente = criar_cliente_qdrant()
+    return _cliente
+
+
+def redefinir_cliente_qdrant():
+    """Fecha o cliente compartilhado; o próximo obter_cliente_qdrant() cria outro"""
+    global _cliente
+    with _lock:
+        cliente, _cliente = _cliente, None
+    if cliente is not None:
+        try:
+            cliente.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao fechar cliente Qdrant: {e}")
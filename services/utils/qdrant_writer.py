@@ -0,0 +1,222 @@
+"""
+Escritor de pontos no Qdrant
+
+Acumula pontos e os envia em lotes por um pool de threads, mantendo vários upserts
+em voo com wait=False: o Qdrant confirma quando a operação entra no WAL, sem esperar
+a indexação, e quem produz os pontos não fica parado a cada ida e volta.
+
+O tamanho do lote é ajustado pela latência observada (cresce enquanto os upserts
+respondem abaixo do alvo e cai quando passam do dobro) e limitado pelo tamanho
+estimado do lote em bytes.
+
+preparar_pontos concentra o que todo ponto passa antes do upsert, em qualquer
+caminho de ingestão (escritor em lote, pipeline de dump, serviço offline e
+restauração de duplicatas).
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .content_store import externalizar_payloads
+from .sparse_utils import adicionar_vetores_esparsos
+from .text_analysis import normalizar_payloads
+
+logger = logging.getLogger(__name__)
+
+
+def _bytes_estimados(ponto: Any) -> int:
+    """Tamanho aproximado do ponto serializado (vetor em JSON + payload)"""
+    vetor = getattr(ponto, "vector", None) or []
+    payload = getattr(ponto, "payload", None) or {}
+    # Vetores nomeados podem incluir o esparso (índices + valores)
+    vetores = vetor.values() if isinstance(vetor, dict) else [vetor]
+    tamanho_vetor = sum(2 * len(v.indices) if hasattr(v, "indices") else len(v) for v in vetores)
+    return 64 + tamanho_vetor * 10 + sum(len(str(v)) + len(k) for k, v in payload.items())
+
+
+def _cliente_local(client: Any) -> bool:
+    """True para QdrantClient em modo local (sem servidor)"""
+    return type(getattr(client, "_client", None)).__name__ in ("QdrantLocal", "AsyncQdrantLocal")
+
+
+def preparar_pontos(client: Any, colecao: str, pontos: Sequence[Any]):
+    """Completa os pontos para o upsert: vetor BM25, campos normalizados e content store
+
+    A ordem importa: o vetor esparso e os campos normalizados saem do texto do
+    payload, que externalizar_payloads retira quando o content store está ativo.
+    """
+    adicionar_vetores_esparsos(client, colecao, pontos)
+    normalizar_payloads(pontos)
+    externalizar_payloads(colecao, pontos)
+
+
+class QdrantBatchWriter:
+    """Envia pontos ao Qdrant em lotes paralelos e não bloqueantes com tamanho adaptativo"""
+
+    def __init__(
+        self,
+        client: Any,
+        colecao: str,
+        max_em_voo: Optional[int] = None,
+        tamanho_lote: Optional[int] = None,
+        lote_minimo: int = 16,
+        lote_maximo: Optional[int] = None,
+        latencia_alvo: Optional[float] = None,
+        max_bytes_lote: Optional[int] = None,
+        wait: bool = False
+    ):
+        self.client = client
+        self.colecao = colecao
+        self.max_em_voo = max(1, int(max_em_voo or os.getenv("QDRANT_WRITER_INFLIGHT", "4")))
+        if _cliente_local(client):
+            # O modo local (":memory:"/path) não aceita escritas concorrentes
+            self.max_em_voo = 1
+        self.lote_minimo = lote_minimo
+        self.lote_maximo = int(lote_maximo or os.getenv("QDRANT_WRITER_MAX_BATCH", "1024"))
+        self.tamanho_lote = min(int(tamanho_lote or os.getenv("QDRANT_WRITER_BATCH", "128")), self.lote_maximo)
+        self.latencia_alvo = float(latencia_alvo or os.getenv("QDRANT_WRITER_TARGET_LATENCY", "0.25"))
+        self.max_bytes_lote = int(max_bytes_lote or os.getenv("QDRANT_WRITER_MAX_BATCH_BYTES", str(8 * 1024 * 1024)))
+        self.wait = wait
+
+        self._buffer: List[Any] = []
+        self._lock = threading.Lock()
+        self._vagas = threading.BoundedSemaphore(self.max_em_voo)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_em_voo, thread_name_prefix="qdrant-writer")
+        self._pendentes: set = set()
+        self._erro: Optional[BaseException] = None
+        self._fechado = False
+
+        self._inicio = time.time()
+        self._pontos_enviados = 0
+        self._lotes = 0
+        self._tempo_upsert = 0.0
+        self._bytes_por_ponto = 0.0
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+    def adicionar(self, pontos: Iterable[Any]):
+        """Enfileira pontos; lotes completos são enviados sem esperar a resposta"""
+        self._verificar_erro()
+        if self._fechado:
+            raise RuntimeError("QdrantBatchWriter já foi fechado")
+        with self._lock:
+            self._buffer.extend(pontos)
+            lotes = []
+            while len(self._buffer) >= self.tamanho_lote:
+                lotes.append(self._buffer[:self.tamanho_lote])
+                del self._buffer[:self.tamanho_lote]
+        for lote in lotes:
+            self._enviar(lote)
+
+    def flush(self):
+        """Envia o que restou no buffer e espera todos os upserts em voo"""
+        with self._lock:
+            lote, self._buffer = self._buffer, []
+        if lote:
+            self._enviar(lote)
+        for futuro in list(self._pendentes):
+            futuro.exception()
+        self._verificar_erro()
+
+    def fechar(self):
+        """Descarrega tudo e encerra o pool"""
+        if self._fechado:
+            return
+        try:
+            self.flush()
+        finally:
+            self._fechado = True
+            self._executor.shutdown(wait=True)
+            stats = self.estatisticas()
+            logger.info(
+                f"📦 Escrita em '{self.colecao}': {stats['pontos_enviados']} pontos em {stats['lotes']} lotes "
+                f"({stats['pontos_por_segundo']} pontos/s, lote final {stats['tamanho_lote']})"
+            )
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Vazão, lotes em voo e tamanho de lote atual"""
+        decorrido = time.time() - self._inicio
+        return {
+            "colecao": self.colecao,
+            "pontos_enviados": self._pontos_enviados,
+            "lotes": self._lotes,
+            "pontos_por_segundo": round(self._pontos_enviados / decorrido, 1) if decorrido > 0 else 0.0,
+            "latencia_media_ms": round(self._tempo_upsert / self._lotes * 1000, 1) if self._lotes else 0.0,
+            "lotes_em_voo": len(self._pendentes),
+            "pontos_no_buffer": len(self._buffer),
+            "tamanho_lote": self.tamanho_lote,
+            "wait": self.wait
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.fechar()
+        else:
+            # Já há um erro em andamento: não mascará-lo com outro do flush
+            try:
+                self.fechar()
+            except Exception as e:
+                logger.error(f"❌ Erro ao descarregar escrita no Qdrant: {e}")
+        return False
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _verificar_erro(self):
+        if self._erro is not None:
+            erro, self._erro = self._erro, None
+            raise erro
+
+    def _enviar(self, lote: List[Any]):
+        # Backpressure: no máximo max_em_voo upserts pendentes
+        self._vagas.acquire()
+        try:
+            futuro = self._executor.submit(self._upsert, lote)
+        except Exception:
+            self._vagas.release()
+            raise
+        self._pendentes.add(futuro)
+        futuro.add_done_callback(self._concluir)
+
+    def _concluir(self, futuro: Future):
+        self._pendentes.discard(futuro)
+        self._vagas.release()
+        erro = futuro.exception()
+        if erro is not None and self._erro is None:
+            self._erro = erro
+
+    def _upsert(self, lote: List[Any]):
+        # Com CONTENT_STORE_ENABLED o texto vai para o armazenamento local antes do ponto existir
+        preparar_pontos(self.client, self.colecao, lote)
+        t0 = time.time()
+        try:
+            self.client.upsert(collection_name=self.colecao, points=lote, wait=self.wait)
+        except Exception as e:
+            logger.error(f"❌ Erro no upsert de {len(lote)} pontos em '{self.colecao}': {e}")
+            raise
+        self._ajustar(len(lote), time.time() - t0, _bytes_estimados(lote[0]))
+
+    def _ajustar(self, pontos: int, latencia: float, bytes_ponto: int):
+        """Ajusta o tamanho do lote pela latência e pelo limite de bytes"""
+        with self._lock:
+            self._pontos_enviados += pontos
+            self._lotes += 1
+            self._tempo_upsert += latencia
+            self._bytes_por_ponto = bytes_ponto if not self._bytes_por_ponto else 0.8 * self._bytes_por_ponto + 0.2 * bytes_ponto
+
+            # Só reage a lotes cheios: o lote final menor não diz nada sobre a latência
+            if pontos >= self.tamanho_lote:
+                if latencia < self.latencia_alvo:
+                    self.tamanho_lote = int(self.tamanho_lote * 1.25) + 1
+                elif latencia > 2 * self.latencia_alvo:
+                    self.tamanho_lote //= 2
+            limite_bytes = int(self.max_bytes_lote / max(self._bytes_por_ponto, 1))
+            self.tamanho_lote = max(self.lote_minimo, min(self.tamanho_lote, self.lote_maximo, limite_bytes))
@@ -0,0 +1,167 @@
+"""
+Vetores esparsos BM25 para busca híbrida (densa + lexical)
+
+Coleções criadas com HYBRID_SEARCH_ENABLED=true têm, além do vetor denso sem
+nome, o vetor esparso "bm25". Cada chunk recebe os pesos de termo do BM25
+(saturação por tf e normalização pelo tamanho do chunk); o IDF é aplicado pelo
+próprio Qdrant (Modifier.IDF), que conhece a frequência de cada termo na coleção.
+
+O analisador é para português: minúsculas, sem acentos, sem stopwords e com um
+redutor de plural leve, para "Nações", "nacao" e "nação" caírem no mesmo termo.
+O termo vira índice pelo CRC32, então não há vocabulário a manter.
+
+Na busca, as pernas densa e esparsa vão em uma única query com fusão por
+reciprocal rank fusion (RRF) feita no servidor.
+"""
+
+import os
+import re
+import zlib
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from .text_analysis import STOPWORDS_BM25, normalizar
+
+logger = logging.getLogger(__name__)
+
+try:
+    from qdrant_client.http import models
+    QDRANT_AVAILABLE = True
+except ImportError:
+    models = None
+    QDRANT_AVAILABLE = False
+
+# Nome do vetor esparso nas coleções híbridas (o denso continua sem nome: "")
+VETOR_ESPARSO = "bm25"
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+# Cache por processo: coleção -> tem o vetor esparso
+_colecoes_hibridas: Dict[str, bool] = {}
+
+
+def hibrido_habilitado() -> bool:
+    return os.getenv("HYBRID_SEARCH_ENABLED", "false").lower() == "true"
+
+
+def _radical(termo: str) -> str:
+    """Redução leve de plural (nações -> nacao, papéis -> papel, flores -> flor)"""
+    if len(termo) <= 3 or not termo.endswith("s"):
+        return termo
+    if termo.endswith(("oes", "aes", "aos")):
+        return termo[:-3] + "ao"
+    if termo.endswith("ais"):
+        return termo[:-3] + "al"
+    if termo.endswith("eis"):
+        return termo[:-3] + "el"
+    if termo.endswith("ois"):
+        return termo[:-3] + "ol"
+    if termo.endswith("ns"):
+        return termo[:-2] + "m"
+    if termo.endswith(("res", "zes", "ses")):
+        return termo[:-2]
+    if termo.endswith("ss"):
+        return termo
+    return termo[:-1]
+
+
+def analisar(texto: str) -> List[str]:
+    """Termos do texto como o índice esparso os vê"""
+    termos = []
+    for token in _TOKEN.findall(normalizar(texto)):
+        if len(token) < 2 or token in STOPWORDS_BM25:
+            continue
+        termos.append(_radical(token))
+    return termos
+
+
+def indice_termo(termo: str) -> int:
+    return zlib.crc32(termo.encode("utf-8"))
+
+
+def _vetor(pesos: Dict[int, float]):
+    indices = sorted(pesos)
+    return models.SparseVector(indices=indices, values=[pesos[i] for i in indices])
+
+
+def vetor_esparso_documento(texto: str, k1: float = 1.2, b: float = 0.75, tamanho_medio: Optional[float] = None):
+    """Pesos BM25 de tf do chunk (o IDF fica com o Qdrant)"""
+    tamanho_medio = tamanho_medio or float(os.getenv("SPARSE_AVGDL", "100"))
+    termos = analisar(texto)
+    normalizacao = k1 * (1 - b + b * len(termos) / tamanho_medio)
+    pesos: Dict[int, float] = {}
+    for termo, tf in Counter(termos).items():
+        indice = indice_termo(termo)
+        # Colisões de CRC32 somam no mesmo índice
+        pesos[indice] = pesos.get(indice, 0.0) + tf * (k1 + 1) / (tf + normalizacao)
+    return _vetor(pesos)
+
+
+def vetor_esparso_consulta(texto: str):
+    """Termos distintos da consulta com peso 1 (o IDF do servidor pondera)"""
+    return _vetor({indice_termo(termo): 1.0 for termo in set(analisar(texto))})
+
+
+def config_vetores_esparsos() -> Dict[str, Any]:
+    """sparse_vectors_config de create_collection para coleções híbridas"""
+    return {VETOR_ESPARSO: models.SparseVectorParams(modifier=models.Modifier.IDF)}
+
+
+def tem_vetor_esparso(info: Any) -> bool:
+    """True se a configuração retornada por get_collection tem o vetor esparso"""
+    esparsos = getattr(getattr(getattr(info, "config", None), "params", None), "sparse_vectors", None)
+    return bool(esparsos) and VETOR_ESPARSO in esparsos
+
+
+def colecao_hibrida(client: Any, colecao: str) -> bool:
+    """Se a coleção tem o vetor esparso (consulta o Qdrant uma vez por coleção)"""
+    if colecao not in _colecoes_hibridas:
+        try:
+            _colecoes_hibridas[colecao] = tem_vetor_esparso(client.get_collection(colecao))
+        except Exception:
+            return False
+    return _colecoes_hibridas[colecao]
+
+
+def esquecer_colecao_hibrida(colecao: str):
+    _colecoes_hibridas.pop(colecao, None)
+
+
+def adicionar_vetores_esparsos(client: Any, colecao: str, pontos: Sequence[Any]) -> int:
+    """Completa os pontos de uma coleção híbrida com o vetor esparso do conteúdo
+
+    Vetores reaproveitados de pontos existentes já chegam como dict; deles só o
+    denso ("") é mantido. Retorna quantos pontos receberam o vetor esparso.
+    """
+    if not pontos or not colecao_hibrida(client, colecao):
+        return 0
+    completados = 0
+    for ponto in pontos:
+        texto = (ponto.payload or {}).get("content")
+        if not texto:
+            continue
+        denso = ponto.vector.get("") if isinstance(ponto.vector, dict) else ponto.vector
+        ponto.vector = {"": denso, VETOR_ESPARSO: vetor_esparso_documento(texto)}
+        completados += 1
+    return completados
+
+
+def consulta_hibrida(vetor_denso: List[float], texto: str, limite: int, score_threshold: Optional[float] = None,
+                     search_params: Any = None, limite_pernas: Optional[int] = None):
+    """QueryRequest com as pernas densa e BM25 fundidas por RRF no Qdrant
+
+    `score_threshold` vale só para a perna densa: um chunk com o termo exato
+    entra pela perna esparsa mesmo com similaridade baixa. Com o RRF do Qdrant
+    (k=2), o score fundido fica em (0, 1]: 1.0 é o primeiro nas duas pernas.
+    """
+    limite_pernas = limite_pernas or limite
+    return models.QueryRequest(
+        prefetch=[
+            models.Prefetch(query=vetor_denso, limit=limite_pernas, score_threshold=score_threshold, params=search_params),
+            models.Prefetch(query=vetor_esparso_consulta(texto), using=VETOR_ESPARSO, limit=limite_pernas)
+        ],
+        query=models.FusionQuery(fusion=models.Fusion.RRF),
+        limit=limite,
+        with_payload=True
+    )
@@ -0,0 +1,171 @@
+"""
+Perfis de armazenamento de coleções Qdrant
+
+Uma coleção float32 com HNSW inteiramente em RAM não cabe na memória dos nós para
+modelos grandes (bge-m3, 1024 dimensões, sobre a Wikipedia inteira). Cada perfil
+nomeado combina quantização (escalar int8, binária ou por produto), tipo dos
+vetores (float16), vetores/payload/grafo HNSW em disco e parâmetros do HNSW. Os
+perfis quantizados mantêm só os vetores quantizados em RAM e buscam com
+oversampling + rescoring pelos vetores originais (lidos do disco).
+
+O perfil é escolhido na criação da coleção (QDRANT_STORAGE_PROFILE define o
+padrão) e, na busca, é deduzido da configuração da própria coleção.
+"""
+
+import os
+import logging
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+
+from .sparse_utils import config_vetores_esparsos, hibrido_habilitado
+
+logger = logging.getLogger(__name__)
+
+try:
+    from qdrant_client.http import models
+    QDRANT_AVAILABLE = True
+except ImportError:
+    models = None
+    QDRANT_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class PerfilArmazenamento:
+    """Como os vetores de uma coleção são guardados e buscados"""
+    nome: str
+    descricao: str
+    quantizacao: Optional[str] = None  # "int8", "binario" ou "pq"
+    datatype: str = "float32"
+    vetores_em_disco: bool = False
+    payload_em_disco: bool = False
+    hnsw_em_disco: bool = False
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    oversampling: Optional[float] = None
+
+
+PERFIS: Dict[str, PerfilArmazenamento] = {
+    perfil.nome: perfil for perfil in (
+        PerfilArmazenamento("padrao", "float32 com vetores e HNSW em RAM (comportamento original)"),
+        PerfilArmazenamento(
+            "int8", "Quantização escalar int8 em RAM (4x menor), originais em disco para rescoring",
+            quantizacao="int8", vetores_em_disco=True, payload_em_disco=True, oversampling=1.5
+        ),
+        PerfilArmazenamento(
+            "binario", "Quantização binária em RAM (32x menor), indicada para 1024+ dimensões",
+            quantizacao="binario", vetores_em_disco=True, payload_em_disco=True, oversampling=3.0
+        ),
+        PerfilArmazenamento(
+            "pq", "Quantização por produto x16 em RAM, originais em disco para rescoring",
+            quantizacao="pq", vetores_em_disco=True, payload_em_disco=True, oversampling=2.0
+        ),
+        PerfilArmazenamento("float16", "Vetores float16 em RAM (2x menor, sem rescoring)", datatype="float16"),
+        PerfilArmazenamento(
+            "disco", "Vetores, payload e grafo HNSW em disco (memory-mapped); RAM vira cache de páginas",
+            vetores_em_disco=True, payload_em_disco=True, hnsw_em_disco=True
+        ),
+    )
+}
+
+
+def obter_perfil(nome: Optional[str] = None) -> PerfilArmazenamento:
+    """Perfil pelo nome (ou QDRANT_STORAGE_PROFILE); ValueError se não existir"""
+    nome = nome or os.getenv("QDRANT_STORAGE_PROFILE", "padrao")
+    if nome not in PERFIS:
+        raise ValueError(f"Perfil de armazenamento inválido: {nome} (disponíveis: {', '.join(PERFIS)})")
+    return PERFIS[nome]
+
+
+def listar_perfis() -> Dict[str, Dict[str, Any]]:
+    return {nome: asdict(perfil) for nome, perfil in PERFIS.items()}
+
+
+def _config_quantizacao(perfil: PerfilArmazenamento):
+    if perfil.quantizacao == "int8":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if perfil.quantizacao == "binario":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+    if perfil.quantizacao == "pq":
+        return models.ProductQuantization(
+            product=models.ProductQuantizationConfig(compression=models.CompressionRatio.X16, always_ram=True)
+        )
+    return None
+
+
+def configuracao_colecao(perfil: PerfilArmazenamento, dimensao: int, distancia: str = "COSINE",
+                         hnsw_m: Optional[int] = None, hnsw_ef_construct: Optional[int] = None,
+                         hibrida: Optional[bool] = None) -> Dict[str, Any]:
+    """Argumentos de create_collection (exceto o nome) para o perfil
+
+    m/ef_construct do HNSW vêm dos argumentos, do perfil ou de QDRANT_HNSW_M /
+    QDRANT_HNSW_EF_CONSTRUCT; sem nenhum deles, vale o padrão do servidor.
+    `hibrida` (padrão: HYBRID_SEARCH_ENABLED) adiciona o vetor esparso BM25.
+    """
+    m = hnsw_m or perfil.hnsw_m or int(os.getenv("QDRANT_HNSW_M", "0")) or None
+    ef_construct = hnsw_ef_construct or perfil.hnsw_ef_construct or int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "0")) or None
+    hnsw = None
+    if m or ef_construct or perfil.hnsw_em_disco:
+        hnsw = models.HnswConfigDiff(m=m, ef_construct=ef_construct, on_disk=perfil.hnsw_em_disco or None)
+    vetores = models.VectorParams(
+        size=dimensao,
+        distance=getattr(models.Distance, distancia),
+        on_disk=perfil.vetores_em_disco or None,
+        datatype=models.Datatype.FLOAT16 if perfil.datatype == "float16" else None,
+        hnsw_config=hnsw
+    )
+    configuracao: Dict[str, Any] = {"vectors_config": vetores}
+    quantizacao = _config_quantizacao(perfil)
+    if quantizacao is not None:
+        configuracao["quantization_config"] = quantizacao
+    if perfil.payload_em_disco:
+        configuracao["on_disk_payload"] = True
+    if hibrida if hibrida is not None else hibrido_habilitado():
+        configuracao["sparse_vectors_config"] = config_vetores_esparsos()
+    return configuracao
+
+
+def parametros_busca(perfil: PerfilArmazenamento, hnsw_ef: Optional[int] = None) -> Optional[Any]:
+    """SearchParams do perfil: oversampling + rescoring nos quantizados; None se não há o que ajustar"""
+    ef = hnsw_ef or int(os.getenv("QDRANT_HNSW_EF", "0")) or None
+    quantizacao = None
+    if perfil.quantizacao:
+        oversampling = float(os.getenv("QDRANT_OVERSAMPLING", "0")) or perfil.oversampling
+        quantizacao = models.QuantizationSearchParams(ignore=False, rescore=True, oversampling=oversampling)
+    if ef is None and quantizacao is None:
+        return None
+    return models.SearchParams(hnsw_ef=ef, quantization=quantizacao)
+
+
+def perfil_da_colecao(info: Any) -> PerfilArmazenamento:
+    """Deduz o perfil de uma coleção existente pela configuração retornada por get_collection"""
+    config = getattr(info, "config", None)
+    quantizacao = getattr(config, "quantization_config", None)
+    if quantizacao is not None:
+        if getattr(quantizacao, "binary", None) is not None:
+            return PERFIS["binario"]
+        if getattr(quantizacao, "product", None) is not None:
+            return PERFIS["pq"]
+        return PERFIS["int8"]
+    vetores = getattr(getattr(config, "params", None), "vectors", None)
+    if str(getattr(vetores, "datatype", "") or "").lower().endswith("float16"):
+        return PERFIS["float16"]
+    if getattr(vetores, "on_disk", None):
+        return PERFIS["disco"]
+    return PERFIS["padrao"]
+
+
+def estimar_memoria(perfil: PerfilArmazenamento, n_vetores: int, dimensao: int, hnsw_m: int = 16) -> Dict[str, int]:
+    """Bytes aproximados em RAM e em disco dos vetores e do grafo HNSW (sem payload)"""
+    originais = n_vetores * dimensao * (2 if perfil.datatype == "float16" else 4)
+    quantizados = {
+        "int8": n_vetores * dimensao,
+        "binario": n_vetores * ((dimensao + 7) // 8),
+        "pq": n_vetores * dimensao * 4 // 16,
+    }.get(perfil.quantizacao, 0)
+    # Camada 0 do HNSW guarda 2*m vizinhos (u32) por ponto
+    grafo = n_vetores * (perfil.hnsw_m or hnsw_m) * 2 * 4
+    ram = quantizados + (0 if perfil.vetores_em_disco else originais) + (0 if perfil.hnsw_em_disco else grafo)
+    disco = originais + quantizados + grafo
+    return {"ram_bytes": ram, "disco_bytes": disco}
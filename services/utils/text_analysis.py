@@ -0,0 +1,161 @@
+"""
+Análise de texto compartilhada por ingestão e busca
+
+Um único analisador para as consultas: stopwords em frozenset, padrões
+compilados uma vez, remoção de acentos por tabela de str.translate e análise
+memoizada por consulta (a mesma pergunta passa por buscar_documentos,
+perguntar_com_rag e pelos filtros da API).
+
+A busca compara os termos da consulta com o título e o início do conteúdo de
+cada resultado sem acentos e em minúsculas. Essas formas normalizadas são
+calculadas uma vez, na ingestão, e gravadas no payload como "title_norm" e
+"content_norm" (os primeiros PREFIXO_NORMALIZADO caracteres, o mesmo trecho
+que a busca devolve e confere). Na consulta, resultados de pontos antigos sem
+esses campos caem no cálculo na hora.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, FrozenSet, Optional, Pattern, Sequence, Tuple
+
+# Trecho do conteúdo devolvido pela busca e conferido contra os termos da consulta
+PREFIXO_NORMALIZADO = 200
+
+# Palavras que não identificam o assunto de uma consulta
+STOPWORDS = frozenset("""
+o a os as um uma uns umas de da do das dos em no na nos nas e é que qual quais quem foi são
+para com por
+""".split())
+
+# Pergunta do RAG: também o tom de conversa ("você sabe onde fica...", "me fala sobre...")
+STOPWORDS_PERGUNTA = STOPWORDS | frozenset("onde fica sobre sabe vc você voce me diz fala".split())
+
+# Primeira palavra com maiúscula que não é nome próprio ("Quem foi...", "Onde fica...")
+STOPWORDS_INICIO = frozenset("o a os as que quem qual quais onde quando como".split())
+
+_NAO_PALAVRA = re.compile(r"[^\w]")
+# Fora de Latin-1/Latin Extended: a tabela não cobre, cai na decomposição NFD
+_FORA_DA_TABELA = re.compile(r"[^\x00-\u024f]")
+
+
+def _tabela_acentos() -> dict:
+    """Latin-1 e Latin Extended -> letra base; marcas combinantes soltas são removidas"""
+    tabela = {}
+    for codigo in range(0x80, 0x250):
+        caractere = chr(codigo)
+        base = "".join(c for c in unicodedata.normalize("NFD", caractere) if unicodedata.category(c) != "Mn")
+        if base != caractere:
+            tabela[codigo] = base
+    for codigo in range(0x300, 0x370):
+        tabela[codigo] = None
+    return tabela
+
+
+_TABELA_ACENTOS = _tabela_acentos()
+
+
+def remover_acentos(texto: str) -> str:
+    """Texto sem marcas diacríticas, igual a NFD sem as marcas Mn"""
+    if texto.isascii():
+        return texto
+    texto = texto.translate(_TABELA_ACENTOS)
+    if _FORA_DA_TABELA.search(texto):
+        texto_nfd = unicodedata.normalize("NFD", texto)
+        return "".join(c for c in texto_nfd if unicodedata.category(c) != "Mn")
+    return texto
+
+
+def normalizar(texto: str) -> str:
+    """Sem acentos (NFD sem marcas Mn) e em minúsculas"""
+    return remover_acentos(texto).lower()
+
+
+# Índice BM25 (tokens já sem acentos): as stopwords das consultas e as demais
+# palavras funcionais, para documento e consulta perderem as mesmas palavras
+STOPWORDS_BM25 = frozenset(normalizar(p) for p in STOPWORDS) | frozenset("""
+ao aos aquela aquelas aquele aqueles aquilo ate como dela delas dele deles depois ela elas ele
+eles entre era eram essa essas esse esses esta estas este estes eu foram ha isso isto ja la lhe
+lhes mais mas me mesmo meu minha muito nao nem nossa nosso num numa onde ou pela pelas pelo
+pelos quando se sem ser seu seus sua suas so tambem te tem tinha voce
+""".split())
+
+
+@dataclass(frozen=True)
+class AnaliseConsulta:
+    """Consulta analisada uma vez e compartilhada pelos caminhos de busca e RAG"""
+    normalizada: str
+    # Palavras sem pontuação e sem stopwords, com a caixa original
+    palavras: Tuple[str, ...]
+    # Palavras em minúsculas com mais de 2 letras (termos de boosting e filtros)
+    termos: Tuple[str, ...]
+    termos_normalizados: Tuple[str, ...]
+    # Consulta para o embedding; a original se só havia stopwords
+    texto_limpo: str
+    nomes_proprios: Tuple[str, ...]
+    # Termos normalizados como palavras inteiras (\b...\b); None sem termos
+    padrao_termos: Optional[Pattern]
+
+
+def _nomes_proprios(tokens: Sequence[str]) -> Tuple[str, ...]:
+    """Palavras com inicial maiúscula; a primeira só se não for interrogativa ou artigo"""
+    nomes = []
+    for i, palavra in enumerate(tokens):
+        if len(palavra) > 2 and palavra[0].isupper() and (i > 0 or palavra.lower() not in STOPWORDS_INICIO):
+            nomes.append(palavra)
+    return tuple(nomes)
+
+
+@lru_cache(maxsize=1024)
+def analisar_consulta(consulta: str, stopwords: FrozenSet[str] = STOPWORDS) -> AnaliseConsulta:
+    """Analisa a consulta (memoizado por consulta e conjunto de stopwords)"""
+    tokens = [_NAO_PALAVRA.sub("", palavra) for palavra in consulta.split()]
+    palavras = tuple(t for t in tokens if t and t.lower() not in stopwords)
+    termos = tuple(p.lower() for p in palavras if len(p) > 2)
+    termos_normalizados = tuple(normalizar(t) for t in termos)
+    padrao = None
+    if termos_normalizados:
+        padrao = re.compile(r"\b(?:" + "|".join(re.escape(t) for t in termos_normalizados) + r")\b")
+    return AnaliseConsulta(
+        normalizada=normalizar(consulta),
+        palavras=palavras,
+        termos=termos,
+        termos_normalizados=termos_normalizados,
+        texto_limpo=" ".join(palavras) or consulta,
+        nomes_proprios=_nomes_proprios([t for t in tokens if t]),
+        padrao_termos=padrao
+    )
+
+
+def campos_normalizados(titulo: str, conteudo: str) -> dict:
+    """Campos de payload com título e início do conteúdo já normalizados"""
+    return {
+        "title_norm": normalizar(titulo or ""),
+        "content_norm": normalizar((conteudo or "")[:PREFIXO_NORMALIZADO])
+    }
+
+
+def normalizar_payloads(pontos: Sequence[Any]) -> int:
+    """Acrescenta title_norm/content_norm aos pontos que têm o texto no payload"""
+    completados = 0
+    for ponto in pontos:
+        payload = ponto.payload
+        if payload and "content" in payload:
+            payload.update(campos_normalizados(payload.get("title", ""), payload["content"]))
+            completados += 1
+    return completados
+
+
+def normalizados(resultado: Any) -> Tuple[str, str]:
+    """(título, início do conteúdo) normalizados de um resultado de busca
+
+    Usa os campos gravados na ingestão; pontos antigos sem eles são normalizados aqui.
+    """
+    titulo = getattr(resultado, "title_norm", None)
+    if titulo is None:
+        titulo = normalizar(resultado.title or "")
+    conteudo = getattr(resultado, "content_norm", None)
+    if conteudo is None:
+        conteudo = normalizar((resultado.content or "")[:PREFIXO_NORMALIZADO])
+    return titulo, conteudo
@@ -4,34 +4,87 @@ Utilitários para Wikipedia Offline Service
 Classes auxiliares para processamento de texto, API Wikipedia e Qdrant
 """
 
+import os
+import asyncio
+import hashlib
 import logging
 import requests
 import time
 import uuid
-from typing import List, Dict, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+from .wikitext_utils import limpar_wikitext
+from .text_analysis import analisar_consulta
+from .dedup_utils import obter_registro_supressoes
+from .content_store import remover_conteudo
+
 logger = logging.getLogger(__name__)
 
+WIKIPEDIA_BASE_URL = os.getenv("WIKIPEDIA_API_BASE_URL", "https://pt.wikipedia.org").rstrip("/")
+
+# Namespace dos IDs determinísticos de chunks (uuid5)
+QDRANT_ID_NAMESPACE = uuid.UUID("6f1c2b0e-5d1a-4c8e-9a57-3f0b8e2d4c71")
+
+
+def _montar_artigo(titulo: str, summary_data: Dict, content: str, base_url: str) -> Dict:
+    """Monta o dicionário de artigo a partir do summary e do extract completo"""
+    if not content.strip():
+        # Fallback: se a Query API falhar, usar extract do summary
+        content = summary_data.get('extract', '')
+        logger.warning(f"⚠️ Usando apenas extract do summary para '{titulo}' ({len(content)} caracteres)")
+    titulo_encoded = titulo.replace(" ", "_")
+    return {
+        'title': summary_data.get('title', titulo),
+        'extract': summary_data.get('extract', ''),
+        'content': content,
+        'url': summary_data.get('content_urls', {}).get('desktop', {}).get('page', f'{base_url}/wiki/{titulo_encoded}'),
+        'description': summary_data.get('description', '')
+    }
+
+
+def _extrair_conteudo(parse_data: Dict) -> str:
+    """Extrai o texto da resposta de prop=extracts (vazio se a página não existe)"""
+    pages = parse_data.get('query', {}).get('pages', {})
+    for page_id, page_data in pages.items():
+        if page_id != '-1':  # -1 indica página não encontrada
+            content = page_data.get('extract', '')
+            logger.info(f"✅ Conteúdo completo obtido: {len(content)} caracteres")
+            return content
+        logger.warning(f"⚠️ Página não encontrada na Query API")
+    return ""
+
 
 class WikipediaAPIClient:
     """Cliente para Wikipedia API com múltiplos métodos de busca"""
     
-    def __init__(self):
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (base_url or WIKIPEDIA_BASE_URL).rstrip("/")
         self.headers = {
             'User-Agent': 'WikipediaOfflineRAG/2.0 (Educational project; Python/requests) Contact: github.com/ekotuja-AI',
             'Accept': 'application/json'
         }
         self.timeout = 10
+        # Sessão reaproveita conexões (keep-alive) entre chamadas
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
     
     def buscar_artigo_completo(self, titulo: str) -> Optional[Dict]:
-        """Busca artigo na Wikipedia API com conteúdo completo usando Parse API"""
+        """Busca artigo na Wikipedia API com conteúdo completo (summary + extracts)"""
         try:
             titulo_encoded = titulo.replace(" ", "_")
             
             # 1. Buscar summary para metadados
-            summary_url = f"https://pt.wikipedia.org/api/rest_v1/page/summary/{titulo_encoded}"
-            summary_response = requests.get(summary_url, headers=self.headers, timeout=self.timeout)
+            summary_url = f"{self.base_url}/api/rest_v1/page/summary/{titulo_encoded}"
+            summary_response = self.session.get(summary_url, timeout=self.timeout)
             
             if summary_response.status_code != 200:
                 logger.warning(f"⚠️ Summary API retornou status {summary_response.status_code} para '{titulo}'")
@@ -39,41 +92,271 @@ class WikipediaAPIClient:
             
             summary_data = summary_response.json()
             
-            # 2. Buscar conteúdo completo usando Parse API
-            parse_url = f"https://pt.wikipedia.org/w/api.php?action=query&format=json&prop=extracts&titles={titulo_encoded}&explaintext=1&exsectionformat=plain"
-            parse_response = requests.get(parse_url, headers=self.headers, timeout=self.timeout)
+            # 2. Buscar conteúdo completo
+            parse_response = self.session.get(
+                f"{self.base_url}/w/api.php",
+                params=WikipediaAsyncAPIClient.parametros_extract(titulo_encoded),
+                timeout=self.timeout
+            )
+            content = _extrair_conteudo(parse_response.json()) if parse_response.status_code == 200 else ""
             
-            content = ""
-            if parse_response.status_code == 200:
-                parse_data = parse_response.json()
-                pages = parse_data.get('query', {}).get('pages', {})
-                
-                # Pegar o primeiro (e único) resultado
-                for page_id, page_data in pages.items():
-                    if page_id != '-1':  # -1 indica página não encontrada
-                        content = page_data.get('extract', '')
-                        logger.info(f"✅ Conteúdo completo obtido: {len(content)} caracteres")
-                    else:
-                        logger.warning(f"⚠️ Página não encontrada na Parse API")
-            
-            # Fallback: se Parse API falhar, usar extract do summary
-            if not content.strip():
-                content = summary_data.get('extract', '')
-                logger.warning(f"⚠️ Usando apenas extract do summary para '{titulo}' ({len(content)} caracteres)")
-            
-            return {
-                'title': summary_data.get('title', titulo),
-                'extract': summary_data.get('extract', ''),
-                'content': content,
-                'url': summary_data.get('content_urls', {}).get('desktop', {}).get('page', f'https://pt.wikipedia.org/wiki/{titulo_encoded}'),
-                'description': summary_data.get('description', '')
-            }
+            return _montar_artigo(titulo, summary_data, content, self.base_url)
                 
         except Exception as e:
             logger.error(f"❌ Erro ao buscar artigo na Wikipedia: {e}", exc_info=True)
             return None
 
 
+class WikipediaAsyncAPIClient:
+    """Cliente assíncrono da Wikipedia API com pool de conexões e limite de concorrência
+
+    Um único httpx.AsyncClient (keep-alive) é compartilhado por todas as requisições;
+    um semáforo limita quantas ficam em voo. Respostas 429/503 com Retry-After (ou
+    cabeçalhos de rate limit zerados) pausam todas as requisições até a janela liberar.
+    """
+
+    STATUS_RETENTATIVA = (429, 503)
+    # Máximo de títulos por requisição da Query API (usuários sem apihighlimits)
+    LIMITE_TITULOS = 50
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_concorrencia: Optional[int] = None,
+        timeout: float = 10.0,
+        max_tentativas: int = 3,
+        espera_maxima: float = 60.0
+    ):
+        if not HTTPX_AVAILABLE:
+            raise RuntimeError("httpx é necessário para o cliente assíncrono da Wikipedia")
+        self.base_url = (base_url or WIKIPEDIA_BASE_URL).rstrip("/")
+        self.max_concorrencia = max(1, int(max_concorrencia or os.getenv("WIKIPEDIA_MAX_CONCURRENCY", "8")))
+        self.timeout = timeout
+        self.max_tentativas = max_tentativas
+        self.espera_maxima = espera_maxima
+        self.headers = {
+            'User-Agent': 'WikipediaOfflineRAG/2.0 (Educational project; Python/httpx) Contact: github.com/ekotuja-AI',
+            'Accept': 'application/json'
+        }
+        self.estatisticas = {"requisicoes": 0, "retentativas": 0, "pausas_rate_limit": 0}
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._pausa_ate = 0.0
+
+    async def __aenter__(self):
+        limites = httpx.Limits(
+            max_connections=self.max_concorrencia,
+            max_keepalive_connections=self.max_concorrencia
+        )
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url, headers=self.headers, timeout=self.timeout, limits=limites
+        )
+        self._semaforo = asyncio.Semaphore(self.max_concorrencia)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._client = None
+
+    @staticmethod
+    def parametros_extract(titulos: str) -> Dict[str, str]:
+        """Parâmetros da Query API para o texto completo (prop=extracts)"""
+        return {
+            'action': 'query', 'format': 'json', 'prop': 'extracts',
+            'titles': titulos, 'explaintext': '1', 'exsectionformat': 'plain'
+        }
+
+    @staticmethod
+    def parametros_lote(titulos: List[str]) -> Dict[str, str]:
+        """Parâmetros da Query API para vários títulos: wikitext atual, URL, descrição e redirecionamentos
+
+        prop=extracts devolve só um artigo completo por resposta, por isso o lote usa
+        prop=revisions (até 50 páginas por requisição) e limpa o wikitext localmente.
+        """
+        return {
+            'action': 'query', 'format': 'json', 'formatversion': '2',
+            'prop': 'revisions|info|description', 'rvprop': 'content', 'rvslots': 'main',
+            'inprop': 'url', 'redirects': '1', 'titles': '|'.join(titulos)
+        }
+
+    @staticmethod
+    def _segundos_retry_after(valor: Optional[str]) -> Optional[float]:
+        """Interpreta Retry-After em segundos ou como data HTTP"""
+        if not valor:
+            return None
+        try:
+            return max(0.0, float(valor))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _registrar_rate_limit(self, response: "httpx.Response"):
+        """Agenda uma pausa global quando a API pede para esperar"""
+        espera = None
+        if response.status_code in self.STATUS_RETENTATIVA:
+            espera = self._segundos_retry_after(response.headers.get("retry-after"))
+            if espera is None:
+                espera = 1.0
+        else:
+            restantes = response.headers.get("x-ratelimit-remaining") or response.headers.get("ratelimit-remaining")
+            if restantes is not None and restantes.strip() == "0":
+                reset = response.headers.get("x-ratelimit-reset") or response.headers.get("ratelimit-reset")
+                espera = self._segundos_retry_after(reset) if reset else 1.0
+        if espera is not None:
+            espera = min(espera, self.espera_maxima)
+            self._pausa_ate = max(self._pausa_ate, time.monotonic() + espera)
+            self.estatisticas["pausas_rate_limit"] += 1
+            logger.warning(f"⏳ Rate limit da Wikipedia: aguardando {espera:.1f}s")
+
+    async def _get(self, url: str, params: Optional[Dict[str, str]] = None) -> "httpx.Response":
+        """GET limitado pelo semáforo, respeitando pausas de rate limit e com retentativas"""
+        for tentativa in range(self.max_tentativas):
+            async with self._semaforo:
+                espera = self._pausa_ate - time.monotonic()
+                if espera > 0:
+                    await asyncio.sleep(espera)
+                response = await self._client.get(url, params=params)
+                self.estatisticas["requisicoes"] += 1
+                self._registrar_rate_limit(response)
+            if response.status_code not in self.STATUS_RETENTATIVA or tentativa == self.max_tentativas - 1:
+                return response
+            self.estatisticas["retentativas"] += 1
+        return response
+
+    async def buscar_artigo_completo(self, titulo: str) -> Optional[Dict]:
+        """Busca summary e texto completo de um artigo em paralelo"""
+        titulo_encoded = titulo.replace(" ", "_")
+        try:
+            summary_response, parse_response = await asyncio.gather(
+                self._get(f"/api/rest_v1/page/summary/{titulo_encoded}"),
+                self._get("/w/api.php", params=self.parametros_extract(titulo_encoded))
+            )
+            if summary_response.status_code != 200:
+                logger.warning(f"⚠️ Summary API retornou status {summary_response.status_code} para '{titulo}'")
+                return None
+            content = _extrair_conteudo(parse_response.json()) if parse_response.status_code == 200 else ""
+            return _montar_artigo(titulo, summary_response.json(), content, self.base_url)
+        except Exception as e:
+            logger.error(f"❌ Erro ao buscar artigo '{titulo}' na Wikipedia: {e}")
+            return None
+
+    async def buscar_artigos(self, titulos: List[str]) -> Dict[str, Optional[Dict]]:
+        """Busca vários artigos concorrentemente (None para os não encontrados)"""
+        unicos = list(dict.fromkeys(titulos))
+        artigos = await asyncio.gather(*(self.buscar_artigo_completo(t) for t in unicos))
+        return dict(zip(unicos, artigos))
+
+    async def _consultar_lote(self, titulos: List[str]) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+        """Consulta um grupo de títulos seguindo os tokens continue
+
+        Retorna as páginas por título canônico e o mapa de normalizações/redirecionamentos.
+        """
+        paginas: Dict[str, Dict] = {}
+        mapa: Dict[str, str] = {}
+        continuacao: Dict[str, str] = {}
+        while True:
+            response = await self._get("/w/api.php", params={**self.parametros_lote(titulos), **continuacao})
+            response.raise_for_status()
+            dados = response.json()
+            query = dados.get('query', {})
+            for item in query.get('normalized', []) + query.get('redirects', []):
+                mapa[item['from']] = item['to']
+            for pagina in query.get('pages', []):
+                # Respostas continuadas trazem a mesma página com propriedades diferentes
+                atual = paginas.setdefault(pagina['title'], {})
+                for chave, valor in pagina.items():
+                    atual.setdefault(chave, valor)
+            continuacao = dados.get('continue')
+            if not continuacao:
+                return paginas, mapa
+
+    @staticmethod
+    def _resolver_titulo(titulo: str, mapa: Dict[str, str]) -> str:
+        """Segue normalização e redirecionamentos até o título canônico"""
+        for _ in range(len(mapa) + 1):
+            if titulo not in mapa:
+                break
+            titulo = mapa[titulo]
+        return titulo
+
+    def _artigo_de_pagina(self, pagina: Dict, limpar_texto: Optional[Callable[[str], str]]) -> Optional[Dict]:
+        """Converte uma página da Query API no dicionário de artigo"""
+        if pagina.get('missing') or pagina.get('invalid') or not pagina.get('revisions'):
+            return None
+        wikitext = pagina['revisions'][0].get('slots', {}).get('main', {}).get('content', '')
+        content = (limpar_texto or limpar_wikitext)(wikitext)
+        extract = next((p.strip() for p in content.split("\n") if p.strip()), '')
+        titulo = pagina['title']
+        return {
+            'title': titulo,
+            'extract': extract,
+            'content': content,
+            'url': pagina.get('fullurl') or f"{self.base_url}/wiki/{titulo.replace(' ', '_')}",
+            'description': pagina.get('description', '')
+        }
+
+    async def buscar_artigos_lote(
+        self,
+        titulos: List[str],
+        limpar_texto: Optional[Callable[[str], str]] = None,
+        tamanho_lote: Optional[int] = None
+    ) -> Dict[str, Optional[Dict]]:
+        """Busca vários artigos com requisições titles=A|B|C (até 50 títulos cada)
+
+        Os grupos são consultados concorrentemente e o resultado é indexado pelo título
+        solicitado, mesmo quando a API o normaliza ou redireciona. O wikitext é
+        limpo com limpar_texto (padrão: wikitext_utils.limpar_wikitext).
+        """
+        tamanho_lote = min(tamanho_lote or self.LIMITE_TITULOS, self.LIMITE_TITULOS)
+        unicos = list(dict.fromkeys(titulos))
+        grupos = [unicos[i:i + tamanho_lote] for i in range(0, len(unicos), tamanho_lote)]
+        respostas = await asyncio.gather(*(self._consultar_lote(g) for g in grupos), return_exceptions=True)
+
+        resultado: Dict[str, Optional[Dict]] = {}
+        for grupo, resposta in zip(grupos, respostas):
+            if isinstance(resposta, Exception):
+                logger.error(f"❌ Erro ao buscar lote de {len(grupo)} artigos na Wikipedia: {resposta}")
+                resultado.update({titulo: None for titulo in grupo})
+                continue
+            paginas, mapa = resposta
+            for titulo in grupo:
+                pagina = paginas.get(self._resolver_titulo(titulo, mapa))
+                resultado[titulo] = self._artigo_de_pagina(pagina, limpar_texto) if pagina else None
+        encontrados = sum(1 for a in resultado.values() if a)
+        logger.info(f"✅ {encontrados}/{len(unicos)} artigos obtidos em {len(grupos)} lotes")
+        return resultado
+
+
+def buscar_artigos_concorrente(
+    titulos: List[str],
+    lote: bool = True,
+    limpar_texto: Optional[Callable[[str], str]] = None,
+    **kwargs
+) -> Dict[str, Optional[Dict]]:
+    """Versão síncrona da busca concorrente de artigos
+
+    Com lote=True usa WikipediaAsyncAPIClient.buscar_artigos_lote (titles=A|B|C);
+    com lote=False, uma busca summary + extracts por título. Funciona também quando
+    chamada de dentro de um event loop (ex.: endpoint async), executando a busca em
+    uma thread com loop próprio.
+    """
+    async def _buscar():
+        async with WikipediaAsyncAPIClient(**kwargs) as client:
+            if lote:
+                return await client.buscar_artigos_lote(titulos, limpar_texto=limpar_texto)
+            return await client.buscar_artigos(titulos)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_buscar())
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, _buscar()).result()
+
+
 class TextProcessor:
     """Processador de texto para chunking e limpeza"""
     
@@ -94,13 +377,16 @@ class TextProcessor:
         
         return chunks
     
+    @staticmethod
+    def calcular_hash_conteudo(texto: str) -> str:
+        """Hash do texto normalizado (espaços colapsados), usado para detectar mudanças"""
+        normalizado = " ".join((texto or "").split())
+        return hashlib.sha1(normalizado.encode("utf-8")).hexdigest()
+    
     @staticmethod
     def limpar_query(query: str) -> str:
         """Remove stopwords e normaliza query"""
-        stopwords = {'o', 'a', 'os', 'as', 'de', 'da', 'do', 'das', 'dos', 'em', 'no', 'na', 'é', 'que', 'qual', 'quais', 'quem', 'foi', 'são'}
-        palavras = query.lower().split()
-        palavras_limpas = [p for p in palavras if p not in stopwords and len(p) > 2]
-        return ' '.join(palavras_limpas)
+        return ' '.join(analisar_consulta(query).termos)
     
     @staticmethod
     def extrair_termos_query(query: str) -> List[str]:
@@ -121,9 +407,12 @@ class QdrantHelper:
             "url": chunk_data['url'],
             "chunk_index": chunk_data.get('chunk_index', 0),
             "total_chunks": chunk_data.get('total_chunks', 1),
-            "article_id": str(chunk_data.get('article_id', '')),
+            # Inteiro: o índice de payload de article_id é do tipo integer
+            "article_id": int(chunk_data['article_id']) if str(chunk_data.get('article_id', '')).isdigit() else 0,
             "timestamp": chunk_data.get('timestamp', time.strftime('%Y-%m-%d %H:%M:%S')),
-            "source": chunk_data.get('source', 'wikipedia_api')
+            "source": chunk_data.get('source', 'wikipedia_api'),
+            "content_hash": chunk_data.get('content_hash') or TextProcessor.calcular_hash_conteudo(chunk_data['content']),
+            "article_hash": chunk_data.get('article_hash', '')
         }
     
     @staticmethod
@@ -131,6 +420,101 @@ class QdrantHelper:
         """Gera ID único para ponto no Qdrant"""
         return str(uuid.uuid4())
     
+    @staticmethod
+    def gerar_id_deterministico(colecao: str, artigo: str, chunk_index: int) -> str:
+        """Gera ID estável para o chunk de um artigo: reingerir sobrescreve o mesmo ponto"""
+        return str(uuid.uuid5(QDRANT_ID_NAMESPACE, f"{colecao}\x1f{artigo}\x1f{int(chunk_index)}"))
+    
+    @staticmethod
+    def obter_pontos_existentes(client: Any, colecao: str, ids: List[str], com_vetores: bool = False) -> Dict[str, Any]:
+        """Retorna {id: ponto} dos IDs que já existem na coleção (vazio se a consulta falhar)"""
+        if not client or not ids:
+            return {}
+        try:
+            pontos = client.retrieve(
+                collection_name=colecao,
+                ids=list(dict.fromkeys(ids)),
+                with_payload=["content_hash", "article_hash", "total_chunks"],
+                with_vectors=com_vetores
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível consultar pontos existentes em '{colecao}': {e}")
+            return {}
+        return {str(p.id): p for p in pontos}
+    
+    @staticmethod
+    def classificar_chunks(existentes: Dict[str, Any], ids: List[str], content_hashes: List[str],
+                           article_hashes: List[str]) -> List[str]:
+        """Classifica cada chunk para ingestão incremental
+        
+        'inalterado': o artigo inteiro tem o mesmo hash (nada a gravar);
+        'reaproveitar': o chunk tem o mesmo hash (regrava com o vetor existente, sem embedding);
+        'novo': chunk novo ou alterado (precisa de embedding).
+        """
+        situacoes = []
+        for point_id, content_hash, article_hash in zip(ids, content_hashes, article_hashes):
+            payload = getattr(existentes.get(point_id), "payload", None) or {}
+            if article_hash and payload.get("article_hash") == article_hash and payload.get("content_hash") == content_hash:
+                situacoes.append("inalterado")
+            elif payload.get("content_hash") == content_hash:
+                situacoes.append("reaproveitar")
+            else:
+                situacoes.append("novo")
+        return situacoes
+    
+    @staticmethod
+    def remover_chunks_excedentes(client: Any, colecao: str, artigos: Dict[str, int],
+                                  ao_remover: Optional[Callable[[List[str]], None]] = None) -> int:
+        """Remove chunks de ingestões anteriores além da nova contagem de cada artigo
+        
+        artigos mapeia título -> nova quantidade de chunks. Como os IDs são determinísticos,
+        basta consultar o ponto do índice 'nova quantidade': se existir, seu total_chunks
+        indica até onde vão os chunks antigos (sem varrer a coleção com filtros). Se esse
+        chunk foi suprimido como quase-duplicata, o total vem do registro de supressões.
+        `ao_remover` recebe os ids removidos.
+        """
+        if not client or not artigos:
+            return 0
+        
+        ids_limite = {
+            QdrantHelper.gerar_id_deterministico(colecao, titulo, total): (titulo, total)
+            for titulo, total in artigos.items()
+        }
+        try:
+            existentes = client.retrieve(
+                collection_name=colecao,
+                ids=list(ids_limite),
+                with_payload=["total_chunks"],
+                with_vectors=False
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível verificar chunks excedentes em '{colecao}': {e}")
+            return 0
+        
+        totais_antigos = {str(p.id): int((p.payload or {}).get("total_chunks", ids_limite[str(p.id)][1] + 1)) for p in existentes}
+        registro = obter_registro_supressoes(colecao, criar=False)
+        if registro is not None:
+            totais_antigos.update(registro.totais([i for i in ids_limite if i not in totais_antigos]))
+        
+        ids_remover = []
+        for id_limite, total_antigo in totais_antigos.items():
+            titulo, total = ids_limite[id_limite]
+            ids_remover.extend(
+                QdrantHelper.gerar_id_deterministico(colecao, titulo, i)
+                for i in range(total, max(total_antigo, total + 1))
+            )
+        
+        if ids_remover:
+            client.delete(collection_name=colecao, points_selector=ids_remover)
+            remover_conteudo(colecao, ids_remover)
+            if registro is not None:
+                # Chunks suprimidos além do fim do artigo não existem mais
+                registro.esquecer(ids_remover)
+            if ao_remover is not None:
+                ao_remover(ids_remover)
+            logger.info(f"🧹 {len(ids_remover)} chunks excedentes removidos de '{colecao}'")
+        return len(ids_remover)
+    
     @staticmethod
     def criar_vetor_dummy(dimensoes: int = 384) -> List[float]:
         """Cria vetor dummy para compatibilidade"""
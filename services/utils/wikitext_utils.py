@@ -0,0 +1,176 @@
+"""
+Utilitários de wikitext
+
+Limpeza de marcação MediaWiki em uma única varredura. Um único regex separa os
+tokens de marcação do texto, que é copiado por fatias; predefinições e
+tabelas aninhadas são descartadas acompanhando a profundidade, links viram o texto
+exibido e categorias, arquivos e interwikis são removidos. Os parágrafos são
+preservados (separados por linha em branco) para o chunking por parágrafo.
+"""
+
+import re
+import html
+from typing import List
+
+# Conteúdo de tags descartado por inteiro (não é texto corrido)
+_TAGS_DESCARTADAS = "gallery|math|timeline|score|syntaxhighlight|source|imagemap|mapframe|graph|templatedata|chem"
+
+# Prefixos de links que não geram texto (em português e inglês)
+_PREFIXOS_DESCARTADOS = frozenset({
+    "categoria", "category", "ficheiro", "arquivo", "imagem", "file", "image", "media", "multimédia"
+})
+
+_MARCADORES_LISTA = frozenset("*#:;")
+
+_INTERWIKI = re.compile(r"[a-z]{2,3}(?:-[a-z]+)?$")
+
+# Um único regex separa o texto dos tokens de marcação (re.split, em C). Comentários,
+# <ref>, tags descartadas e links simples [[alvo|rótulo]] já saem como um token
+# inteiro; predefinições, tabelas e links aninhados são resolvidos pela máquina de
+# estados. Toda alternativa começa por um caractere literal, o que permite ao re
+# pular direto para o próximo candidato em vez de testar cada posição.
+_TOKENS = re.compile(
+    r"(\|"
+    r"|\[\[[^\[\]{}\n]*\]\]|\[\[|\]\]"
+    r"|''+"
+    r"|\{\{|\}\}|\{\||\n[ \t]*\|\}"
+    r"|<ref\b[^>]*?/>|<ref\b[^>]*>.*?(?:</ref\s*>|\Z)"
+    r"|<!--.*?(?:-->|\Z)"
+    r"|<(?:" + _TAGS_DESCARTADAS + r")\b[^>]*>.*?(?:</(?:" + _TAGS_DESCARTADAS + r")\s*>|\Z)"
+    r"|</?[A-Za-z][^>]*>"
+    r"|\[(?:https?:)?//[^\s\]]*[ \t]*[^\]\n]*\]"
+    r"|__[A-Z]+__)",
+    re.S
+)
+
+
+def _link_descartado(alvo: str) -> bool:
+    """Categorias, arquivos e interwikis não aparecem no texto"""
+    if alvo.startswith(":"):
+        return False
+    prefixo, separador, _ = alvo.partition(":")
+    if not separador:
+        return False
+    prefixo = prefixo.strip().lower()
+    return prefixo in _PREFIXOS_DESCARTADOS or bool(_INTERWIKI.match(prefixo))
+
+
+def _aberturas_sem_fechamento(partes: List[str]) -> set:
+    """Índices dos {{ / {| que nunca fecham (qualquer }} ou |} fecha a abertura mais recente)"""
+    pilha: List[int] = []
+    for j in range(1, len(partes), 2):
+        c = partes[j][0]
+        if c == "{":
+            pilha.append(j)
+        elif (c == "}" or c == "\n") and pilha:
+            pilha.pop()
+    return set(pilha)
+
+
+def _normalizar_espacos(texto: str) -> str:
+    """Colapsa espaços por linha e separa parágrafos com uma linha em branco"""
+    paragrafos: List[str] = []
+    atual: List[str] = []
+    for linha in texto.split("\n"):
+        linha = " ".join(linha.split())
+        if linha[:1] == "=" and linha[-1:] == "=":
+            linha = linha.strip("= ")  # == Título ==
+        elif linha[:1] in _MARCADORES_LISTA:
+            linha = linha.lstrip("*#:; ")
+        if linha:
+            atual.append(linha)
+        elif atual:
+            paragrafos.append("\n".join(atual))
+            atual = []
+    if atual:
+        paragrafos.append("\n".join(atual))
+    return "\n\n".join(paragrafos)
+
+
+def limpar_wikitext(wikitext: str) -> str:
+    """Remove marcação wiki e retorna texto limpo, em uma varredura linear
+
+    - {{predefinições}} e {| tabelas |} (inclusive aninhadas) são descartadas
+    - [[alvo|rótulo]] vira "rótulo"; [[alvo]] vira "alvo"
+    - [[Categoria:...]], [[Ficheiro:...]] e interwikis são removidos
+    - <ref>, comentários, tags HTML, ênfase ('' e ''') e marcadores de
+      títulos/listas são removidos; o texto de [url rótulo] é mantido
+    """
+    if not wikitext:
+        return ""
+
+    # Itens pares são texto, ímpares são tokens
+    partes = _TOKENS.split(wikitext)
+    total = len(partes)
+    # Predefinições sem fechamento, casadas antes em uma passada: o marcador é ignorado e
+    # o resto é processado normalmente (sem voltar à abertura e varrer de novo até o fim)
+    sem_fechamento = _aberturas_sem_fechamento(partes) if "{" in wikitext else ()
+    raiz: List[str] = []
+    # Pilha de links abertos: [partes do texto, alvo (definido no primeiro '|')]
+    links: List[list] = []
+    saida = raiz
+    profundidade = 0  # predefinições/tabelas abertas (conteúdo descartado)
+    i = 0
+
+    while i < total:
+        if profundidade == 0 and partes[i]:
+            saida.append(partes[i])
+        if i + 1 >= total:
+            i += 2
+            continue
+        token = partes[i + 1]
+        c = token[0]
+        i += 2
+
+        if profundidade:
+            if c == "{":
+                profundidade += 1
+            elif c == "}" or c == "\n":
+                profundidade -= 1
+            continue
+
+        if c == "[":
+            if token[1] != "[":
+                rotulo = token.find(" ")
+                if rotulo != -1:
+                    saida.append(token[rotulo + 1:-1])  # [url rótulo]
+            elif len(token) == 2:
+                links.append([[], None])
+                saida = links[-1][0]
+            else:
+                corpo = token[2:-2]
+                alvo, pipe, _ = corpo.partition("|")
+                if ":" not in alvo or not _link_descartado(alvo):
+                    saida.append(corpo.rpartition("|")[2] if pipe else alvo.lstrip(":"))
+        elif c == "{":
+            if i - 1 not in sem_fechamento:
+                profundidade = 1
+        elif c == "|":
+            if links:
+                if links[-1][1] is None:
+                    links[-1][1] = "".join(saida)
+                # O texto exibido é o que vem depois do último '|'
+                saida.clear()
+            else:
+                saida.append("|")
+        elif c == "]":
+            if not links:
+                continue
+            partes_link, alvo = links.pop()
+            texto_link = "".join(partes_link)
+            saida = links[-1][0] if links else raiz
+            if not _link_descartado(alvo if alvo is not None else texto_link):
+                saida.append(texto_link.lstrip(":") if alvo is None else texto_link)
+        elif c == "\n" or c == "}":
+            saida.append("\n")  # fechamento de tabela/predefinição sem abertura
+        # comentários, refs, tags, ênfase e palavras mágicas não são copiados
+
+    # Links sem fechamento: mantém o texto acumulado
+    while links:
+        partes_link, _ = links.pop()
+        (links[-1][0] if links else raiz).append("".join(partes_link))
+
+    texto = "".join(raiz)
+    if "&" in texto:
+        texto = html.unescape(texto)
+    return _normalizar_espacos(texto)
@@ -9,14 +9,26 @@ import os
 import xml.etree.ElementTree as ET
 import bz2
 import gzip
-import requests
 import logging
 from typing import Dict, List, Generator, Optional, Any
 from dataclasses import dataclass
 import time
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    from lxml import etree as lxml_etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+from .utils.checkpoint_utils import CheckpointStore
+from .utils.download_utils import baixar_arquivo
+from .utils.wikipedia_utils import TextProcessor
+from .utils.wikitext_utils import limpar_wikitext
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -27,6 +39,7 @@ class WikipediaArticle:
     id: int
     timestamp: str
     redirect: Optional[str] = None
+    stream_offset: Optional[int] = None  # Offset do stream bz2 (dumps multistream)
 
 @dataclass
 class DumpInfo:
@@ -38,6 +51,53 @@ class DumpInfo:
     size_mb: int
     filename: str
 
+@dataclass
+class MultistreamBlock:
+    """Stream bz2 independente de um dump multistream (cerca de 100 páginas)"""
+    offset: int
+    length: Optional[int]  # None = até o fim do arquivo
+    first_page_id: int
+    last_page_id: int
+    page_count: int
+
+
+# Processador usado dentro de cada processo de descompressão (criado sob demanda)
+_multistream_processor = None
+
+
+def _parse_multistream_block(filepath: str, offset: int, length: Optional[int],
+                             data_dir: str, min_content_length: int) -> List[WikipediaArticle]:
+    """Executado no pool: lê, descomprime e interpreta um único stream bz2"""
+    global _multistream_processor
+    if _multistream_processor is None or str(_multistream_processor.data_dir) != data_dir:
+        _multistream_processor = WikipediaDumpProcessor(data_dir=data_dir)
+    _multistream_processor.min_content_length = min_content_length
+    processor = _multistream_processor
+
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        raw = f.read(length) if length is not None else f.read()
+
+    # Cada stream é um membro bz2 completo; o decompressor para no fim do membro
+    xml = bz2.BZ2Decompressor().decompress(raw).decode('utf-8')
+
+    # O primeiro stream traz <mediawiki><siteinfo> e o último fecha </mediawiki>:
+    # mantemos apenas a sequência de <page>...</page>
+    start = xml.find('<page>')
+    end = xml.rfind('</page>')
+    if start == -1 or end == -1:
+        return []
+    root = ET.fromstring('<pages>' + xml[start:end + len('</page>')] + '</pages>')
+
+    articles = []
+    for page_elem in root.iter('page'):
+        article = processor._pagina_para_artigo(page_elem)
+        if article and processor._is_valid_article(article):
+            article.stream_offset = offset
+            articles.append(article)
+    return articles
+
+
 class WikipediaDumpProcessor:
     """Processador de dumps XML da Wikipedia"""
     
@@ -55,6 +115,11 @@ class WikipediaDumpProcessor:
         # Configurações de processamento
         self.batch_size = 1000  # Artigos por lote
         self.min_content_length = 50  # Tamanho mínimo do conteúdo (reduzido para teste)
+        # TokenChunker do modelo de embedding (None = parágrafos de até 1000 caracteres)
+        self.chunker = None
+        
+        # Checkpoints de ingestão (retomada sem reprocessar o início do dump)
+        self.checkpoints = CheckpointStore(self.data_dir / "ingestion_checkpoints.json")
         
     def get_available_dumps(self, language: str = 'pt') -> List[DumpInfo]:
         """Lista dumps disponíveis para download"""
@@ -127,21 +192,13 @@ class WikipediaDumpProcessor:
             logger.info(f"🔗 URL: {dump_info.url}")
             logger.info(f"📊 Tamanho estimado: {dump_info.size_mb} MB")
             
-            response = requests.get(dump_info.url, stream=True)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
+            def _progresso(baixados, total):
+                if progress_callback and total:
+                    progress_callback((baixados / total) * 100, baixados, total)
             
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        if progress_callback and total_size > 0:
-                            progress = (downloaded / total_size) * 100
-                            progress_callback(progress, downloaded, total_size)
+            # Segmentos paralelos, retomando um .part existente e conferindo o SHA-1 publicado
+            resultado = baixar_arquivo(dump_info.url, filepath, progresso=_progresso)
+            logger.info(f"⚡ {resultado['mb_por_segundo']} MB/s em {resultado['segmentos']} segmento(s)")
             
             logger.info(f"✅ Download concluído: {filepath}")
             return str(filepath)
@@ -150,8 +207,12 @@ class WikipediaDumpProcessor:
             logger.error(f"❌ Erro no download: {e}")
             raise
     
-    def parse_xml_dump(self, filepath: str) -> Generator[WikipediaArticle, None, None]:
-        """Parser XML eficiente para dumps da Wikipedia"""
+    def parse_xml_dump(self, filepath: str, usar_lxml: Optional[bool] = None) -> Generator[WikipediaArticle, None, None]:
+        """Parser XML eficiente para dumps da Wikipedia
+
+        Com lxml disponível (ou usar_lxml=True) usa _parse_xml_dump_lxml; o caminho
+        com xml.etree fica como fallback.
+        """
         try:
             logger.info(f"📖 Iniciando parsing: {filepath}")
             
@@ -163,6 +224,10 @@ class WikipediaDumpProcessor:
             file_size_mb = os.path.getsize(filepath) / (1024 * 1024)
             logger.info(f"📁 Tamanho do arquivo: {file_size_mb:.1f} MB")
             
+            if LXML_AVAILABLE if usar_lxml is None else usar_lxml:
+                yield from self._parse_xml_dump_lxml(filepath)
+                return
+            
             # Detectar tipo de compressão
             if filepath.endswith('.bz2'):
                 logger.info("🗜️ Descomprimindo arquivo BZ2...")
@@ -243,6 +308,187 @@ class WikipediaDumpProcessor:
             logger.error(f"📋 Stack trace: {traceback.format_exc()}")
             raise
     
+    def _parse_xml_dump_lxml(self, filepath: str) -> Generator[WikipediaArticle, None, None]:
+        """Itera as páginas com lxml.iterparse(tag=page), descartando cedo o que não é artigo
+
+        O namespace (<ns>) e a marca <redirect> são verificados antes de ler o texto, e
+        cada página processada é liberada junto com as irmãs anteriores, mantendo a
+        memória constante ao longo do dump.
+        """
+        if filepath.endswith('.bz2'):
+            file_obj = bz2.open(filepath, 'rb')
+        elif filepath.endswith('.gz'):
+            file_obj = gzip.open(filepath, 'rb')
+        else:
+            file_obj = open(filepath, 'rb')
+
+        estatisticas = {'paginas': 0, 'outros_namespaces': 0, 'redirecionamentos': 0, 'artigos': 0}
+        with file_obj as f:
+            for _, elem in lxml_etree.iterparse(f, events=('end',), tag='{*}page', huge_tree=True):
+                estatisticas['paginas'] += 1
+                try:
+                    ns = elem.findtext('{*}ns')
+                    if ns is not None and ns.strip() != '0':
+                        estatisticas['outros_namespaces'] += 1
+                        continue
+                    if elem.find('{*}redirect') is not None:
+                        estatisticas['redirecionamentos'] += 1
+                        continue
+                    article = self._pagina_para_artigo(elem)
+                    if article and self._is_valid_article(article):
+                        estatisticas['artigos'] += 1
+                        yield article
+                except Exception as e:
+                    logger.warning(f"⚠️ Erro ao processar página {estatisticas['paginas']}: {e}")
+                finally:
+                    # Libera a página e as irmãs já processadas (a raiz não acumula filhos)
+                    elem.clear(keep_tail=True)
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+
+        logger.info(
+            f"📊 Estatísticas finais: {estatisticas['paginas']} páginas, {estatisticas['artigos']} artigos válidos, "
+            f"{estatisticas['outros_namespaces']} de outros namespaces, {estatisticas['redirecionamentos']} redirecionamentos"
+        )
+
+    def find_multistream_index(self, filepath: str) -> Optional[str]:
+        """Localiza o índice de offsets de um dump multistream (ex.: *-multistream-index.txt.bz2)"""
+        path = Path(filepath)
+        if 'multistream' not in path.name or not path.name.endswith('.xml.bz2'):
+            return None
+        base = path.name[:-len('.xml.bz2')]
+        for candidate in (f"{base}-index.txt.bz2", f"{base}-index.txt"):
+            index_path = path.with_name(candidate)
+            if index_path.exists():
+                return str(index_path)
+        return None
+
+    def read_multistream_index(self, index_path: str) -> List[MultistreamBlock]:
+        """Lê o índice (linhas 'offset:page_id:título') e agrupa as páginas por stream"""
+        opener = bz2.open if index_path.endswith('.bz2') else open
+        blocks: List[MultistreamBlock] = []
+        current = None
+
+        with opener(index_path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split(':', 2)
+                if len(parts) < 2 or not parts[0].isdigit():
+                    continue
+                offset, page_id = int(parts[0]), int(parts[1])
+                if current is None or offset != current.offset:
+                    if current is not None:
+                        current.length = offset - current.offset
+                    current = MultistreamBlock(offset, None, page_id, page_id, 0)
+                    blocks.append(current)
+                current.first_page_id = min(current.first_page_id, page_id)
+                current.last_page_id = max(current.last_page_id, page_id)
+                current.page_count += 1
+
+        logger.info(f"🗂️ Índice multistream: {len(blocks)} streams, {sum(b.page_count for b in blocks)} páginas")
+        return blocks
+
+    def parse_multistream_dump(self, filepath: str, index_path: Optional[str] = None,
+                               workers: Optional[int] = None, min_page_id: Optional[int] = None,
+                               max_page_id: Optional[int] = None,
+                               start_offset: Optional[int] = None) -> Generator[WikipediaArticle, None, None]:
+        """Descomprime streams independentes em paralelo e gera os artigos na ordem do dump
+
+        Com min_page_id/max_page_id (ou start_offset), apenas os streams a partir do ponto
+        pedido são lidos (acesso aleatório via offsets do índice, sem percorrer o resto do arquivo).
+        """
+        index_path = index_path or self.find_multistream_index(filepath)
+        if not index_path:
+            raise FileNotFoundError(f"Índice multistream não encontrado para {filepath}")
+
+        blocks = [
+            b for b in self.read_multistream_index(index_path)
+            if (min_page_id is None or b.last_page_id >= min_page_id)
+            and (max_page_id is None or b.first_page_id <= max_page_id)
+            and (start_offset is None or b.offset >= start_offset)
+        ]
+        workers = workers or int(os.getenv("DUMP_DECOMPRESS_WORKERS", str(os.cpu_count() or 2)))
+        logger.info(f"🚀 Lendo {len(blocks)} streams de {filepath} com {workers} processos")
+
+        max_in_flight = max(2, workers * 2)
+        pending = deque()
+        articles_count = 0
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            block_iter = iter(blocks)
+            while True:
+                # Mantém um número limitado de streams em voo (memória previsível)
+                for block in block_iter:
+                    pending.append(executor.submit(
+                        _parse_multistream_block, str(filepath), block.offset, block.length,
+                        str(self.data_dir), self.min_content_length
+                    ))
+                    if len(pending) >= max_in_flight:
+                        break
+                if not pending:
+                    break
+                for article in pending.popleft().result():
+                    if min_page_id is not None and article.id < min_page_id:
+                        continue
+                    if max_page_id is not None and article.id > max_page_id:
+                        continue
+                    articles_count += 1
+                    yield article
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+            logger.info(f"✅ Multistream concluído: {articles_count} artigos válidos")
+
+    def iter_articles(self, filepath: str, min_page_id: Optional[int] = None,
+                      max_page_id: Optional[int] = None,
+                      start_offset: Optional[int] = None) -> Generator[WikipediaArticle, None, None]:
+        """Itera artigos usando o leitor paralelo quando há índice multistream, senão o parser sequencial
+
+        Sem índice não há acesso aleatório: start_offset é ignorado e o intervalo de page ids
+        é aplicado como filtro durante o parsing sequencial.
+        """
+        index_path = self.find_multistream_index(filepath)
+        if index_path:
+            yield from self.parse_multistream_dump(
+                filepath, index_path=index_path, min_page_id=min_page_id,
+                max_page_id=max_page_id, start_offset=start_offset
+            )
+            return
+
+        for article in self.parse_xml_dump(filepath):
+            if min_page_id is not None and article.id < min_page_id:
+                continue
+            if max_page_id is not None and article.id > max_page_id:
+                continue
+            yield article
+
+    def _pagina_para_artigo(self, page_elem) -> Optional[WikipediaArticle]:
+        """Extrai um artigo de um elemento <page> (lxml ou xml.etree) usando só filhos diretos
+
+        Páginas fora do namespace principal e redirecionamentos retornam None sem ler o texto.
+        """
+        ns = page_elem.findtext('{*}ns')
+        if ns is not None and ns.strip() != '0':
+            return None
+        if page_elem.find('{*}redirect') is not None:
+            return None
+        revision = page_elem.find('{*}revision')
+        if revision is None:
+            return None
+        title = page_elem.findtext('{*}title')
+        if not title:
+            return None
+        content = revision.findtext('{*}text') or ""
+        if content.lstrip()[:18].upper().startswith(('#REDIRECT', '#REDIRECIONAMENTO')):
+            return None
+        page_id = page_elem.findtext('{*}id')
+        return WikipediaArticle(
+            title=title,
+            content=content,
+            id=int(page_id) if page_id else 0,
+            timestamp=revision.findtext('{*}timestamp') or ""
+        )
+
     def _extract_article_from_element(self, page_elem, namespaces: Dict) -> Optional[WikipediaArticle]:
         """Extrai dados de um elemento page XML"""
         try:
@@ -346,30 +592,8 @@ class WikipediaDumpProcessor:
         return True
     
     def clean_wikitext(self, wikitext: str) -> str:
-        """Remove marcação wiki e retorna texto limpo"""
-        # Remove templates {{...}}
-        text = re.sub(r'\{\{[^}]*\}\}', '', wikitext)
-        
-        # Remove links [[...]]
-        text = re.sub(r'\[\[([^|\]]*\|)?([^\]]*)\]\]', r'\2', text)
-        
-        # Remove referências <ref>...</ref>
-        text = re.sub(r'<ref[^>]*>.*?</ref>', '', text, flags=re.DOTALL)
-        text = re.sub(r'<ref[^>]*/?>', '', text)
-        
-        # Remove outros elementos HTML
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        # Remove categorias
-        text = re.sub(r'\[\[Categoria:.*?\]\]', '', text)
-        
-        # Remove múltiplas quebras de linha
-        text = re.sub(r'\n+', '\n', text)
-        
-        # Remove espaços extras
-        text = re.sub(r' +', ' ', text)
-        
-        return text.strip()
+        """Remove marcação wiki e retorna texto limpo (ver utils.wikitext_utils)"""
+        return limpar_wikitext(wikitext)
     
     def process_dump_to_chunks(self, filepath: str, max_articles: int = None) -> Generator[Dict, None, None]:
         """Processa dump e gera chunks prontos para ingestão"""
@@ -388,25 +612,13 @@ class WikipediaDumpProcessor:
                     logger.info(f"🛑 Limite de {max_articles} artigos atingido")
                     break
                 try:
-                    # Limpar conteúdo
-                    clean_content = self.clean_wikitext(article.content)
-                    if len(clean_content) < self.min_content_length:
-                        logger.info(f"⏭️ Artigo descartado: '{article.title}' ({len(clean_content)} chars)")
+                    chunks = self.article_to_chunks(article)
+                    if not chunks:
+                        logger.info(f"⏭️ Artigo descartado: '{article.title}'")
                         continue
-                    # Dividir em chunks
-                    chunks = self._split_into_chunks(clean_content)
                     logger.info(f"🧩 Artigo '{article.title}' gerou {len(chunks)} chunks")
-                    for i, chunk in enumerate(chunks):
-                        yield {
-                            'title': article.title,
-                            'content': chunk,
-                            'url': f"https://pt.wikipedia.org/wiki/{article.title.replace(' ', '_')}",
-                            'chunk_index': i,
-                            'total_chunks': len(chunks),
-                            'article_id': article.id,
-                            'timestamp': article.timestamp,
-                            'source': 'wikipedia_dump'
-                        }
+                    for chunk in chunks:
+                        yield chunk
                     
                     processed += 1
                     
@@ -440,6 +652,31 @@ class WikipediaDumpProcessor:
                 except Exception as debug_e:
                     logger.error(f"🔍 Erro no debug: {debug_e}")
     
+    def article_to_chunks(self, article: WikipediaArticle) -> List[Dict]:
+        """Limpa o wikitext de um artigo e gera os dicts de chunk prontos para ingestão"""
+        clean_content = self.clean_wikitext(article.content)
+        if len(clean_content) < self.min_content_length:
+            return []
+        chunks = self.chunker.dividir(clean_content) if self.chunker is not None else self._split_into_chunks(clean_content)
+        if not chunks:
+            return []
+        article_hash = TextProcessor.calcular_hash_conteudo(article.content)
+        return [
+            {
+                'title': article.title,
+                'content': chunk,
+                'url': f"https://pt.wikipedia.org/wiki/{article.title.replace(' ', '_')}",
+                'chunk_index': i,
+                'total_chunks': len(chunks),
+                'article_id': article.id,
+                'timestamp': article.timestamp,
+                'source': 'wikipedia_dump',
+                'content_hash': TextProcessor.calcular_hash_conteudo(chunk),
+                'article_hash': article_hash
+            }
+            for i, chunk in enumerate(chunks)
+        ]
+    
     def _split_into_chunks(self, text: str, max_chunk_size: int = 1000) -> List[str]:
         """Divide texto em chunks por parágrafos"""
         # Dividir por parágrafos duplos
@@ -9,7 +9,6 @@ import os
 import time
 import logging
 import requests
-import uuid
 import datetime
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
@@ -22,15 +21,23 @@ from .langchainWikipediaService import langchain_wikipedia_service, WikipediaDoc
 # Utilitários
 from .utils.wikipedia_utils import (
     WikipediaAPIClient,
+    HTTPX_AVAILABLE,
+    buscar_artigos_concorrente,
     TextProcessor,
     QdrantHelper,
     WikipediaDataValidator,
     MetricsCollector
 )
+from .utils.qdrant_writer import QdrantBatchWriter, preparar_pontos
+from .utils.qdrant_factory import obter_cliente_qdrant
+from .utils.storage_profiles import obter_perfil, configuracao_colecao
+from .utils.content_store import preencher_conteudo
+from .utils.payload_indexes import criar_indices
+from .utils.sparse_utils import VETOR_ESPARSO, colecao_hibrida, vetor_esparso_consulta
+from .utils.text_analysis import STOPWORDS_PERGUNTA, analisar_consulta, normalizados
 from api.telemetria_ws import enviar_telemetria
 
 try:
-    from qdrant_client import QdrantClient
     from qdrant_client.http import models
     from qdrant_client.models import PointStruct
     QDRANT_AVAILABLE = True
@@ -55,6 +62,9 @@ class SearchResult:
     score: float
     categories: List[str] = None
     chunk_info: Dict[str, Any] = None
+    # Título e início do conteúdo sem acentos e em minúsculas (gravados na ingestão)
+    title_norm: Optional[str] = None
+    content_norm: Optional[str] = None
 
     def __post_init__(self):
         if self.categories is None:
@@ -94,6 +104,8 @@ class WikipediaOfflineService:
         self.qdrant_helper = QdrantHelper()
         self.validator = WikipediaDataValidator()
         self.metrics = MetricsCollector()
+        # Escritores de pontos por coleção (upserts em voo entre lotes de chunks)
+        self._escritores: Dict[str, QdrantBatchWriter] = {}
         
     def inicializar(self):
         """Inicializa todos os componentes"""
@@ -126,13 +138,11 @@ class WikipediaOfflineService:
             logger.warning("⚠️ Qdrant não disponível")
             return
             
-        host = os.getenv("QDRANT_HOST", "localhost")
-        port = int(os.getenv("QDRANT_PORT", "6333"))
-        
         try:
-            self.client = QdrantClient(host=host, port=port)
+            # Mesmo cliente do serviço LangChain (REST ou gRPC conforme QDRANT_PREFER_GRPC)
+            self.client = obter_cliente_qdrant()
             self.client.get_collections()
-            logger.info(f"✅ Conectado ao Qdrant em {host}:{port}")
+            logger.info("✅ Conectado ao Qdrant")
         except Exception as e:
             logger.warning(f"⚠️ Erro ao conectar ao Qdrant: {e}")
             self.client = None
@@ -151,11 +161,10 @@ class WikipediaOfflineService:
                 
                 self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=models.VectorParams(
-                        size=384,  # Dimensão do SentenceTransformers
-                        distance=models.Distance.COSINE
-                    )
+                    # Dimensão do SentenceTransformers; armazenamento pelo QDRANT_STORAGE_PROFILE
+                    **configuracao_colecao(obter_perfil(), 384)
                 )
+                criar_indices(self.client, self.collection_name)
                 logger.info(f"✅ Coleção {self.collection_name} criada")
             else:
                 logger.info(f"✅ Coleção {self.collection_name} já existe")
@@ -187,8 +196,12 @@ class WikipediaOfflineService:
         except Exception as e:
             logger.warning(f"⚠️ Erro ao conectar com Ollama: {e}")
     
-    def adicionar_artigo_wikipedia(self, titulo: str, colecao: str = None) -> int:
-        """Adiciona artigo da Wikipedia ao banco vetorial usando LangChain na coleção especificada"""
+    def adicionar_artigo_wikipedia(self, titulo: str, colecao: str = None, incremental: bool = False) -> int:
+        """Adiciona artigo da Wikipedia ao banco vetorial usando LangChain na coleção especificada
+
+        Com incremental=True, um artigo cujo conteúdo não mudou é ignorado e apenas os
+        chunks alterados são reprocessados.
+        """
         try:
             if not self._initialized:
                 logger.error("❌ Serviço não inicializado")
@@ -226,7 +239,7 @@ class WikipediaOfflineService:
             )
             
             # Ingerir usando LangChain service
-            chunks_criados = langchain_wikipedia_service.ingerir_documentos([documento],colecao=colecao)
+            chunks_criados = langchain_wikipedia_service.ingerir_documentos([documento], colecao=colecao, incremental=incremental)
             logger.info(f"✅ {chunks_criados} chunks criados com LangChain para '{titulo}'")
             
             # Registrar métrica
@@ -241,55 +254,39 @@ class WikipediaOfflineService:
             logger.error(f"❌ Erro ao adicionar artigo '{titulo}': {e}")
             return 0
     
-    def adicionar_artigos_com_langchain(self, titulos: List[str]) -> Dict[str, int]:
-        """Adiciona múltiplos artigos usando pipeline LangChain"""
+    def adicionar_artigos_com_langchain(self, titulos: List[str], colecao: str = None, incremental: bool = False) -> Dict[str, int]:
+        """Adiciona múltiplos artigos usando pipeline LangChain
+
+        Os artigos são buscados concorrentemente (pool de conexões) e ingeridos em uma
+        única chamada, para que os embeddings sejam gerados em lotes. Retorna o número
+        de chunks por título solicitado (0 para não encontrados).
+        """
+        resultados = {titulo: 0 for titulo in titulos}
         try:
-            logger.info(f"🔗 Processando {len(titulos)} artigos com LangChain")
-            logger.info("📥#################################### Iniciando ingestão de múltiplos artigos com LangChain")
-            
+            if not self._initialized:
+                logger.error("❌ Serviço não inicializado")
+                raise Exception("Serviço não inicializado")
+
+            colecao = colecao or self.collection_name
+            logger.info(f"🔗 Processando {len(titulos)} artigos com LangChain na coleção '{colecao}'")
+
+            # Buscar todos os artigos em paralelo
+            artigos = self._buscar_artigos_wikipedia(titulos)
+
             documentos = []
-            resultados = {}
-            
-            # Buscar todos os artigos
-            for titulo in titulos:
-                logger.info(f"📖 Buscando: {titulo}")
-                artigo = self._buscar_artigo_wikipedia(titulo)
-                
-                if artigo:
-                    documento = WikipediaDocument(
-                        title=artigo['title'],
-                        content=artigo['content'], 
-                        url=artigo['url'],
-                        metadata={
-                            'source': 'wikipedia_api',
-                            'language': 'pt',
-                            'processed_at': time.strftime('%Y-%m-%d %H:%M:%S')
-                        }
-                    )
-                    documentos.append(documento)
-                    resultados[titulo] = 0  # Será atualizado depois
-                else:
-                    logger.warning(f"⚠️ Artigo não encontrado: {titulo}")
-                    resultados[titulo] = 0
-            
-            try:
-                if not self._initialized:
-                    logger.error("❌ Serviço não inicializado")
-                    raise Exception("Serviço não inicializado")
-                # Buscar artigo na Wikipedia
-                logger.info(f"📖 Buscando artigo: {titulo}")
-                artigo = self._buscar_artigo_wikipedia(titulo)
+            titulo_documento = {}
+            for titulo in resultados:
+                artigo = artigos.get(titulo)
                 if not artigo:
-                    logger.warning(f"⚠️ Artigo '{titulo}' não encontrado")
-                    return 0
-                # Validar artigo
+                    logger.warning(f"⚠️ Artigo não encontrado: {titulo}")
+                    continue
                 if not self.validator.validar_artigo(artigo):
                     logger.warning(f"⚠️ Artigo '{titulo}' não passou na validação")
-                    return 0
-                logger.info(f"✅ Artigo encontrado: {artigo['title']}, extract length: {len(artigo.get('extract', ''))}, content length: {len(artigo.get('content', ''))}")
-                # Usar LangChain para processamento
-                logger.info(f"🔗 Processando com LangChain: {titulo}")
-                documento = WikipediaDocument(
+                    continue
+                titulo_documento[titulo] = artigo['title']
+                if any(doc.title == artigo['title'] for doc in documentos):
+                    continue  # redirecionamentos para o mesmo artigo
+                documentos.append(WikipediaDocument(
                     title=artigo['title'],
                     content=artigo['content'],
                     url=artigo['url'],
@@ -298,32 +295,33 @@ class WikipediaOfflineService:
                         'language': 'pt',
                         'processed_at': time.strftime('%Y-%m-%d %H:%M:%S')
                     }
-                )
-                # Patch: set LangChain service collection if provided
-                selected_colecao = colecao if colecao else self.collection_name
-                if hasattr(langchain_wikipedia_service, 'collection_name'):
-                    langchain_wikipedia_service.collection_name = selected_colecao
-                chunks_criados = langchain_wikipedia_service.ingerir_documentos([documento])
-                logger.info(f"✅ {chunks_criados} chunks criados com LangChain para '{titulo}' na coleção '{selected_colecao}'")
-                # Registrar métrica
-                self.metrics.record_article_processed(chunks_criados)
-                # Também adicionar ao sistema legado para compatibilidade
-                chunks_legado = self._processar_e_armazenar_artigo(artigo, colecao=selected_colecao)
-                return chunks_criados
-            except Exception as e:
-                logger.error(f"❌ Erro ao adicionar artigo '{titulo}': {e}")
-                return 0
-            # Inserir no Qdrant
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=[point]
+                ))
+
+            if not documentos:
+                return resultados
+
+            # Contagem desta chamada (ultima_ingestao é compartilhado pelos jobs concorrentes)
+            chunks_por_artigo: Dict[str, int] = {}
+            langchain_wikipedia_service.ingerir_documentos(
+                documentos, colecao=colecao, incremental=incremental, contagem=chunks_por_artigo
             )
-            
-            return True
-            
+            for titulo, titulo_doc in titulo_documento.items():
+                resultados[titulo] = chunks_por_artigo.get(titulo_doc, 0)
+            for doc in documentos:
+                self.metrics.record_article_processed(chunks_por_artigo.get(doc.title, 0))
+
+            logger.info(f"✅ {sum(resultados.values())} chunks criados com LangChain para {len(documentos)} artigos")
+            return resultados
+
         except Exception as e:
-            logger.error(f"❌ Erro ao adicionar chunk: {e}")
-            return False
+            logger.error(f"❌ Erro ao adicionar artigos com LangChain: {e}")
+            return resultados
+    
+    def _buscar_artigos_wikipedia(self, titulos: List[str]) -> Dict[str, Optional[Dict]]:
+        """Busca vários artigos em lotes de até 50 títulos; sem httpx, cai para buscas sequenciais"""
+        if HTTPX_AVAILABLE:
+            return buscar_artigos_concorrente(titulos, base_url=self.api_client.base_url)
+        return {titulo: self._buscar_artigo_wikipedia(titulo) for titulo in dict.fromkeys(titulos)}
     
     def _buscar_artigo_wikipedia(self, titulo: str) -> Optional[Dict]:
         """Busca artigo na Wikipedia API com conteúdo completo - delegado ao WikipediaAPIClient"""
@@ -361,8 +359,8 @@ class WikipediaOfflineService:
                     continue
                 # Vetor fake com dimensão correta
                 vector = [0.1] * int(vector_dim)
-                # Gerar ID único como UUID
-                point_id = str(uuid.uuid4())
+                # ID determinístico: reprocessar o artigo sobrescreve os mesmos pontos
+                point_id = self.qdrant_helper.gerar_id_deterministico(collection_name, artigo.get('title', ''), i)
                 point = models.PointStruct(
                     id=point_id,
                     vector=vector,
@@ -373,16 +371,21 @@ class WikipediaOfflineService:
                         "chunk_index": i,
                         "total_chunks": len(chunks),
                         "description": artigo.get('description', ''),
-                        "source": "wikipedia"
+                        "source": "wikipedia",
+                        "content_hash": TextProcessor.calcular_hash_conteudo(chunk)
                     }
                 )
                 points.append(point)
             if points:
                 try:
+                    preparar_pontos(self.client, collection_name, points)
                     self.client.upsert(
                         collection_name=collection_name,
                         points=points
                     )
+                    self.qdrant_helper.remover_chunks_excedentes(
+                        self.client, collection_name, {artigo.get('title', ''): len(chunks)}
+                    )
                 except Exception as e:
                     logger.error(f"❌ Erro ao inserir pontos no Qdrant: {e}")
                     return 0
@@ -469,6 +472,17 @@ class WikipediaOfflineService:
                     logger.info(f"📋 Busca por title encontrou {len(search_results[0])} resultados")
                 except Exception as e:
                     logger.warning(f"⚠️ Erro na busca por title: {e}")
+            if (not search_results or len(search_results[0]) == 0) and colecao_hibrida(self.client, collection_name):
+                try:
+                    # Coleção híbrida: BM25 indexado no lugar da varredura manual
+                    pontos = self.client.query_points(
+                        collection_name=collection_name, query=vetor_esparso_consulta(query),
+                        using=VETOR_ESPARSO, limit=limit, with_payload=True
+                    ).points
+                    search_results = (pontos, None)
+                    logger.info(f"🔤 Busca BM25 encontrou {len(pontos)} resultados")
+                except Exception as e:
+                    logger.warning(f"⚠️ Erro na busca BM25: {e}")
             if not search_results or len(search_results[0]) == 0:
                 logger.info("🔄 Tentando busca manual em todos os documentos...")
                 try:
@@ -478,6 +492,7 @@ class WikipediaOfflineService:
                         with_payload=True
                     )
                     logger.info(f"📚 Encontrou {len(all_results[0])} documentos totais")
+                    preencher_conteudo(collection_name, all_results[0])
                     filtered_results = []
                     for hit in all_results[0]:
                         content = hit.payload.get("content", "").lower()
@@ -498,6 +513,7 @@ class WikipediaOfflineService:
                     search_results = ([], None)
             artigo_dict = {}
             if search_results and len(search_results[0]) > 0:
+                preencher_conteudo(collection_name, search_results[0])
                 for hit in search_results[0]:
                     content = hit.payload.get("content", "")
                     title = hit.payload.get("title", "")
@@ -519,7 +535,9 @@ class WikipediaOfflineService:
                                 "chunk_index": hit.payload.get("chunk_index", 0),
                                 "total_chunks": hit.payload.get("total_chunks", 1),
                                 "source": hit.payload.get("source", "unknown")
-                            }
+                            },
+                            title_norm=hit.payload.get("title_norm"),
+                            content_norm=hit.payload.get("content_norm")
                         )
                 resultados_unificados = list(artigo_dict.values())
                 resultados_unificados = sorted(resultados_unificados, key=lambda x: x.score, reverse=True)[:limit]
@@ -547,7 +565,9 @@ class WikipediaOfflineService:
                             "chunk_index": hit.payload.get("chunk_index", 0),
                             "total_chunks": hit.payload.get("total_chunks", 1),
                             "source": hit.payload.get("source", "unknown")
-                        }
+                        },
+                        title_norm=hit.payload.get("title_norm"),
+                        content_norm=hit.payload.get("content_norm")
                     )
                     results.append(result)
                 logger.info(f"✅ Retornando {len(results)} resultados reais")
@@ -725,18 +745,21 @@ class WikipediaOfflineService:
                 MIN_SIMILARITY_SCORE = 0.08
                 logger.warning(f"Erro ao verificar tamanho da base: {e}")
             
+            # Coleção híbrida: o score é o do RRF (posição nas pernas densa e BM25), não a
+            # similaridade de cosseno; os cortes calibrados por cosseno não se aplicam e a
+            # relevância fica com a verificação de termos
+            scores_rrf = bool(self.client) and colecao_hibrida(self.client, colecao or self.collection_name)
+            if scores_rrf:
+                logger.info("🔀 Coleção híbrida: scores do RRF, sem threshold de similaridade")
+            
             # Estratégia 1: Aplicar boosting para matches exatos no título ANTES de filtrar
             await asyncio.sleep(0.5)
-            import re
-            stopwords = ['o', 'que', 'é', 'a', 'de', 'da', 'do', 'um', 'uma', 'os', 'as', 'para', 'com', 'por']
-            termos_pergunta = [re.sub(r'[^w\s]', '', t.lower()) for t in pergunta.split() if t.lower() not in stopwords]
-            termos_pergunta = [t for t in termos_pergunta if len(t) > 2]  # Filtrar termos muito curtos
-            # Se não sobrou nenhum termo, tenta pegar a última palavra relevante (ex: 'Jakarta' em 'o que é Jakarta?')
-            if not termos_pergunta:
-                palavras = [re.sub(r'[^w\s]', '', t.lower()) for t in pergunta.split() if t.lower() not in stopwords]
-                palavras = [t for t in palavras if t]
-                if palavras:
-                    termos_pergunta = [palavras[-1]]
+            # Pergunta analisada uma vez (memoizada) para o boosting e a verificação de termos
+            analise = analisar_consulta(pergunta, STOPWORDS_PERGUNTA)
+            termos_pergunta = list(analise.termos)  # Sem pontuação, stopwords e termos muito curtos
+            # Se não sobrou nenhum termo, tenta pegar a última palavra relevante (ex: 'RJ' em 'o que é RJ?')
+            if not termos_pergunta and analise.palavras:
+                termos_pergunta = [analise.palavras[-1].lower()]
             # Aplicar boosting de 3x para matches exatos no título
             titulos_pergunta = [t for t in termos_pergunta]
             for doc in documentos:
@@ -749,31 +772,17 @@ class WikipediaOfflineService:
             # Reordenar documentos após boosting
             documentos = sorted(documentos, key=lambda x: x.score, reverse=True)
             # Filtrar por score mínimo de similaridade OU inclusão forçada
-            documentos_relevantes = [doc for doc in documentos if doc.score >= MIN_SIMILARITY_SCORE or getattr(doc, '_force_include', False)]
+            documentos_relevantes = [doc for doc in documentos if scores_rrf or doc.score >= MIN_SIMILARITY_SCORE or getattr(doc, '_force_include', False)]
             logger.warning(f"📊 Após filtro de score ({MIN_SIMILARITY_SCORE}): {len(documentos_relevantes)} docs - {[(d.title, round(d.score, 4)) for d in documentos_relevantes]}")
             
             # Estratégia 2: Verificar se termos da pergunta aparecem no título ou conteúdo
             # SEMPRE verificar termos exatos para evitar respostas inventadas
             if documentos_relevantes:
-                # Extrair termos principais da pergunta (remover palavras comuns e caracteres especiais)
-                import re
-                import unicodedata
-                
+                # Termos principais da pergunta (sem palavras comuns e caracteres especiais)
                 await enviar_telemetria("Extrair termos principais da pergunta (remover palavras comuns e caracteres especiais")
                 await asyncio.sleep(0.5)
-
-                def normalizar_texto(texto):
-                    """Remove acentos e normaliza texto para comparação"""
-                    # Normalizar unicode (NFD = decompor caracteres com acentos)
-                    texto_nfd = unicodedata.normalize('NFD', texto)
-                    # Remover marcas diacríticas (acentos)
-                    texto_sem_acento = ''.join(c for c in texto_nfd if unicodedata.category(c) != 'Mn')
-                    return texto_sem_acento.lower()
                 
-                stopwords = ['o', 'que', 'é', 'a', 'de', 'da', 'do', 'um', 'uma', 'os', 'as', 'para', 'com', 'por', 'onde', 'fica', 'qual', 'sobre', 'sabe', 'vc', 'você', 'me', 'diz', 'fala']
-                # Remover pontuação e caracteres especiais, manter apenas letras e números
-                termos_pergunta = [re.sub(r'[^\w\s]', '', t.lower()) for t in pergunta.split() if t.lower() not in stopwords]
-                termos_pergunta = [t for t in termos_pergunta if len(t) > 2]  # Filtrar termos muito curtos
+                termos_pergunta = list(analise.termos)
                 
                 if not termos_pergunta:
                     # Se não há termos válidos, aceitar os documentos com score alto
@@ -782,32 +791,26 @@ class WikipediaOfflineService:
                     # Verificar se pelo menos um termo aparece no título ou conteúdo
                     docs_com_termo_exato = []
                     docs_score_alto = []  # Documentos com score alto mesmo sem match exato
+                    # Termos como palavras inteiras (\b) em um padrão compilado na análise da pergunta
+                    padrao_termos = analise.padrao_termos
+                    pergunta_normalizada = analise.normalizada
                     logger.warning(f"🔄 Iniciando verificação de {len(documentos_relevantes)} documentos")
                     for doc in documentos_relevantes:
                         logger.warning(f"  🔎 Verificando documento: '{doc.title}' (score: {doc.score})")
-                        titulo_normalizado = normalizar_texto(doc.title)
-                        conteudo_normalizado = normalizar_texto(doc.content)
+                        # Título e início do conteúdo normalizados na ingestão
+                        titulo_normalizado, conteudo_normalizado = normalizados(doc)
                         
-                        # Verificar com word boundaries para evitar falsos positivos
-                        tem_termo = False
-                        for termo in termos_pergunta:
-                            termo_normalizado = normalizar_texto(termo)
-                            # Usar word boundaries (\b) para matches exatos de palavras
-                            pattern = r'\b' + re.escape(termo_normalizado) + r'\b'
-                            if re.search(pattern, titulo_normalizado) or re.search(pattern, conteudo_normalizado):
-                                tem_termo = True
-                                break
+                        tem_termo = bool(padrao_termos.search(titulo_normalizado) or padrao_termos.search(conteudo_normalizado))
                         
                         # Verificação adicional: se título aparece na pergunta (match reverso)
                         titulo_palavras = [p for p in titulo_normalizado.split() if len(p) > 2]
-                        pergunta_normalizada = normalizar_texto(pergunta)
                         titulo_na_pergunta = any(palavra in pergunta_normalizada for palavra in titulo_palavras)
                         
                         if tem_termo or titulo_na_pergunta:
                             docs_com_termo_exato.append(doc)
                             razao = "termos" if tem_termo else "título na pergunta"
                             logger.warning(f"✅ Documento '{doc.title}' aceito ({razao}): {termos_pergunta}")
-                        elif doc.score > 0.60:  # Score MUITO alto (60%+), aceitar mesmo sem match exato
+                        elif not scores_rrf and doc.score > 0.60:  # Score MUITO alto (60%+), aceitar mesmo sem match exato
                             docs_score_alto.append(doc)
                             logger.warning(f"✅ Documento '{doc.title}' aceito (score muito alto: {doc.score:.4f})")
                         else:
@@ -1121,6 +1124,11 @@ class WikipediaOfflineService:
                 if offset is None:
                     break
             # Agrupar por título e pegar informações únicas
+            # (texto no content store: só o início do primeiro chunk de cada artigo é lido)
+            primeiros = {}
+            for point in all_points:
+                primeiros.setdefault(point.payload.get('title', 'Sem título'), point)
+            preencher_conteudo(collection_name, list(primeiros.values()), max_chars=200)
             artigos_dict = {}
             for point in all_points:
                 title = point.payload.get('title', 'Sem título')
@@ -1156,6 +1164,7 @@ class WikipediaOfflineService:
             # Deletar e recriar a coleção
             try:
                 self.client.delete_collection(self.collection_name)
+                langchain_wikipedia_service.esquecer_colecao(self.collection_name)
                 logger.info(f"🗑️ Coleção {self.collection_name} removida")
             except Exception:
                 logger.info(f"⚠️ Coleção {self.collection_name} não existia")
@@ -1176,13 +1185,17 @@ class WikipediaOfflineService:
             
         try:
             points = []
+            chunks_por_artigo = {}
             
             for chunk_data in chunk_batch:
                 # TODO: Gerar embedding real aqui
                 # Para simplificar, usar vetor fake (em produção seria embeddings reais)
                 fake_vector = [0.1] * 384
                 
-                point_id = str(uuid.uuid4())
+                point_id = self.qdrant_helper.gerar_id_deterministico(
+                    self.collection_name, chunk_data['title'], chunk_data.get('chunk_index', 0)
+                )
+                chunks_por_artigo[chunk_data['title']] = chunk_data.get('total_chunks', 1)
                 
                 point = models.PointStruct(
                     id=point_id,
@@ -1195,17 +1208,18 @@ class WikipediaOfflineService:
                         "total_chunks": chunk_data.get('total_chunks', 1),
                         "article_id": chunk_data.get('article_id', 0),
                         "timestamp": chunk_data.get('timestamp', ''),
-                        "source": chunk_data.get('source', 'wikipedia_dump')
+                        "source": chunk_data.get('source', 'wikipedia_dump'),
+                        "content_hash": chunk_data.get('content_hash') or TextProcessor.calcular_hash_conteudo(chunk_data['content']),
+                        "article_hash": chunk_data.get('article_hash', '')
                     }
                 )
                 points.append(point)
             
             if points:
-                self.client.upsert(
-                    collection_name=self.collection_name,
-                    points=points
-                )
-                logger.info(f"✅ Lote processado: {len(points)} chunks adicionados")
+                # Envio sem bloquear: os pontos seguem pelo escritor enquanto o próximo lote é montado
+                self._obter_escritor(self.collection_name).adicionar(points)
+                self.qdrant_helper.remover_chunks_excedentes(self.client, self.collection_name, chunks_por_artigo)
+                logger.info(f"✅ Lote processado: {len(points)} chunks enfileirados")
             
             return len(points)
             
@@ -1213,6 +1227,102 @@ class WikipediaOfflineService:
             logger.error(f"❌ Erro ao processar lote: {e}")
             return 0
     
+    def adicionar_chunk_direto(self, chunk_data: Dict, colecao: str = None) -> bool:
+        """Adiciona um único chunk de dump diretamente ao Qdrant"""
+        if not self.client:
+            return False
+        
+        # Validar chunk
+        if not self.validator.validar_chunk(chunk_data):
+            return False
+        
+        try:
+            collection_name = colecao if colecao else self.collection_name
+            # Preparar usando helpers (ID determinístico: reingestão sobrescreve o chunk)
+            chunk_id = self.qdrant_helper.gerar_id_deterministico(
+                collection_name, chunk_data['title'], chunk_data.get('chunk_index', 0)
+            )
+            payload = self.qdrant_helper.criar_payload_chunk(chunk_data)
+            if langchain_wikipedia_service.embedding_model is not None:
+                vector = langchain_wikipedia_service._obter_embedding_batcher().encode([chunk_data['content']])[0]
+            else:
+                vector = self.qdrant_helper.criar_vetor_dummy()
+            
+            # Enfileirar no escritor da coleção (enviado em lote, sem esperar a indexação)
+            self._obter_escritor(collection_name).adicionar(
+                [models.PointStruct(id=chunk_id, vector=vector, payload=payload)]
+            )
+            # Uma verificação por artigo basta: feita no primeiro chunk
+            if payload['chunk_index'] == 0:
+                self.qdrant_helper.remover_chunks_excedentes(
+                    self.client, collection_name, {chunk_data['title']: payload['total_chunks']}
+                )
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Erro ao adicionar chunk: {e}")
+            return False
+    
+    def _obter_escritor(self, colecao: str) -> QdrantBatchWriter:
+        """Escritor de pontos da coleção, criado no primeiro uso"""
+        escritor = self._escritores.get(colecao)
+        if escritor is None or escritor.client is not self.client:
+            # Cliente reconectado: o escritor antigo é descarregado antes de ser trocado
+            if escritor is not None:
+                escritor.fechar()
+            escritor = self._escritores[colecao] = QdrantBatchWriter(self.client, colecao)
+        return escritor
+    
+    def descarregar_escritas(self) -> Dict[str, Dict[str, Any]]:
+        """Envia os pontos pendentes de todas as coleções e espera os upserts em voo
+
+        Retorna as estatísticas de escrita (pontos/s, lotes, fila) por coleção.
+        """
+        estatisticas = {}
+        for colecao, escritor in list(self._escritores.items()):
+            try:
+                escritor.flush()
+            except Exception as e:
+                logger.error(f"❌ Erro ao descarregar escritas em '{colecao}': {e}")
+            estatisticas[colecao] = escritor.estatisticas()
+        return estatisticas
+    
+    def encerrar(self):
+        """Descarrega e fecha os escritores de pontos (chamado no shutdown da API)"""
+        escritores, self._escritores = self._escritores, {}
+        for colecao, escritor in escritores.items():
+            try:
+                escritor.fechar()
+            except Exception as e:
+                logger.error(f"❌ Erro ao fechar escritor de '{colecao}': {e}")
+    
+    def criar_pipeline_dump(self, colecao: str = None, config=None, progress_callback=None, usar_checkpoint: bool = True):
+        """Cria o pipeline paralelo de ingestão de dumps para a coleção informada"""
+        from .dumpPipelineService import DumpIngestionPipeline
+        from .wikipediaDumpService import wikipedia_dump_processor
+        
+        if not self.client:
+            raise RuntimeError("Cliente Qdrant não inicializado")
+        if langchain_wikipedia_service.embedding_model is None:
+            raise RuntimeError("Embedding model não inicializado. Instale sentence-transformers.")
+        
+        collection_name = colecao if colecao else self.collection_name
+        dimensao = langchain_wikipedia_service._obter_dimensao_embedding()
+        langchain_wikipedia_service.criar_colecao_custom(collection_name, dimensao)
+        
+        return DumpIngestionPipeline(
+            processor=wikipedia_dump_processor,
+            embedding_model=langchain_wikipedia_service.embedding_model,
+            qdrant_client=self.client,
+            colecao=collection_name,
+            config=config,
+            progress_callback=progress_callback,
+            checkpoint_store=wikipedia_dump_processor.checkpoints if usar_checkpoint else None,
+            embedding_cache=langchain_wikipedia_service._obter_cache_embeddings(),
+            chunker=langchain_wikipedia_service.obter_chunker(collection_name),
+            deduplicador=langchain_wikipedia_service.obter_deduplicador(collection_name)
+        )
+    
     def _get_embedding_dimensions(self, collection_name=None):
         logger.debug(f"#############   _get_embedding_dimensions chamada: {collection_name}")
         # Se collection_name for informado, buscar modelo do banco
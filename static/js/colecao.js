@@ -32,6 +32,21 @@ async function carregarModelos() {
         <option value="qwen2.5:7b">qwen2.5:7b (LLM Multilingual)</option>
         <option value="llama3.1:8b">llama3.1:8b (LLM English/General)</option>
     `;
+
+    // === Perfis de armazenamento (quantização / disco) ===
+    const perfilDropdown = document.getElementById('perfilDropdown');
+    perfilDropdown.innerHTML = '';
+    try {
+        const respPerfis = await fetch('/perfis_armazenamento');
+        const dataPerfis = await respPerfis.json();
+        Object.entries(dataPerfis.perfis).forEach(([nome, perfil]) => {
+            const selecionado = nome === dataPerfis.padrao ? ' selected' : '';
+            perfilDropdown.innerHTML += `<option value="${nome}"${selecionado}>${nome} (${perfil.descricao})</option>`;
+        });
+    } catch (e) {
+        console.error("Erro ao carregar perfis de armazenamento:", e);
+        perfilDropdown.innerHTML = `<option value="">padrão do servidor</option>`;
+    }
 }
 
 window.addEventListener('DOMContentLoaded', carregarModelos);
@@ -42,6 +57,7 @@ async function criarColecao() {
     const modelo_embedding_desc = document.getElementById('modeloEmbedDropdown').options[document.getElementById('modeloEmbedDropdown').selectedIndex].text;
     const dimensoes = getDimensoesModeloEmbed(document.getElementById('modeloEmbedDropdown'));
     const modelo_llm = document.getElementById('modeloLLMDropdown').value;
+    const perfil = document.getElementById('perfilDropdown').value;
 
     if (!nome) {
         document.getElementById('msg').textContent = 'Digite um nome para a coleção.';
@@ -51,7 +67,8 @@ async function criarColecao() {
         nome: nome,
         embedding_model_id: embedding_model_id,
         dimensoes: dimensoes,
-        modelo_llm: modelo_llm
+        modelo_llm: modelo_llm,
+        perfil: perfil
     });
 
     try {
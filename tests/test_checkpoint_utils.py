@@ -0,0 +1,43 @@
+"""
+Testes unitários para o armazenamento de checkpoints de ingestão
+"""
+import pytest
+from services.utils.checkpoint_utils import CheckpointStore
+
+
+class TestCheckpointStore:
+    """Testes para o CheckpointStore"""
+
+    def test_salvar_e_obter(self, tmp_path):
+        """Testa persistência e merge de campos"""
+        store = CheckpointStore(tmp_path / "cp.json")
+        store.salvar("a::col", last_page_id=10, stream_offset=500)
+        store.salvar("a::col", last_page_id=20)
+
+        checkpoint = CheckpointStore(tmp_path / "cp.json").obter("a::col")
+
+        assert checkpoint["last_page_id"] == 20
+        assert checkpoint["stream_offset"] == 500
+        assert "atualizado_em" in checkpoint
+
+    def test_resetar(self, tmp_path):
+        """Testa remoção individual e total"""
+        store = CheckpointStore(tmp_path / "cp.json")
+        store.salvar("a::col", last_page_id=1)
+        store.salvar("b::col", last_page_id=2)
+
+        assert store.resetar("a::col") == 1
+        assert store.resetar("a::col") == 0
+        assert list(store.listar()) == ["b::col"]
+        assert store.resetar() == 1
+        assert store.listar() == {}
+
+    def test_arquivo_corrompido(self, tmp_path):
+        """Testa se um arquivo inválido é tratado como vazio"""
+        (tmp_path / "cp.json").write_text("{quebrado", encoding="utf-8")
+
+        assert CheckpointStore(tmp_path / "cp.json").listar() == {}
+
+    def test_chave_usa_nome_do_arquivo(self):
+        """Testa se a chave independe do diretório do dump"""
+        assert CheckpointStore.chave("/data/ptwiki.xml.bz2", "wiki") == "ptwiki.xml.bz2::wiki"
@@ -0,0 +1,149 @@
+"""
+Testes unitários para o chunking por tokens do modelo de embedding
+"""
+import re
+import pytest
+from services.utils.chunking_utils import TokenChunker, relatorio_truncamento
+
+
+class TokenizerFalso:
+    """Imita um tokenizer rápido do HuggingFace: palavras e pontuação, palavras longas em dois pedaços"""
+
+    is_fast = True
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+    def _offsets(self, texto):
+        offsets = []
+        for m in re.finditer(r"\w+|[^\w\s]", texto):
+            a, b = m.span()
+            if b - a > 8:
+                offsets += [(a, a + 5), (a + 5, b)]
+            else:
+                offsets.append((a, b))
+        return offsets
+
+    def __call__(self, textos, add_special_tokens=True, truncation=False, return_offsets_mapping=False):
+        offsets = [self._offsets(t) for t in textos]
+        extra = 2 if add_special_tokens else 0
+        resultado = {"input_ids": [[0] * (len(o) + extra) for o in offsets]}
+        if return_offsets_mapping:
+            resultado["offset_mapping"] = offsets
+        return resultado
+
+
+class ModeloFalso:
+    """Modelo com tokenizer e max_seq_length, como um SentenceTransformer"""
+
+    def __init__(self, max_seq_length=32):
+        self.tokenizer = TokenizerFalso()
+        self.max_seq_length = max_seq_length
+
+    def encode(self, textos, **kwargs):
+        if isinstance(textos, str):
+            return [1.0, 0.0]
+        return [[1.0, float(len(t))] for t in textos]
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+
+def _texto(paragrafos=6, frases=5):
+    return "\n\n".join(
+        " ".join(f"Frase {f} do parágrafo {p} sobre administração pública." for f in range(frases))
+        for p in range(paragrafos)
+    )
+
+
+def _tokens(texto):
+    return len(TokenizerFalso()([texto])["input_ids"][0])
+
+
+class TestTokenChunker:
+    """Testes para TokenChunker"""
+
+    def test_chunks_cabem_no_modelo(self):
+        """Testa se nenhum chunk (com tokens especiais) passa do max_seq_length"""
+        chunker = TokenChunker.do_modelo(ModeloFalso(max_seq_length=32), overlap_tokens=4)
+        chunks = chunker.dividir(_texto())
+
+        assert len(chunks) > 1
+        assert max(_tokens(c) for c in chunks) <= 32
+
+    def test_cobre_o_texto_com_overlap(self):
+        """Testa se todo o texto aparece nos chunks e chunks vizinhos se sobrepõem"""
+        texto = _texto(paragrafos=2)
+        chunks = TokenChunker(TokenizerFalso(), 40, overlap_tokens=6).dividir(texto)
+
+        assert chunks[0].startswith("Frase 0")
+        assert texto.rstrip().endswith(chunks[-1][-20:])
+        for anterior, seguinte in zip(chunks, chunks[1:]):
+            assert seguinte.split()[0] in anterior
+
+    def test_termina_em_fronteira_de_frase(self):
+        """Testa se as janelas preferem terminar no fim de uma frase"""
+        chunks = TokenChunker(TokenizerFalso(), 30, overlap_tokens=0).dividir(_texto())
+
+        assert all(c.endswith(".") for c in chunks[:-1])
+
+    def test_overlap_comeca_em_palavra(self):
+        """Testa se nenhum chunk começa no meio de uma palavra"""
+        texto = "administração " * 100
+        chunks = TokenChunker(TokenizerFalso(), 20, overlap_tokens=5).dividir(texto)
+
+        assert all(c.startswith("administração") for c in chunks)
+
+    def test_modelo_sem_tokenizer(self):
+        """Testa se modelos sem tokenizer não geram chunker"""
+        class SemTokenizer:
+            max_seq_length = 128
+
+        assert TokenChunker.do_modelo(SemTokenizer()) is None
+
+
+class TestRelatorioTruncamento:
+    """Testes para relatorio_truncamento"""
+
+    def test_conta_tokens_excedentes(self):
+        """Testa a contagem de tokens além do limite"""
+        relatorio = relatorio_truncamento(TokenizerFalso(), ["a b c", "a " * 20], max_tokens=10)
+
+        assert relatorio["chunks_truncados"] == 1
+        assert relatorio["tokens_truncados"] == 22 - 10
+
+
+class TestChunkingNoServico:
+    """Testes do chunking por tokens em LangChainWikipediaService"""
+
+    @pytest.fixture
+    def servico(self):
+        qdrant_client = pytest.importorskip("qdrant_client")
+        from services.langchainWikipediaService import LangChainWikipediaService
+
+        service = LangChainWikipediaService()
+        service.qdrant_client = qdrant_client.QdrantClient(":memory:")
+        service.embedding_model = ModeloFalso(max_seq_length=32)
+        service._configurar_text_splitter()
+        service._initialized = True
+        return service
+
+    def test_ingestao_sem_truncamento(self, servico):
+        """Testa se a ingestão por tokens não trunca nada e registra o relatório"""
+        from services.langchainWikipediaService import WikipediaDocument
+
+        documento = WikipediaDocument(title="Estado", content=_texto(), url="u", metadata={})
+        servico.ingerir_documentos([documento], colecao="wiki")
+
+        assert servico.ultima_ingestao["chunking"] == "tokens"
+        assert servico.ultima_ingestao["truncamento"]["tokens_truncados"] == 0
+
+    def test_modo_por_colecao_e_comparacao(self, servico):
+        """Testa a escolha por coleção e o relatório antes/depois"""
+        servico.definir_chunking("legado", "caracteres")
+
+        assert servico.obter_chunker("legado") is None
+        assert servico.obter_chunker("wiki") is not None
+        relatorio = servico.comparar_chunking([_texto()])
+        assert relatorio["caracteres"]["tokens_truncados"] > 0
+        assert relatorio["tokens"]["tokens_truncados"] == 0
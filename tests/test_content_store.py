@@ -0,0 +1,163 @@
+"""
+Testes unitários para o armazenamento externo e comprimido do texto dos chunks
+"""
+import multiprocessing
+import pytest
+
+from services.utils import content_store
+from services.utils.content_store import ContentStore, externalizar_payloads, preencher_conteudo
+
+
+def _gravar_em_outro_processo(diretorio):
+    store = ContentStore(diretorio, "wiki")
+    store.guardar({"p2": "texto de outro processo"})
+    store.fechar()
+
+
+def _texto(n):
+    return " ".join(f"palavra{i % 37} São Paulo" for i in range(n))
+
+
+@pytest.fixture
+def ambiente(tmp_path, monkeypatch):
+    """Content store habilitado em um diretório temporário, sem instâncias de outros testes"""
+    monkeypatch.setenv("CONTENT_STORE_ENABLED", "true")
+    monkeypatch.setenv("CONTENT_STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(content_store, "_stores", {})
+    return tmp_path
+
+
+class TestContentStore:
+    """Testes para ContentStore"""
+
+    def test_guardar_e_obter(self, tmp_path):
+        """Testa ida e volta do texto, compressão e ids ausentes"""
+        store = ContentStore(tmp_path, "wiki")
+        store.guardar({"p1": _texto(500), 7: "olá"})
+
+        resultado = store.obter(["p1", "7", "ausente"])
+
+        assert resultado == {"p1": _texto(500), "7": "olá"}
+        assert store.estatisticas()["taxa_compressao"] > 2
+
+    def test_trecho_inicial(self, tmp_path):
+        """Testa se max_chars devolve só o início, inclusive com caracteres multibyte"""
+        store = ContentStore(tmp_path, "wiki", max_cache=0)
+        store.guardar({"p1": "ção" * 1000})
+
+        assert store.obter(["p1"], max_chars=201)["p1"] == ("ção" * 1000)[:201]
+
+    def test_lru_e_texto_inalterado(self, tmp_path):
+        """Testa acertos do LRU e que regravar o mesmo texto não cresce o arquivo"""
+        store = ContentStore(tmp_path, "wiki")
+        store.guardar({"p1": _texto(100)})
+        tamanho = store.dados_path.stat().st_size
+
+        store.obter(["p1"])
+        store.obter(["p1"])
+
+        assert store.guardar({"p1": _texto(100)}) == 0
+        assert store.dados_path.stat().st_size == tamanho
+        assert (store.acertos, store.falhas) == (1, 1)
+
+    def test_compactar_remove_registros_substituidos(self, tmp_path):
+        """Testa se a compactação mantém só a versão atual de cada chunk"""
+        store = ContentStore(tmp_path, "wiki")
+        store.guardar({"p1": _texto(200), "p2": _texto(300)})
+        store.guardar({"p1": "versão nova"})
+        store.remover(["p2"])
+
+        resultado = store.compactar()
+
+        assert resultado["bytes_depois"] < resultado["bytes_antes"]
+        assert store.obter(["p1", "p2"]) == {"p1": "versão nova"}
+        assert store.estatisticas()["bytes_recuperaveis"] == 0
+
+    def test_zstd_le_registros_zlib(self, tmp_path, monkeypatch):
+        """Testa se um store com zstd lê registros gravados antes com o fallback zlib"""
+        pytest.importorskip("zstandard")
+        monkeypatch.setattr(content_store, "ZSTD_AVAILABLE", False)
+        antigo = ContentStore(tmp_path, "wiki")
+        antigo.guardar({"p1": _texto(300)})
+        antigo.fechar()
+        monkeypatch.setattr(content_store, "ZSTD_AVAILABLE", True)
+
+        store = ContentStore(tmp_path, "wiki", max_cache=0)
+        store.guardar({"p2": _texto(300)})
+
+        assert store.estatisticas()["codec"] == "zstd"
+        assert store.obter(["p1", "p2"]) == {"p1": _texto(300), "p2": _texto(300)}
+        assert store.obter(["p2"], max_chars=50)["p2"] == _texto(300)[:50]
+
+    def test_compartilhado_entre_processos(self, tmp_path):
+        """Testa se textos gravados por outro processo são lidos (o mmap é reaberto)"""
+        store = ContentStore(tmp_path, "wiki")
+        store.guardar({"p1": "texto local"})
+        store.obter(["p1"])
+
+        processo = multiprocessing.get_context("spawn").Process(target=_gravar_em_outro_processo, args=(str(tmp_path),))
+        processo.start()
+        processo.join(timeout=60)
+
+        assert processo.exitcode == 0
+        assert store.obter(["p2"]) == {"p2": "texto de outro processo"}
+
+
+class TestPayloadsExternos:
+    """Testes de externalizar_payloads / preencher_conteudo"""
+
+    def test_payload_sem_texto(self, ambiente):
+        """Testa se o texto sai do payload na escrita e volta na leitura"""
+        models = pytest.importorskip("qdrant_client.http.models")
+        ponto = models.PointStruct(id=1, vector=[0.1], payload={
+            "title": "Recife", "content": _texto(100), "doc_metadata": {"title": "Recife"}, "chunk_index": 0
+        })
+
+        assert externalizar_payloads("wiki", [ponto]) == 1
+        assert set(ponto.payload) == {"title", "chunk_index", "conteudo_externo"}
+
+        preencher_conteudo("wiki", [ponto], max_chars=20)
+        assert ponto.payload["content"] == _texto(100)[:20]
+
+    def test_desabilitado_mantem_payload(self, ambiente, monkeypatch):
+        """Testa se sem CONTENT_STORE_ENABLED nada muda"""
+        models = pytest.importorskip("qdrant_client.http.models")
+        monkeypatch.setenv("CONTENT_STORE_ENABLED", "false")
+        ponto = models.PointStruct(id=1, vector=[0.1], payload={"title": "Recife", "content": "texto"})
+
+        assert externalizar_payloads("wiki", [ponto]) == 0
+        assert ponto.payload["content"] == "texto"
+
+    def test_busca_no_servico(self, ambiente):
+        """Testa se buscar_documentos devolve o trecho vindo do content store"""
+        qdrant_client = pytest.importorskip("qdrant_client")
+        from services.langchainWikipediaService import LangChainWikipediaService, WikipediaDocument
+
+        class Modelo:
+            def encode(self, textos, **kwargs):
+                import numpy as np
+                if isinstance(textos, str):
+                    return np.array([1.0, 0.0])
+                return [[1.0, float(len(t))] for t in textos]
+
+            def get_sentence_embedding_dimension(self):
+                return 2
+
+        client = qdrant_client.QdrantClient(":memory:")
+        if not hasattr(client, "search"):
+            # qdrant-client >= 1.13 só tem query_points
+            client.search = lambda collection_name, query_vector, query_filter=None, **kwargs: client.query_points(
+                collection_name, query=query_vector, query_filter=query_filter, **kwargs
+            ).points
+        service = LangChainWikipediaService()
+        service.qdrant_client = client
+        service.embedding_model = Modelo()
+        service._configurar_text_splitter()
+        service._initialized = True
+        texto = "Recife é a capital de Pernambuco. " * 20
+        service.ingerir_documentos([WikipediaDocument(title="Recife", content=texto, url="r", metadata={})], colecao="wiki")
+
+        pontos, _ = service.qdrant_client.scroll("wiki", limit=10, with_payload=True)
+        assert all("content" not in p.payload and p.payload["conteudo_externo"] for p in pontos)
+        resultados = service.buscar_documentos("Recife", limit=3, score_threshold=0.0, colecao="wiki")
+        assert resultados[0].content == texto[:200] + "..."
@@ -0,0 +1,164 @@
+"""
+Testes unitários para a deduplicação aproximada de chunks (MinHash + LSH)
+"""
+import random
+import pytest
+from services.utils.dedup_utils import DeduplicadorLSH, MinHasher, _parametros_lsh
+
+NAVBOX = (
+    "Ver também Lista de municípios de Pernambuco Lista de rios de Pernambuco "
+    "Microrregiões de Pernambuco Mesorregiões de Pernambuco Região Nordeste do Brasil "
+    "Referências Ligações externas Portal de Pernambuco Portal do Brasil "
+) * 3
+
+
+def _texto_aleatorio(semente, palavras=150):
+    aleatorio = random.Random(semente)
+    return " ".join(f"palavra{aleatorio.randint(0, 5000)}" for _ in range(palavras))
+
+
+class TestMinHasher:
+    """Testes para MinHasher"""
+
+    def test_similaridade_estimada(self):
+        """Testa se a similaridade estimada acompanha a sobreposição real dos textos"""
+        hasher = MinHasher(num_perm=128)
+        base = _texto_aleatorio(1)
+
+        igual = hasher.similaridade(hasher.assinatura(base), hasher.assinatura(base.upper()))
+        diferente = hasher.similaridade(hasher.assinatura(base), hasher.assinatura(_texto_aleatorio(2)))
+
+        assert igual == 1.0
+        assert diferente < 0.1
+
+    def test_texto_curto_e_vazio(self):
+        """Testa textos com menos palavras que a shingle e textos sem palavras"""
+        hasher = MinHasher(shingle=5)
+
+        assert hasher.shingles("Ver também") == ["ver também"]
+        assert hasher.shingles("  ...  ") == []
+        assert len(hasher.assinatura("")) == hasher.num_perm
+
+
+class TestDeduplicadorLSH:
+    """Testes para DeduplicadorLSH"""
+
+    def test_suprime_quase_duplicata(self):
+        """Testa se um chunk quase igual a outro já indexado é suprimido e registrado"""
+        deduplicador = DeduplicadorLSH(limiar=0.8, modo="pular")
+
+        assert deduplicador.verificar("a", NAVBOX + " Recife", rotulo="Recife#3") is None
+        duplicata = deduplicador.verificar("b", NAVBOX + " Olinda", rotulo="Olinda#2")
+
+        assert duplicata is not None and duplicata[0] == "a"
+        assert deduplicador.suprimidos[-1]["rotulo_original"] == "Recife#3"
+        assert deduplicador.estatisticas()["chunks_indexados"] == 1
+
+    def test_textos_distintos_indexados(self):
+        """Testa se textos diferentes não são confundidos"""
+        deduplicador = DeduplicadorLSH(limiar=0.8, modo="pular")
+
+        suprimidos = [deduplicador.verificar(str(i), _texto_aleatorio(i)) for i in range(200)]
+
+        assert suprimidos == [None] * 200
+
+    def test_mesmo_chunk_reingerido(self):
+        """Testa se reingerir um chunk (mesma chave) não o torna duplicata de si mesmo"""
+        deduplicador = DeduplicadorLSH(limiar=0.8, modo="pular")
+        deduplicador.verificar("a", NAVBOX)
+
+        assert deduplicador.verificar("a", NAVBOX) is None
+        assert deduplicador.estatisticas()["chunks_indexados"] == 1
+
+    def test_modo_mesclar_acumula_origens(self):
+        """Testa se no modo mesclar a origem da duplicata fica associada ao chunk mantido"""
+        deduplicador = DeduplicadorLSH(limiar=0.8, modo="mesclar")
+        deduplicador.verificar("a", NAVBOX)
+        deduplicador.verificar("b", NAVBOX, origem={"title": "Olinda", "chunk_index": 2})
+
+        mesclas = deduplicador.retirar_mesclas()
+
+        assert mesclas["a"][0]["title"] == "Olinda"
+        assert deduplicador.retirar_mesclas() == {}
+
+    def test_parametros_lsh_favorecem_recall(self):
+        """Testa se as bandas encontram a maioria dos pares no limiar"""
+        bandas, linhas = _parametros_lsh(0.9, 64)
+
+        assert bandas * linhas <= 64
+        assert 1 - (1 - 0.9 ** linhas) ** bandas >= 0.85
+
+    def test_modo_invalido(self):
+        """Testa a validação do modo"""
+        with pytest.raises(ValueError):
+            DeduplicadorLSH(modo="apagar")
+
+
+class TestDeduplicacaoNoServico:
+    """Testes da deduplicação em LangChainWikipediaService.ingerir_documentos"""
+
+    @pytest.fixture
+    def servico(self, monkeypatch, tmp_path):
+        qdrant_client = pytest.importorskip("qdrant_client")
+        from services.utils import dedup_utils
+        from services.langchainWikipediaService import LangChainWikipediaService
+
+        class Modelo:
+            def encode(self, textos, **kwargs):
+                if isinstance(textos, str):
+                    return [1.0, 0.0]
+                return [[1.0, float(len(t))] for t in textos]
+
+            def get_sentence_embedding_dimension(self):
+                return 2
+
+        monkeypatch.setenv("DEDUP_MODE", "mesclar")
+        monkeypatch.setenv("DEDUP_DIR", str(tmp_path))
+        monkeypatch.setattr(dedup_utils, "_registros", {})
+        service = LangChainWikipediaService()
+        service.qdrant_client = qdrant_client.QdrantClient(":memory:")
+        service.embedding_model = Modelo()
+        service._configurar_text_splitter()
+        service._initialized = True
+        return service
+
+    def test_boilerplate_repetido_suprimido(self, servico):
+        """Testa se o bloco comum a dois artigos é gravado uma vez e o original registra a duplicata"""
+        from services.langchainWikipediaService import WikipediaDocument
+
+        documentos = [
+            WikipediaDocument(title=titulo, content=_texto_aleatorio(k, 120) + "\n\n" + NAVBOX, url=titulo, metadata={})
+            for k, titulo in enumerate(["Recife", "Olinda"])
+        ]
+        servico.ingerir_documentos(documentos, colecao="wiki")
+
+        dedup = servico.ultima_ingestao["deduplicacao"]
+        assert dedup["chunks_suprimidos"] == 1
+        assert dedup["suprimidos"][0]["title"] == "Olinda"
+        pontos, _ = servico.qdrant_client.scroll("wiki", limit=100, with_payload=True)
+        assert len(pontos) == sum(servico.ultima_ingestao["chunks_por_artigo"].values()) - 1
+        assert [p.payload["duplicatas"][0]["title"] for p in pontos if p.payload.get("duplicatas")] == ["Olinda"]
+
+    def test_suprimido_volta_quando_original_muda(self, servico):
+        """Testa se, após reiniciar o processo, o chunk suprimido volta quando o original é removido"""
+        from services.langchainWikipediaService import LangChainWikipediaService, WikipediaDocument
+
+        recife, olinda = _texto_aleatorio(0, 120), _texto_aleatorio(1, 120)
+        servico.ingerir_documentos([
+            WikipediaDocument(title=titulo, content=texto + "\n\n" + NAVBOX, url=titulo, metadata={})
+            for titulo, texto in [("Recife", recife), ("Olinda", olinda)]
+        ], colecao="wiki")
+        total_olinda = servico.ultima_ingestao["chunks_por_artigo"]["Olinda"]
+        assert servico.ultima_ingestao["deduplicacao"]["chunks_suprimidos"] == 1
+
+        # Processo novo: índice LSH vazio, registro de supressões em disco; Recife perde o bloco comum
+        reiniciado = LangChainWikipediaService()
+        reiniciado.qdrant_client = servico.qdrant_client
+        reiniciado.embedding_model = servico.embedding_model
+        reiniciado._configurar_text_splitter()
+        reiniciado._initialized = True
+        reiniciado.ingerir_documentos([WikipediaDocument(title="Recife", content=recife, url="Recife", metadata={})], colecao="wiki")
+
+        pontos, _ = servico.qdrant_client.scroll("wiki", limit=100, with_payload=True)
+        assert reiniciado.ultima_ingestao["deduplicacao"]["chunks_restaurados"] == 1
+        assert sorted(p.payload["chunk_index"] for p in pontos if p.payload["title"] == "Olinda") == list(range(total_olinda))
@@ -0,0 +1,178 @@
+"""
+Testes unitários para o download segmentado e retomável de dumps
+"""
+import json
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.utils.download_utils import (
+    DownloadCancelado,
+    DownloadSegmentado,
+    ErroChecksum,
+    checksums_dumpstatus,
+    estado_downloads
+)
+
+CONTEUDO = bytes(range(256)) * 4096  # 1 MB
+
+
+class Servidor:
+    """Servidor HTTP local com suporte a Range e falhas sob demanda"""
+
+    def __init__(self, aceita_range=True):
+        self.aceita_range = aceita_range
+        self.falhar_apos = None  # bytes enviados antes de derrubar cada resposta
+        self.encurtar = None  # bytes de cada resposta de dados, com Content-Length coerente
+        self.ranges = []
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.endswith("dumpstatus.json"):
+                    corpo = json.dumps({"jobs": {"articlesdump": {"files": {"dump.xml.bz2": {
+                        "size": len(CONTEUDO), "sha1": hashlib.sha1(CONTEUDO).hexdigest(),
+                        "md5": hashlib.md5(CONTEUDO).hexdigest()
+                    }}}}}).encode()
+                    self._responder(200, corpo, {})
+                    return
+                intervalo = self.headers.get("Range")
+                if intervalo and servidor.aceita_range:
+                    servidor.ranges.append(intervalo)
+                    inicio, fim = intervalo.split("=")[1].split("-")
+                    inicio, fim = int(inicio), int(fim) if fim else len(CONTEUDO) - 1
+                    self._responder(206, CONTEUDO[inicio:fim + 1], {
+                        "Content-Range": f"bytes {inicio}-{fim}/{len(CONTEUDO)}"
+                    })
+                else:
+                    self._responder(200, CONTEUDO, {})
+
+            def _responder(self, codigo, corpo, headers):
+                sonda = self.headers.get("Range") == "bytes=0-0"
+                if servidor.encurtar is not None and len(corpo) > 1 and not sonda:
+                    corpo = corpo[:servidor.encurtar]
+                self.send_response(codigo)
+                self.send_header("Content-Length", str(len(corpo)))
+                for nome, valor in headers.items():
+                    self.send_header(nome, valor)
+                self.end_headers()
+                if servidor.falhar_apos is not None and len(corpo) > 1:
+                    self.wfile.write(corpo[:servidor.falhar_apos])
+                    self.close_connection = True
+                    return
+                self.wfile.write(corpo)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/ptwiki/20240101/dump.xml.bz2"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def fechar(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def servidor():
+    s = Servidor()
+    yield s
+    s.fechar()
+
+
+class TestDownloadSegmentado:
+    """Testes para DownloadSegmentado"""
+
+    def test_segmentos_paralelos_com_checksum(self, servidor, tmp_path):
+        """Testa o download em 4 Ranges com SHA-1 conferido e progresso até o total"""
+        progresso = []
+        download = DownloadSegmentado(
+            servidor.url, tmp_path / "dump.xml.bz2", segmentos=4, buffer_bytes=65536,
+            checksum=("sha1", hashlib.sha1(CONTEUDO).hexdigest()), progresso=lambda b, t: progresso.append((b, t))
+        )
+
+        resultado = download.executar()
+
+        assert (tmp_path / "dump.xml.bz2").read_bytes() == CONTEUDO
+        assert resultado["segmentos"] == 4 and resultado["checksum"]["verificado"]
+        assert len(servidor.ranges) == 5  # sonda bytes=0-0 + 4 segmentos
+        assert progresso[-1] == (len(CONTEUDO), len(CONTEUDO))
+        assert not (tmp_path / "dump.xml.bz2.part.json").exists()
+
+    def test_retomada_apos_falha(self, servidor, tmp_path):
+        """Testa se uma falha mantém o .part e a nova chamada continua de onde parou"""
+        destino = tmp_path / "dump.xml.bz2"
+        sha1 = hashlib.sha1(CONTEUDO).hexdigest()
+        servidor.falhar_apos = 100_000
+
+        with pytest.raises(Exception):
+            DownloadSegmentado(servidor.url, destino, segmentos=2, buffer_bytes=4096,
+                               checksum=("sha1", sha1), tentativas=1).executar()
+        parcial = estado_downloads(tmp_path)[0]
+        assert 0 < parcial["bytes_baixados"] < len(CONTEUDO)
+
+        servidor.falhar_apos = None
+        resultado = DownloadSegmentado(servidor.url, destino, segmentos=2, checksum=("sha1", sha1)).executar()
+
+        assert resultado["retomado_de_bytes"] == parcial["bytes_baixados"]
+        assert destino.read_bytes() == CONTEUDO
+
+    def test_checksum_divergente(self, servidor, tmp_path):
+        """Testa se um hash diferente do publicado descarta o arquivo"""
+        with pytest.raises(ErroChecksum):
+            DownloadSegmentado(servidor.url, tmp_path / "dump.xml.bz2", checksum=("md5", "0" * 32)).executar()
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_servidor_sem_range(self, tmp_path):
+        """Testa o fallback para uma única conexão"""
+        servidor = Servidor(aceita_range=False)
+        try:
+            resultado = DownloadSegmentado(servidor.url, tmp_path / "dump.xml.bz2", segmentos=4).executar()
+        finally:
+            servidor.fechar()
+
+        assert resultado["segmentos"] == 1
+        assert (tmp_path / "dump.xml.bz2").read_bytes() == CONTEUDO
+
+    def test_resposta_curta_sem_range_nao_vira_arquivo(self, tmp_path):
+        """Testa se um corpo menor que o tamanho conhecido falha em vez de promover o .part truncado"""
+        servidor = Servidor(aceita_range=False)
+        servidor.encurtar = 1000
+        try:
+            with pytest.raises(IOError):
+                DownloadSegmentado(servidor.url, tmp_path / "dump.xml.bz2").executar()
+        finally:
+            servidor.fechar()
+
+        assert not (tmp_path / "dump.xml.bz2").exists()
+
+    def test_206_vazio_conta_como_tentativa(self, servidor, tmp_path):
+        """Testa se respostas Range sem bytes esgotam as tentativas em vez de repetir para sempre"""
+        servidor.encurtar = 0
+
+        with pytest.raises(IOError):
+            DownloadSegmentado(servidor.url, tmp_path / "dump.xml.bz2", segmentos=2, tentativas=1).executar()
+
+        assert len(servidor.ranges) == 3  # sonda + uma tentativa por segmento
+        assert not (tmp_path / "dump.xml.bz2").exists()
+
+    def test_cancelamento_mantem_parcial(self, servidor, tmp_path):
+        """Testa se cancelar interrompe o download sem apagar o que já foi baixado"""
+        download = DownloadSegmentado(servidor.url, tmp_path / "dump.xml.bz2", segmentos=2, buffer_bytes=4096,
+                                      progresso=lambda b, t: download.cancelar() if b > 50_000 else None)
+
+        with pytest.raises(DownloadCancelado):
+            download.executar()
+
+        assert estado_downloads(tmp_path)[0]["bytes_baixados"] > 0
+
+    def test_checksums_dumpstatus(self, servidor):
+        """Testa a leitura do SHA-1/MD5 publicado para o arquivo"""
+        publicados = checksums_dumpstatus(servidor.url)
+
+        assert publicados["sha1"] == hashlib.sha1(CONTEUDO).hexdigest()
+        assert publicados["size"] == len(CONTEUDO)
@@ -0,0 +1,220 @@
+"""
+Testes unitários para o pipeline paralelo de ingestão de dumps
+"""
+import threading
+import pytest
+from services.wikipediaDumpService import WikipediaDumpProcessor
+from services.dumpPipelineService import DumpIngestionPipeline, PipelineConfig
+from services.utils.checkpoint_utils import CheckpointStore
+
+
+def _criar_dump(caminho, n_artigos, texto_fixo=None):
+    """Gera um dump XML mínimo no formato MediaWiki"""
+    paginas = []
+    for i in range(1, n_artigos + 1):
+        texto = texto_fixo or f"O artigo {i} fala sobre o tema número {i}. " * 20
+        paginas.append(
+            f"<page><title>Artigo {i}</title><ns>0</ns><id>{i}</id>"
+            f"<revision><timestamp>2024-01-01T00:00:00Z</timestamp>"
+            f"<text>{texto}</text></revision></page>"
+        )
+    caminho.write_text(
+        '<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/">'
+        + "".join(paginas) + "</mediawiki>",
+        encoding="utf-8"
+    )
+    return str(caminho)
+
+
+@pytest.fixture(autouse=True)
+def registro_supressoes_isolado(tmp_path, monkeypatch):
+    """Registro de supressões no tmp_path e sem cache de outros testes"""
+    from services.utils import dedup_utils
+
+    monkeypatch.setenv("DEDUP_DIR", str(tmp_path / "dedup"))
+    monkeypatch.setattr(dedup_utils, "_registros", {})
+
+
+class FakeModel:
+    """Modelo de embeddings simplificado"""
+
+    def encode(self, textos, **kwargs):
+        if isinstance(textos, str):
+            return [float(len(textos)), 1.0]
+        return [[float(len(t)), 1.0] for t in textos]
+
+
+class FakeQdrant:
+    """Cliente Qdrant em memória (pontos indexados por ID)"""
+
+    def __init__(self, falhar=False):
+        self.pontos_por_id = {}
+        self.falhar = falhar
+        self._lock = threading.Lock()
+
+    @property
+    def pontos(self):
+        return list(self.pontos_por_id.values())
+
+    def upsert(self, collection_name, points, **kwargs):
+        if self.falhar:
+            raise RuntimeError("qdrant indisponível")
+        with self._lock:
+            for ponto in points:
+                self.pontos_por_id[ponto.id] = ponto
+
+    def retrieve(self, collection_name, ids, **kwargs):
+        with self._lock:
+            return [self.pontos_por_id[i] for i in ids if i in self.pontos_por_id]
+
+    def delete(self, collection_name, points_selector, **kwargs):
+        with self._lock:
+            for i in getattr(points_selector, "points", points_selector):
+                self.pontos_por_id.pop(i, None)
+
+
+def _pipeline(tmp_path, qdrant, checkpoint_store=None, deduplicador=None, **config):
+    processor = WikipediaDumpProcessor(data_dir=str(tmp_path))
+    base = dict(clean_workers=2, upsert_workers=2, embed_batch_size=4, upsert_batch_size=3, queue_size=4, usar_processos=False)
+    base.update(config)
+    return DumpIngestionPipeline(
+        processor, FakeModel(), qdrant, "teste", config=PipelineConfig(**base),
+        checkpoint_store=checkpoint_store, deduplicador=deduplicador
+    )
+
+
+class TestDumpIngestionPipeline:
+    """Testes para o DumpIngestionPipeline"""
+
+    def test_ingere_todos_os_artigos(self, tmp_path):
+        """Testa se todos os chunks de todos os artigos chegam ao Qdrant"""
+        dump = _criar_dump(tmp_path / "dump.xml", 10)
+        qdrant = FakeQdrant()
+
+        resultado = _pipeline(tmp_path, qdrant).executar(dump)
+
+        assert resultado["erro"] is None
+        assert resultado["artigos_processados"] == 10
+        assert resultado["chunks_inseridos"] == len(qdrant.pontos)
+        assert {p.payload["title"] for p in qdrant.pontos} == {f"Artigo {i}" for i in range(1, 11)}
+
+    def test_max_artigos_e_offset(self, tmp_path):
+        """Testa se offset e limite de artigos são respeitados"""
+        dump = _criar_dump(tmp_path / "dump.xml", 10)
+        qdrant = FakeQdrant()
+
+        resultado = _pipeline(tmp_path, qdrant).executar(dump, max_artigos=3, offset=5)
+
+        assert resultado["artigos_processados"] == 3
+        assert {p.payload["title"] for p in qdrant.pontos} == {"Artigo 6", "Artigo 7", "Artigo 8"}
+
+    def test_pool_de_processos(self, tmp_path):
+        """Testa a limpeza em processos separados"""
+        dump = _criar_dump(tmp_path / "dump.xml", 4)
+        qdrant = FakeQdrant()
+
+        resultado = _pipeline(tmp_path, qdrant, usar_processos=True).executar(dump)
+
+        assert resultado["artigos_processados"] == 4
+        assert len(qdrant.pontos) == resultado["chunks_inseridos"] > 0
+
+    def test_reimportacao_nao_duplica(self, tmp_path):
+        """Testa se importar o mesmo dump duas vezes sobrescreve os pontos em vez de duplicá-los"""
+        dump = _criar_dump(tmp_path / "dump.xml", 5)
+        qdrant = FakeQdrant()
+
+        primeira = _pipeline(tmp_path, qdrant).executar(dump)
+        _pipeline(tmp_path, qdrant).executar(dump)
+
+        assert len(qdrant.pontos) == primeira["chunks_inseridos"]
+
+    def test_reimportacao_incremental(self, tmp_path):
+        """Testa se artigos inalterados não são reprocessados no modo incremental"""
+        dump = _criar_dump(tmp_path / "dump.xml", 5)
+        qdrant = FakeQdrant()
+        primeira = _pipeline(tmp_path, qdrant).executar(dump)
+
+        resultado = _pipeline(tmp_path, qdrant, incremental=True).executar(dump)
+
+        assert resultado["incremental"]["chunks_inalterados"] == primeira["chunks_inseridos"]
+        assert resultado["incremental"]["chunks_reembedados"] == 0
+        assert resultado["chunks_inseridos"] == 0
+        assert len(qdrant.pontos) == primeira["chunks_inseridos"]
+
+    def test_quase_duplicatas_suprimidas(self, tmp_path):
+        """Testa se artigos repetidos não são embedados nem gravados, mas contam como processados"""
+        from services.utils.dedup_utils import DeduplicadorLSH
+        dump = _criar_dump(tmp_path / "dump.xml", 5, texto_fixo="Ver também a lista de municípios da região. " * 20)
+        qdrant = FakeQdrant()
+
+        resultado = _pipeline(tmp_path, qdrant, deduplicador=DeduplicadorLSH(modo="pular")).executar(dump)
+
+        assert resultado["artigos_processados"] == 5
+        assert resultado["deduplicacao"]["chunks_suprimidos"] == 4
+        assert [p.payload["title"] for p in qdrant.pontos] == ["Artigo 1"]
+
+    def test_falha_no_upsert_encerra_pipeline(self, tmp_path):
+        """Testa se um erro no Qdrant cancela o pipeline sem travar"""
+        dump = _criar_dump(tmp_path / "dump.xml", 30)
+
+        resultado = _pipeline(tmp_path, FakeQdrant(falhar=True)).executar(dump)
+
+        assert "qdrant indisponível" in resultado["erro"]
+        assert resultado["cancelado"] is True
+        assert resultado["chunks_inseridos"] == 0
+
+
+class TestCheckpointRetomada:
+    """Testes para retomada de ingestão via checkpoint"""
+
+    def test_retoma_do_ultimo_artigo_confirmado(self, tmp_path):
+        """Testa se chamadas sucessivas continuam de onde a anterior parou"""
+        dump = _criar_dump(tmp_path / "dump.xml", 10)
+        store = CheckpointStore(tmp_path / "checkpoints.json")
+        qdrant = FakeQdrant()
+
+        _pipeline(tmp_path, qdrant, store).executar(dump, max_artigos=4)
+        checkpoint = store.obter(CheckpointStore.chave(dump, "teste"))
+        assert checkpoint["last_page_id"] == 4
+        assert checkpoint["concluido"] is False
+
+        resultado = _pipeline(tmp_path, qdrant, store).executar(dump, max_artigos=100)
+
+        assert {p.payload["title"] for p in qdrant.pontos} == {f"Artigo {i}" for i in range(1, 11)}
+        assert resultado["artigos_processados"] == 6
+        assert resultado["checkpoint"]["concluido"] is True
+        assert resultado["checkpoint"]["artigos_processados"] == 10
+        assert resultado["checkpoint"]["chunks_inseridos"] == len(qdrant.pontos)
+
+    def test_dump_concluido_nao_reprocessa(self, tmp_path):
+        """Testa se um dump já concluído não é relido"""
+        dump = _criar_dump(tmp_path / "dump.xml", 3)
+        store = CheckpointStore(tmp_path / "checkpoints.json")
+        _pipeline(tmp_path, FakeQdrant(), store).executar(dump)
+
+        qdrant = FakeQdrant()
+        resultado = _pipeline(tmp_path, qdrant, store).executar(dump)
+
+        assert resultado["chunks_inseridos"] == 0
+        assert qdrant.pontos == []
+
+    def test_falha_nao_avanca_checkpoint(self, tmp_path):
+        """Testa se lotes que falharam não são registrados no checkpoint"""
+        dump = _criar_dump(tmp_path / "dump.xml", 5)
+        store = CheckpointStore(tmp_path / "checkpoints.json")
+
+        _pipeline(tmp_path, FakeQdrant(falhar=True), store).executar(dump)
+
+        checkpoint = store.obter(CheckpointStore.chave(dump, "teste"))
+        assert checkpoint["last_page_id"] is None
+        assert checkpoint["concluido"] is False
+
+    def test_retomar_false_reinicia(self, tmp_path):
+        """Testa se retomar=False ignora e descarta o checkpoint existente"""
+        dump = _criar_dump(tmp_path / "dump.xml", 6)
+        store = CheckpointStore(tmp_path / "checkpoints.json")
+        _pipeline(tmp_path, FakeQdrant(), store).executar(dump, max_artigos=3)
+
+        resultado = _pipeline(tmp_path, FakeQdrant(), store).executar(dump, max_artigos=2, retomar=False)
+
+        assert resultado["checkpoint"]["last_page_id"] == 2
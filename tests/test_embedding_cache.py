@@ -0,0 +1,146 @@
+"""
+Testes unitários para o cache persistente de embeddings e o LRU de consultas
+"""
+import multiprocessing
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from services.utils.embedding_cache import CacheConsultas, EmbeddingCache
+from services.utils.embedding_utils import EmbeddingBatcher
+
+
+def _gravar_em_outro_processo(cache_dir):
+    cache = EmbeddingCache(cache_dir, "modelo-teste", 3, max_entradas=10)
+    cache.guardar(["texto de outro processo"], [[7.0, 8.0, 9.0]])
+    cache.fechar()
+
+
+class ModeloContador:
+    """Modelo que registra os textos codificados"""
+
+    def __init__(self):
+        self.codificados = []
+
+    def encode(self, textos, **kwargs):
+        self.codificados.extend(textos)
+        return [[float(len(t)), 1.0, 0.0] for t in textos]
+
+
+class TestEmbeddingCache:
+    """Testes para o EmbeddingCache"""
+
+    def test_acerto_e_falha(self, tmp_path):
+        """Testa leitura de vetores armazenados e contadores"""
+        cache = EmbeddingCache(tmp_path, "modelo-teste", 3, max_entradas=10)
+        cache.guardar(["olá mundo"], [[0.1, 0.2, 0.3]])
+
+        resultado = cache.obter(["olá   mundo", "ausente"])
+
+        assert resultado[0] == pytest.approx([0.1, 0.2, 0.3])
+        assert resultado[1] is None
+        assert (cache.acertos, cache.falhas) == (1, 1)
+
+    def test_persistencia_entre_instancias(self, tmp_path):
+        """Testa se o cache sobrevive a uma nova instância"""
+        EmbeddingCache(tmp_path, "modelo-teste", 3, max_entradas=10).guardar(["a"], [[1.0, 2.0, 3.0]])
+
+        cache = EmbeddingCache(tmp_path, "modelo-teste", 3, max_entradas=10)
+
+        assert cache.obter(["a"]) == [[1.0, 2.0, 3.0]]
+        assert cache.estatisticas()["acertos_total"] == 1
+
+    def test_modelos_diferentes_nao_compartilham(self, tmp_path):
+        """Testa se a chave inclui o nome do modelo"""
+        EmbeddingCache(tmp_path, "modelo-a", 3, max_entradas=10).guardar(["a"], [[1.0, 2.0, 3.0]])
+
+        assert EmbeddingCache(tmp_path, "modelo-b", 3, max_entradas=10).obter(["a"]) == [None]
+
+    def test_despejo_lru(self, tmp_path):
+        """Testa se a entrada menos usada recentemente é despejada"""
+        cache = EmbeddingCache(tmp_path, "modelo-teste", 3, max_entradas=2)
+        cache.guardar(["a"], [[1.0, 0.0, 0.0]])
+        cache.guardar(["b"], [[0.0, 1.0, 0.0]])
+        cache.obter(["a"])  # "a" passa a ser a mais recente
+
+        cache.guardar(["c"], [[0.0, 0.0, 1.0]])
+
+        assert cache.obter(["a", "b", "c"]) == [[1.0, 0.0, 0.0], None, [0.0, 0.0, 1.0]]
+        assert cache.estatisticas()["entradas"] == 2
+        assert cache.estatisticas()["despejos_total"] == 1
+
+    def test_float16(self, tmp_path):
+        """Testa armazenamento em meia precisão"""
+        cache = EmbeddingCache(tmp_path, "modelo-teste", 3, dtype="float16", max_entradas=10)
+        cache.guardar(["a"], [[0.123456, -1.5, 2.0]])
+
+        assert cache.obter(["a"])[0] == pytest.approx([0.123456, -1.5, 2.0], abs=1e-3)
+        assert cache.vetores_path.stat().st_size == 10 * 3 * 2
+
+    def test_compartilhado_entre_processos(self, tmp_path):
+        """Testa se vetores gravados por outro processo são vistos"""
+        cache = EmbeddingCache(tmp_path, "modelo-teste", 3, max_entradas=10)
+        processo = multiprocessing.get_context("spawn").Process(target=_gravar_em_outro_processo, args=(str(tmp_path),))
+        processo.start()
+        processo.join(60)
+
+        assert processo.exitcode == 0
+        assert cache.obter(["texto de outro processo"]) == [[7.0, 8.0, 9.0]]
+
+
+class TestBatcherComCache:
+    """Testes para a integração do cache com o EmbeddingBatcher"""
+
+    def test_textos_em_cache_nao_passam_pelo_modelo(self, tmp_path):
+        """Testa se apenas textos novos e únicos são codificados"""
+        cache = EmbeddingCache(tmp_path, "modelo-teste", 3, max_entradas=10)
+        modelo = ModeloContador()
+        batcher = EmbeddingBatcher(modelo, cache=cache)
+
+        primeiro = batcher.encode(["a", "bb", "a"])
+        segundo = batcher.encode(["bb", "ccc"])
+
+        assert modelo.codificados == ["a", "bb", "ccc"]
+        assert primeiro == [[1.0, 1.0, 0.0], [2.0, 1.0, 0.0], [1.0, 1.0, 0.0]]
+        assert segundo == [[2.0, 1.0, 0.0], [3.0, 1.0, 0.0]]
+        assert batcher.ultima_execucao["cache_hits"] == 1
+
+
+class TestCacheConsultas:
+    """Testes para o LRU em memória dos vetores de consulta"""
+
+    def test_consulta_repetida_nao_passa_pelo_modelo(self):
+        """Testa acertos com espaços diferentes e falha com outro modelo"""
+        cache = CacheConsultas(max_entradas=10)
+        modelo = ModeloContador()
+        calcular = lambda texto: modelo.encode([texto])[0]
+
+        cache.obter_ou_calcular("minilm", "Santos Dumont avião", calcular)
+        vetor = cache.obter_ou_calcular("minilm", "  Santos  Dumont avião ", calcular)
+        cache.obter_ou_calcular("outro-modelo", "Santos Dumont avião", calcular)
+
+        assert modelo.codificados == ["Santos Dumont avião", "Santos Dumont avião"]
+        assert vetor == [19.0, 1.0, 0.0]
+        assert cache.estatisticas()["acertos"] == 1 and cache.estatisticas()["falhas"] == 2
+
+    def test_despejo_lru(self):
+        """Testa se a consulta menos usada recentemente sai quando o cache enche"""
+        cache = CacheConsultas(max_entradas=2)
+        modelo = ModeloContador()
+        calcular = lambda texto: modelo.encode([texto])[0]
+
+        for consulta in ["a", "b", "a", "c", "a", "b"]:
+            cache.obter_ou_calcular("minilm", consulta, calcular)
+
+        assert modelo.codificados == ["a", "b", "c", "b"]
+        assert cache.estatisticas()["despejos"] == 2
+
+    def test_tamanho_zero_desativa(self):
+        """Testa se QUERY_EMBEDDING_CACHE_SIZE=0 sempre codifica"""
+        cache = CacheConsultas(max_entradas=0)
+        modelo = ModeloContador()
+
+        for _ in range(3):
+            cache.obter_ou_calcular("minilm", "a", lambda texto: modelo.encode([texto])[0])
+
+        assert len(modelo.codificados) == 3 and cache.estatisticas()["entradas"] == 0
@@ -0,0 +1,83 @@
+"""
+Testes unitários para geração de embeddings em lote
+"""
+import pytest
+from services.utils.embedding_utils import EmbeddingBatcher, obter_dimensao_modelo
+
+
+class FakeModel:
+    """Modelo determinístico: vetor derivado do próprio texto"""
+
+    max_seq_length = 128
+
+    def __init__(self):
+        self.chamadas = []
+
+    def encode(self, textos, **kwargs):
+        if isinstance(textos, str):
+            return self._vetor(textos)
+        self.chamadas.append(list(textos))
+        return [self._vetor(t) for t in textos]
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+    @staticmethod
+    def _vetor(texto):
+        return [float(len(texto)), float(len(texto.split())), float(sum(map(ord, texto)) % 97)]
+
+
+class TestEmbeddingBatcher:
+    """Testes para o EmbeddingBatcher"""
+
+    def test_vetores_identicos_e_ordem_preservada(self):
+        """Testa se o lote gera os mesmos vetores que a codificação individual, na ordem original"""
+        model = FakeModel()
+        textos = ["palavra " * n for n in (30, 2, 15, 1, 60, 7)]
+
+        vetores = EmbeddingBatcher(model, token_budget=64).encode(textos)
+
+        assert vetores == [model.encode(t) for t in textos]
+
+    def test_lotes_respeitam_orcamento(self):
+        """Testa se nenhum lote ultrapassa o orçamento de tokens"""
+        batcher = EmbeddingBatcher(FakeModel(), token_budget=100)
+        contagens = [10, 50, 20, 5, 40, 30, 25]
+
+        lotes = batcher.montar_lotes(contagens)
+
+        assert sorted(i for lote in lotes for i in lote) == list(range(len(contagens)))
+        for lote in lotes:
+            assert len(lote) == 1 or max(contagens[i] for i in lote) * len(lote) <= 100
+
+    def test_lotes_ordenados_por_comprimento(self):
+        """Testa se os textos são agrupados do menor para o maior"""
+        batcher = EmbeddingBatcher(FakeModel(), token_budget=1000)
+        lotes = batcher.montar_lotes([30, 10, 20])
+
+        assert lotes == [[1, 2, 0]]
+
+    def test_contagem_truncada_no_max_seq_length(self):
+        """Testa se a contagem de tokens é limitada pelo max_seq_length do modelo"""
+        batcher = EmbeddingBatcher(FakeModel())
+        contagens = batcher.contar_tokens(["x " * 500])
+
+        assert contagens == [128]
+
+    def test_metricas_ultima_execucao(self):
+        """Testa se as métricas de chunks/s são registradas"""
+        batcher = EmbeddingBatcher(FakeModel())
+        batcher.encode(["a b c", "d e"])
+
+        assert batcher.ultima_execucao["chunks"] == 2
+        assert "chunks_por_segundo" in batcher.ultima_execucao
+
+    def test_lista_vazia(self):
+        """Testa codificação de lista vazia"""
+        assert EmbeddingBatcher(FakeModel()).encode([]) == []
+
+    def test_dimensao_sem_encode(self):
+        """Testa se a dimensão é obtida do modelo sem codificar texto de teste"""
+        model = FakeModel()
+        assert obter_dimensao_modelo(model) == 3
+        assert model.chamadas == []
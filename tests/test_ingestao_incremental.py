@@ -0,0 +1,114 @@
+"""
+Testes unitários para ingestão incremental por hash de conteúdo
+"""
+import pytest
+
+qdrant_client = pytest.importorskip("qdrant_client")
+
+from services.langchainWikipediaService import LangChainWikipediaService, WikipediaDocument
+
+
+class ContadorModel:
+    """Modelo de embeddings que conta quantos textos codificou"""
+
+    def __init__(self):
+        self.codificados = 0
+
+    def encode(self, textos, **kwargs):
+        if isinstance(textos, str):
+            return [1.0, 0.0, 0.0, float(len(textos))]
+        self.codificados += len(textos)
+        return [[1.0, 0.0, 0.0, float(len(t))] for t in textos]
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+
+def _paragrafo(n, versao="a"):
+    return f"Parágrafo {n} versão {versao}. " + f"Conteúdo do parágrafo {n} sobre história. " * 18
+
+
+def _documento(versoes):
+    texto = "\n\n".join(_paragrafo(n, v) for n, v in enumerate(versoes))
+    return WikipediaDocument(title="Brasil", content=texto, url="https://pt.wikipedia.org/wiki/Brasil", metadata={})
+
+
+@pytest.fixture
+def servico():
+    service = LangChainWikipediaService()
+    service.qdrant_client = qdrant_client.QdrantClient(":memory:")
+    service.embedding_model = ContadorModel()
+    service._configurar_text_splitter()
+    service._initialized = True
+    return service
+
+
+class TestIngestaoIncremental:
+    """Testes para o modo incremental de ingerir_documentos"""
+
+    def test_artigo_inalterado_nao_reprocessa(self, servico):
+        """Testa se reingerir o mesmo texto não gera embeddings nem pontos novos"""
+        total = servico.ingerir_documentos([_documento("aaaa")], colecao="wiki", incremental=True)
+        codificados = servico.embedding_model.codificados
+
+        total_novamente = servico.ingerir_documentos([_documento("aaaa")], colecao="wiki", incremental=True)
+
+        assert total_novamente == total
+        assert servico.embedding_model.codificados == codificados
+        assert servico.ultima_ingestao["artigos_inalterados"] == 1
+        assert servico.qdrant_client.count("wiki").count == total
+
+    def test_apenas_chunks_alterados_reprocessados(self, servico):
+        """Testa se só os chunks cujo texto mudou passam pelo modelo"""
+        total = servico.ingerir_documentos([_documento("aaaa")], colecao="wiki", incremental=True)
+        codificados = servico.embedding_model.codificados
+
+        servico.ingerir_documentos([_documento("aaab")], colecao="wiki", incremental=True)
+
+        reprocessados = servico.embedding_model.codificados - codificados
+        assert 0 < reprocessados < total
+        assert servico.ultima_ingestao["chunks_reembedados"] == reprocessados
+        assert servico.qdrant_client.count("wiki").count == total
+
+    def test_hashes_no_payload(self, servico):
+        """Testa se os hashes de conteúdo e de artigo são armazenados"""
+        servico.ingerir_documentos([_documento("aa")], colecao="wiki")
+
+        pontos, _ = servico.qdrant_client.scroll("wiki", with_payload=True)
+
+        assert all(p.payload["content_hash"] and p.payload["article_hash"] for p in pontos)
+        assert len({p.payload["article_hash"] for p in pontos}) == 1
+
+    def test_modo_completo_reprocessa_tudo(self, servico):
+        """Testa se sem incremental todos os chunks são reprocessados"""
+        total = servico.ingerir_documentos([_documento("aa")], colecao="wiki")
+        codificados = servico.embedding_model.codificados
+
+        servico.ingerir_documentos([_documento("aa")], colecao="wiki")
+
+        assert servico.embedding_model.codificados - codificados == total
+
+    def test_contagem_por_chamada(self, servico):
+        """Testa se a contagem por artigo vem da própria chamada, também para artigos inalterados"""
+        contagem = {}
+        total = servico.ingerir_documentos([_documento("aaaa")], colecao="wiki", incremental=True, contagem=contagem)
+        servico.ultima_ingestao["chunks_por_artigo"] = {}  # outra ingestão concorrente
+
+        inalterado = {}
+        servico.ingerir_documentos([_documento("aaaa")], colecao="wiki", incremental=True, contagem=inalterado)
+
+        assert contagem == inalterado == {"Brasil": total}
+
+    def test_upserts_aplicados_antes_da_leitura(self, servico, monkeypatch):
+        """Testa se a ingestão grava com wait=True (lê de volta os pontos logo depois)"""
+        chamadas = []
+        upsert = servico.qdrant_client.upsert
+
+        def registrar(*args, **kwargs):
+            chamadas.append(kwargs.get("wait"))
+            return upsert(*args, **kwargs)
+
+        monkeypatch.setattr(servico.qdrant_client, "upsert", registrar)
+        servico.ingerir_documentos([_documento("aa")], colecao="wiki")
+
+        assert chamadas and all(chamadas)
@@ -0,0 +1,140 @@
+"""
+Testes unitários para o gerenciador de jobs em segundo plano
+"""
+import time
+import threading
+import pytest
+from services.jobService import (
+    JobManager,
+    CONCLUIDO,
+    FALHOU,
+    CANCELADO,
+    INTERROMPIDO,
+    EXECUTANDO
+)
+
+
+def _esperar(job, estados=(CONCLUIDO, FALHOU, CANCELADO), timeout=5.0):
+    limite = time.time() + timeout
+    while job.estado not in estados and time.time() < limite:
+        time.sleep(0.01)
+    return job.estado
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = JobManager(path=tmp_path / "jobs.json", max_concorrentes=1)
+    yield manager
+    manager.encerrar()
+
+
+class TestJobManager:
+    """Testes para JobManager"""
+
+    def test_executa_e_guarda_resultado(self, manager):
+        """Testa se o job roda em segundo plano e guarda progresso e resultado"""
+        def tarefa(contexto):
+            for i in range(1, 5):
+                contexto.atualizar(artigos=i, chunks=i * 3)
+            return {"total": 4}
+
+        job = manager.submeter("teste", tarefa, {"x": 1}, total_artigos=4)
+
+        assert _esperar(job) == CONCLUIDO
+        dados = manager.obter(job.id).to_dict()
+        assert dados["resultado"] == {"total": 4}
+        assert dados["progresso"]["chunks"] == 12
+        assert dados["taxa"]["unidade"] == "artigos/s"
+
+    def test_eta_durante_execucao(self, manager):
+        """Testa taxa e ETA calculados pelo total de bytes"""
+        liberar = threading.Event()
+
+        def tarefa(contexto):
+            contexto.atualizar(bytes=250)
+            liberar.wait(5)
+
+        job = manager.submeter("download", tarefa, total_bytes=1000)
+        _esperar(job, estados=(EXECUTANDO,))
+        while job.progresso["bytes"] != 250:
+            time.sleep(0.01)
+        time.sleep(0.05)
+
+        dados = job.to_dict()
+        liberar.set()
+        assert dados["taxa"]["unidade"] == "bytes/s"
+        assert dados["eta_s"] > 0
+
+    def test_falha_registrada(self, manager):
+        """Testa se exceções e resultados com 'erro' marcam o job como falho"""
+        def explode(contexto):
+            raise ValueError("sem dump")
+
+        falho = manager.submeter("teste", explode)
+        com_erro = manager.submeter("teste", lambda contexto: {"erro": "pipeline parou"})
+
+        assert _esperar(falho) == FALHOU
+        assert falho.erro == "sem dump"
+        assert _esperar(com_erro) == FALHOU
+        assert com_erro.resultado == {"erro": "pipeline parou"}
+
+    def test_cancelamento(self, manager):
+        """Testa cancelamento de job em execução (callback) e de job ainda pendente"""
+        parado = threading.Event()
+
+        def longa(contexto):
+            contexto.ao_cancelar(parado.set)
+            parado.wait(5)
+            return {"parcial": True}
+
+        executando = manager.submeter("longa", longa)
+        pendente = manager.submeter("longa", longa)  # max_concorrentes=1: fica na fila
+        _esperar(executando, estados=(EXECUTANDO,))
+
+        manager.cancelar(pendente.id)
+        manager.cancelar(executando.id)
+
+        assert _esperar(executando) == CANCELADO
+        assert executando.resultado == {"parcial": True}
+        assert pendente.estado == CANCELADO
+        assert pendente.iniciado_em is None
+
+    def test_estado_persistido(self, tmp_path):
+        """Testa se jobs são recarregados e os que estavam ativos ficam interrompidos"""
+        caminho = tmp_path / "jobs.json"
+        primeiro = JobManager(path=caminho, max_concorrentes=1)
+        concluido = primeiro.submeter("teste", lambda contexto: {"ok": True})
+        _esperar(concluido)
+        travado = threading.Event()
+        ativo = primeiro.submeter("teste", lambda contexto: travado.wait(5))
+        _esperar(ativo, estados=(EXECUTANDO,))
+
+        recarregado = JobManager(path=caminho)
+
+        assert recarregado.obter(concluido.id).resultado == {"ok": True}
+        assert recarregado.obter(ativo.id).estado == INTERROMPIDO
+        travado.set()
+        primeiro.encerrar()
+
+    def test_ouvintes_recebem_atualizacoes(self, manager):
+        """Testa se ouvintes (WebSocket) recebem cada mudança de estado"""
+        eventos = []
+        manager.adicionar_ouvinte(lambda dados: eventos.append(dados["estado"]))
+
+        job = manager.submeter("teste", lambda contexto: contexto.atualizar(artigos=1))
+        _esperar(job)
+
+        assert eventos[0] == "pendente"
+        assert eventos[-1] == CONCLUIDO
+
+    def test_em_andamento_por_parametros(self, manager):
+        """Testa se o job ativo é encontrado pelo tipo e pelos parâmetros e deixa de ser ao terminar"""
+        travado = threading.Event()
+        job = manager.submeter("processar_dump", lambda contexto: travado.wait(5), {"filename": "a.bz2", "colecao": "wiki"})
+
+        assert manager.em_andamento("processar_dump", filename="a.bz2", colecao="wiki") is job
+        assert manager.em_andamento("processar_dump", filename="a.bz2", colecao="outra") is None
+        assert manager.em_andamento("download_dump", filename="a.bz2") is None
+        travado.set()
+        _esperar(job)
+        assert manager.em_andamento("processar_dump", filename="a.bz2", colecao="wiki") is None
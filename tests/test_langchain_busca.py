@@ -0,0 +1,93 @@
+"""
+Testes unitários para a busca do LangChainWikipediaService (pernas em lote)
+"""
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from qdrant_client.http import models
+from services.langchainWikipediaService import LangChainWikipediaService
+
+
+class Modelo:
+    def encode(self, texto, **kwargs):
+        import numpy as np
+        return np.array([1.0, 0.0])
+
+
+class FakeQdrant:
+    """Cliente que responde cada perna do lote conforme o filtro e registra as chamadas"""
+
+    def __init__(self, pernas):
+        self.pernas = pernas
+        self.lotes = []
+
+    def get_collection(self, colecao):
+        raise RuntimeError("sem perfil")
+
+    def query_batch_points(self, collection_name, requests):
+        self.lotes.append(requests)
+        respostas = []
+        for requisicao in requests:
+            if requisicao.filter is None:
+                nome = "semantica"
+            else:
+                nome = "nomes" if requisicao.filter.must else "palavra"
+            respostas.append(SimpleNamespace(points=[
+                models.ScoredPoint(id=i, version=0, score=s, payload={"title": t, "content": "x"})
+                for i, t, s in self.pernas[nome]
+            ]))
+        return respostas
+
+
+@pytest.fixture
+def service():
+    service = LangChainWikipediaService()
+    service.embedding_model = Modelo()
+    service._initialized = True
+    return service
+
+
+class TestBuscaEmLote:
+    """Testes para as pernas de buscar_documentos em uma única requisição"""
+
+    def test_uma_ida_ao_qdrant_com_mesmos_boosts(self, service):
+        """Testa se semântica, nomes próprios e palavra vão em um lote e mantêm o merge"""
+        service.qdrant_client = FakeQdrant({
+            "semantica": [(1, "Alfa", 0.9), (2, "Beta", 0.3)],
+            "nomes": [(2, "Beta", 0.3), (3, "Gama", 0.2)],
+            "palavra": [(3, "Gama", 0.2), (4, "Delta", 0.1)]
+        })
+
+        resultados = service.buscar_documentos("Recife", limit=5, score_threshold=0.5, colecao="wiki")
+
+        assert len(service.qdrant_client.lotes) == 1
+        semantica, nomes, palavra = service.qdrant_client.lotes[0]
+        assert semantica.score_threshold is None and semantica.limit == 15
+        assert nomes.score_threshold == palavra.score_threshold == 0.0
+        # Beta abaixo do threshold volta pelos nomes próprios (x1.5); Delta só pela palavra (x2 x1.5)
+        assert [(r.title, round(r.score, 4)) for r in resultados] == [
+            ("Alfa", 0.9), ("Beta", 0.45), ("Gama", 0.3), ("Delta", 0.3)
+        ]
+
+    def test_consulta_longa_so_semantica(self, service):
+        """Testa se queries com mais de 3 palavras e sem maiúsculas fazem só a perna semântica"""
+        service.qdrant_client = FakeQdrant({"semantica": [(1, "Alfa", 0.2)]})
+
+        resultados = service.buscar_documentos("como funciona motor carro elétrico", limit=5,
+                                               score_threshold=0.5, colecao="wiki")
+
+        assert len(service.qdrant_client.lotes[0]) == 1
+        assert resultados == []
+
+    def test_content_store_sem_match_text_em_content(self, service, monkeypatch):
+        """Testa se, com o texto no content store, as pernas textuais filtram só o título"""
+        monkeypatch.setenv("CONTENT_STORE_ENABLED", "true")
+        service.qdrant_client = FakeQdrant({"semantica": [(1, "Alfa", 0.9)], "palavra": [(2, "Recife", 0.2)]})
+
+        resultados = service.buscar_documentos("Recife", limit=5, score_threshold=0.5, colecao="wiki")
+
+        semantica, palavra = service.qdrant_client.lotes[0]
+        assert [c.key for c in palavra.filter.should] == ["title"]
+        assert {r.title for r in resultados} == {"Alfa", "Recife"}
@@ -0,0 +1,67 @@
+"""
+Testes unitários para o parser de dumps com lxml e pré-filtro de namespace
+"""
+import pytest
+from services.wikipediaDumpService import WikipediaDumpProcessor, LXML_AVAILABLE
+
+pytestmark = pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml não instalado")
+
+
+def _pagina(page_id, titulo, ns=0, redirect=None):
+    texto = f"#REDIRECIONAMENTO [[{redirect}]]" if redirect else f"O artigo {titulo} trata do tema {page_id}. " * 10
+    marca = f'<redirect title="{redirect}" />' if redirect else ""
+    return (
+        f"<page><title>{titulo}</title><ns>{ns}</ns><id>{page_id}</id>{marca}"
+        f"<revision><id>{page_id + 500}</id><timestamp>2024-01-01T00:00:00Z</timestamp>"
+        f"<text>{texto}</text></revision></page>"
+    )
+
+
+def _criar_dump(caminho):
+    paginas = [
+        _pagina(1, "Lisboa"),
+        _pagina(2, "Discussão:Lisboa", ns=1),
+        _pagina(3, "Porto"),
+        _pagina(4, "Cidade do Porto", redirect="Porto"),
+        _pagina(5, "Predefinição:Info", ns=10),
+        _pagina(6, "Braga"),
+    ]
+    caminho.write_text(
+        '<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/"><siteinfo><sitename>W</sitename></siteinfo>'
+        + "".join(paginas) + "</mediawiki>",
+        encoding="utf-8"
+    )
+    return str(caminho)
+
+
+class TestParserLxml:
+    """Testes para WikipediaDumpProcessor._parse_xml_dump_lxml"""
+
+    def test_filtra_namespaces_e_redirecionamentos(self, tmp_path):
+        """Testa se só artigos do namespace principal são emitidos"""
+        processor = WikipediaDumpProcessor(data_dir=str(tmp_path))
+        dump = _criar_dump(tmp_path / "dump.xml")
+
+        artigos = list(processor.parse_xml_dump(dump, usar_lxml=True))
+
+        assert [(a.id, a.title) for a in artigos] == [(1, "Lisboa"), (3, "Porto"), (6, "Braga")]
+        assert artigos[0].timestamp == "2024-01-01T00:00:00Z"
+        assert artigos[0].content.startswith("O artigo Lisboa")
+
+    def test_mesmo_resultado_que_etree(self, tmp_path):
+        """Testa se lxml e xml.etree produzem os mesmos artigos"""
+        processor = WikipediaDumpProcessor(data_dir=str(tmp_path))
+        dump = _criar_dump(tmp_path / "dump.xml")
+
+        com_lxml = [(a.id, a.title, a.content) for a in processor.parse_xml_dump(dump, usar_lxml=True)]
+        com_etree = [(a.id, a.title, a.content) for a in processor.parse_xml_dump(dump, usar_lxml=False)]
+
+        assert com_lxml == com_etree
+
+    def test_redirecionamento_sem_marca(self, tmp_path):
+        """Testa se #REDIRECIONAMENTO no texto também é descartado"""
+        processor = WikipediaDumpProcessor(data_dir=str(tmp_path))
+        xml = _pagina(9, "Antigo", redirect="Novo").replace('<redirect title="Novo" />', "")
+        (tmp_path / "dump.xml").write_text(f"<mediawiki>{xml}</mediawiki>", encoding="utf-8")
+
+        assert list(processor.parse_xml_dump(str(tmp_path / "dump.xml"), usar_lxml=True)) == []
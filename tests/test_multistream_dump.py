@@ -0,0 +1,83 @@
+"""
+Testes unitários para leitura paralela de dumps multistream
+"""
+import bz2
+import pytest
+from services.wikipediaDumpService import WikipediaDumpProcessor
+
+
+def _pagina(page_id):
+    texto = f"O artigo {page_id} descreve o assunto {page_id} em detalhes. " * 10
+    return (
+        f"<page><title>Artigo {page_id}</title><ns>0</ns><id>{page_id}</id>"
+        f"<revision><id>{page_id + 9000}</id><timestamp>2024-01-01T00:00:00Z</timestamp>"
+        f"<text>{texto}</text></revision></page>\n"
+    )
+
+
+def _criar_multistream(tmp_path, n_paginas=25, por_stream=4):
+    """Gera dump multistream (um membro bz2 por grupo de páginas) e o índice de offsets"""
+    dump = tmp_path / "ptwiki-test-pages-articles-multistream.xml.bz2"
+    index = tmp_path / "ptwiki-test-pages-articles-multistream-index.txt.bz2"
+
+    streams = [bz2.compress(b'<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/">\n<siteinfo></siteinfo>\n')]
+    linhas = []
+    offset = len(streams[0])
+    ids = list(range(1, n_paginas + 1))
+    for i in range(0, len(ids), por_stream):
+        grupo = ids[i:i + por_stream]
+        dados = bz2.compress("".join(_pagina(p) for p in grupo).encode("utf-8"))
+        linhas += [f"{offset}:{p}:Artigo {p}" for p in grupo]
+        streams.append(dados)
+        offset += len(dados)
+    streams.append(bz2.compress(b"</mediawiki>\n"))
+
+    dump.write_bytes(b"".join(streams))
+    index.write_bytes(bz2.compress("\n".join(linhas).encode("utf-8")))
+    return str(dump), str(index)
+
+
+class TestMultistreamDump:
+    """Testes para o leitor multistream do WikipediaDumpProcessor"""
+
+    def test_indice_agrupa_streams(self, tmp_path):
+        """Testa se o índice é agrupado por offset com intervalo de page ids"""
+        processor = WikipediaDumpProcessor(data_dir=str(tmp_path))
+        _, index = _criar_multistream(tmp_path)
+
+        blocos = processor.read_multistream_index(index)
+
+        assert len(blocos) == 7
+        assert (blocos[0].first_page_id, blocos[0].last_page_id, blocos[0].page_count) == (1, 4, 4)
+        assert blocos[0].length == blocos[1].offset - blocos[0].offset
+        assert blocos[-1].length is None
+
+    def test_leitura_paralela_preserva_ordem(self, tmp_path):
+        """Testa se todos os artigos são lidos em paralelo e na ordem do dump"""
+        processor = WikipediaDumpProcessor(data_dir=str(tmp_path))
+        dump, _ = _criar_multistream(tmp_path)
+
+        artigos = list(processor.parse_multistream_dump(dump, workers=2))
+
+        assert [a.id for a in artigos] == list(range(1, 26))
+        assert artigos[0].title == "Artigo 1"
+
+    def test_intervalo_de_page_id(self, tmp_path):
+        """Testa acesso direto a um intervalo de page ids"""
+        processor = WikipediaDumpProcessor(data_dir=str(tmp_path))
+        dump, _ = _criar_multistream(tmp_path)
+
+        artigos = list(processor.parse_multistream_dump(dump, workers=2, min_page_id=7, max_page_id=10))
+
+        assert [a.id for a in artigos] == [7, 8, 9, 10]
+
+    def test_iter_articles_sem_indice_usa_parser_sequencial(self, tmp_path):
+        """Testa o fallback para o parser sequencial quando não há índice"""
+        processor = WikipediaDumpProcessor(data_dir=str(tmp_path))
+        dump, index = _criar_multistream(tmp_path, n_paginas=6)
+        (tmp_path / "ptwiki-test-pages-articles-multistream-index.txt.bz2").unlink()
+
+        assert processor.find_multistream_index(dump) is None
+        artigos = list(processor.iter_articles(dump, min_page_id=3))
+
+        assert [a.id for a in artigos] == [3, 4, 5, 6]
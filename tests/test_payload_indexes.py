@@ -0,0 +1,60 @@
+"""
+Testes unitários para o esquema de índices de payload das coleções
+"""
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from qdrant_client.http import models
+from services.utils.payload_indexes import ESQUEMA_INDICES, criar_indices, indices_faltando
+
+
+class FakeQdrant:
+    """Cliente que guarda os índices criados como o payload_schema do Qdrant"""
+
+    def __init__(self, schema=None):
+        self.schema = dict(schema or {})
+        self.criados = []
+
+    def get_collection(self, colecao):
+        return SimpleNamespace(payload_schema={
+            campo: SimpleNamespace(data_type=models.PayloadSchemaType(tipo)) for campo, tipo in self.schema.items()
+        })
+
+    def create_payload_index(self, collection_name, field_name, field_schema, wait=True):
+        tipo = "text" if isinstance(field_schema, models.TextIndexParams) else field_schema.value
+        self.schema[field_name] = tipo
+        self.criados.append(field_name)
+
+
+class TestIndicesPayload:
+    """Testes para utils.payload_indexes"""
+
+    def test_esquema_completo_na_criacao(self):
+        """Testa se uma coleção sem índices recebe todos os do esquema com o tipo certo"""
+        client = FakeQdrant()
+
+        resultado = criar_indices(client, "wiki")
+
+        assert set(resultado.values()) == {"criado"}
+        assert client.schema == {
+            "content": "text", "title": "text", "url": "keyword", "source": "keyword",
+            "article_id": "integer", "chunk_index": "integer"
+        }
+
+    def test_backfill_cria_so_o_que_falta(self):
+        """Testa se índices existentes são mantidos e o antigo page_content é ignorado"""
+        client = FakeQdrant({"page_content": "text", "content": "text", "url": "keyword"})
+
+        resultado = criar_indices(client, "wiki")
+
+        assert resultado["content"] == resultado["url"] == "existente"
+        assert sorted(client.criados) == ["article_id", "chunk_index", "source", "title"]
+        assert indices_faltando(client.get_collection("wiki")) == {}
+
+    def test_tipo_errado_e_recriado(self):
+        """Testa se um índice de tipo diferente do esquema conta como faltando"""
+        client = FakeQdrant({"chunk_index": "keyword"})
+
+        assert indices_faltando(client.get_collection("wiki"))["chunk_index"] == ESQUEMA_INDICES["chunk_index"]
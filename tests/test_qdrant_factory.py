@@ -0,0 +1,68 @@
+"""
+Testes unitários para a fábrica do cliente Qdrant compartilhado
+"""
+import pytest
+from services.utils import qdrant_factory
+from services.utils.qdrant_factory import (
+    configuracao_qdrant,
+    obter_cliente_qdrant,
+    redefinir_cliente_qdrant
+)
+
+pytestmark = pytest.mark.skipif(not qdrant_factory.QDRANT_AVAILABLE, reason="qdrant-client não instalado")
+
+
+@pytest.fixture(autouse=True)
+def cliente_limpo():
+    redefinir_cliente_qdrant()
+    yield
+    redefinir_cliente_qdrant()
+
+
+class TestFabricaQdrant:
+    """Testes para services.utils.qdrant_factory"""
+
+    def test_configuracao_do_ambiente(self, monkeypatch):
+        """Testa leitura de host, portas, gRPC e timeout das variáveis de ambiente"""
+        monkeypatch.setenv("QDRANT_HOST", "qdrant")
+        monkeypatch.setenv("QDRANT_GRPC_PORT", "7334")
+        monkeypatch.setenv("QDRANT_PREFER_GRPC", "true")
+        monkeypatch.setenv("QDRANT_TIMEOUT", "5")
+
+        config = configuracao_qdrant()
+
+        assert config["host"] == "qdrant"
+        assert config["grpc_port"] == 7334
+        assert config["prefer_grpc"] is True
+        assert config["timeout"] == 5
+
+    def test_sobrescritas(self, monkeypatch):
+        """Testa se parâmetros explícitos têm prioridade e None é ignorado"""
+        monkeypatch.setenv("QDRANT_PREFER_GRPC", "true")
+        monkeypatch.delenv("QDRANT_HOST", raising=False)
+
+        config = configuracao_qdrant(prefer_grpc=False, host=None)
+
+        assert config["prefer_grpc"] is False
+        assert config["host"] == "localhost"
+
+    def test_cliente_compartilhado(self, monkeypatch):
+        """Testa se o cliente é criado uma vez e recriado após redefinir"""
+        criados = []
+        monkeypatch.setattr(qdrant_factory, "QdrantClient", lambda **kw: criados.append(kw) or object())
+
+        primeiro = obter_cliente_qdrant()
+        assert obter_cliente_qdrant() is primeiro
+        assert len(criados) == 1
+
+        redefinir_cliente_qdrant()
+        assert obter_cliente_qdrant() is not primeiro
+        assert len(criados) == 2
+
+    def test_cliente_grpc_sem_servidor(self, monkeypatch):
+        """Testa se o cliente gRPC é construído sem abrir conexão"""
+        monkeypatch.setenv("QDRANT_PREFER_GRPC", "true")
+
+        cliente = obter_cliente_qdrant()
+
+        assert cliente._client._prefer_grpc is True
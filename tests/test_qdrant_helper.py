@@ -0,0 +1,106 @@
+"""
+Testes unitários para o QdrantHelper (IDs determinísticos e limpeza de chunks)
+"""
+import pytest
+from types import SimpleNamespace
+from services.utils.wikipedia_utils import QdrantHelper
+
+
+class FakeQdrant:
+    """Cliente Qdrant em memória com retrieve/delete por ID"""
+
+    def __init__(self):
+        self.pontos = {}
+        self.deletes = 0
+
+    def adicionar_artigo(self, colecao, titulo, total):
+        for i in range(total):
+            pid = QdrantHelper.gerar_id_deterministico(colecao, titulo, i)
+            self.pontos[pid] = SimpleNamespace(id=pid, payload={"title": titulo, "total_chunks": total})
+
+    def retrieve(self, collection_name, ids, **kwargs):
+        return [self.pontos[i] for i in ids if i in self.pontos]
+
+    def delete(self, collection_name, points_selector, **kwargs):
+        self.deletes += 1
+        for i in points_selector:
+            self.pontos.pop(i, None)
+
+
+class TestIdsDeterministicos:
+    """Testes para geração de IDs determinísticos"""
+
+    def test_id_estavel(self):
+        """Testa se o mesmo chunk sempre gera o mesmo ID"""
+        assert QdrantHelper.gerar_id_deterministico("wiki", "Brasil", 3) == \
+            QdrantHelper.gerar_id_deterministico("wiki", "Brasil", 3)
+
+    def test_id_varia_por_colecao_artigo_e_indice(self):
+        """Testa se coleção, artigo e índice compõem o ID"""
+        ids = {
+            QdrantHelper.gerar_id_deterministico("wiki", "Brasil", 0),
+            QdrantHelper.gerar_id_deterministico("outra", "Brasil", 0),
+            QdrantHelper.gerar_id_deterministico("wiki", "Portugal", 0),
+            QdrantHelper.gerar_id_deterministico("wiki", "Brasil", 1),
+        }
+        assert len(ids) == 4
+
+
+class TestRemoverChunksExcedentes:
+    """Testes para remoção de chunks antigos além da nova contagem"""
+
+    def test_remove_excedentes_quando_artigo_encolhe(self):
+        """Testa se chunks além da nova contagem são removidos"""
+        client = FakeQdrant()
+        client.adicionar_artigo("wiki", "Brasil", 5)
+
+        removidos = QdrantHelper.remover_chunks_excedentes(client, "wiki", {"Brasil": 2})
+
+        assert removidos == 3
+        assert len(client.pontos) == 2
+
+    def test_nada_a_remover(self):
+        """Testa se artigos que cresceram ou são novos não geram delete"""
+        client = FakeQdrant()
+        client.adicionar_artigo("wiki", "Brasil", 2)
+
+        assert QdrantHelper.remover_chunks_excedentes(client, "wiki", {"Brasil": 4, "Novo": 1}) == 0
+        assert client.deletes == 0
+
+    def test_probe_em_chunk_suprimido(self, monkeypatch, tmp_path):
+        """Testa se o total de um chunk suprimido (fora do Qdrant) vem do registro de supressões"""
+        from services.utils import dedup_utils
+
+        monkeypatch.setenv("DEDUP_DIR", str(tmp_path))
+        monkeypatch.setattr(dedup_utils, "_registros", {})
+        client = FakeQdrant()
+        client.adicionar_artigo("wiki", "Brasil", 5)
+        suprimido = QdrantHelper.gerar_id_deterministico("wiki", "Brasil", 2)
+        payload = client.pontos.pop(suprimido).payload
+        registro = dedup_utils.obter_registro_supressoes("wiki")
+        registro.registrar({suprimido: ("outro", payload)})
+
+        removidos = []
+        QdrantHelper.remover_chunks_excedentes(client, "wiki", {"Brasil": 2}, ao_remover=removidos.extend)
+
+        assert len(client.pontos) == 2
+        assert len(removidos) == 3 and registro.contar() == 0
+
+    def test_remove_texto_do_content_store(self, monkeypatch, tmp_path):
+        """Testa se o texto externalizado dos chunks excedentes sai do content store"""
+        from services.utils import content_store
+
+        monkeypatch.setenv("CONTENT_STORE_DIR", str(tmp_path))
+        monkeypatch.setattr(content_store, "_stores", {})
+        client = FakeQdrant()
+        client.adicionar_artigo("wiki", "Brasil", 3)
+        store = content_store.obter_content_store("wiki")
+        store.guardar({pid: f"texto {pid}" for pid in client.pontos})
+
+        QdrantHelper.remover_chunks_excedentes(client, "wiki", {"Brasil": 1})
+
+        assert store.estatisticas()["registros"] == 1
+
+    def test_cliente_sem_suporte(self):
+        """Testa se falhas na consulta não interrompem a ingestão"""
+        assert QdrantHelper.remover_chunks_excedentes(object(), "wiki", {"Brasil": 1}) == 0
@@ -0,0 +1,130 @@
+"""
+Testes unitários para o escritor de upserts paralelos no Qdrant
+"""
+import time
+import threading
+import pytest
+from qdrant_client import QdrantClient, models
+from services.utils.qdrant_writer import QdrantBatchWriter, preparar_pontos
+
+
+class ClienteLento:
+    """Cliente falso que registra lotes e upserts simultâneos"""
+
+    def __init__(self, latencia=0.02, falhar=False):
+        self.latencia = latencia
+        self.falhar = falhar
+        self.lotes = []
+        self.kwargs = []
+        self.em_voo = 0
+        self.pico = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, collection_name, points, **kwargs):
+        with self._lock:
+            self.em_voo += 1
+            self.pico = max(self.pico, self.em_voo)
+        time.sleep(self.latencia)
+        with self._lock:
+            self.em_voo -= 1
+            self.lotes.append(len(points))
+            self.kwargs.append(kwargs)
+        if self.falhar:
+            raise RuntimeError("qdrant indisponível")
+
+
+def _pontos(n, inicio=0, dim=4):
+    return [models.PointStruct(id=i, vector=[0.1] * dim, payload={"title": f"T{i}"}) for i in range(inicio, inicio + n)]
+
+
+class TestQdrantBatchWriter:
+    """Testes para QdrantBatchWriter"""
+
+    def test_upserts_em_paralelo_sem_wait(self):
+        """Testa se vários lotes ficam em voo ao mesmo tempo com wait=False"""
+        cliente = ClienteLento(latencia=0.05)
+        with QdrantBatchWriter(cliente, "c", max_em_voo=4, tamanho_lote=10, latencia_alvo=10) as escritor:
+            escritor.adicionar(_pontos(80))
+
+        assert sum(cliente.lotes) == 80
+        assert cliente.pico > 1
+        assert all(k["wait"] is False for k in cliente.kwargs)
+        assert escritor.estatisticas()["pontos_enviados"] == 80
+
+    def test_backpressure(self):
+        """Testa se nunca há mais upserts pendentes do que max_em_voo"""
+        cliente = ClienteLento(latencia=0.02)
+        with QdrantBatchWriter(cliente, "c", max_em_voo=2, tamanho_lote=5, latencia_alvo=10) as escritor:
+            for k in range(20):
+                escritor.adicionar(_pontos(5, inicio=k * 5))
+
+        assert cliente.pico <= 2
+
+    def test_lote_cresce_e_encolhe_pela_latencia(self):
+        """Testa o ajuste do tamanho do lote pela latência observada"""
+        rapido = QdrantBatchWriter(ClienteLento(latencia=0), "c", max_em_voo=1, tamanho_lote=16, latencia_alvo=1)
+        rapido.adicionar(_pontos(200))
+        rapido.fechar()
+        assert rapido.tamanho_lote > 16
+
+        lento = QdrantBatchWriter(ClienteLento(latencia=0.05), "c", max_em_voo=1, tamanho_lote=64, latencia_alvo=0.01)
+        lento.adicionar(_pontos(128))
+        lento.fechar()
+        assert lento.tamanho_lote < 64
+
+    def test_lote_limitado_por_bytes(self):
+        """Testa se vetores grandes reduzem o lote ao limite de bytes"""
+        escritor = QdrantBatchWriter(
+            ClienteLento(latencia=0), "c", max_em_voo=1, tamanho_lote=100,
+            latencia_alvo=1, max_bytes_lote=200_000, lote_minimo=1
+        )
+        escritor.adicionar(_pontos(100, dim=1024))
+        escritor.fechar()
+
+        assert escritor.tamanho_lote <= 200_000 // (1024 * 10)
+
+    def test_erro_propagado_no_flush(self):
+        """Testa se uma falha de upsert em segundo plano chega a quem escreve"""
+        escritor = QdrantBatchWriter(ClienteLento(latencia=0, falhar=True), "c", tamanho_lote=10)
+        escritor.adicionar(_pontos(10))
+
+        with pytest.raises(RuntimeError, match="indisponível"):
+            escritor.flush()
+        escritor.fechar()
+
+    def test_qdrant_em_memoria(self):
+        """Testa a escrita real em um Qdrant em memória"""
+        cliente = QdrantClient(":memory:")
+        cliente.create_collection("c", vectors_config=models.VectorParams(size=4, distance=models.Distance.COSINE))
+
+        with QdrantBatchWriter(cliente, "c", tamanho_lote=7) as escritor:
+            escritor.adicionar(_pontos(50))
+
+        assert cliente.count("c").count == 50
+        assert escritor.estatisticas()["lotes_em_voo"] == 0
+
+
+class TestPrepararPontos:
+    """Testes do preparo dos pontos antes do upsert"""
+
+    def test_bm25_e_normalizados_antes_do_content_store(self, tmp_path, monkeypatch):
+        """Testa se o vetor BM25 e os campos normalizados saem do texto antes de ele ser externalizado"""
+        from services.utils import content_store
+        from services.utils.sparse_utils import VETOR_ESPARSO, config_vetores_esparsos, esquecer_colecao_hibrida
+
+        monkeypatch.setenv("CONTENT_STORE_ENABLED", "true")
+        monkeypatch.setenv("CONTENT_STORE_DIR", str(tmp_path))
+        monkeypatch.setattr(content_store, "_stores", {})
+        esquecer_colecao_hibrida("h")
+        cliente = QdrantClient(":memory:")
+        cliente.create_collection(
+            "h", vectors_config={"": models.VectorParams(size=4, distance=models.Distance.COSINE)},
+            sparse_vectors_config=config_vetores_esparsos()
+        )
+        ponto = models.PointStruct(id=1, vector=[0.1] * 4, payload={"title": "Recife", "content": "Recife é a capital de Pernambuco"})
+
+        preparar_pontos(cliente, "h", [ponto])
+
+        assert VETOR_ESPARSO in ponto.vector
+        assert ponto.payload["content_norm"] == "recife e a capital de pernambuco"
+        assert "content" not in ponto.payload and ponto.payload["conteudo_externo"] is True
@@ -0,0 +1,172 @@
+"""
+Testes unitários para os vetores esparsos BM25 e a busca híbrida
+"""
+import pytest
+
+qdrant_client = pytest.importorskip("qdrant_client")
+
+from qdrant_client.http import models
+from services.utils.sparse_utils import (
+    VETOR_ESPARSO,
+    adicionar_vetores_esparsos,
+    analisar,
+    config_vetores_esparsos,
+    esquecer_colecao_hibrida,
+    indice_termo,
+    vetor_esparso_documento
+)
+
+
+class Modelo:
+    """Consulta ortogonal a todos os chunks: nenhum passa pelo threshold da perna densa"""
+
+    def encode(self, textos, **kwargs):
+        import numpy as np
+        if isinstance(textos, str):
+            return np.array([1.0, 0.0])
+        return [[0.0, 1.0] for _ in textos]
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+
+class ModeloFrevo:
+    """Consulta e chunks sobre frevo no mesmo ponto: Olinda lidera a perna densa"""
+
+    def encode(self, textos, **kwargs):
+        import numpy as np
+        if isinstance(textos, str):
+            return np.array([1.0, 0.0])
+        return [[1.0, 0.0] if "frevo" in texto else [0.0, 1.0] for texto in textos]
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+
+def servico_recife_olinda(monkeypatch, colecao):
+    """Serviço com coleção híbrida: Recife só na perna BM25, Olinda nas duas pernas"""
+    from services.langchainWikipediaService import LangChainWikipediaService, WikipediaDocument
+
+    monkeypatch.setenv("HYBRID_SEARCH_ENABLED", "true")
+    monkeypatch.setenv("CONTENT_STORE_ENABLED", "false")
+    esquecer_colecao_hibrida(colecao)
+    service = LangChainWikipediaService()
+    service.qdrant_client = qdrant_client.QdrantClient(":memory:")
+    service.embedding_model = ModeloFrevo()
+    service._configurar_text_splitter()
+    service._initialized = True
+    service.criar_colecao_custom(colecao, 2)
+    service.ingerir_documentos([
+        WikipediaDocument(title="Recife", content="Recife é a capital do estado de Pernambuco. " * 3, url="Recife", metadata={}),
+        # "capital" só depois do trecho conferido pelo boosting e pela verificação de termos
+        WikipediaDocument(title="Olinda", content="Olinda é famosa pelo frevo e pelo carnaval de rua. " * 5 + "Foi capital.", url="Olinda", metadata={})
+    ], colecao=colecao)
+    return service
+
+
+class TestAnalisador:
+    """Testes para o analisador e os pesos BM25"""
+
+    def test_acentos_plural_e_stopwords(self):
+        """Testa se variações de acento e plural caem no mesmo termo"""
+        assert analisar("As Nações e a nação") == ["nacao", "nacao"]
+        assert analisar("papéis, flores e homens") == ["papel", "flor", "homem"]
+        assert analisar("o que é") == []
+
+    def test_stopwords_da_consulta_fora_do_indice(self):
+        """Testa se o BM25 descarta as mesmas stopwords da análise de consulta"""
+        from services.utils.text_analysis import STOPWORDS
+
+        assert [p for p in STOPWORDS if analisar(p)] == []
+
+    def test_saturacao_e_tamanho(self):
+        """Testa se tf satura e se o mesmo termo pesa menos em um chunk mais longo"""
+        recife = indice_termo("recife")
+        curto = vetor_esparso_documento("Recife Recife", tamanho_medio=10)
+        longo = vetor_esparso_documento("Recife Recife " + "palavra " * 30, tamanho_medio=10)
+        uma_vez = vetor_esparso_documento("Recife", tamanho_medio=10)
+
+        peso = lambda v: v.values[v.indices.index(recife)]
+        assert peso(uma_vez) < peso(curto) < 2 * peso(uma_vez)
+        assert peso(longo) < peso(curto)
+
+
+class TestColecaoHibrida:
+    """Testes para ingestão e busca em coleções com o vetor esparso"""
+
+    def test_so_colecoes_hibridas_recebem_vetor(self):
+        """Testa se pontos de coleção sem o vetor esparso ficam intactos e dicts reaproveitados são refeitos"""
+        client = qdrant_client.QdrantClient(":memory:")
+        client.create_collection("densa", vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE))
+        client.create_collection("hibrida", vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+                                 sparse_vectors_config=config_vetores_esparsos())
+        esquecer_colecao_hibrida("densa")
+        esquecer_colecao_hibrida("hibrida")
+        ponto = lambda vetor: models.PointStruct(id=1, vector=vetor, payload={"content": "Recife"})
+
+        denso = ponto([1.0, 0.0])
+        reaproveitado = ponto({"": [1.0, 0.0], VETOR_ESPARSO: models.SparseVector(indices=[1], values=[9.0])})
+
+        assert adicionar_vetores_esparsos(client, "densa", [denso]) == 0 and denso.vector == [1.0, 0.0]
+        assert adicionar_vetores_esparsos(client, "hibrida", [reaproveitado]) == 1
+        assert reaproveitado.vector[""] == [1.0, 0.0]
+        assert reaproveitado.vector[VETOR_ESPARSO].indices == [indice_termo("recife")]
+
+    def test_busca_hibrida_no_servico(self, monkeypatch):
+        """Testa se a perna BM25 traz o artigo com o termo mesmo sem similaridade densa"""
+        from services.langchainWikipediaService import LangChainWikipediaService, WikipediaDocument
+
+        monkeypatch.setenv("HYBRID_SEARCH_ENABLED", "true")
+        monkeypatch.setenv("CONTENT_STORE_ENABLED", "false")
+        esquecer_colecao_hibrida("wiki_hibrida")
+        service = LangChainWikipediaService()
+        service.qdrant_client = qdrant_client.QdrantClient(":memory:")
+        service.embedding_model = Modelo()
+        service._configurar_text_splitter()
+        service._initialized = True
+        service.criar_colecao_custom("wiki_hibrida", 2)
+        documentos = [
+            WikipediaDocument(title=titulo, content=texto * 5, url=titulo, metadata={})
+            for titulo, texto in [
+                ("Recife", "Recife é a capital do estado de Pernambuco. "),
+                ("Curitiba", "Curitiba é a capital do estado do Paraná. "),
+                ("Manaus", "Manaus é a capital do estado do Amazonas. ")
+            ]
+        ]
+        service.ingerir_documentos(documentos, colecao="wiki_hibrida")
+
+        resultados = service.buscar_documentos("capital de Pernambuco", limit=3, score_threshold=0.5, colecao="wiki_hibrida")
+
+        assert resultados[0].title == "Recife"
+
+    def test_busca_hibrida_mantem_ordem_do_rrf(self, monkeypatch):
+        """Testa se o boost por termo não reordena a fusão (o BM25 já contou o match lexical)"""
+        service = servico_recife_olinda(monkeypatch, "wiki_ordem")
+
+        resultados = service.buscar_documentos("capital de Pernambuco", limit=3, score_threshold=0.5, colecao="wiki_ordem")
+
+        # Olinda soma as duas pernas; Recife, com os termos no título, só a BM25
+        assert [r.title for r in resultados] == ["Olinda", "Recife"]
+        assert resultados[0].score > resultados[1].score
+
+    def test_rag_sem_cortes_de_cosseno_na_hibrida(self, monkeypatch):
+        """Testa se o RAG numa coleção híbrida não aceita chunk sem os termos só pelo score do RRF"""
+        import asyncio
+        from services import wikipediaOfflineService as modulo
+
+        service = servico_recife_olinda(monkeypatch, "wiki_rag")
+
+        async def sem_telemetria(*args, **kwargs):
+            pass
+
+        rag = modulo.WikipediaOfflineService()
+        rag.client = service.qdrant_client
+        monkeypatch.setattr(modulo, "langchain_wikipedia_service", service)
+        monkeypatch.setattr(modulo, "enviar_telemetria", sem_telemetria)
+        monkeypatch.setattr(modulo.asyncio, "sleep", sem_telemetria)
+        monkeypatch.setattr(rag, "_generate_answer_with_ollama", lambda pergunta, contexto: ("resposta", {}))
+
+        resposta = asyncio.run(rag.perguntar_com_rag("capital de Pernambuco", colecao="wiki_rag"))
+
+        # Olinda soma as duas pernas (score do RRF acima de 0.60), mas não tem os termos
+        assert [doc.title for doc in resposta.sources] == ["Recife"]
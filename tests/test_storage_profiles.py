@@ -0,0 +1,77 @@
+"""
+Testes unitários para os perfis de armazenamento de coleções Qdrant
+"""
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from qdrant_client.http import models
+from services.utils.storage_profiles import (
+    PERFIS,
+    obter_perfil,
+    configuracao_colecao,
+    parametros_busca,
+    perfil_da_colecao,
+    estimar_memoria
+)
+
+
+def _info(configuracao):
+    """Imita o retorno de get_collection para uma coleção criada com a configuração"""
+    return SimpleNamespace(config=SimpleNamespace(
+        params=SimpleNamespace(vectors=configuracao["vectors_config"]),
+        quantization_config=configuracao.get("quantization_config")
+    ))
+
+
+class TestPerfisArmazenamento:
+    """Testes para utils.storage_profiles"""
+
+    def test_padrao_mantem_comportamento_original(self):
+        """Testa se o perfil padrão cria float32 em RAM e busca sem parâmetros extras"""
+        configuracao = configuracao_colecao(obter_perfil("padrao"), 384)
+
+        assert set(configuracao) == {"vectors_config"}
+        assert configuracao["vectors_config"].on_disk is None
+        assert parametros_busca(PERFIS["padrao"]) is None
+
+    def test_int8_quantizado_com_originais_em_disco(self):
+        """Testa quantização escalar, vetores e payload em disco e rescoring na busca"""
+        configuracao = configuracao_colecao(PERFIS["int8"], 1024, hnsw_m=32, hnsw_ef_construct=256)
+
+        assert configuracao["quantization_config"].scalar.type == models.ScalarType.INT8
+        assert configuracao["vectors_config"].on_disk is True
+        assert configuracao["vectors_config"].hnsw_config.m == 32
+        assert configuracao["on_disk_payload"] is True
+        busca = parametros_busca(PERFIS["int8"], hnsw_ef=128)
+        assert busca.quantization.rescore is True
+        assert busca.quantization.oversampling == PERFIS["int8"].oversampling
+        assert busca.hnsw_ef == 128
+
+    def test_perfil_deduzido_da_colecao(self):
+        """Testa se o perfil de uma coleção existente é reconhecido pela configuração dela"""
+        for nome in ("padrao", "int8", "binario", "pq", "float16", "disco"):
+            assert perfil_da_colecao(_info(configuracao_colecao(PERFIS[nome], 64))).nome == nome
+
+    def test_oversampling_por_ambiente(self, monkeypatch):
+        """Testa QDRANT_OVERSAMPLING e QDRANT_HNSW_EF"""
+        monkeypatch.setenv("QDRANT_OVERSAMPLING", "4")
+        monkeypatch.setenv("QDRANT_HNSW_EF", "200")
+
+        busca = parametros_busca(PERFIS["binario"])
+
+        assert busca.quantization.oversampling == 4.0
+        assert busca.hnsw_ef == 200
+
+    def test_memoria_estimada(self):
+        """Testa se os perfis quantizados e em disco ocupam menos RAM que o padrão"""
+        ram = {nome: estimar_memoria(perfil, 1_000_000, 1024)["ram_bytes"] for nome, perfil in PERFIS.items()}
+
+        assert ram["binario"] < ram["pq"] < ram["int8"] < ram["float16"] < ram["padrao"]
+        assert ram["disco"] == 0
+
+    def test_perfil_invalido(self):
+        """Testa a validação do nome do perfil"""
+        with pytest.raises(ValueError):
+            obter_perfil("comprimido")
@@ -0,0 +1,68 @@
+"""
+Testes unitários para o analisador de consultas e os campos normalizados gravados na ingestão
+"""
+import unicodedata
+from types import SimpleNamespace
+
+from services.utils.text_analysis import (
+    PREFIXO_NORMALIZADO,
+    STOPWORDS_PERGUNTA,
+    analisar_consulta,
+    normalizados,
+    normalizar,
+    normalizar_payloads,
+    remover_acentos
+)
+
+
+class TestAnaliseConsulta:
+    """Testes para a remoção de acentos por tabela e a análise memoizada"""
+
+    def test_tabela_igual_a_nfd(self):
+        """Testa se a tabela de translate dá o mesmo resultado que NFD sem marcas Mn"""
+        referencia = lambda t: "".join(c for c in unicodedata.normalize("NFD", t) if unicodedata.category(c) != "Mn")
+        textos = ["São Paulo", "Ærø Łódź ǅ", "Ἀθῆναι e Hà Nội", "cafe\u0301 decomposto", "".join(map(chr, range(0x80, 0x500)))]
+
+        for texto in textos:
+            assert remover_acentos(texto) == referencia(texto)
+
+    def test_termos_nomes_e_padrao(self):
+        """Testa stopwords, pontuação, nomes próprios e o padrão de palavras inteiras"""
+        analise = analisar_consulta("Quem foi Dom Pedro II, o imperador do Brasil?")
+
+        assert analise.palavras == ("Dom", "Pedro", "II", "imperador", "Brasil")
+        assert analise.termos == ("dom", "pedro", "imperador", "brasil")
+        assert analise.nomes_proprios == ("Dom", "Pedro", "Brasil")
+        assert analise.padrao_termos.search("o imperador reinou")
+        assert not analise.padrao_termos.search("brasileiro")
+
+    def test_fallback_e_memoizacao(self):
+        """Testa se uma consulta só de stopwords mantém o texto original e se a análise é reaproveitada"""
+        analise = analisar_consulta("o que é?")
+
+        assert analise.texto_limpo == "o que é?" and analise.termos == () and analise.padrao_termos is None
+        assert analisar_consulta("Onde fica Cusco?", STOPWORDS_PERGUNTA) is analisar_consulta("Onde fica Cusco?", STOPWORDS_PERGUNTA)
+        assert analisar_consulta("Onde fica Cusco?", STOPWORDS_PERGUNTA).termos == ("cusco",)
+
+
+class TestCamposNormalizados:
+    """Testes para title_norm/content_norm no payload e na busca"""
+
+    def test_normalizar_payloads(self):
+        """Testa se pontos com conteúdo ganham os campos e os demais ficam intactos"""
+        conteudo = "São Paulo é a maior cidade do Brasil. " * 20
+        com_texto = SimpleNamespace(payload={"title": "São Paulo", "content": conteudo})
+        sem_texto = SimpleNamespace(payload={"title": "Externalizado"})
+
+        assert normalizar_payloads([com_texto, sem_texto]) == 1
+        assert com_texto.payload["title_norm"] == "sao paulo"
+        assert com_texto.payload["content_norm"] == normalizar(conteudo[:PREFIXO_NORMALIZADO])
+        assert "title_norm" not in sem_texto.payload
+
+    def test_normalizados_usa_campos_ou_calcula(self):
+        """Testa se os campos gravados são usados e pontos antigos são normalizados na hora"""
+        gravado = SimpleNamespace(title="Ignorado", content="Ignorado", title_norm="recife", content_norm="capital")
+        antigo = SimpleNamespace(title="Ceará", content="Fortaleza é a Capital", title_norm=None, content_norm=None)
+
+        assert normalizados(gravado) == ("recife", "capital")
+        assert normalizados(antigo) == ("ceara", "fortaleza e a capital")
@@ -0,0 +1,192 @@
+"""
+Testes unitários para o cliente assíncrono da Wikipedia API (contra servidor local)
+"""
+import json
+import asyncio
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+from services.utils.wikipedia_utils import WikipediaAsyncAPIClient, buscar_artigos_concorrente
+
+LATENCIA = 0.2
+# Conteúdos por resposta do stub em lote (força o uso de tokens continue)
+CONTEUDOS_POR_RESPOSTA = 20
+
+
+class _StubWikipedia(BaseHTTPRequestHandler):
+    """Imita as rotas de summary, prop=extracts e prop=revisions com latência fixa"""
+
+    estado = {"requisicoes": 0, "em_voo": 0, "pico": 0, "falhas_429": 0}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, codigo, corpo, headers=None):
+        dados = json.dumps(corpo).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in (headers or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        with self.lock:
+            self.estado["requisicoes"] += 1
+            self.estado["em_voo"] += 1
+            self.estado["pico"] = max(self.estado["pico"], self.estado["em_voo"])
+            devolver_429 = self.estado["falhas_429"] > 0
+            if devolver_429:
+                self.estado["falhas_429"] -= 1
+        try:
+            time.sleep(LATENCIA)
+            if devolver_429:
+                return self._responder(429, {"erro": "limite"}, {"Retry-After": "0"})
+            url = urlparse(self.path)
+            if url.path.startswith("/api/rest_v1/page/summary/"):
+                titulo = unquote(url.path.rsplit("/", 1)[-1]).replace("_", " ")
+                if titulo.startswith("Inexistente"):
+                    return self._responder(404, {})
+                return self._responder(200, {"title": titulo, "extract": f"Resumo de {titulo}"})
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if "revisions" in params.get("prop", ""):
+                return self._responder(200, self._consulta_lote(params))
+            titulo = params["titles"].replace("_", " ")
+            pagina = {"1": {"title": titulo, "extract": f"Texto completo de {titulo}. " * 5}}
+            return self._responder(200, {"query": {"pages": pagina}})
+        finally:
+            with self.lock:
+                self.estado["em_voo"] -= 1
+
+    @staticmethod
+    def _consulta_lote(params):
+        """Imita titles=A|B|C com normalização, redirecionamentos e continue"""
+        query = {"normalized": [], "redirects": [], "pages": []}
+        canonicos = []
+        for titulo in params["titles"].split("|"):
+            normalizado = titulo.replace("_", " ")
+            normalizado = normalizado[:1].upper() + normalizado[1:]
+            if normalizado != titulo:
+                query["normalized"].append({"from": titulo, "to": normalizado})
+            if normalizado.startswith("Redireciona "):
+                destino = normalizado.replace("Redireciona", "Artigo")
+                query["redirects"].append({"from": normalizado, "to": destino})
+                normalizado = destino
+            if normalizado not in canonicos:
+                canonicos.append(normalizado)
+
+        inicio = int(params.get("rvcontinue", 0))
+        for k, titulo in enumerate(canonicos):
+            if titulo.startswith("Inexistente"):
+                query["pages"].append({"title": titulo, "missing": True})
+                continue
+            pagina = {"title": titulo, "fullurl": f"https://pt.wikipedia.org/wiki/{titulo.replace(' ', '_')}"}
+            if inicio <= k < inicio + CONTEUDOS_POR_RESPOSTA:
+                pagina["description"] = f"Descrição de {titulo}"
+                conteudo = f"'''Texto''' de {titulo}.\n\nMais texto."
+                pagina["revisions"] = [{"slots": {"main": {"content": conteudo}}}]
+            query["pages"].append(pagina)
+
+        resposta = {"query": query}
+        if inicio + CONTEUDOS_POR_RESPOSTA < len(canonicos):
+            resposta["continue"] = {"rvcontinue": str(inicio + CONTEUDOS_POR_RESPOSTA), "continue": "||"}
+        return resposta
+
+
+@pytest.fixture
+def servidor():
+    _StubWikipedia.estado.update(requisicoes=0, em_voo=0, pico=0, falhas_429=0)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StubWikipedia)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestWikipediaAsyncAPIClient:
+    """Testes para o WikipediaAsyncAPIClient (uma busca por título)"""
+
+    def test_busca_titulos_em_paralelo(self, servidor):
+        """Testa se vários títulos são buscados concorrentemente"""
+        titulos = [f"Artigo {i}" for i in range(8)]
+
+        artigos = buscar_artigos_concorrente(titulos, lote=False, base_url=servidor, max_concorrencia=16)
+
+        assert set(artigos) == set(titulos)
+        assert artigos["Artigo 3"]["content"].startswith("Texto completo de Artigo 3")
+        # Summary e extract de vários títulos ficaram em voo ao mesmo tempo
+        assert _StubWikipedia.estado["pico"] > 2
+
+    def test_respeita_limite_de_concorrencia(self, servidor):
+        """Testa se o semáforo limita as requisições em voo"""
+        buscar_artigos_concorrente(
+            [f"Artigo {i}" for i in range(6)], lote=False, base_url=servidor, max_concorrencia=2
+        )
+
+        assert _StubWikipedia.estado["pico"] <= 2
+
+    def test_artigo_inexistente_retorna_none(self, servidor):
+        """Testa se um 404 no summary resulta em None"""
+        artigos = buscar_artigos_concorrente(["Inexistente X", "Artigo 1"], lote=False, base_url=servidor)
+
+        assert artigos["Inexistente X"] is None
+        assert artigos["Artigo 1"]["title"] == "Artigo 1"
+
+    def test_retenta_apos_429(self, servidor):
+        """Testa se respostas 429 com Retry-After são retentadas"""
+        _StubWikipedia.estado["falhas_429"] = 2
+
+        async def _buscar():
+            async with WikipediaAsyncAPIClient(base_url=servidor, max_concorrencia=1) as client:
+                artigo = await client.buscar_artigo_completo("Artigo 1")
+                return artigo, client.estatisticas
+
+        artigo, estatisticas = asyncio.run(_buscar())
+
+        assert artigo["content"].startswith("Texto completo")
+        assert estatisticas["retentativas"] == 2
+        assert estatisticas["pausas_rate_limit"] >= 2
+
+    def test_retry_after_em_data_http(self):
+        """Testa a interpretação de Retry-After como segundos e como data HTTP"""
+        assert WikipediaAsyncAPIClient._segundos_retry_after("3") == 3.0
+        assert WikipediaAsyncAPIClient._segundos_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert WikipediaAsyncAPIClient._segundos_retry_after("inválido") is None
+
+
+class TestBuscaEmLote:
+    """Testes para a busca multi-título (titles=A|B|C)"""
+
+    def test_agrupa_titulos_e_segue_continue(self, servidor):
+        """Testa se 60 títulos viram 2 grupos e as continuações são seguidas"""
+        titulos = [f"Artigo {i}" for i in range(60)]
+
+        artigos = buscar_artigos_concorrente(titulos, base_url=servidor)
+
+        assert all(artigos[t] and t in artigos[t]["content"] for t in titulos)
+        # Grupos de 50 e 10 títulos; o primeiro precisa de 3 respostas (20 conteúdos cada)
+        assert _StubWikipedia.estado["requisicoes"] == 4
+
+    def test_mapeia_normalizacao_e_redirecionamento(self, servidor):
+        """Testa se o resultado é indexado pelo título solicitado"""
+        artigos = buscar_artigos_concorrente(["artigo_1", "Redireciona 2", "Inexistente Y"], base_url=servidor)
+
+        assert artigos["artigo_1"]["title"] == "Artigo 1"
+        assert artigos["Redireciona 2"]["title"] == "Artigo 2"
+        assert artigos["Redireciona 2"]["description"] == "Descrição de Artigo 2"
+        assert artigos["Inexistente Y"] is None
+
+    def test_limpa_wikitext(self, servidor):
+        """Testa se o limpador recebido é aplicado ao wikitext"""
+        artigos = buscar_artigos_concorrente(
+            ["Artigo 5"], base_url=servidor, limpar_texto=lambda t: t.replace("'''", "")
+        )
+
+        assert artigos["Artigo 5"]["content"].startswith("Texto de Artigo 5.")
+        assert artigos["Artigo 5"]["extract"] == "Texto de Artigo 5."
@@ -0,0 +1,72 @@
+"""
+Testes unitários para a limpeza de wikitext em varredura única
+"""
+import pytest
+from services.utils.wikitext_utils import limpar_wikitext
+
+
+class TestLimparWikitext:
+    """Testes para limpar_wikitext"""
+
+    def test_predefinicoes_aninhadas(self):
+        """Testa se predefinições aninhadas são removidas por inteiro"""
+        texto = "Antes {{Info/País\n| nome = {{nowrap|Brasil {{small|x}}}}\n| capital = [[Brasília]]\n}} depois."
+
+        assert limpar_wikitext(texto) == "Antes depois."
+
+    def test_tabelas(self):
+        """Testa se tabelas {| |} são removidas, inclusive com predefinições dentro"""
+        texto = "Início.\n{| class=\"wikitable\"\n|-\n| {{formatnum:10}} || b\n|}\nFim."
+
+        assert limpar_wikitext(texto) == "Início.\n\nFim."
+
+    def test_links(self):
+        """Testa links simples, com rótulo e com sufixo"""
+        texto = "O [[Brasil]] e a [[República Portuguesa|Portugal]] têm [[casa]]s."
+
+        assert limpar_wikitext(texto) == "O Brasil e a Portugal têm casas."
+
+    def test_categorias_arquivos_e_interwikis(self):
+        """Testa se categorias, arquivos (com legenda aninhada) e interwikis somem"""
+        texto = (
+            "Texto.\n[[Ficheiro:Mapa.png|thumb|Mapa de [[Portugal]]]]\n"
+            "[[Categoria:Países]]\n[[en:Brazil]]\nVer [[:Categoria:Países]]."
+        )
+
+        assert limpar_wikitext(texto) == "Texto.\n\nVer Categoria:Países."
+
+    def test_referencias_comentarios_e_tags(self):
+        """Testa remoção de <ref>, comentários, tags e ênfase"""
+        texto = (
+            "O '''Brasil'''<ref name=\"a\">{{citar web|url=x}}</ref> é ''grande''<ref name=\"a\"/>."
+            "<!-- nota {{x}} --> <small>Fim</small>&nbsp;aqui.<math>x^2</math>"
+        )
+
+        assert limpar_wikitext(texto) == "O Brasil é grande. Fim aqui."
+
+    def test_links_externos(self):
+        """Testa se links externos mantêm apenas o rótulo"""
+        assert limpar_wikitext("Veja [https://exemplo.org o site] e [http://x.org].") == "Veja o site e ."
+
+    def test_titulos_listas_e_paragrafos(self):
+        """Testa se marcadores saem e parágrafos continuam separados por linha em branco"""
+        texto = "== História ==\nPrimeiro.\n\n\n\n* item um\n# item dois\n\nÚltimo   parágrafo."
+
+        assert limpar_wikitext(texto) == "História\nPrimeiro.\n\nitem um\nitem dois\n\nÚltimo parágrafo."
+
+    def test_predefinicao_sem_fechamento(self):
+        """Testa se uma predefinição sem fechamento não apaga o resto do artigo"""
+        texto = "Começo {{quebrada texto [[Lisboa]] continua."
+
+        assert limpar_wikitext(texto) == "Começo quebrada texto Lisboa continua."
+
+    def test_muitas_aberturas_sem_fechamento(self):
+        """Testa se aberturas sem fechamento são resolvidas em uma passada, junto com as que fecham"""
+        texto = "a {{ " * 20000 + "fim {{remover}} [[Lisboa]]"
+
+        assert limpar_wikitext(texto) == "a " * 19999 + "a fim Lisboa"
+
+    @pytest.mark.parametrize("texto", ["", None])
+    def test_vazio(self, texto):
+        """Testa entrada vazia"""
+        assert limpar_wikitext(texto) == ""